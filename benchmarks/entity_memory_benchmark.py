@@ -0,0 +1,163 @@
+"""
+Memory of the entity classes created every round: the slotted classes
+against a `__dict__` replica of each (the same attributes, set in the same
+order), and how many of them a 200 round match against the greedy bots
+creates
+
+    PYTHONPATH=src python benchmarks/entity_memory_benchmark.py --rounds 200
+"""
+
+import argparse
+import contextlib
+import os
+import tracemalloc
+
+from python_prototypes.field_types import Coordinate, EntitiesForReaper, GridUnitState, PlayerState, Unit
+from python_prototypes.reaper.q_state_types import MissionStep, ReaperActionsQWeights, ReaperActionTypes
+from python_prototypes.reaper.target_selector import SelectedTargetInformation
+from python_prototypes.reaper.target_tracker_determiner import (
+    DynamicTargetTracker,
+    RoundCountTracker,
+    StaticTargetTracker,
+)
+from python_prototypes.simulation.referee import EngineBot, GreedyHarvesterBot, LocalReferee
+
+INSTANCE_COUNT = 10_000
+
+
+def create_unit() -> Unit:
+    return Unit(100, 200, 3, 4, 400, 0, 0, 1, 0.5, -1, -1)
+
+
+def create_grid_unit_state() -> GridUnitState:
+    return GridUnitState((1, 2), create_unit())
+
+
+ENTITY_FACTORIES = {
+    Unit: create_unit,
+    GridUnitState: create_grid_unit_state,
+    Coordinate: lambda: Coordinate(100, 200),
+    PlayerState: lambda: PlayerState(
+        create_grid_unit_state(), create_grid_unit_state(), create_grid_unit_state(), 10, 20, 5, 15
+    ),
+    SelectedTargetInformation: lambda: SelectedTargetInformation(3, EntitiesForReaper.WRECK, 0),
+    MissionStep: lambda: MissionStep(None, ReaperActionTypes.wait),
+    StaticTargetTracker: StaticTargetTracker,
+    DynamicTargetTracker: DynamicTargetTracker,
+    RoundCountTracker: RoundCountTracker,
+    ReaperActionsQWeights: lambda: ReaperActionsQWeights({action_type: 0.0 for action_type in ReaperActionTypes}),
+}
+
+
+def get_slot_names(entity_type: type) -> list[str]:
+    return [name for base_type in reversed(entity_type.__mro__) for name in base_type.__dict__.get("__slots__", ())]
+
+
+def get_dict_replica_factory(entity_type: type, factory):
+    """
+    the instances are copies of the slotted ones with a `__dict__` (the
+    attributes of the members are shared, only the instances are measured)
+    """
+    replica_type = type(f"{entity_type.__name__}Dict", (), {})
+    slot_names = get_slot_names(entity_type)
+
+    def create_replica():
+        entity = factory()
+        replica = replica_type()
+        for name in slot_names:
+            setattr(replica, name, getattr(entity, name))
+        return replica
+
+    return create_replica
+
+
+def get_instance_bytes(factory, instance_count: int = INSTANCE_COUNT) -> float:
+    """
+    :return: the bytes allocated per instance, everything referenced by the
+        instance included
+    """
+    tracemalloc.start()
+    try:
+        instances = [factory() for _ in range(instance_count)]
+        allocated_bytes = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del instances
+    return allocated_bytes / instance_count
+
+
+@contextlib.contextmanager
+def count_instances(entity_types: list[type]):
+    """
+    counts the instances created while inside, the `__init__` of the types
+    is wrapped meanwhile
+    """
+    counts = {entity_type: 0 for entity_type in entity_types}
+    original_inits = {entity_type: entity_type.__dict__.get("__init__") for entity_type in entity_types}
+
+    def get_counting_init(entity_type, original_init):
+        def counting_init(self, *args, **kwargs):
+            if type(self) is entity_type:
+                counts[entity_type] += 1
+            original_init(self, *args, **kwargs)
+
+        return counting_init
+
+    for entity_type in entity_types:
+        entity_type.__init__ = get_counting_init(entity_type, entity_type.__init__)
+    try:
+        yield counts
+    finally:
+        for entity_type, original_init in original_inits.items():
+            if original_init is None:
+                del entity_type.__init__
+            else:
+                entity_type.__init__ = original_init
+
+
+def play_match(round_count: int, seed: int) -> int:
+    """
+    :return: the peak traced memory of the match
+    """
+    referee = LocalReferee(
+        [EngineBot(), GreedyHarvesterBot(), GreedyHarvesterBot()], seed=seed, max_round_count=round_count
+    )
+    tracemalloc.start()
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull):
+            referee.play_match()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entity memory of a match")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    with count_instances(list(ENTITY_FACTORIES)) as counts:
+        peak_bytes = play_match(arguments.rounds, arguments.seed)
+    print(f"{arguments.rounds} round match, peak traced memory {peak_bytes / 1e6:.1f} MB")
+
+    total_slotted_bytes = 0.0
+    total_dict_bytes = 0.0
+    for entity_type, factory in ENTITY_FACTORIES.items():
+        slotted_bytes = get_instance_bytes(factory)
+        dict_bytes = get_instance_bytes(get_dict_replica_factory(entity_type, factory))
+        count = counts[entity_type]
+        total_slotted_bytes += count * slotted_bytes
+        total_dict_bytes += count * dict_bytes
+        print(
+            f"{entity_type.__name__}: {count} created, {slotted_bytes:.0f} bytes slotted, "
+            f"{dict_bytes:.0f} bytes with __dict__ ({1 - slotted_bytes / dict_bytes:.0%} less)"
+        )
+    print(
+        f"allocated by the created entities: {total_slotted_bytes / 1e6:.1f} MB slotted, "
+        f"{total_dict_bytes / 1e6:.1f} MB with __dict__"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Per round parse latency of the game input: the line by line `input()` loop
+against the bulk frame reader, on rounds recorded from local referee games.
+Both produce the units and the unit table of the round (what
+`run_engine_round` uses)
+
+    PYTHONPATH=src python benchmarks/frame_reader_benchmark.py --matches 3
+"""
+
+import argparse
+import io
+import time
+
+from python_prototypes.field_types import UnitTable
+from python_prototypes.round_input import RoundInput, parse_unit_line, read_round_input_from_buffer
+from python_prototypes.simulation.referee import GreedyHarvesterBot, LocalReferee, RecordingBot
+
+
+def record_rounds(match_count: int, round_count: int) -> list[RoundInput]:
+    round_inputs = []
+    for seed in range(match_count):
+        recording_bot = RecordingBot(GreedyHarvesterBot())
+        referee = LocalReferee(
+            [recording_bot, GreedyHarvesterBot(), GreedyHarvesterBot()], seed=seed, max_round_count=round_count
+        )
+        referee.play_match()
+        round_inputs.extend(recorded_round.round_input for recorded_round in recording_bot.recorded_rounds)
+    return round_inputs
+
+
+def read_line_by_line(stream: io.TextIOBase) -> RoundInput:
+    """
+    the previous game loop, `input()` is a `readline` of stdin
+    """
+    header = [int(stream.readline()) for _ in range(7)]
+    units = [parse_unit_line(stream.readline()) for _ in range(header[6])]
+    return RoundInput(*header[:6], units=units, unit_table=UnitTable.from_units(units))
+
+
+def time_reader(reader, stream, round_count: int) -> float:
+    """
+    :return: mean microseconds per round
+    """
+    start = time.perf_counter()
+    for _ in range(round_count):
+        reader(stream)
+    return (time.perf_counter() - start) / round_count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round input parse latency")
+    parser.add_argument("--matches", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5)
+    arguments = parser.parse_args()
+
+    round_inputs = record_rounds(arguments.matches, arguments.rounds)
+    text = "".join(f"{line}\n" for round_input in round_inputs for line in round_input.to_lines())
+    unit_count = sum(len(round_input.units) for round_input in round_inputs)
+    print(f"{len(round_inputs)} rounds, {unit_count / len(round_inputs):.1f} units per round")
+
+    line_timings = []
+    bulk_timings = []
+    for _ in range(arguments.repeats):
+        line_timings.append(time_reader(read_line_by_line, io.StringIO(text), len(round_inputs)))
+        bulk_timings.append(time_reader(read_round_input_from_buffer, io.BytesIO(text.encode()), len(round_inputs)))
+    line_timing, bulk_timing = min(line_timings), min(bulk_timings)
+    print(f"line by line: {line_timing:.1f} us per round")
+    print(f"bulk:         {bulk_timing:.1f} us per round ({line_timing / bulk_timing:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Per round overhead of the binary frame recorder (the record and the flushes
+included), and the size of the log, on rounds recorded from local referee
+games. A record should stay well under 1 ms
+
+    PYTHONPATH=src python benchmarks/frame_recorder_benchmark.py --matches 3
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from python_prototypes.frame_recorder import FrameRecorder, get_index_path, iter_recorded_frames
+from python_prototypes.round_input import RecordedRound
+from python_prototypes.simulation.referee import GreedyHarvesterBot, LocalReferee, RecordingBot
+
+
+def record_rounds(match_count: int, round_count: int) -> list[RecordedRound]:
+    recorded_rounds = []
+    for seed in range(match_count):
+        recording_bot = RecordingBot(GreedyHarvesterBot())
+        referee = LocalReferee(
+            [recording_bot, GreedyHarvesterBot(), GreedyHarvesterBot()], seed=seed, max_round_count=round_count
+        )
+        referee.play_match()
+        recorded_rounds.extend(recording_bot.recorded_rounds)
+    return recorded_rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame recorder overhead")
+    parser.add_argument("--matches", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=200)
+    arguments = parser.parse_args()
+
+    recorded_rounds = record_rounds(arguments.matches, arguments.rounds)
+    # the game loop has the table of the round already (the bulk frame reader builds it)
+    for recorded_round in recorded_rounds:
+        recorded_round.round_input.get_unit_table()
+    timings = {"read": 1e-4, "engine": 1e-3}
+    with tempfile.TemporaryDirectory() as directory:
+        log_path = Path(directory) / "match.bin"
+        round_seconds = []
+        with FrameRecorder(log_path) as frame_recorder:
+            for recorded_round in recorded_rounds:
+                start = time.perf_counter()
+                frame_recorder.record(recorded_round.round_input, recorded_round.commands, timings)
+                round_seconds.append(time.perf_counter() - start)
+        log_size = log_path.stat().st_size + get_index_path(log_path).stat().st_size
+
+        start = time.perf_counter()
+        read_count = sum(1 for _ in iter_recorded_frames(log_path))
+        read_seconds = time.perf_counter() - start
+
+    round_seconds.sort()
+    print(f"{len(recorded_rounds)} rounds, {log_size / len(recorded_rounds):.0f} bytes per round")
+    print(
+        f"record: mean {sum(round_seconds) / len(round_seconds) * 1e6:.1f} us, "
+        f"p99 {round_seconds[int(len(round_seconds) * 0.99)] * 1e6:.1f} us per round"
+    )
+    print(f"read back: {read_seconds / read_count * 1e6:.1f} us per round")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+The production game loop (`original_game_main` without stdin and stdout) at
+full speed over local data: the rounds are written in the game protocol
+into a buffer, read back with the stdin reader, played by the engine and
+the commands are written as lines into another buffer. The time of every
+round (read, engine and write) is taken between the consecutive writes
+
+The rounds come from the given recordings (frame logs or text recordings,
+one match each), or from local referee games if there is none
+
+    PYTHONPATH=src python benchmarks/game_loop_benchmark.py recordings/*.mmf
+    PYTHONPATH=src python benchmarks/game_loop_benchmark.py --matches 3 --rounds 200
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import time
+from pathlib import Path
+
+from python_prototypes.frame_recorder import iter_recording
+from python_prototypes.input_handler import GameLoop, StreamCommandSink, iter_stream_round_inputs
+from python_prototypes.round_input import RecordedRound
+from python_prototypes.simulation.referee import GreedyHarvesterBot, LocalReferee, RecordingBot
+from python_prototypes.simulation.tournament import get_seat_latency
+
+
+class TimedCommandSink(StreamCommandSink):
+    """
+    keeps when the commands of every round were written
+    """
+
+    def __init__(self, stream: io.StringIO):
+        super().__init__(stream)
+        self.write_times: list[float] = []
+
+    def write(self, commands: tuple[str, str, str]) -> None:
+        super().write(commands)
+        self.write_times.append(time.perf_counter())
+
+
+def record_matches(match_count: int, round_count: int) -> list[list[RecordedRound]]:
+    matches = []
+    for seed in range(match_count):
+        recording_bot = RecordingBot(GreedyHarvesterBot())
+        referee = LocalReferee(
+            [recording_bot, GreedyHarvesterBot(), GreedyHarvesterBot()], seed=seed, max_round_count=round_count
+        )
+        referee.play_match()
+        matches.append(recording_bot.recorded_rounds)
+    return matches
+
+
+def get_protocol_bytes(recorded_rounds: list[RecordedRound]) -> bytes:
+    return "".join(
+        f"{line}\n" for recorded_round in recorded_rounds for line in recorded_round.round_input.to_lines()
+    ).encode()
+
+
+def run_match(protocol_bytes: bytes, seed: int) -> list[float]:
+    """
+    :return: the seconds of every round
+    """
+    random.seed(seed)
+    command_sink = TimedCommandSink(io.StringIO())
+    game_loop = GameLoop(command_sink=command_sink)
+    start = time.perf_counter()
+    game_loop.run(iter_stream_round_inputs(io.BytesIO(protocol_bytes)))
+    round_starts = [start] + command_sink.write_times[:-1]
+    return [write_time - round_start for round_start, write_time in zip(round_starts, command_sink.write_times)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="The game loop over local data")
+    parser.add_argument("recordings", type=Path, nargs="*", help="frame logs or text recordings")
+    parser.add_argument("--matches", type=int, default=3, help="referee matches, if there is no recording")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    if arguments.recordings:
+        matches = [list(iter_recording(path)) for path in arguments.recordings]
+    else:
+        matches = record_matches(arguments.matches, arguments.rounds)
+
+    round_seconds = []
+    total_seconds = 0.0
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull):
+        for recorded_rounds in matches:
+            start = time.perf_counter()
+            round_seconds.extend(run_match(get_protocol_bytes(recorded_rounds), arguments.seed))
+            total_seconds += time.perf_counter() - start
+
+    latency = get_seat_latency(round_seconds)
+    print(
+        f"{len(matches)} matches, {len(round_seconds)} rounds in {total_seconds:.2f} s "
+        f"({len(round_seconds) / total_seconds:.0f} rounds/s)"
+    )
+    print(f"round time mean {latency.mean_ms:.2f} ms, p95 {latency.p95_ms:.2f} ms, max {latency.max_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
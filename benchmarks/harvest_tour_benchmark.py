@@ -0,0 +1,66 @@
+"""
+Planning time of the multi-wreck harvest tours on growing numbers of random
+wrecks. Dozens of wrecks should be planned within 20 ms
+
+    PYTHONPATH=src python benchmarks/harvest_tour_benchmark.py --maps 20
+"""
+
+import argparse
+import random
+import time
+
+from python_prototypes.field_types import Entity, Unit
+from python_prototypes.simulation.harvest_tour import plan_harvest_tour
+from python_prototypes.simulation.water_extraction import WaterExtractionMap
+
+WRECK_COUNTS = (5, 10, 20, 40)
+
+
+def get_water_extraction_map(wreck_count: int) -> WaterExtractionMap:
+    wrecks = [
+        Unit(
+            random.randint(-5000, 5000),
+            random.randint(-5000, 5000),
+            0,
+            0,
+            random.randint(600, 900),
+            Entity.WRECK.value,
+            -1,
+            unit_id,
+            -1,
+            random.randint(1, 9),
+            -1,
+        )
+        for unit_id in range(wreck_count)
+    ]
+    water_extraction_map = WaterExtractionMap()
+    water_extraction_map.set_units(wrecks)
+    return water_extraction_map
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Harvest tour planning time")
+    parser.add_argument("--maps", type=int, default=20, help="random wreck maps per wreck count")
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+    random.seed(arguments.seed)
+
+    reaper = Unit(0, 0, 0, 0, 400, Entity.REAPER.value, 0, 0, 0.5)
+    for wreck_count in WRECK_COUNTS:
+        plan_seconds = []
+        stop_count = 0
+        for _ in range(arguments.maps):
+            water_extraction_map = get_water_extraction_map(wreck_count)
+            start = time.perf_counter()
+            tour = plan_harvest_tour(reaper, water_extraction_map)
+            plan_seconds.append(time.perf_counter() - start)
+            stop_count += len(tour.stops)
+        plan_seconds.sort()
+        print(
+            f"{wreck_count:>3} wrecks: mean {sum(plan_seconds) / len(plan_seconds) * 1e3:.2f} ms, "
+            f"max {plan_seconds[-1] * 1e3:.2f} ms, {stop_count / arguments.maps:.1f} stops per tour"
+        )
+
+
+if __name__ == "__main__":
+    main()
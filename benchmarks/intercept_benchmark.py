@@ -0,0 +1,112 @@
+"""
+The scalar intercept solver (one target at a time) against the vectorized
+one (every target in the same numpy passes): on the enemy looters of the
+rounds of local referee games, chased by the player's reaper (what
+`EnemyMotionPredictor.update` solves every round), and on growing numbers of
+drifting targets, to find where the numpy passes start paying off
+(`SCALAR_TARGET_LIMIT`)
+
+    PYTHONPATH=src python benchmarks/intercept_benchmark.py --matches 3
+"""
+
+import argparse
+import random
+import time
+
+from python_prototypes.field_types import Entity, GameGridInformation, Unit
+from python_prototypes.simulation.intercept_solver import get_scalar_intercepts, get_vectorized_intercepts
+from python_prototypes.simulation.referee import GreedyHarvesterBot, LocalReferee, RecordingBot
+from python_prototypes.unit_parameters import UnitMass
+
+TARGET_COUNTS = (1, 2, 4, 6, 8, 12, 24)
+
+
+def get_match_chases(match_count: int, round_count: int) -> list[tuple[Unit, list[Unit]]]:
+    """
+    :return: the player's reaper and the enemy looters of every round
+    """
+    chases = []
+    for seed in range(match_count):
+        recording_bot = RecordingBot(GreedyHarvesterBot())
+        referee = LocalReferee(
+            [recording_bot, GreedyHarvesterBot(), GreedyHarvesterBot()], seed=seed, max_round_count=round_count
+        )
+        referee.play_match()
+        for recorded_round in recording_bot.recorded_rounds:
+            game_grid_information = GameGridInformation(unit_table=recorded_round.round_input.get_unit_table())
+            enemy_units = [
+                grid_unit.unit
+                for grid_state in (
+                    game_grid_information.enemy_reaper_grid_state,
+                    game_grid_information.enemy_others_grid_state,
+                )
+                for grid_units in grid_state.values()
+                for grid_unit in grid_units
+            ]
+            chases.append((game_grid_information.player_looters[Entity.REAPER].unit, enemy_units))
+    return chases
+
+
+def get_random_chases(target_count: int, chase_count: int) -> list[tuple[Unit, list[Unit]]]:
+    chaser = Unit(0, 0, 100, 0, 400, Entity.REAPER.value, 0, 0, UnitMass.reaper)
+    return [
+        (
+            chaser,
+            [
+                Unit(
+                    random.randint(-6000, 6000),
+                    random.randint(-6000, 6000),
+                    random.randint(-400, 400),
+                    random.randint(-400, 400),
+                    400,
+                    random.choice((Entity.REAPER.value, Entity.DESTROYER.value, Entity.DOOF.value)),
+                    1,
+                    target_index + 1,
+                    UnitMass.reaper,
+                )
+                for target_index in range(target_count)
+            ],
+        )
+        for _ in range(chase_count)
+    ]
+
+
+def get_chase_microseconds(solver, chases: list[tuple[Unit, list[Unit]]], repeat_count: int = 5) -> float:
+    """
+    :return: the mean time of a chase, of the fastest repeat
+    """
+    repeat_seconds = []
+    for _ in range(repeat_count):
+        start = time.perf_counter()
+        for chaser, targets in chases:
+            solver(chaser, targets)
+        repeat_seconds.append(time.perf_counter() - start)
+    return min(repeat_seconds) / len(chases) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scalar against vectorized intercept solver")
+    parser.add_argument("--matches", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--chases", type=int, default=200, help="random chases per target count")
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+    random.seed(arguments.seed)
+
+    match_chases = get_match_chases(arguments.matches, arguments.rounds)
+    scalar_microseconds = get_chase_microseconds(get_scalar_intercepts, match_chases)
+    vectorized_microseconds = get_chase_microseconds(get_vectorized_intercepts, match_chases)
+    print(
+        f"{len(match_chases)} match rounds: scalar {scalar_microseconds:.0f} us, "
+        f"vectorized {vectorized_microseconds:.0f} us per round"
+    )
+    for target_count in TARGET_COUNTS:
+        chases = get_random_chases(target_count, arguments.chases)
+        print(
+            f"{target_count:>3} targets: scalar {get_chase_microseconds(get_scalar_intercepts, chases):.0f} us, "
+            f"vectorized {get_chase_microseconds(get_vectorized_intercepts, chases):.0f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Speed of the local referee: full matches of the scripted bots (no engine),
+so only the referee and its simulation are measured
+
+    PYTHONPATH=src python benchmarks/referee_benchmark.py --matches 5
+"""
+
+import argparse
+import time
+
+from python_prototypes.simulation.referee import GreedyHarvesterBot, LocalReferee, WaitBot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local referee speed")
+    parser.add_argument("--matches", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    match_seconds = []
+    round_count = 0
+    for match_index in range(arguments.matches):
+        referee = LocalReferee(
+            [GreedyHarvesterBot(), GreedyHarvesterBot(), WaitBot()], seed=arguments.seed + match_index
+        )
+        start = time.perf_counter()
+        result = referee.play_match()
+        match_seconds.append(time.perf_counter() - start)
+        round_count += result.round_count
+
+    total_seconds = sum(match_seconds)
+    print(
+        f"{arguments.matches} matches, {round_count} rounds: {total_seconds / arguments.matches:.3f} s per match "
+        f"(max {max(match_seconds):.3f} s), {round_count / total_seconds:.0f} rounds/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
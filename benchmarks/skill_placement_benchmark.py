@@ -0,0 +1,64 @@
+"""
+Placement time of the skills against growing numbers of looters around the
+caster, with the default time budget. A placement should stay close to the
+budget, and well within 2 ms
+
+    PYTHONPATH=src python benchmarks/skill_placement_benchmark.py --placements 100
+"""
+
+import argparse
+import random
+import time
+
+from python_prototypes.field_types import Entity, Unit
+from python_prototypes.simulation.skill_placement import SKILL_PLACEMENT_BUDGET_US, SkillType, find_skill_placement
+
+LOOTER_COUNTS = (3, 6, 9)
+
+
+def get_looters(looter_count: int) -> list[Unit]:
+    return [
+        Unit(
+            random.randint(-3000, 3000),
+            random.randint(-3000, 3000),
+            0,
+            0,
+            400,
+            random.choice((Entity.REAPER.value, Entity.DESTROYER.value, Entity.DOOF.value)),
+            random.randint(0, 2),
+            unit_id,
+            0.5,
+            -1,
+            -1,
+        )
+        for unit_id in range(1, looter_count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Skill placement time")
+    parser.add_argument("--placements", type=int, default=100, help="random placements per skill and looter count")
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+    random.seed(arguments.seed)
+
+    caster = Unit(0, 0, 0, 0, 400, Entity.REAPER.value, 0, 0, 0.5, -1, -1)
+    print(f"budget {SKILL_PLACEMENT_BUDGET_US} us")
+    for skill_type in SkillType:
+        for looter_count in LOOTER_COUNTS:
+            placement_seconds = []
+            for _ in range(arguments.placements):
+                units = [caster] + get_looters(looter_count)
+                start = time.perf_counter()
+                find_skill_placement(skill_type, caster, units)
+                placement_seconds.append(time.perf_counter() - start)
+            placement_seconds.sort()
+            print(
+                f"{skill_type.name:>8}, {looter_count} looters: "
+                f"mean {sum(placement_seconds) / len(placement_seconds) * 1e6:.0f} us, "
+                f"max {placement_seconds[-1] * 1e6:.0f} us"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,7 @@ PROJECT_PACKAGE = "python_prototypes"  # your package name prefix
 # =========================
 
 
-def find_dependencies(file_path: Path, visited=None):
+def find_dependencies(file_path: Path, visited=None, project_root: Path = PROJECT_ROOT):
     """Recursively find all internal project dependencies."""
     if visited is None:
         visited = set()
@@ -32,28 +32,28 @@ def find_dependencies(file_path: Path, visited=None):
         if isinstance(node, ast.ImportFrom) and node.module:
             if node.module.startswith(PROJECT_PACKAGE):
                 rel_path = node.module.replace(".", "/") + ".py"
-                abs_path = PROJECT_ROOT / rel_path.split(f"{PROJECT_PACKAGE}/")[-1]
+                abs_path = project_root / rel_path.split(f"{PROJECT_PACKAGE}/")[-1]
                 if abs_path.exists():
                     dependencies.append(abs_path)
         elif isinstance(node, ast.Import):
             for alias in node.names:
                 if alias.name.startswith(PROJECT_PACKAGE):
                     rel_path = alias.name.replace(".", "/") + ".py"
-                    abs_path = PROJECT_ROOT / rel_path.split(f"{PROJECT_PACKAGE}/")[-1]
+                    abs_path = project_root / rel_path.split(f"{PROJECT_PACKAGE}/")[-1]
                     if abs_path.exists():
                         dependencies.append(abs_path)
 
     merged = []
     for dep in dependencies:
-        merged.extend(find_dependencies(dep, visited))
+        merged.extend(find_dependencies(dep, visited, project_root))
 
     merged.append(file_path)
     return merged
 
 
-def merge_files(entry_file: Path, output_file: Path):
+def merge_files(entry_file: Path, output_file: Path, project_root: Path = PROJECT_ROOT):
     """Flatten all internal modules into a single .py file."""
-    all_files = find_dependencies(entry_file)
+    all_files = find_dependencies(entry_file, project_root=project_root)
     all_files = list(dict.fromkeys(all_files))  # preserve order, remove dups
 
     print(f"🧩 Found {len(all_files)} modules to merge.")
@@ -65,7 +65,7 @@ def merge_files(entry_file: Path, output_file: Path):
         out.write("# ======= MERGED CODINGAME SOLUTION =======\n\n")
 
         for path in all_files:
-            rel_path = path.relative_to(PROJECT_ROOT)
+            rel_path = path.relative_to(project_root)
             out.write(f"\n# ===== FILE: {rel_path} =====\n")
 
             with open(path, "r", encoding="utf-8") as f:
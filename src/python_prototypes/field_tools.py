@@ -53,6 +53,141 @@ def calculate_speed_from_vectors(vx: float, vy: float) -> float:
     return math.sqrt(vx**2 + vy**2)
 
 
+def calculate_relative_heading(
+    coordinate: tuple[float, float],
+    velocity: tuple[float, float],
+    target_coordinate: tuple[float, float],
+) -> float:
+    """
+    Angle (radians, between 0 and pi) of the velocity relative to the
+    direction towards the target. 0 means moving straight at the target, pi
+    means moving straight away from it. Standing still (or standing on the
+    target) counts as 0
+    """
+    dx = target_coordinate[0] - coordinate[0]
+    dy = target_coordinate[1] - coordinate[1]
+    vx, vy = velocity
+    if (dx == 0 and dy == 0) or (vx == 0 and vy == 0):
+        return 0.0
+    return abs(math.atan2(dx * vy - dy * vx, dx * vx + dy * vy))
+
+
+def get_drift_factor(friction, rounds):
+    """
+    distance drifted in `rounds` (can be fractional) rounds without thrust,
+    in units of the starting velocity. Friction is applied after the
+    movement of every round
+
+    The friction and the rounds can be numpy arrays as well (broadcast
+    against each other), the vectorized solvers use it that way
+    """
+    if isinstance(friction, (int, float)):
+        if friction == 0:
+            return rounds
+        return (1 - (1 - friction) ** rounds) / friction
+    # the same without branches, the static units drift linearly
+    is_static = friction == 0
+    safe_friction = friction + is_static
+    return (1 - (1 - safe_friction) ** rounds) / safe_friction * (1 - is_static) + rounds * is_static
+
+
+def get_thrust_reach(acceleration, friction, rounds):
+    """
+    distance covered in `rounds` rounds (on top of the drift) when
+    accelerating with `acceleration` in a fixed direction, starting from a
+    standstill. Takes numpy arrays like `get_drift_factor`
+    """
+    if isinstance(friction, (int, float)):
+        if friction == 0:
+            return acceleration * rounds * (rounds + 1) / 2
+        return acceleration / friction * (rounds - (1 - friction) * get_drift_factor(friction, rounds))
+    is_static = friction == 0
+    safe_friction = friction + is_static
+    drift = get_drift_factor(safe_friction, rounds)
+    moving_reach = acceleration / safe_friction * (rounds - (1 - safe_friction) * drift)
+    return moving_reach * (1 - is_static) + acceleration * rounds * (rounds + 1) / 2 * is_static
+
+
+def get_intercept_gap(
+    chaser_coordinate: tuple[float, float],
+    chaser_velocity: tuple[float, float],
+    chaser_friction: float,
+    chaser_acceleration: float,
+    target_coordinate: tuple[float, float],
+    target_velocity: tuple[float, float],
+    target_friction: float,
+    contact_distance: float,
+    rounds: float,
+) -> float:
+    """
+    distance the chaser misses the drifting target by after `rounds` rounds
+    at full thrust, negative if the target can be reached by then. The
+    chaser can reach a circle around its own drifted position, the radius
+    of it is the thrust reach
+    """
+    chaser_drift = get_drift_factor(chaser_friction, rounds)
+    target_drift = get_drift_factor(target_friction, rounds)
+    dx = (target_coordinate[0] + target_velocity[0] * target_drift) - (
+        chaser_coordinate[0] + chaser_velocity[0] * chaser_drift
+    )
+    dy = (target_coordinate[1] + target_velocity[1] * target_drift) - (
+        chaser_coordinate[1] + chaser_velocity[1] * chaser_drift
+    )
+    return math.hypot(dx, dy) - contact_distance - get_thrust_reach(chaser_acceleration, chaser_friction, rounds)
+
+
+def get_intercept(
+    chaser_coordinate: tuple[float, float],
+    chaser_velocity: tuple[float, float],
+    chaser_friction: float,
+    chaser_acceleration: float,
+    target_coordinate: tuple[float, float],
+    target_velocity: tuple[float, float],
+    target_friction: float,
+    contact_distance: float,
+    max_round_count: int = 20,
+    bisection_steps: int = 12,
+) -> tuple[float, tuple[float, float]] | None:
+    """
+    Earliest interception of a drifting target by a chaser at full thrust.
+    The first whole round the target is within reach is found by scanning
+    the rounds, the (fractional) time within that round by bisection
+
+    :return: the time of the interception in rounds and the position of
+        the target at that time, None if it can't be reached within
+        `max_round_count` rounds
+    """
+    gap_arguments = (
+        chaser_coordinate,
+        chaser_velocity,
+        chaser_friction,
+        chaser_acceleration,
+        target_coordinate,
+        target_velocity,
+        target_friction,
+        contact_distance,
+    )
+    if get_intercept_gap(*gap_arguments, rounds=0) <= 0:
+        return 0.0, target_coordinate
+
+    for round_index in range(1, max_round_count + 1):
+        if get_intercept_gap(*gap_arguments, rounds=round_index) > 0:
+            continue
+        low, high = round_index - 1.0, float(round_index)
+        for _ in range(bisection_steps):
+            middle = (low + high) / 2
+            if get_intercept_gap(*gap_arguments, rounds=middle) > 0:
+                low = middle
+            else:
+                high = middle
+        target_drift = get_drift_factor(target_friction, high)
+        return high, (
+            target_coordinate[0] + target_velocity[0] * target_drift,
+            target_coordinate[1] + target_velocity[1] * target_drift,
+        )
+    return None
+
+
 # grid_state: dict[tuple[int, int], list[Entity]] = {}
 # tanker_grid_positions: list[GridUnitState]
 
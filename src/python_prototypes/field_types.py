@@ -1,5 +1,11 @@
+from array import array
+from collections import defaultdict
 from dataclasses import dataclass
 from enum import Enum
+from functools import cached_property
+from typing import Iterable
+
+from python_prototypes.field_tools import get_grid_position
 
 
 class Entity(Enum):
@@ -33,7 +39,43 @@ class PlayerFieldTypes(Enum):
     ENEMY_2 = 2
 
 
+class UnitCategory(Enum):
+    """
+    the groups the units of a round are sorted into
+    """
+
+    WRECK = 0
+    TANKER = 1
+    ENEMY_REAPER = 2
+    ENEMY_OTHER = 3
+    OIL_POOL = 4
+    PLAYER_LOOTER = 5
+    OTHER = 6
+
+
+# keyed by the unit type and whether the unit is the player's, the rest (the
+# tar pools) is `UnitCategory.OTHER`. The wrecks, tankers and oil pools belong
+# to nobody in the game, but a tanker can come with a player (the referee
+# spawns them next to one), so they map for both
+UNIT_CATEGORIES: dict[tuple[int, bool], UnitCategory] = {
+    (Entity.WRECK.value, False): UnitCategory.WRECK,
+    (Entity.WRECK.value, True): UnitCategory.WRECK,
+    (Entity.TANKER.value, False): UnitCategory.TANKER,
+    (Entity.TANKER.value, True): UnitCategory.TANKER,
+    (Entity.REAPER.value, False): UnitCategory.ENEMY_REAPER,
+    (Entity.DESTROYER.value, False): UnitCategory.ENEMY_OTHER,
+    (Entity.DOOF.value, False): UnitCategory.ENEMY_OTHER,
+    (Entity.OIL_POOL.value, False): UnitCategory.OIL_POOL,
+    (Entity.OIL_POOL.value, True): UnitCategory.OIL_POOL,
+    (Entity.REAPER.value, True): UnitCategory.PLAYER_LOOTER,
+    (Entity.DESTROYER.value, True): UnitCategory.PLAYER_LOOTER,
+    (Entity.DOOF.value, True): UnitCategory.PLAYER_LOOTER,
+}
+
+
 class Unit:
+    __slots__ = ("x", "y", "vx", "vy", "radius", "unit_type", "player", "unit_id", "mass", "extra", "extra_2")
+
     def __init__(
         self,
         x,
@@ -61,6 +103,118 @@ class Unit:
         self.extra_2 = extra_2
 
 
+class UnitTable:
+    """
+    The units of a round as columns: contiguous typed arrays (`array.array`,
+    so numpy can read them through the buffer protocol without copying), in
+    the order of the input. Only the mass is a float column (and the columns
+    of hand built units, see `from_units`).
+
+    The indices of every unit type and category are collected once, the
+    `Unit` objects are only created when asked for (and kept)
+    """
+
+    COLUMNS = ("unit_id", "unit_type", "player", "mass", "radius", "x", "y", "vx", "vy", "extra", "extra_2")
+    FLOAT_COLUMNS = ("mass",)
+
+    def __init__(
+        self,
+        unit_id: array,
+        unit_type: array,
+        player: array,
+        mass: array,
+        radius: array,
+        x: array,
+        y: array,
+        vx: array,
+        vy: array,
+        extra: array,
+        extra_2: array,
+        units: list[Unit] | None = None,
+    ):
+        self.unit_id = unit_id
+        self.unit_type = unit_type
+        self.player = player
+        self.mass = mass
+        self.radius = radius
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.extra = extra
+        self.extra_2 = extra_2
+        self._units = units
+        self._type_indices: dict[int, array] = {}
+        self._category_indices: dict[UnitCategory, array] = {category: array("q") for category in UnitCategory}
+        player_value = PlayerFieldTypes.PLAYER.value
+        for index, (unit_type_value, unit_player) in enumerate(zip(unit_type, player)):
+            type_indices = self._type_indices.get(unit_type_value)
+            if type_indices is None:
+                type_indices = self._type_indices[unit_type_value] = array("q")
+            type_indices.append(index)
+            category = UNIT_CATEGORIES.get((unit_type_value, unit_player == player_value), UnitCategory.OTHER)
+            self._category_indices[category].append(index)
+
+    @classmethod
+    def from_columns(cls, columns: Iterable[Iterable[int | float]]) -> "UnitTable":
+        """
+        :param columns: the values of every column, in the order of `COLUMNS`
+        """
+        return cls(
+            *(
+                array("d" if column_name in cls.FLOAT_COLUMNS else "q", values)
+                for column_name, values in zip(cls.COLUMNS, columns)
+            )
+        )
+
+    @classmethod
+    def from_units(cls, units: Iterable[Unit]) -> "UnitTable":
+        """
+        the missing (None) values of the units are stored as -1. Units built
+        by hand may have float coordinates, such columns are stored as floats
+        """
+        units = list(units)
+        columns = []
+        for column_name in cls.COLUMNS:
+            values = [-1 if getattr(unit, column_name) is None else getattr(unit, column_name) for unit in units]
+            is_float = column_name in cls.FLOAT_COLUMNS or not all(isinstance(value, int) for value in values)
+            columns.append(array("d" if is_float else "q", values))
+        return cls(*columns, units=units)
+
+    def __len__(self) -> int:
+        return len(self.unit_id)
+
+    def get_indices(self, unit_type: int, is_player: bool | None = None) -> array:
+        """
+        :param unit_type: `Entity` value
+        :param is_player: only the player's (True) or only the others' (False)
+            units if given
+        """
+        type_indices = self._type_indices.get(unit_type, array("q"))
+        if is_player is None:
+            return type_indices
+        player_value = PlayerFieldTypes.PLAYER.value
+        return array("q", [index for index in type_indices if (self.player[index] == player_value) == is_player])
+
+    def get_category_indices(self, category: UnitCategory) -> array:
+        """
+        see `UNIT_CATEGORIES`
+        """
+        return self._category_indices[category]
+
+    def get_units(self, indices: Iterable[int] | None = None) -> list[Unit]:
+        if self._units is None:
+            self._units = [
+                Unit(x, y, vx, vy, radius, unit_type, player, unit_id, mass, extra, extra_2)
+                for unit_id, unit_type, player, mass, radius, x, y, vx, vy, extra, extra_2 in zip(
+                    *(getattr(self, column_name) for column_name in self.COLUMNS)
+                )
+            ]
+        if indices is None:
+            return self._units
+        return [self._units[index] for index in indices]
+
+
 class GridUnitState:
     """
     TODO: this stores only the units today, we need to create an
@@ -69,6 +223,8 @@ class GridUnitState:
         object (Unit class)
     """
 
+    __slots__ = ("grid_coordinate", "unit")
+
     def __init__(self, grid_coordinate: tuple[int, int], unit: Unit):
         self.grid_coordinate = grid_coordinate
         self.unit = unit
@@ -78,25 +234,188 @@ GRID_COORD_UNIT_STATE_T = dict[tuple[int, int], list[GridUnitState]]
 
 
 @dataclass
+class FrameDiff:
+    """
+    the changes since the previous round, see `FrameDiffer`
+
+    :param appeared_ids: units not present in the previous round
+    :param disappeared_ids: units of the previous round not present anymore
+    :param moved_cell_ids: persisting units in another grid cell than in the
+        previous round
+    :param changed_extra_ids: persisting units with a changed extra value
+        (water of the wrecks and tankers, remaining rounds of the pools)
+    :param changed_scalars: the changed header values (scores and rages),
+        previous and actual. The previous is None in the first round
+    """
+
+    appeared_ids: list[int]
+    disappeared_ids: list[int]
+    moved_cell_ids: list[int]
+    changed_extra_ids: list[int]
+    changed_scalars: dict[str, tuple[int | None, int]]
+
+
 class GameGridInformation:
     """
-    right now recreated on every round
+    right now recreated on every round. The grid states are the object view
+    of the units, vectorized code should read the columns of the unit table.
+
+    The views not given are computed from the unit table on their first
+    access, and kept for the round. The views not used in a round are never
+    computed
     """
 
-    full_grid_state: GRID_COORD_UNIT_STATE_T
-    wreck_grid_state: GRID_COORD_UNIT_STATE_T
-    wreck_id_to_grid_coord: dict[int, tuple[int, int]]
-    tanker_grid_state: GRID_COORD_UNIT_STATE_T
-    tanker_id_to_grid_coord: dict[int, tuple[int, int]]
-    enemy_reaper_grid_state: GRID_COORD_UNIT_STATE_T
-    enemy_reaper_id_to_grid_coord: dict[int, tuple[int, int]]
-    enemy_others_grid_state: GRID_COORD_UNIT_STATE_T
-    enemy_others_id_to_grid_coord: dict[int, tuple[int, int]]
-    oil_pool_grid_state: GRID_COORD_UNIT_STATE_T
-    oil_pool_id_to_grid_coord: dict[int, tuple[int, int]]
+    def __init__(
+        self,
+        full_grid_state: GRID_COORD_UNIT_STATE_T | None = None,
+        wreck_grid_state: GRID_COORD_UNIT_STATE_T | None = None,
+        wreck_id_to_grid_coord: dict[int, tuple[int, int]] | None = None,
+        tanker_grid_state: GRID_COORD_UNIT_STATE_T | None = None,
+        tanker_id_to_grid_coord: dict[int, tuple[int, int]] | None = None,
+        enemy_reaper_grid_state: GRID_COORD_UNIT_STATE_T | None = None,
+        enemy_reaper_id_to_grid_coord: dict[int, tuple[int, int]] | None = None,
+        enemy_others_grid_state: GRID_COORD_UNIT_STATE_T | None = None,
+        enemy_others_id_to_grid_coord: dict[int, tuple[int, int]] | None = None,
+        oil_pool_grid_state: GRID_COORD_UNIT_STATE_T | None = None,
+        oil_pool_id_to_grid_coord: dict[int, tuple[int, int]] | None = None,
+        unit_table: UnitTable | None = None,
+        frame_diff: FrameDiff | None = None,
+    ):
+        """
+        :param unit_table: the units of the round, collected from the full
+            grid state if not given (an empty round if neither is given)
+        """
+        if unit_table is None and full_grid_state is None:
+            unit_table = UnitTable.from_units([])
+        self.unit_table = unit_table
+        self.frame_diff = frame_diff
+        given_views = {
+            "full_grid_state": full_grid_state,
+            "wreck_grid_state": wreck_grid_state,
+            "wreck_id_to_grid_coord": wreck_id_to_grid_coord,
+            "tanker_grid_state": tanker_grid_state,
+            "tanker_id_to_grid_coord": tanker_id_to_grid_coord,
+            "enemy_reaper_grid_state": enemy_reaper_grid_state,
+            "enemy_reaper_id_to_grid_coord": enemy_reaper_id_to_grid_coord,
+            "enemy_others_grid_state": enemy_others_grid_state,
+            "enemy_others_id_to_grid_coord": enemy_others_id_to_grid_coord,
+            "oil_pool_grid_state": oil_pool_grid_state,
+            "oil_pool_id_to_grid_coord": oil_pool_id_to_grid_coord,
+        }
+        for view_name, view in given_views.items():
+            if view is not None:
+                # shadows the cached property
+                setattr(self, view_name, view)
+
+    def get_unit_table(self) -> UnitTable:
+        """
+        the table of the round, collected from the grid state if it was not
+        given
+        """
+        if self.unit_table is None:
+            self.unit_table = UnitTable.from_units(
+                grid_unit.unit for grid_units in self.full_grid_state.values() for grid_unit in grid_units
+            )
+        return self.unit_table
 
+    @cached_property
+    def full_grid_state(self) -> GRID_COORD_UNIT_STATE_T:
+        return self._get_grid_state(range(len(self.get_unit_table())))
 
-@dataclass
+    @cached_property
+    def wreck_grid_state(self) -> GRID_COORD_UNIT_STATE_T:
+        return self._get_category_grid_state(UnitCategory.WRECK)
+
+    @cached_property
+    def wreck_id_to_grid_coord(self) -> dict[int, tuple[int, int]]:
+        return self._get_category_id_to_grid_coord(UnitCategory.WRECK)
+
+    @cached_property
+    def tanker_grid_state(self) -> GRID_COORD_UNIT_STATE_T:
+        return self._get_category_grid_state(UnitCategory.TANKER)
+
+    @cached_property
+    def tanker_id_to_grid_coord(self) -> dict[int, tuple[int, int]]:
+        return self._get_category_id_to_grid_coord(UnitCategory.TANKER)
+
+    @cached_property
+    def enemy_reaper_grid_state(self) -> GRID_COORD_UNIT_STATE_T:
+        return self._get_category_grid_state(UnitCategory.ENEMY_REAPER)
+
+    @cached_property
+    def enemy_reaper_id_to_grid_coord(self) -> dict[int, tuple[int, int]]:
+        return self._get_category_id_to_grid_coord(UnitCategory.ENEMY_REAPER)
+
+    @cached_property
+    def enemy_others_grid_state(self) -> GRID_COORD_UNIT_STATE_T:
+        return self._get_category_grid_state(UnitCategory.ENEMY_OTHER)
+
+    @cached_property
+    def enemy_others_id_to_grid_coord(self) -> dict[int, tuple[int, int]]:
+        return self._get_category_id_to_grid_coord(UnitCategory.ENEMY_OTHER)
+
+    @cached_property
+    def oil_pool_grid_state(self) -> GRID_COORD_UNIT_STATE_T:
+        return self._get_category_grid_state(UnitCategory.OIL_POOL)
+
+    @cached_property
+    def oil_pool_id_to_grid_coord(self) -> dict[int, tuple[int, int]]:
+        return self._get_category_id_to_grid_coord(UnitCategory.OIL_POOL)
+
+    @cached_property
+    def player_looters(self) -> dict[Entity, GridUnitState]:
+        unit_table = self.get_unit_table()
+        return {
+            Entity(unit_table.unit_type[index]): self._grid_units[index]
+            for index in unit_table.get_category_indices(UnitCategory.PLAYER_LOOTER)
+        }
+
+    @cached_property
+    def enemy_id_to_entities(self) -> dict[int, dict[Entity, GridUnitState]]:
+        unit_table = self.get_unit_table()
+        enemy_id_to_entities = defaultdict(dict)
+        for category in (UnitCategory.ENEMY_REAPER, UnitCategory.ENEMY_OTHER):
+            for index in unit_table.get_category_indices(category):
+                enemy_id_to_entities[unit_table.player[index]][Entity(unit_table.unit_type[index])] = (
+                    self._grid_units[index]
+                )
+        return enemy_id_to_entities
+
+    @cached_property
+    def _grid_coordinates(self) -> list[tuple[int, int]]:
+        unit_table = self.get_unit_table()
+        return [get_grid_position(coordinate=(x, y)) for x, y in zip(unit_table.x, unit_table.y)]
+
+    @cached_property
+    def _grid_units(self) -> list[GridUnitState]:
+        """
+        shared by the views, indexed like the unit table
+        """
+        return [
+            GridUnitState(grid_coordinate=grid_coordinate, unit=unit)
+            for grid_coordinate, unit in zip(self._grid_coordinates, self.get_unit_table().get_units())
+        ]
+
+    def _get_grid_state(self, indices: Iterable[int]) -> GRID_COORD_UNIT_STATE_T:
+        grid_units = self._grid_units
+        grid_state: GRID_COORD_UNIT_STATE_T = defaultdict(list)
+        for index in indices:
+            grid_unit = grid_units[index]
+            grid_state[grid_unit.grid_coordinate].append(grid_unit)
+        return grid_state
+
+    def _get_category_grid_state(self, category: UnitCategory) -> GRID_COORD_UNIT_STATE_T:
+        return self._get_grid_state(self.get_unit_table().get_category_indices(category))
+
+    def _get_category_id_to_grid_coord(self, category: UnitCategory) -> dict[int, tuple[int, int]]:
+        unit_table = self.get_unit_table()
+        grid_coordinates = self._grid_coordinates
+        return {
+            unit_table.unit_id[index]: grid_coordinates[index] for index in unit_table.get_category_indices(category)
+        }
+
+
+@dataclass(slots=True)
 class PlayerState:
     """
     TODO: most probably other fields will be needed, but let's start with
@@ -110,7 +429,6 @@ class PlayerState:
     score: int
     rage_gained: int = 0
     score_gained: int = 0
-    oil_pool_tracker: OilPoolTracker = field(default_factory=OilPoolTracker)
 
     def __init__(
         self,
@@ -127,6 +445,8 @@ class PlayerState:
         self.doof_state = doof_state
         self.rage = rage
         self.score = score
+        self.rage_gained = 0
+        self.score_gained = 0
         if prev_rage:
             self.rage_gained = rage - prev_rage
         if prev_score:
@@ -134,6 +454,8 @@ class PlayerState:
 
 
 class Coordinate:
+    __slots__ = ("x", "y")
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
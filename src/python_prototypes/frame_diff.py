@@ -0,0 +1,61 @@
+"""
+Most of the units persist between the rounds (with the same id), they only
+move. The differ keeps the previous round, so the consumers can update with
+the changes instead of recomputing everything from the actual round
+"""
+
+from python_prototypes.field_tools import get_grid_position
+from python_prototypes.field_types import FrameDiff, UnitTable
+
+
+class FrameDiffer:
+    """
+    call `update` once per round
+    """
+
+    def __init__(self):
+        self._cells: dict[int, tuple[int, int]] = {}
+        self._extras: dict[int, int] = {}
+        self._scalars: dict[str, int] = {}
+
+    def update(self, unit_table: UnitTable, scalars: dict[str, int]) -> FrameDiff:
+        """
+        :param unit_table: the units of the round
+        :param scalars: the header values of the round, by their name
+        """
+        cells = {
+            unit_id: get_grid_position(coordinate=(x, y))
+            for unit_id, x, y in zip(unit_table.unit_id, unit_table.x, unit_table.y)
+        }
+        extras = dict(zip(unit_table.unit_id, unit_table.extra))
+        previous_cells = self._cells
+        previous_extras = self._extras
+
+        appeared_ids = []
+        moved_cell_ids = []
+        changed_extra_ids = []
+        for unit_id, cell in cells.items():
+            previous_cell = previous_cells.get(unit_id)
+            if previous_cell is None:
+                appeared_ids.append(unit_id)
+                continue
+            if previous_cell != cell:
+                moved_cell_ids.append(unit_id)
+            if previous_extras[unit_id] != extras[unit_id]:
+                changed_extra_ids.append(unit_id)
+        frame_diff = FrameDiff(
+            appeared_ids=appeared_ids,
+            disappeared_ids=[unit_id for unit_id in previous_cells if unit_id not in cells],
+            moved_cell_ids=moved_cell_ids,
+            changed_extra_ids=changed_extra_ids,
+            changed_scalars={
+                name: (self._scalars.get(name), value)
+                for name, value in scalars.items()
+                if self._scalars.get(name) != value
+            },
+        )
+
+        self._cells = cells
+        self._extras = extras
+        self._scalars = dict(scalars)
+        return frame_diff
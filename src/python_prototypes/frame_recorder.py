@@ -0,0 +1,246 @@
+"""
+Compact binary recordings of live matches
+
+Every round is appended as one record: the header values, the unit columns
+(int32, the mass float32), the 3 commands we answered with, and the timings
+of the phases of the round. The records are length prefixed, and the offset
+of every record is appended to an index file next to the log (`<log>.idx`),
+so a single round can be read without scanning the log. Both files are
+flushed after every round, a killed process loses the current round only.
+
+The recorder is opt-in, the game loop records only if the
+`MEAN_MAX_RECORDING` environment variable names the log file. Keep it free
+of any non standard library dependency, it is merged into the single file
+solution
+"""
+
+import os
+import struct
+from functools import lru_cache
+from itertools import chain
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from python_prototypes.field_types import UnitTable
+from python_prototypes.round_input import RecordedRound, RoundInput, read_recorded_rounds
+
+RECORDING_ENVIRONMENT_VARIABLE = "MEAN_MAX_RECORDING"
+LOG_MAGIC = b"MMF1"
+INDEX_SUFFIX = ".idx"
+# record length (without itself)
+RECORD_LENGTH = struct.Struct("<I")
+# the 6 scores and rages, unit count
+ROUND_HEADER = struct.Struct("<6iH")
+COMMAND_LENGTHS = struct.Struct("<3H")
+TIMING_COUNT = struct.Struct("<B")
+TIMING_VALUE = struct.Struct("<f")
+INDEX_OFFSET = struct.Struct("<Q")
+
+
+@lru_cache(maxsize=None)
+def get_unit_struct(unit_count: int) -> struct.Struct:
+    """
+    the unit columns one after the other, packed at once
+    """
+    return struct.Struct(
+        "<"
+        + "".join(
+            f"{unit_count}{'f' if column_name in UnitTable.FLOAT_COLUMNS else 'i'}" for column_name in UnitTable.COLUMNS
+        )
+    )
+
+
+class FrameRecorder:
+    """
+    appends the rounds of a match to a binary log, see the module docstring
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.round_count = 0
+        self._log_file = open(self.path, "wb")
+        self._index_file = open(get_index_path(self.path), "wb")
+        self._log_file.write(LOG_MAGIC)
+        self._offset = len(LOG_MAGIC)
+        self._timing_names: dict[str, bytes] = {}
+
+    @classmethod
+    def from_environment(cls) -> "FrameRecorder | None":
+        path = os.environ.get(RECORDING_ENVIRONMENT_VARIABLE)
+        if not path:
+            return None
+        return cls(path)
+
+    def record(
+        self,
+        round_input: RoundInput,
+        commands: tuple[str, str, str],
+        timings: dict[str, float] | None = None,
+    ) -> None:
+        """
+        :param round_input:
+        :param commands: the reaper, destroyer and doof commands
+        :param timings: seconds spent in the phases of the round, by their
+            name (stored as float32 microseconds)
+        """
+        unit_table = round_input.get_unit_table()
+        encoded_commands = [command.encode() for command in commands]
+        parts = [
+            ROUND_HEADER.pack(
+                round_input.my_score,
+                round_input.enemy_1_score,
+                round_input.enemy_2_score,
+                round_input.my_rage,
+                round_input.enemy_1_rage,
+                round_input.enemy_2_rage,
+                len(unit_table),
+            ),
+            get_unit_struct(len(unit_table)).pack(
+                *chain.from_iterable(getattr(unit_table, column_name) for column_name in UnitTable.COLUMNS)
+            ),
+            COMMAND_LENGTHS.pack(*(len(command) for command in encoded_commands)),
+            *encoded_commands,
+        ]
+        timings = timings or {}
+        parts.append(TIMING_COUNT.pack(len(timings)))
+        for name, seconds in timings.items():
+            parts.append(self._get_timing_name(name))
+            parts.append(TIMING_VALUE.pack(seconds * 1e6))
+
+        payload = b"".join(parts)
+        self._log_file.write(RECORD_LENGTH.pack(len(payload)) + payload)
+        self._index_file.write(INDEX_OFFSET.pack(self._offset))
+        self._log_file.flush()
+        self._index_file.flush()
+        self._offset += RECORD_LENGTH.size + len(payload)
+        self.round_count += 1
+
+    def close(self) -> None:
+        self._log_file.close()
+        self._index_file.close()
+
+    def __enter__(self) -> "FrameRecorder":
+        return self
+
+    def __exit__(self, *exception_info) -> None:
+        self.close()
+
+    def _get_timing_name(self, name: str) -> bytes:
+        """
+        the length prefixed name
+        """
+        encoded_name = self._timing_names.get(name)
+        if encoded_name is None:
+            encoded_name = self._timing_names[name] = bytes([len(name.encode())]) + name.encode()
+        return encoded_name
+
+
+def get_index_path(path: Path | str) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def parse_record(payload: bytes) -> RecordedRound:
+    """
+    :param payload: a record of the log, without its length
+    """
+    *header, unit_count = ROUND_HEADER.unpack_from(payload)
+    offset = ROUND_HEADER.size
+    unit_struct = get_unit_struct(unit_count)
+    values = unit_struct.unpack_from(payload, offset)
+    offset += unit_struct.size
+    columns = [
+        values[column_index * unit_count : (column_index + 1) * unit_count]
+        for column_index in range(len(UnitTable.COLUMNS))
+    ]
+
+    command_lengths = COMMAND_LENGTHS.unpack_from(payload, offset)
+    offset += COMMAND_LENGTHS.size
+    commands = []
+    for command_length in command_lengths:
+        commands.append(payload[offset : offset + command_length].decode())
+        offset += command_length
+
+    (timing_count,) = TIMING_COUNT.unpack_from(payload, offset)
+    offset += TIMING_COUNT.size
+    timings = {}
+    for _ in range(timing_count):
+        name_length = payload[offset]
+        name = payload[offset + 1 : offset + 1 + name_length].decode()
+        offset += 1 + name_length
+        (microseconds,) = TIMING_VALUE.unpack_from(payload, offset)
+        offset += TIMING_VALUE.size
+        timings[name] = microseconds / 1e6
+
+    unit_table = UnitTable.from_columns(columns)
+    round_input = RoundInput(*header, units=unit_table.get_units(), unit_table=unit_table)
+    return RecordedRound(round_input, tuple(commands), timings)
+
+
+def read_record_payload(log_file: BinaryIO) -> bytes | None:
+    """
+    :return: None at the end of the log (or at a truncated last record)
+    """
+    length_bytes = log_file.read(RECORD_LENGTH.size)
+    if len(length_bytes) < RECORD_LENGTH.size:
+        return None
+    (record_length,) = RECORD_LENGTH.unpack(length_bytes)
+    payload = log_file.read(record_length)
+    if len(payload) < record_length:
+        return None
+    return payload
+
+
+def open_log(path: Path | str) -> BinaryIO:
+    log_file = open(path, "rb")
+    if log_file.read(len(LOG_MAGIC)) != LOG_MAGIC:
+        log_file.close()
+        raise ValueError(f"{path} is not a frame recording")
+    return log_file
+
+
+def iter_recorded_frames(path: Path | str) -> Iterator[RecordedRound]:
+    """
+    streams the rounds of a log one record at a time
+    """
+    with open_log(path) as log_file:
+        while (payload := read_record_payload(log_file)) is not None:
+            yield parse_record(payload)
+
+
+def iter_recording(path: Path | str) -> Iterator[RecordedRound]:
+    """
+    streams the rounds of a log or of a text recording (see `RecordedRound`),
+    told apart by the magic of the logs
+    """
+    with open(path, "rb") as recording_file:
+        is_log = recording_file.read(len(LOG_MAGIC)) == LOG_MAGIC
+    if is_log:
+        yield from iter_recorded_frames(path)
+        return
+    with open(path, encoding="utf-8") as recording_file:
+        yield from read_recorded_rounds(recording_file)
+
+
+def read_frame_index(path: Path | str) -> list[int]:
+    """
+    :return: the offsets of the records of the log, by the round index
+    """
+    index_bytes = get_index_path(path).read_bytes()
+    offset_count = len(index_bytes) // INDEX_OFFSET.size
+    return [offset for (offset,) in INDEX_OFFSET.iter_unpack(index_bytes[: offset_count * INDEX_OFFSET.size])]
+
+
+def read_recorded_frame(path: Path | str, round_index: int) -> RecordedRound:
+    """
+    reads one round through the index
+
+    :raises IndexError: if the round is not in the log
+    """
+    offset = read_frame_index(path)[round_index]
+    with open_log(path) as log_file:
+        log_file.seek(offset)
+        payload = read_record_payload(log_file)
+    if payload is None:
+        raise IndexError(f"Round {round_index} is truncated in {path}")
+    return parse_record(payload)
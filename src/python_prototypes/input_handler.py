@@ -3,154 +3,162 @@ This is where we interface with the main entry of the game
 We need to be consistent with the actual codingame inputs
 This module should contain some simulation and/or testing capabilities
 that emulates a "real" game input
+
+The loop itself is `GameLoop`: it takes the rounds from a frame source (any
+iterable of `RoundInput`, read lazily, a round is read only after the
+commands of the previous one were written) and writes the commands into a
+command sink. The game reads the rounds from stdin and writes the commands
+to stdout, the same loop runs over recordings (`iter_recorded_round_inputs`),
+generated rounds or the local referee (`EngineBot` plays its rounds through
+`GameLoop.play_round`), so it can be benchmarked and tested without a game
 """
 
-from collections import defaultdict
-from typing import Any
-
-from python_prototypes.field_types import (
-    Unit,
-    GridUnitState,
-    Entity,
-    PlayerFieldTypes,
-    GRID_COORD_UNIT_STATE_T,
-)
-from python_prototypes.field_tools import get_grid_position
-from python_prototypes.main_game_engine import MainGameEngine
-from python_prototypes.reaper.q_orchestrator import ReaperGameState
+import sys
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, TextIO
 
+from python_prototypes.frame_recorder import FrameRecorder, iter_recording
+from python_prototypes.main_game_engine import MainGameEngine, run_engine_round
+from python_prototypes.reaper.q_orchestrator import ReaperGameState
+from python_prototypes.round_input import RoundInput, read_round_input_from_buffer
 
-def original_game_main():
-    # q_state_action_weights: dict[tuple, dict[str, float]] = {}
-    reaper_game_state = ReaperGameState()
-    main_game_engine = MainGameEngine(reaper_game_state)
 
-    # game loop
-    while True:
-        my_score = int(input())
-        enemy_1_score = int(input())
-        enemy_2_score = int(input())
-        my_rage = int(input())
-        enemy_1_rage = int(input())
-        enemy_2_rage = int(input())
-        unit_count = int(input())
-
-        full_grid_state: GRID_COORD_UNIT_STATE_T = defaultdict(list)
-        wreck_grid_state: GRID_COORD_UNIT_STATE_T = defaultdict(list)
-        wreck_id_to_grid_coord: dict[int, tuple[int, int]] = {}
-        tanker_grid_state: GRID_COORD_UNIT_STATE_T = defaultdict(list)
-        tanker_id_to_grid_coord: dict[int, tuple[int, int]] = {}
-        enemy_reaper_grid_state: GRID_COORD_UNIT_STATE_T = defaultdict(list)
-        enemy_reaper_id_to_grid_coord: dict[int, tuple[int, int]] = {}
-        enemy_others_grid_state: GRID_COORD_UNIT_STATE_T = defaultdict(list)
-        enemy_others_id_to_grid_coord: dict[int, tuple[int, int]] = {}
-        player_reaper_grid_unit: GridUnitState | None = None
-        player_destroyer_grid_unit: GridUnitState | None = None
-        player_doof_grid_unit: GridUnitState | None = None
-        enemy_id_to_entities: dict[int, dict[Entity, GridUnitState]] = defaultdict(dict)
-        oil_pool_grid_state: GRID_COORD_UNIT_STATE_T = defaultdict(list)
-        oil_pool_id_to_grid_coord: dict[int, tuple[int, int]] = {}
-
-        for i in range(unit_count):
-            inputs = input().split()
-            unit_id = int(inputs[0])
-            unit_type = int(inputs[1])
-            player = int(inputs[2])
-            mass = float(inputs[3])
-            radius = int(inputs[4])
-            x = int(inputs[5])
-            y = int(inputs[6])
-            vx = int(inputs[7])
-            vy = int(inputs[8])
-            extra = int(inputs[9])
-            extra_2 = int(inputs[10])
-
-            unit = Unit(
-                unit_id=unit_id,
-                unit_type=unit_type,
-                player=player,
-                radius=radius,
-                x=x,
-                y=y,
-                vx=vx,
-                vy=vy,
-                mass=mass,
-                extra=extra,
-                extra_2=extra_2,
-            )
-            grid_coordinate = get_grid_position(coordinate=(x, y))
-            grid_unit = GridUnitState(
-                grid_coordinate=grid_coordinate,
-                unit=unit,
-            )
-            full_grid_state[grid_coordinate].append(grid_unit)
+class CommandSink(ABC):
+    @abstractmethod
+    def write(self, commands: tuple[str, str, str]) -> None:
+        """
+        :param commands: the reaper, destroyer and doof commands of a round
+        """
+        pass
 
-            if unit_type == Entity.WRECK.value:
-                wreck_grid_state[grid_coordinate].append(grid_unit)
-                wreck_id_to_grid_coord[unit_id] = grid_coordinate
-                continue
 
-            if unit_type == Entity.TANKER.value:
-                tanker_grid_state[grid_coordinate].append(grid_unit)
-                tanker_id_to_grid_coord[unit_id] = grid_coordinate
-                continue
+class StreamCommandSink(CommandSink):
+    """
+    writes the commands as the lines the game expects, into stdout by default
+    (looked up at every round, so a redirected stdout is followed)
+    """
 
-            if unit_type == Entity.REAPER.value and player != PlayerFieldTypes.PLAYER.value:
-                enemy_reaper_grid_state[grid_coordinate].append(grid_unit)
-                enemy_reaper_id_to_grid_coord[unit_id] = grid_coordinate
+    def __init__(self, stream: TextIO | None = None):
+        self.stream = stream
 
-                enemy_id_to_entities[player][Entity.REAPER] = grid_unit
-                continue
+    def write(self, commands: tuple[str, str, str]) -> None:
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write(f"{commands[0]}\n{commands[1]}\n{commands[2]}\n")
+        stream.flush()
 
-            if unit_type in [Entity.DESTROYER.value, Entity.DOOF.value] and player != PlayerFieldTypes.PLAYER.value:
-                enemy_others_grid_state[grid_coordinate].append(grid_unit)
-                enemy_others_id_to_grid_coord[unit_id] = grid_coordinate
 
-                enemy_id_to_entities[player][Entity(unit_type)] = grid_unit
-                continue
+class BufferCommandSink(CommandSink):
+    """
+    keeps the commands of every round
+    """
 
-            if unit_type == Entity.OIL_POOL.value:
-                oil_pool_grid_state[grid_coordinate].append(grid_unit)
-                oil_pool_id_to_grid_coord[unit_id] = grid_coordinate
+    def __init__(self):
+        self.commands: list[tuple[str, str, str]] = []
 
-            if unit_type == Entity.REAPER.value and player == PlayerFieldTypes.PLAYER.value:
-                player_reaper_grid_unit = grid_unit
+    def write(self, commands: tuple[str, str, str]) -> None:
+        self.commands.append(commands)
 
-            if unit_type == Entity.DESTROYER.value and player == PlayerFieldTypes.PLAYER.value:
-                player_destroyer_grid_unit = grid_unit
 
-            if unit_type == Entity.DOOF.value and player == PlayerFieldTypes.PLAYER.value:
-                player_doof_grid_unit = grid_unit
+def iter_stream_round_inputs(stream: BinaryIO | None = None) -> Iterator[RoundInput]:
+    """
+    the rounds of the game protocol, until the end of the stream
 
-        # Write an action using print
+    :param stream: `sys.stdin.buffer` by default
+    """
+    if stream is None:
+        stream = sys.stdin.buffer
+    while True:
+        try:
+            yield read_round_input_from_buffer(stream)
+        except EOFError:
+            return
+
+
+def iter_recorded_round_inputs(path: Path | str) -> Iterator[RoundInput]:
+    """
+    the rounds of a frame log or of a text recording
+    """
+    for recorded_round in iter_recording(path):
+        yield recorded_round.round_input
+
+
+class GameLoop:
+    """
+    plays the rounds with the engine, the commands go into the sink, and the
+    rounds are recorded if there is a recorder
+    """
+
+    def __init__(
+        self,
+        main_game_engine: MainGameEngine | None = None,
+        command_sink: CommandSink | None = None,
+        frame_recorder: FrameRecorder | None = None,
+    ):
+        """
+        :param main_game_engine: a fresh one by default
+        :param command_sink: the commands are only returned if not given
+        :param frame_recorder:
+        """
+        if main_game_engine is None:
+            main_game_engine = MainGameEngine(ReaperGameState())
+        self.main_game_engine = main_game_engine
+        self.command_sink = command_sink
+        self.frame_recorder = frame_recorder
+        self.round_count = 0
+
+    def play_round(self, round_input: RoundInput, read_seconds: float = 0.0) -> tuple[str, str, str]:
+        """
+        :param round_input:
+        :param read_seconds: spent reading the round, recorded with it
+        :return: the reaper, destroyer and doof commands
+        """
+        engine_start = time.perf_counter()
         # To debug: print("Debug messages...", file=sys.stderr, flush=True)
-        round_command = main_game_engine.run_round_raw(
-            enemy_others_grid_state,
-            enemy_others_id_to_grid_coord,
-            enemy_reaper_grid_state,
-            enemy_reaper_id_to_grid_coord,
-            full_grid_state,
-            my_rage,
-            my_score,
-            player_destroyer_grid_unit,
-            player_doof_grid_unit,
-            player_reaper_grid_unit,
-            tanker_grid_state,
-            tanker_id_to_grid_coord,
-            wreck_grid_state,
-            wreck_id_to_grid_coord,
-            enemy_id_to_entities,
-            enemy_1_score,
-            enemy_2_score,
-            enemy_1_rage,
-            enemy_2_rage,
-            oil_pool_grid_state,
-            oil_pool_id_to_grid_coord,
-        )
-
-        print(round_command.reaper_command)
-        print(round_command.destroyer_command)
-        print(round_command.doof_command)
-
-
-original_game_main()
+        round_command = run_engine_round(self.main_game_engine, round_input)
+        engine_end = time.perf_counter()
+        commands = (round_command.reaper_command, round_command.destroyer_command, round_command.doof_command)
+
+        if self.command_sink is not None:
+            self.command_sink.write(commands)
+        if self.frame_recorder is not None:
+            self.frame_recorder.record(
+                round_input, commands, {"read": read_seconds, "engine": engine_end - engine_start}
+            )
+        self.round_count += 1
+        return commands
+
+    def run(self, round_inputs: Iterable[RoundInput]) -> None:
+        """
+        plays the rounds until the source runs out
+
+        :param round_inputs: the frame source, the read of every round is
+            timed (for the game it includes the wait for the round)
+        """
+        round_input_iterator = iter(round_inputs)
+        while True:
+            read_start = time.perf_counter()
+            round_input = next(round_input_iterator, None)
+            if round_input is None:
+                return
+            self.play_round(round_input, time.perf_counter() - read_start)
+
+
+def original_game_main():
+    # q_state_action_weights: dict[tuple, dict[str, float]] = {}
+    frame_recorder = FrameRecorder.from_environment()
+    game_loop = GameLoop(
+        MainGameEngine(ReaperGameState()),
+        command_sink=StreamCommandSink(),
+        frame_recorder=frame_recorder,
+    )
+    try:
+        game_loop.run(iter_stream_round_inputs())
+    finally:
+        if frame_recorder is not None:
+            frame_recorder.close()
+
+
+if __name__ == "__main__":
+    original_game_main()
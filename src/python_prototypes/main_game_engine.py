@@ -9,13 +9,20 @@ from python_prototypes.field_types import (
     GridUnitState,
     Entity,
     PlayerFieldTypes,
+    UnitTable,
 )
+from python_prototypes.frame_diff import FrameDiffer
 from python_prototypes.reaper.decision_maker import MainReaperDecider
 from python_prototypes.reaper.input_to_q_state import calculate_reaper_q_state
+from python_prototypes.reaper.path_planner import CommandPath
 from python_prototypes.reaper.q_orchestrator import ReaperGameState
+from python_prototypes.reaper.q_state_types import ReaperActionTypes
 from python_prototypes.reaper.strategy_path_decider import (
     DefaultReaperSrategyPathDecider,
+    get_reaper_target_coordinate,
 )
+from python_prototypes.round_input import RoundInput
+from python_prototypes.simulation.skill_placement import SKILL_CASTERS, find_best_skill_placement
 
 
 class MainGameEngine:
@@ -34,7 +41,8 @@ class MainGameEngine:
         self.enemy_1_prev_rage = None
         self.enemy_2_prev_score = None
         self.enemy_2_prev_rage = None
-        self.previous_oil_pool_id_to_grid: dict[int, tuple[int, int]] = {}
+        self.previous_game_grid_information: GameGridInformation | None = None
+        self.frame_differ = FrameDiffer()
 
     def run_round_raw(
         self,
@@ -59,6 +67,7 @@ class MainGameEngine:
         enemy_2_rage: int,
         oil_pool_grid_state: GRID_COORD_UNIT_STATE_T,
         oil_pool_id_to_grid_coord: dict[int, tuple[int, int]],
+        unit_table: UnitTable | None = None,
     ) -> 'GameRoundCommand':
         """
         Handles the raw data incoming rom every round in the game
@@ -84,6 +93,8 @@ class MainGameEngine:
         :param enemy_2_rage:
         :param oil_pool_grid_state:
         :param oil_pool_id_to_grid_coord:
+        :param unit_table: the same units as columns, collected from the
+            grid state if not given
         :return:
 
         TODO: use the enemy score and rage values similarly to player state
@@ -100,12 +111,57 @@ class MainGameEngine:
             enemy_others_id_to_grid_coord=enemy_others_id_to_grid_coord,
             oil_pool_grid_state=oil_pool_grid_state,
             oil_pool_id_to_grid_coord=oil_pool_id_to_grid_coord,
+            unit_table=unit_table,
+        )
+        return self.run_round_grid(
+            game_grid_information,
+            player_reaper_grid_unit,
+            player_destroyer_grid_unit,
+            player_doof_grid_unit,
+            enemy_id_to_entities,
+            my_rage,
+            my_score,
+            enemy_1_score,
+            enemy_2_score,
+            enemy_1_rage,
+            enemy_2_rage,
+        )
+
+    def run_round_grid(
+        self,
+        game_grid_information: GameGridInformation,
+        player_reaper_grid_unit: GridUnitState,
+        player_destroyer_grid_unit: GridUnitState,
+        player_doof_grid_unit: GridUnitState,
+        enemy_id_to_entities: dict[int, dict[Entity, GridUnitState]],
+        my_rage: int,
+        my_score: int,
+        enemy_1_score: int,
+        enemy_2_score: int,
+        enemy_1_rage: int,
+        enemy_2_rage: int,
+    ) -> 'GameRoundCommand':
+        """
+        plays the round of an already built game grid information (its views
+        can be computed lazily from the unit table), see `run_round_raw`
+        """
+        game_grid_information.frame_diff = self.frame_differ.update(
+            game_grid_information.get_unit_table(),
+            {
+                "my_score": my_score,
+                "my_rage": my_rage,
+                "enemy_1_score": enemy_1_score,
+                "enemy_1_rage": enemy_1_rage,
+                "enemy_2_score": enemy_2_score,
+                "enemy_2_rage": enemy_2_rage,
+            },
         )
 
         # TODO: add the oil pools to the playerstate's, they should have an oil pool tracker as well
-        # if self.previous_oil_pool_id_to_grid:
+        # if self.previous_game_grid_information:
         #     new_oil_pools = determine_new_oil_pools(
-        #         game_grid_information.oil_pool_id_to_grid_coord, self.previous_oil_pool_id_to_grid
+        #         game_grid_information.oil_pool_id_to_grid_coord,
+        #         self.previous_game_grid_information.oil_pool_id_to_grid_coord,
         #     )
         #     correlated_oil_pool_to_doofs
 
@@ -146,7 +202,7 @@ class MainGameEngine:
         self.enemy_1_prev_rage = enemy_1_rage
         self.enemy_2_prev_score = enemy_2_score
         self.enemy_2_prev_rage = enemy_2_rage
-        self.previous_oil_pool_id_to_grid = oil_pool_id_to_grid_coord
+        self.previous_game_grid_information = game_grid_information
 
         # TODO: takes too much time
         # if not self._q_table_reported and (self._round_nr == 190 or enemy_1_score > 40 or my_score > 40 or enemy_2_score > 40):
@@ -166,8 +222,14 @@ class MainGameEngine:
         enemy_2_state: PlayerState,
     ) -> 'GameRoundCommand':
 
+        self.reaper_game_state.state_arena.load_grid(game_grid_information)
+        self.reaper_game_state.enemy_motion_predictor.update(game_grid_information, player_state.reaper_state.unit)
+        self.reaper_game_state.tanker_lifecycle_tracker.update(game_grid_information)
+        self.reaper_game_state.water_extraction_map.update(game_grid_information)
         reaper_q_state = calculate_reaper_q_state(
-            game_grid_information=game_grid_information, player_state=player_state
+            game_grid_information=game_grid_information,
+            player_state=player_state,
+            enemy_prediction=self.reaper_game_state.enemy_motion_predictor.prediction,
         )
         original_target = self.reaper_game_state.current_target_info
         original_mission_steps = self.reaper_game_state._mission_steps
@@ -180,8 +242,10 @@ class MainGameEngine:
             game_grid_information=game_grid_information,
             player_state=player_state,
         )
+        target_grid_unit = reaper_decision.target_grid_unit
+        target_id = target_grid_unit.unit.unit_id if target_grid_unit else None
         print(
-            f"[MAIN] reaper decision: {reaper_decision.decision_type}, {reaper_decision.goal_action_type}, {reaper_decision.target_grid_unit.unit.unit_id}",
+            f"[MAIN] reaper decision: {reaper_decision.decision_type}, {reaper_decision.goal_action_type}, {target_id}",
             file=sys.stderr,
             flush=True,
         )
@@ -210,12 +274,49 @@ class MainGameEngine:
         # TODO: we need a bit more advanced storage and we need to store the full commands not just the throttles
         self.reaper_game_state._planned_game_output_path = reaper_strategy_path
 
-        if reaper_next_throttle:
-            x, y = reaper_decision.target_grid_unit.unit.x, reaper_decision.target_grid_unit.unit.y
+        if reaper_next_throttle and target_grid_unit:
+            if isinstance(reaper_strategy_path, CommandPath) and reaper_strategy_path.current_coordinate:
+                x, y = reaper_strategy_path.current_coordinate
+            else:
+                x, y = get_reaper_target_coordinate(reaper_decision, player_state, self.reaper_game_state)
             reaper_command = f"{x} {y} {reaper_next_throttle}"
-        return GameRoundCommand(
+        round_command = GameRoundCommand(
             reaper_command=reaper_command,
         )
+        if reaper_decision.goal_action_type == ReaperActionTypes.use_super_power and target_grid_unit:
+            self.place_skill(round_command, game_grid_information, player_state)
+        return round_command
+
+    @staticmethod
+    def place_skill(
+        round_command: 'GameRoundCommand',
+        game_grid_information: GameGridInformation,
+        player_state: PlayerState,
+    ) -> None:
+        """
+        overrides the command of the looter casting the best placed
+        affordable skill (if any is worth casting)
+        """
+        casters = {
+            Entity.REAPER: player_state.reaper_state,
+            Entity.DESTROYER: player_state.destroyer_state,
+            Entity.DOOF: player_state.doof_state,
+        }
+        skill_placement = find_best_skill_placement(
+            game_grid_information,
+            casters={entity: grid_unit.unit if grid_unit else None for entity, grid_unit in casters.items()},
+            rage=player_state.rage,
+        )
+        if skill_placement is None:
+            return
+        print(f"[MAIN] skill placement: {skill_placement}", file=sys.stderr, flush=True)
+        match SKILL_CASTERS[skill_placement.skill_type]:
+            case Entity.REAPER:
+                round_command.reaper_command = skill_placement.command
+            case Entity.DESTROYER:
+                round_command.destroyer_command = skill_placement.command
+            case Entity.DOOF:
+                round_command.doof_command = skill_placement.command
 
 
 @dataclass
@@ -223,3 +324,25 @@ class GameRoundCommand:
     reaper_command: str = "WAIT"
     destroyer_command: str = "WAIT"
     doof_command: str = "WAIT"
+
+
+def run_engine_round(main_game_engine: MainGameEngine, round_input: RoundInput) -> GameRoundCommand:
+    """
+    plays the round with the engine, the grid states are computed from the
+    unit table of the round when the engine first needs them
+    """
+    game_grid_information = GameGridInformation(unit_table=round_input.get_unit_table())
+    player_looters = game_grid_information.player_looters
+    return main_game_engine.run_round_grid(
+        game_grid_information,
+        player_looters.get(Entity.REAPER),
+        player_looters.get(Entity.DESTROYER),
+        player_looters.get(Entity.DOOF),
+        game_grid_information.enemy_id_to_entities,
+        round_input.my_rage,
+        round_input.my_score,
+        round_input.enemy_1_score,
+        round_input.enemy_2_score,
+        round_input.enemy_1_rage,
+        round_input.enemy_2_rage,
+    )
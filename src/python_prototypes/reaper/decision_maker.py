@@ -93,6 +93,7 @@ class MainReaperDecider(ReaperDecider):
             reaper_game_state.target_tracker.track(
                 player_reaper_unit=player_state.reaper_state,
                 target_unit=actual_target_grid_unit_state,
+                enemy_prediction=reaper_game_state.enemy_motion_predictor.prediction,
             )
             reaper_game_state.current_target_info.player_id = actual_target_grid_unit_state.unit.player
 
@@ -124,6 +125,7 @@ class MainReaperDecider(ReaperDecider):
 
         if target_availability == TargetAvailabilityState.goal_reached_success:
             reaper_game_state.propagate_successful_goal()
+            reaper_game_state.complete_harvest_tour_stop()
             new_decision = self.get_new_decision(
                 game_grid_information,
                 player_state,
@@ -150,10 +152,13 @@ class MainReaperDecider(ReaperDecider):
         reaper_q_state: ReaperQState,
         output_type: ReaperDecisionType,
     ) -> ReaperDecisionOutput:
-        new_reaper_goal_type = reaper_game_state.initialize_new_goal_type(reaper_q_state)
-        new_target = reaper_game_state.initialize_new_target(
-            reaper_goal_type=new_reaper_goal_type, reaper_q_state=reaper_q_state
-        )
+        if rollout_decision := reaper_game_state.initialize_new_goal_and_target_by_rollout(reaper_q_state):
+            new_reaper_goal_type, new_target = rollout_decision
+        else:
+            new_reaper_goal_type = reaper_game_state.initialize_new_goal_type(reaper_q_state)
+            new_target = reaper_game_state.initialize_new_target(
+                reaper_goal_type=new_reaper_goal_type, reaper_q_state=reaper_q_state
+            )
         if not new_target:
             return ReaperDecisionOutput(output_type, new_reaper_goal_type, None)
         target_grid_unit_state = find_target_grid_unit_state(
@@ -162,7 +167,9 @@ class MainReaperDecider(ReaperDecider):
         )
         # TODO: call to target tracker needs to be encapsulated inside the reaper_game_state
         reaper_game_state.target_tracker.track(
-            player_reaper_unit=player_state.reaper_state, target_unit=target_grid_unit_state
+            player_reaper_unit=player_state.reaper_state,
+            target_unit=target_grid_unit_state,
+            enemy_prediction=reaper_game_state.enemy_motion_predictor.prediction,
         )
         reaper_game_state.current_target_info.player_id = target_grid_unit_state.unit.player
         return ReaperDecisionOutput(output_type, new_reaper_goal_type, target_grid_unit_state)
@@ -1,10 +1,13 @@
 """
 Handles the input conversion into a q state tuple that can be used for decision making (used as the keys in the q table)
+
+The enemies are categorized where the enemy motion prediction of the round
+puts them once the round played out, not where they are now
 """
 
 from typing import Any
 
-from python_prototypes.field_tools import get_manhattan_distance
+from python_prototypes.field_tools import get_grid_position, get_manhattan_distance
 from python_prototypes.field_types import GameGridInformation, PlayerState
 from python_prototypes.q_categorizer import (
     DISTANCE_CATEGORY_RETRIEVER,
@@ -18,40 +21,56 @@ from python_prototypes.reaper.q_state_types import (
     get_default_tanker_enemies_relation,
     get_default_water_relations,
 )
+from python_prototypes.simulation.enemy_predictor import EnemyMotionPrediction
+
+# the rounds ahead the enemies are categorized at
+ENEMY_PREDICTION_ROUNDS_AHEAD = 1
 
 
-def calculate_reaper_q_state(game_grid_information: GameGridInformation, player_state: PlayerState) -> ReaperQState:
+def calculate_reaper_q_state(
+    game_grid_information: GameGridInformation,
+    player_state: PlayerState,
+    enemy_prediction: EnemyMotionPrediction | None = None,
+) -> ReaperQState:
     """
     Takes the game input and converts it into a reaper q state tuple
 
     :param game_grid_information:
     :param player_state:
+    :param enemy_prediction: the shared prediction of the round (see
+        `EnemyMotionPredictor`), the current positions are used without it
     :return:
     """
+    enemy_reaper_id_to_grid_coord = get_predicted_grid_coordinates(
+        game_grid_information.enemy_reaper_id_to_grid_coord, enemy_prediction
+    )
+    enemy_others_id_to_grid_coord = get_predicted_grid_coordinates(
+        game_grid_information.enemy_others_id_to_grid_coord, enemy_prediction
+    )
     water_reaper_relation, reaper_water_relation = get_water_enemy_relations(
         game_grid_information.wreck_id_to_grid_coord,
         player_state,
-        game_grid_information.enemy_reaper_id_to_grid_coord,
+        enemy_reaper_id_to_grid_coord,
     )
     water_other_relation, other_water_relation = get_water_enemy_relations(
         game_grid_information.wreck_id_to_grid_coord,
         player_state,
-        game_grid_information.enemy_others_id_to_grid_coord,
+        enemy_others_id_to_grid_coord,
     )
     tanker_enemy_category_relation, tanker_id_enemy_category_relation = get_tanker_enemy_relations(
         game_grid_information.tanker_id_to_grid_coord,
         player_state,
-        game_grid_information.enemy_reaper_id_to_grid_coord,
-        game_grid_information.enemy_others_id_to_grid_coord,
+        enemy_reaper_id_to_grid_coord,
+        enemy_others_id_to_grid_coord,
     )
     player_reaper_relation, reaper_id_category_relation = get_player_enemy_relation(
-        game_grid_information.enemy_reaper_id_to_grid_coord,
+        enemy_reaper_id_to_grid_coord,
         player_state,
         game_grid_information.wreck_id_to_grid_coord,
         game_grid_information.tanker_id_to_grid_coord,
     )
     player_other_enemy_relation, other_id_category_mapping = get_player_enemy_relation(
-        game_grid_information.enemy_others_id_to_grid_coord,
+        enemy_others_id_to_grid_coord,
         player_state,
         game_grid_information.wreck_id_to_grid_coord,
         game_grid_information.tanker_id_to_grid_coord,
@@ -75,6 +94,29 @@ def calculate_reaper_q_state(game_grid_information: GameGridInformation, player_
     return state
 
 
+def get_predicted_grid_coordinates(
+    enemy_id_to_grid_coord: dict[int, tuple[int, int]],
+    enemy_prediction: EnemyMotionPrediction | None,
+    rounds_ahead: int = ENEMY_PREDICTION_ROUNDS_AHEAD,
+) -> dict[int, tuple[int, int]]:
+    """
+    :param enemy_id_to_grid_coord:
+    :param enemy_prediction:
+    :param rounds_ahead:
+    :return: the grid coordinates of the predicted positions, the enemies
+        without a prediction keep their current one
+    """
+    if enemy_prediction is None:
+        return enemy_id_to_grid_coord
+    predicted_id_to_grid_coord = {}
+    for enemy_id, grid_coordinate in enemy_id_to_grid_coord.items():
+        if enemy_prediction.has_unit(enemy_id):
+            x, y = enemy_prediction.get_position(enemy_id, rounds_ahead)
+            grid_coordinate = get_grid_position((round(x), round(y)))
+        predicted_id_to_grid_coord[enemy_id] = grid_coordinate
+    return predicted_id_to_grid_coord
+
+
 def get_player_enemy_relation(
     enemy_object_id_to_grid_coords: dict[Any, tuple[int, int]],
     player_state: PlayerState,
@@ -1,7 +1,15 @@
+import math
 from abc import ABC
+from dataclasses import dataclass, field
 from typing import Optional
 
+import numpy as np
+
+from python_prototypes.field_types import Unit
 from python_prototypes.reaper.q_state_types import ReaperActionTypes
+from python_prototypes.simulation.intercept_planner import INTERCEPT_THROTTLES, plan_intercept
+from python_prototypes.throttle_lookup.refinement import ThrottleRefinementStore
+from python_prototypes.throttle_lookup.table import ThrottleLookupTable
 from python_prototypes.throttle_optimization import (
     find_optimal_throttle_sequence,
     ThrottleCalculationInput,
@@ -56,55 +64,185 @@ class StrategyPath:
         return self.sequence.pop(0)
 
 
-def get_reaper_planner(goal_action_type: ReaperActionTypes) -> "BaseReaperPathPlanner":
+class CommandPath(StrategyPath):
+    """
+    Throttle sequence with the (x, y) target of every round, to follow a
+    moving target along its predicted trajectory.
+
+    :param commands: (x, y, throttle) of every round
+    :param expected_target_positions: where the target should be at the
+        start of every round, see `is_prediction_holding`
+    """
+
+    def __init__(self, commands: list[tuple[int, int, int]], expected_target_positions: list[tuple[int, int]]):
+        super().__init__([throttle for _, _, throttle in commands])
+        self.coordinates = [(x, y) for x, y, _ in commands]
+        self.expected_target_positions = list(expected_target_positions)
+        self.current_coordinate: tuple[int, int] | None = None
+
+    def get_next_step(self) -> Optional[int]:
+        if not self.sequence:
+            self.current_coordinate = None
+            return None
+        self.current_coordinate = self.coordinates.pop(0)
+        self.expected_target_positions.pop(0)
+        return self.sequence.pop(0)
+
+    def is_prediction_holding(self, target_x: float, target_y: float, tolerance: float) -> bool:
+        """
+        whether the target is (close to) where the plan expects it in the
+        upcoming round
+        """
+        if not self.expected_target_positions:
+            return False
+        expected_x, expected_y = self.expected_target_positions[0]
+        return math.hypot(target_x - expected_x, target_y - expected_y) <= tolerance
+
+
+@dataclass
+class ReaperPathPlannerSettings:
+    """
+    game long (optional) resources of the planners created by `get_reaper_planner`
+
+    :param refinement_store: opt-in, genetic results better than the throttle
+        table entries are recorded into it
+    :param heading_lookup_table: (distance, speed, heading) table, ramming
+        moving targets reads the path from it instead of replanning. A
+        loaded table owns the ram replans, the intercept planner is not
+        used then
+    :param harvest_configuration: genetic configuration of the harvest goals
+    :param fast_configuration: genetic configuration of the ram and tanker goals
+    :param use_intercept_planner: ramming predicted (enemy) targets is
+        planned with simulator rollouts of 2D commands, see `InterceptPathPlanner`
+    """
+
+    refinement_store: ThrottleRefinementStore | None = None
+    heading_lookup_table: ThrottleLookupTable | None = None
+    harvest_configuration: GeneticConfiguration = field(default_factory=lambda: REAPER_BEST_PATH_CONFIGURATION)
+    fast_configuration: GeneticConfiguration = field(default_factory=lambda: REAPER_FAST_PATH_CONFIGURATION)
+    use_intercept_planner: bool = True
+
+    @property
+    def plans_rams_with_intercepts(self) -> bool:
+        """
+        whether the ram replans go to the intercept planner, or to the
+        planner of `get_reaper_planner` (the heading table if loaded)
+        """
+        return self.use_intercept_planner and self.heading_lookup_table is None
+
+
+def get_reaper_planner(
+    goal_action_type: ReaperActionTypes,
+    planner_settings: ReaperPathPlannerSettings | None = None,
+) -> "BaseReaperPathPlanner":
+    if planner_settings is None:
+        planner_settings = ReaperPathPlannerSettings()
+    refinement_store = planner_settings.refinement_store
+    harvest_configuration = planner_settings.harvest_configuration
+    fast_configuration = planner_settings.fast_configuration
+
     match goal_action_type:
         case ReaperActionTypes.harvest_safe:
-            return GeneticStraightPathPlanner(REAPER_BEST_PATH_CONFIGURATION)
+            return GeneticStraightPathPlanner(harvest_configuration, refinement_store)
         case ReaperActionTypes.harvest_risky:
-            return GeneticStraightPathPlanner(REAPER_BEST_PATH_CONFIGURATION)
+            return GeneticStraightPathPlanner(harvest_configuration, refinement_store)
         case ReaperActionTypes.harvest_dangerous:
-            return GeneticStraightPathPlanner(REAPER_BEST_PATH_CONFIGURATION)
+            return GeneticStraightPathPlanner(harvest_configuration, refinement_store)
         case ReaperActionTypes.ram_reaper_close:
-            return GeneticStraightPathPlanner(REAPER_FAST_PATH_CONFIGURATION)
+            return get_moving_target_planner(planner_settings)
         case ReaperActionTypes.ram_reaper_medium:
-            return GeneticStraightPathPlanner(REAPER_FAST_PATH_CONFIGURATION)
+            return get_moving_target_planner(planner_settings)
         case ReaperActionTypes.ram_reaper_far:
-            return GeneticStraightPathPlanner(REAPER_FAST_PATH_CONFIGURATION)
+            return get_moving_target_planner(planner_settings)
         case ReaperActionTypes.ram_other_close:
-            return GeneticStraightPathPlanner(REAPER_FAST_PATH_CONFIGURATION)
+            return get_moving_target_planner(planner_settings)
         case ReaperActionTypes.ram_other_medium:
-            return GeneticStraightPathPlanner(REAPER_FAST_PATH_CONFIGURATION)
+            return get_moving_target_planner(planner_settings)
         case ReaperActionTypes.ram_other_far:
-            return GeneticStraightPathPlanner(REAPER_FAST_PATH_CONFIGURATION)
+            return get_moving_target_planner(planner_settings)
         case ReaperActionTypes.use_super_power:
             return NoOpPlanner()
         case ReaperActionTypes.wait:
             return NoOpPlanner()
         case ReaperActionTypes.move_tanker_safe:
-            return GeneticStraightPathPlanner(REAPER_FAST_PATH_CONFIGURATION)
+            return GeneticStraightPathPlanner(fast_configuration, refinement_store)
         case ReaperActionTypes.move_tanker_risky:
-            return GeneticStraightPathPlanner(REAPER_FAST_PATH_CONFIGURATION)
+            return GeneticStraightPathPlanner(fast_configuration, refinement_store)
         case ReaperActionTypes.move_tanker_dangerous:
-            return GeneticStraightPathPlanner(REAPER_FAST_PATH_CONFIGURATION)
+            return GeneticStraightPathPlanner(fast_configuration, refinement_store)
         case _:
             raise ValueError(f"Unknown goal action type: {goal_action_type}")
 
 
+def get_moving_target_planner(planner_settings: ReaperPathPlannerSettings) -> "BaseReaperPathPlanner":
+    genetic_planner = GeneticStraightPathPlanner(
+        planner_settings.fast_configuration, planner_settings.refinement_store
+    )
+    if planner_settings.heading_lookup_table is None:
+        return genetic_planner
+    return LookupTablePathPlanner(planner_settings.heading_lookup_table, genetic_planner)
+
+
 class BaseReaperPathPlanner(ABC):
     def get_path(self, throttle_game_input) -> StrategyPath:
         pass
 
 
 class GeneticStraightPathPlanner(BaseReaperPathPlanner):
-    def __init__(self, genetic_configuration: GeneticConfiguration):
+    def __init__(
+        self,
+        genetic_configuration: GeneticConfiguration,
+        refinement_store: ThrottleRefinementStore | None = None,
+    ):
         self.genetic_configuration = genetic_configuration
+        self.refinement_store = refinement_store
 
     def get_path(self, throttle_game_input: ThrottleCalculationInput) -> StrategyPath:
         sequence_result = find_optimal_throttle_sequence(
             throttle_calculation_input=throttle_game_input, genetic_configration=self.genetic_configuration
         )
+        if self.refinement_store:
+            self.refinement_store.offer(throttle_game_input, sequence_result)
         return StrategyPath(sequence_result.sequence)
 
+
+class LookupTablePathPlanner(BaseReaperPathPlanner):
+    """
+    Reads the path from a precomputed throttle table, the fallback planner is
+    used for inputs outside the table (e.g. the reaper is slowed by tar)
+    """
+
+    def __init__(self, throttle_lookup_table: ThrottleLookupTable, fallback_planner: BaseReaperPathPlanner):
+        self.throttle_lookup_table = throttle_lookup_table
+        self.fallback_planner = fallback_planner
+
+    def get_path(self, throttle_game_input: ThrottleCalculationInput) -> StrategyPath:
+        table_entry = self.throttle_lookup_table.lookup(throttle_game_input)
+        if table_entry is None:
+            return self.fallback_planner.get_path(throttle_game_input)
+        return StrategyPath(list(table_entry.sequence))
+
+
+class InterceptPathPlanner:
+    """
+    Plans (x, y, throttle) commands against the predicted trajectory of a
+    moving target, instead of a throttle sequence towards a fixed point
+    """
+
+    def __init__(self, throttles: tuple[int, ...] = INTERCEPT_THROTTLES):
+        self.throttles = throttles
+
+    def get_command_path(
+        self,
+        chaser: Unit,
+        target_x: np.ndarray,
+        target_y: np.ndarray,
+        contact_distance: float,
+    ) -> CommandPath:
+        intercept_plan = plan_intercept(chaser, target_x, target_y, contact_distance, self.throttles)
+        return CommandPath(intercept_plan.commands, intercept_plan.expected_target_positions)
+
+
 class NoOpPlanner(BaseReaperPathPlanner):
     def get_path(self, throttle_game_input: ThrottleCalculationInput) -> StrategyPath:
         return StrategyPath([0])
\ No newline at end of file
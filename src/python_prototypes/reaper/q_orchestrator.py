@@ -5,11 +5,14 @@ learning
 
 import random
 
+import numpy as np
 
 from python_prototypes.field_types import (
     GridUnitState,
     GameGridInformation,
     EntitiesForReaper,
+    Entity,
+    PlayerFieldTypes,
 )
 from python_prototypes.reaper.goal_possibility_determiner import (
     get_goal_possibility_determiner,
@@ -17,13 +20,15 @@ from python_prototypes.reaper.goal_possibility_determiner import (
 from python_prototypes.reaper.long_term_tracker.orchestrator import (
     LongTermRewardTrackingOrchestrator,
 )
-from python_prototypes.reaper.path_planner import StrategyPath
+from python_prototypes.reaper.path_planner import StrategyPath, ReaperPathPlannerSettings, REAPER_GOAL_ROUND_LIMIT
 from python_prototypes.reaper.q_state_types import (
     ReaperQState,
     get_default_reaper_actions_q_weights,
     ReaperActionsQWeights,
     ReaperActionTypes,
     MissionStep,
+    RAM_ACTION_TYPES,
+    HARVEST_ACTION_TYPES,
 )
 from python_prototypes.reaper.target_availability_determiner import (
     get_goal_target_determiner,
@@ -31,12 +36,20 @@ from python_prototypes.reaper.target_availability_determiner import (
 )
 from python_prototypes.reaper.target_selector import (
     get_target_id_selector,
+    get_ram_target_candidates,
+    get_goal_target_candidates,
     SelectedTargetInformation,
 )
 from python_prototypes.reaper.target_tracker_determiner import (
     get_target_tracker,
     BaseTracker,
 )
+from python_prototypes.simulation.enemy_predictor import EnemyMotionPredictor
+from python_prototypes.simulation.harvest_tour import HarvestTourPlanner
+from python_prototypes.simulation.rollout_evaluator import RolloutCandidate, RolloutEvaluator
+from python_prototypes.simulation.state_arena import StateArena
+from python_prototypes.simulation.tanker_forecast import TankerLifecycleTracker
+from python_prototypes.simulation.water_extraction import WaterExtractionMap
 
 
 class ReaperGameState:
@@ -58,6 +71,7 @@ class ReaperGameState:
             you should be able to inject a pre filled q table
         """
         self.exploration_rate = 0.2
+        self.step_penalty = STEP_PENALTY
         self.max_random_actions = 10  # make this configurable from the outside
         self.current_target_info: SelectedTargetInformation | None = None
         self._is_mission_set = False
@@ -71,6 +85,19 @@ class ReaperGameState:
 
         # TODO: currently we are storing only the throttles, but store the commands on the long run
         self._planned_game_output_path: StrategyPath | None = None
+        self.path_planner_settings = ReaperPathPlannerSettings()
+        # predictors are refreshed by the engine at the start of every round
+        self.enemy_motion_predictor = EnemyMotionPredictor()
+        self.tanker_lifecycle_tracker = TankerLifecycleTracker()
+        self.water_extraction_map = WaterExtractionMap()
+        # the simulation state of the round, loaded once per round for the searches
+        self.state_arena = StateArena()
+        # opt-in, picks the new goal and target by simulating the best
+        # candidates instead of taking the first target of the best goal
+        self.rollout_evaluator: RolloutEvaluator | None = None
+        self.rollout_candidate_count = ROLLOUT_CANDIDATE_COUNT
+        # opt-in, harvest targets follow a planned multi-wreck tour
+        self.harvest_tour_planner: HarvestTourPlanner | None = None
 
         self.long_term_reward_tracking_orchestrator: LongTermRewardTrackingOrchestrator = (
             LongTermRewardTrackingOrchestrator()
@@ -99,15 +126,7 @@ class ReaperGameState:
 
         exploration_rate = random.uniform(0, 1)
         if exploration_rate < self.exploration_rate:
-            for _ in range(self.max_random_actions):
-                possible_keys = list(reaper_q_action_weights.inner_weigths_dict.keys())
-                random_goal_type = random.choice(possible_keys)
-                is_available = self.is_goal_possible(reaper_q_state, random_goal_type)
-                if not is_available:
-                    continue
-
-                return random_goal_type
-            return ReaperActionTypes.wait
+            return self.get_random_goal_type(reaper_q_state, reaper_q_action_weights)
 
         sorted_actions = reaper_q_action_weights.get_sorted_weights()
         for goal_type, weight in sorted_actions:
@@ -119,6 +138,82 @@ class ReaperGameState:
 
         return ReaperActionTypes.wait
 
+    def get_random_goal_type(
+        self, reaper_q_state: ReaperQState, reaper_q_action_weights: ReaperActionsQWeights
+    ) -> ReaperActionTypes:
+        for _ in range(self.max_random_actions):
+            possible_keys = list(reaper_q_action_weights.inner_weigths_dict.keys())
+            random_goal_type = random.choice(possible_keys)
+            is_available = self.is_goal_possible(reaper_q_state, random_goal_type)
+            if not is_available:
+                continue
+
+            return random_goal_type
+        return ReaperActionTypes.wait
+
+    def get_rollout_candidates(
+        self, reaper_q_state: ReaperQState
+    ) -> list[tuple[ReaperActionTypes, SelectedTargetInformation]]:
+        """
+        the (goal, target) pairs of the possible goals with the highest q
+        weights, at most `rollout_candidate_count` of them. Empty if the best
+        possible goal has no target (wait, super power): the rollouts can't
+        evaluate it, and it must not be replaced by a lower ranked goal
+        """
+        reaper_q_action_weights = self._q_table.setdefault(
+            reaper_q_state,
+            ReaperActionsQWeights(get_default_reaper_actions_q_weights()),
+        )
+        candidates = []
+        for goal_type, _weight in reaper_q_action_weights.get_sorted_weights():
+            if not self.is_goal_possible(reaper_q_state, goal_type):
+                continue
+            if goal_type in RAM_ACTION_TYPES:
+                targets = self.get_reachable_ram_targets(reaper_q_state, goal_type)
+            else:
+                targets = get_goal_target_candidates(reaper_q_state, goal_type)
+            if not targets and not candidates:
+                return []
+            candidates.extend((goal_type, target) for target in targets)
+            if len(candidates) >= self.rollout_candidate_count:
+                break
+        return candidates[: self.rollout_candidate_count]
+
+    def initialize_new_goal_and_target_by_rollout(
+        self, reaper_q_state: ReaperQState
+    ) -> tuple[ReaperActionTypes, SelectedTargetInformation] | None:
+        """
+        sets the candidate with the best rollout value as the new goal and
+        target. Exploration keeps picking random goals the usual way
+
+        :return: None if there is nothing to evaluate (no evaluator,
+            exploring, no candidates, no time for the rollouts), the usual
+            initialization applies then
+        """
+        if self.rollout_evaluator is None or self.state_arena.turn_state is None:
+            return None
+        if random.uniform(0, 1) < self.exploration_rate:
+            return None
+        candidates = self.get_rollout_candidates(reaper_q_state)
+        if not candidates:
+            return None
+        evaluations = self.rollout_evaluator.evaluate_state(
+            self.state_arena.turn_state,
+            [RolloutCandidate(goal_type, target.id) for goal_type, target in candidates],
+        )
+        best_candidate = self.rollout_evaluator.get_best_candidate(evaluations)
+        if best_candidate is None:
+            return None
+        goal_type, target = next(
+            (goal_type, target)
+            for goal_type, target in candidates
+            if goal_type == best_candidate.goal and target.id == best_candidate.target_id
+        )
+        self.set_and_initialize_goal_type(reaper_q_state, goal_type)
+        self.target_tracker = get_target_tracker(goal_type)
+        self.current_target_info = target
+        return goal_type, target
+
     def set_and_initialize_goal_type(self, q_state: ReaperQState, new_goal_type: ReaperActionTypes):
         self._is_mission_set = True
         self._mission_steps = []
@@ -164,15 +259,42 @@ class ReaperGameState:
         """
         goal_possibility_determiner = get_goal_possibility_determiner(goal_type)
         is_possible = goal_possibility_determiner(reaper_q_state)
+        if is_possible and goal_type in RAM_ACTION_TYPES:
+            return bool(self.get_reachable_ram_targets(reaper_q_state, goal_type))
         return is_possible
 
+    def get_reachable_ram_targets(
+        self, reaper_q_state: ReaperQState, goal_type: ReaperActionTypes
+    ) -> list[SelectedTargetInformation]:
+        """
+        the targets of the ram goal the reaper can intercept within the goal's
+        round limit, the earliest interception first. Without intercept
+        estimates (i.e. no chaser was given to the predictor) every target
+        counts as reachable
+        """
+        candidates = get_ram_target_candidates(reaper_q_state, goal_type)
+        intercepts = self.enemy_motion_predictor.intercepts
+        if intercepts is None:
+            return candidates
+        candidate_etas = [(intercepts.get_eta(candidate.id), candidate) for candidate in candidates]
+        reachable_candidates = [
+            (eta, candidate)
+            for eta, candidate in candidate_etas
+            if eta is not None and eta <= REAPER_GOAL_ROUND_LIMIT
+        ]
+        reachable_candidates.sort(key=lambda eta_candidate: eta_candidate[0])
+        return [candidate for _, candidate in reachable_candidates]
+
     def get_goal_target_availability(
         self,
         target_grid_unit: GridUnitState | None,
         game_grid_information: GameGridInformation,
         tracker: BaseTracker = None,
     ) -> TargetAvailabilityState:
-        goal_target_determiner = get_goal_target_determiner(self.current_goal_type)
+        target_id = self.current_target_info.id if self.current_target_info else None
+        goal_target_determiner = get_goal_target_determiner(
+            self.current_goal_type, self.tanker_lifecycle_tracker, target_id
+        )
         is_available = goal_target_determiner(target_grid_unit, game_grid_information, tracker)
         return is_available
 
@@ -181,14 +303,53 @@ class ReaperGameState:
     ) -> SelectedTargetInformation | None:
         target_tracker = get_target_tracker(reaper_goal_type)
         self.target_tracker = target_tracker
-        target_id_selector = get_target_id_selector(reaper_goal_type)
-        selected_target = target_id_selector(reaper_q_state)
+        if reaper_goal_type in RAM_ACTION_TYPES and (
+            reachable_targets := self.get_reachable_ram_targets(reaper_q_state, reaper_goal_type)
+        ):
+            selected_target = reachable_targets[0]
+        elif reaper_goal_type in HARVEST_ACTION_TYPES and (
+            tour_target := self.get_harvest_tour_target(reaper_q_state, reaper_goal_type)
+        ):
+            selected_target = tour_target
+        else:
+            target_id_selector = get_target_id_selector(reaper_goal_type)
+            selected_target = target_id_selector(reaper_q_state)
         if not selected_target:
             self.current_target_info = None
             return None
         self.current_target_info = selected_target
         return selected_target
 
+    def get_harvest_tour_target(
+        self, reaper_q_state: ReaperQState, reaper_goal_type: ReaperActionTypes
+    ) -> SelectedTargetInformation | None:
+        """
+        the next stop of the harvest tour among the targets of the goal, None
+        without a tour planner (or a tour)
+        """
+        turn_state = self.state_arena.turn_state
+        if self.harvest_tour_planner is None or turn_state is None:
+            return None
+        player_reaper_indices = np.flatnonzero(
+            (turn_state.unit_type == Entity.REAPER.value) & (turn_state.player == PlayerFieldTypes.PLAYER.value)
+        )
+        if not player_reaper_indices.size:
+            return None
+        (player_reaper,) = turn_state.take(player_reaper_indices[:1]).to_units()
+        candidates = get_goal_target_candidates(reaper_q_state, reaper_goal_type)
+        wreck_id = self.harvest_tour_planner.select_wreck(
+            player_reaper, self.water_extraction_map, [candidate.id for candidate in candidates]
+        )
+        return next((candidate for candidate in candidates if candidate.id == wreck_id), None)
+
+    def complete_harvest_tour_stop(self) -> None:
+        """
+        call it after a successful goal, a harvest moves the tour on to its
+        next stop
+        """
+        if self.harvest_tour_planner is not None and self.current_goal_type in HARVEST_ACTION_TYPES:
+            self.harvest_tour_planner.complete_stop()
+
     def add_current_step_to_mission(self, q_state: ReaperQState, goal_type: ReaperActionTypes):
         self._mission_steps.append(MissionStep(q_state, goal_type))
 
@@ -196,7 +357,7 @@ class ReaperGameState:
         reaper_q_action_weights = self._q_table.setdefault(
             q_state, ReaperActionsQWeights(get_default_reaper_actions_q_weights())
         )
-        reaper_q_action_weights.inner_weigths_dict[self.current_goal_type] -= STEP_PENALTY
+        reaper_q_action_weights.inner_weigths_dict[self.current_goal_type] -= self.step_penalty
         return
 
     def register_q_state(self, q_state: ReaperQState) -> None:
@@ -207,6 +368,7 @@ class ReaperGameState:
 
 
 STEP_PENALTY = 0.5
+ROLLOUT_CANDIDATE_COUNT = 4
 
 
 def get_goal_failure_penalty(current_goal: ReaperActionTypes) -> float:
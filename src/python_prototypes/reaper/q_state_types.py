@@ -99,6 +99,8 @@ class ReaperQState:
 
 
 class ReaperActionsQWeights:
+    __slots__ = ("inner_weigths_dict",)
+
     def __init__(
         self,
         inner_weigths_dict: dict["ReaperActionTypes", float],
@@ -193,6 +195,35 @@ class ReaperActionTypes(Enum):
     move_tanker_dangerous = 14
 
 
+# goals collecting water from wrecks
+HARVEST_ACTION_TYPES = frozenset(
+    {
+        ReaperActionTypes.harvest_safe,
+        ReaperActionTypes.harvest_risky,
+        ReaperActionTypes.harvest_dangerous,
+    }
+)
+# goals chasing moving targets
+RAM_ACTION_TYPES = frozenset(
+    {
+        ReaperActionTypes.ram_reaper_close,
+        ReaperActionTypes.ram_reaper_medium,
+        ReaperActionTypes.ram_reaper_far,
+        ReaperActionTypes.ram_other_close,
+        ReaperActionTypes.ram_other_medium,
+        ReaperActionTypes.ram_other_far,
+    }
+)
+# goals following tankers, waiting for them to become wrecks
+MOVE_TANKER_ACTION_TYPES = frozenset(
+    {
+        ReaperActionTypes.move_tanker_safe,
+        ReaperActionTypes.move_tanker_risky,
+        ReaperActionTypes.move_tanker_dangerous,
+    }
+)
+
+
 def get_default_reaper_actions_q_weights() -> dict[ReaperActionTypes, float]:
     reaper_actions_q_weights = {
         ReaperActionTypes.harvest_safe: 0.0,
@@ -225,7 +256,7 @@ def convert_to_state_dict(
     return state_dict
 
 
-@dataclass
+@dataclass(slots=True)
 class MissionStep:
     q_state: ReaperQState
     goal_type: ReaperActionTypes
@@ -1,19 +1,117 @@
 from python_prototypes.field_tools import (
     calculate_speed_from_vectors,
     get_euclidean_distance,
+    calculate_relative_heading,
 )
 from python_prototypes.reaper.decision_maker import ReaperDecisionType
 from python_prototypes.reaper.long_term_tracker.determiner import (
     get_success_long_term_tracker,
     get_failure_long_term_tracker,
 )
-from python_prototypes.reaper.path_planner import StrategyPath, get_reaper_planner
+from python_prototypes.reaper.path_planner import (
+    CommandPath,
+    InterceptPathPlanner,
+    StrategyPath,
+    get_reaper_planner,
+)
 from python_prototypes.reaper.q_orchestrator import ReaperGameState
+from python_prototypes.reaper.q_state_types import (
+    HARVEST_ACTION_TYPES,
+    MOVE_TANKER_ACTION_TYPES,
+    RAM_ACTION_TYPES,
+)
 from python_prototypes.reaper.target_selector import SelectedTargetInformation
 from python_prototypes.throttle_optimization import ThrottleCalculationInput
 from python_prototypes.unit_parameters import UnitFriction
 
 
+def get_reaper_target_coordinate(
+    reaper_decision,
+    player_state,
+    reaper_game_state: ReaperGameState,
+) -> tuple[int, int]:
+    """
+    ramming aims at the predicted intercept point of the (moving) target,
+    tanker goals pre-position to where the tanker is forecasted to become a
+    wreck, harvesting aims at the stop of the harvest tour (if there is one),
+    or at the point of the target wreck overlapping the most other wrecks,
+    every other goal aims at the actual position of the target
+    """
+    target_unit = reaper_decision.target_grid_unit.unit
+    if reaper_decision.goal_action_type in HARVEST_ACTION_TYPES:
+        harvest_tour_planner = reaper_game_state.harvest_tour_planner
+        if harvest_tour_planner is not None and (
+            stop_coordinate := harvest_tour_planner.get_stop_coordinate(target_unit.unit_id)
+        ):
+            return stop_coordinate
+        # the strategy path and the command ask for the same point, the second is a cache hit
+        harvest_point = reaper_game_state.water_extraction_map.get_best_harvest_point(
+            wreck_id=target_unit.unit_id,
+            round_count=max(target_unit.extra, 1),
+        )
+        if harvest_point is not None:
+            return harvest_point.x, harvest_point.y
+    if reaper_decision.goal_action_type in RAM_ACTION_TYPES:
+        return reaper_game_state.enemy_motion_predictor.get_intercept_coordinate(
+            player_state.reaper_state.unit, target_unit
+        )
+    if reaper_decision.goal_action_type in MOVE_TANKER_ACTION_TYPES:
+        wreck_forecast = reaper_game_state.tanker_lifecycle_tracker.forecast.get_wreck_forecast(target_unit.unit_id)
+        if wreck_forecast is not None:
+            return wreck_forecast.x, wreck_forecast.y
+    return target_unit.x, target_unit.y
+
+
+def get_planned_relative_heading(reaper_decision, player_state, target_coordinate: tuple[int, int]) -> float:
+    """
+    the heading the throttle sequence of the goal is planned with. Only the
+    ram goals (the heading table, moving targets) plan against the sideways
+    velocity, the harvest and tanker goals stay on the ~2x faster 1D
+    fitness, as if the reaper moved towards the target
+    """
+    if reaper_decision.goal_action_type not in RAM_ACTION_TYPES:
+        return 0.0
+    reaper_unit = player_state.reaper_state.unit
+    return calculate_relative_heading(
+        coordinate=(reaper_unit.x, reaper_unit.y),
+        velocity=(reaper_unit.vx, reaper_unit.vy),
+        target_coordinate=target_coordinate,
+    )
+
+
+# the distance between the actual and the expected position of the target,
+# above which an intercept plan is made again
+INTERCEPT_PLAN_TOLERANCE = 300
+
+
+def get_intercept_command_path(
+    reaper_decision,
+    player_state,
+    reaper_game_state: ReaperGameState,
+) -> CommandPath | None:
+    """
+    plans the 2D commands against the predicted trajectory of the target
+    of a ram goal
+
+    :return: None if the intercept planner is not used for the goal (not a
+        ram goal, no prediction of the target, or disabled by the settings,
+        e.g. a heading table is loaded)
+    """
+    if not reaper_game_state.path_planner_settings.plans_rams_with_intercepts:
+        return None
+    if reaper_decision.goal_action_type not in RAM_ACTION_TYPES or not reaper_decision.target_grid_unit:
+        return None
+    target_unit = reaper_decision.target_grid_unit.unit
+    prediction = reaper_game_state.enemy_motion_predictor.prediction
+    if not prediction.has_unit(target_unit.unit_id):
+        return None
+    target_x, target_y = prediction.get_trajectory(target_unit.unit_id)
+    reaper_unit = player_state.reaper_state.unit
+    return InterceptPathPlanner().get_command_path(
+        reaper_unit, target_x, target_y, contact_distance=reaper_unit.radius + target_unit.radius
+    )
+
+
 class DefaultReaperSrategyPathDecider:
     @classmethod
     def reaper_get_strategy_path(
@@ -41,9 +139,21 @@ class DefaultReaperSrategyPathDecider:
         match reaper_decision.decision_type:
             case ReaperDecisionType.existing_target:
                 strategy_path = reaper_game_state._planned_game_output_path
+                if isinstance(strategy_path, CommandPath) and reaper_decision.target_grid_unit:
+                    target_unit = reaper_decision.target_grid_unit.unit
+                    if not strategy_path.is_prediction_holding(target_unit.x, target_unit.y, INTERCEPT_PLAN_TOLERANCE):
+                        command_path = get_intercept_command_path(reaper_decision, player_state, reaper_game_state)
+                        if command_path is not None:
+                            return command_path
                 return strategy_path
             case ReaperDecisionType.replan_existing_target:
-                planner = get_reaper_planner(reaper_decision.goal_action_type)
+                command_path = get_intercept_command_path(reaper_decision, player_state, reaper_game_state)
+                if command_path is not None:
+                    return command_path
+                planner = get_reaper_planner(
+                    reaper_decision.goal_action_type, reaper_game_state.path_planner_settings
+                )
+                target_coordinate = get_reaper_target_coordinate(reaper_decision, player_state, reaper_game_state)
                 v0 = calculate_speed_from_vectors(
                     vx=player_state.reaper_state.unit.vx,
                     vy=player_state.reaper_state.unit.vy,
@@ -53,16 +163,15 @@ class DefaultReaperSrategyPathDecider:
                         player_state.reaper_state.unit.x,
                         player_state.reaper_state.unit.y,
                     ),
-                    coordinate_b=(
-                        reaper_decision.target_grid_unit.unit.x,
-                        reaper_decision.target_grid_unit.unit.y,
-                    ),
+                    coordinate_b=target_coordinate,
                 )
+                relative_heading = get_planned_relative_heading(reaper_decision, player_state, target_coordinate)
                 reaper_throttle_calculation_input = ThrottleCalculationInput(
                     v0=v0,
                     mass=player_state.reaper_state.unit.mass,
                     friction=UnitFriction.reaper,
                     d_target=distance_to_target,
+                    relative_heading=relative_heading,
                 )
                 strategy_path = planner.get_path(reaper_throttle_calculation_input)
                 return strategy_path
@@ -76,7 +185,10 @@ class DefaultReaperSrategyPathDecider:
                     long_term_tracker = get_success_long_term_tracker(
                         original_target, original_mission_steps, latest_goal_type
                     )
-                    reaper_game_state.long_term_reward_tracking_orchestrator.register_success_tracker(long_term_tracker)
+                    # not every goal type has a success tracker yet
+                    if long_term_tracker is not None:
+                        orchestrator = reaper_game_state.long_term_reward_tracking_orchestrator
+                        orchestrator.register_success_tracker(long_term_tracker)
                 # TODO: disabling temporarily as its not implemented yet
                 # if reaper_decision.decision_type == ReaperDecisionType.new_target_on_failure:
                 #     long_term_tracker = get_failure_long_term_tracker(
@@ -87,7 +199,13 @@ class DefaultReaperSrategyPathDecider:
                 # TODO: not sure if doing this is fully correct
                 if not reaper_decision.target_grid_unit:
                     return StrategyPath([])
-                planner = get_reaper_planner(reaper_decision.goal_action_type)
+                command_path = get_intercept_command_path(reaper_decision, player_state, reaper_game_state)
+                if command_path is not None:
+                    return command_path
+                planner = get_reaper_planner(
+                    reaper_decision.goal_action_type, reaper_game_state.path_planner_settings
+                )
+                target_coordinate = get_reaper_target_coordinate(reaper_decision, player_state, reaper_game_state)
                 v0 = calculate_speed_from_vectors(
                     vx=player_state.reaper_state.unit.vx,
                     vy=player_state.reaper_state.unit.vy,
@@ -97,16 +215,15 @@ class DefaultReaperSrategyPathDecider:
                         player_state.reaper_state.unit.x,
                         player_state.reaper_state.unit.y,
                     ),
-                    coordinate_b=(
-                        reaper_decision.target_grid_unit.unit.x,
-                        reaper_decision.target_grid_unit.unit.y,
-                    ),
+                    coordinate_b=target_coordinate,
                 )
+                relative_heading = get_planned_relative_heading(reaper_decision, player_state, target_coordinate)
                 reaper_throttle_calculation_input = ThrottleCalculationInput(
                     v0=v0,
                     mass=player_state.reaper_state.unit.mass,
                     friction=UnitFriction.reaper,
                     d_target=distance_to_target,
+                    relative_heading=relative_heading,
                 )
                 strategy_path = planner.get_path(reaper_throttle_calculation_input)
                 return strategy_path
@@ -9,6 +9,10 @@ from python_prototypes.field_types import (
 )
 from python_prototypes.reaper.q_state_types import ReaperActionTypes
 from python_prototypes.reaper.target_tracker_determiner import BaseTracker
+from python_prototypes.simulation.tanker_forecast import TankerLifecycleTracker
+
+# a tanker goal succeeds if the reaper is this close once its tanker turned into a wreck
+TANKER_WRECK_SUCCESS_DISTANCE = 2000
 
 
 class TargetAvailabilityState(Enum):
@@ -20,10 +24,15 @@ class TargetAvailabilityState(Enum):
 
 def get_goal_target_determiner(
     current_goal_type: ReaperActionTypes,
+    tanker_lifecycle_tracker: TankerLifecycleTracker | None = None,
+    target_id: int | None = None,
 ) -> Callable[[GridUnitState | None, GameGridInformation, BaseTracker], TargetAvailabilityState]:
     """
 
     :param current_goal_type:
+    :param tanker_lifecycle_tracker: tells the tanker goals whether their
+        tanker turned into a wreck
+    :param target_id: id of the current target, needed once the target is gone
     :return:
         TODO: consider changing the signature of the callables,
             [GridUnitState, GameGridInformation, BaseTracker]
@@ -57,11 +66,17 @@ def get_goal_target_determiner(
         case ReaperActionTypes.wait:
             return partial(round_count_target_available, round_limit=1)
         case ReaperActionTypes.move_tanker_safe:
-            return tanker_target_available
+            return partial(
+                tanker_target_available, tanker_lifecycle_tracker=tanker_lifecycle_tracker, tanker_id=target_id
+            )
         case ReaperActionTypes.move_tanker_risky:
-            return tanker_target_available
+            return partial(
+                tanker_target_available, tanker_lifecycle_tracker=tanker_lifecycle_tracker, tanker_id=target_id
+            )
         case ReaperActionTypes.move_tanker_dangerous:
-            return tanker_target_available
+            return partial(
+                tanker_target_available, tanker_lifecycle_tracker=tanker_lifecycle_tracker, tanker_id=target_id
+            )
         case _:
             raise ValueError(f"Invalid goal type: {current_goal_type}")
 
@@ -179,7 +194,7 @@ def super_power_target_available(
     enemy_target_coordinate = goal_target_obj.grid_coordinate
 
     target_obj_type_raw = goal_target_obj.unit.unit_type
-    target_obj_type = Entity[target_obj_type_raw]
+    target_obj_type = Entity(target_obj_type_raw)
 
     match target_obj_type:
         case Entity.REAPER:
@@ -198,16 +213,27 @@ def tanker_target_available(
     goal_target_obj: GridUnitState | None,
     game_grid_information: GameGridInformation,
     target_tracker: BaseTracker,
+    tanker_lifecycle_tracker: TankerLifecycleTracker | None = None,
+    tanker_id: int | None = None,
 ) -> TargetAvailabilityState:
     """
     :param goal_target_obj:
     :param game_grid_information:
     :param target_tracker:
+    :param tanker_lifecycle_tracker: without it a disappeared tanker is
+        always a failure
+    :param tanker_id: id of the followed tanker (the target object is None
+        once it disappeared)
     :return:
-
-    TODO: we need somehow detect when a tanker turned into a wreck
     """
     if goal_target_obj is None:
+        # the tanker either turned into a wreck or left the map
+        if tanker_lifecycle_tracker is None or tanker_id is None:
+            return TargetAvailabilityState.invalid
+        if tanker_lifecycle_tracker.get_wreck_id(tanker_id) is None or not target_tracker.steps_taken:
+            return TargetAvailabilityState.invalid
+        if target_tracker.is_target_within_threshold(TANKER_WRECK_SUCCESS_DISTANCE):
+            return TargetAvailabilityState.goal_reached_success
         return TargetAvailabilityState.invalid
     tanker_id = goal_target_obj.unit.unit_id
     tanker_coordinate = goal_target_obj.grid_coordinate
@@ -229,8 +255,12 @@ def tanker_target_available(
     if target_tracker.is_distance_growing(replan_round_threshold):
         return TargetAvailabilityState.replan_reach
 
-    # TODO: see the TODO above in the docstring, we need to find a way if
-    #  a tanker turned into a wreck
+    # full tankers are leaving the map, it's over if no destroyer can catch them
+    is_tanker_full = goal_target_obj.unit.extra >= goal_target_obj.unit.extra_2
+    if tanker_lifecycle_tracker is not None and is_tanker_full:
+        if tanker_lifecycle_tracker.forecast.get_wreck_forecast(tanker_id) is None:
+            return TargetAvailabilityState.invalid
+
     if target_tracker.is_target_within_threshold(target_distance_threshold):
         return TargetAvailabilityState.goal_reached_success
 
@@ -7,7 +7,7 @@ from python_prototypes.reaper.exception_types import ImpossibleTarget
 from python_prototypes.reaper.q_state_types import ReaperQState, ReaperActionTypes
 
 
-@dataclass
+@dataclass(slots=True)
 class SelectedTargetInformation:
     id: int
     type: EntitiesForReaper
@@ -42,8 +42,8 @@ def get_target_id_selector(
         case ReaperActionTypes.ram_other_far:
             return partial(select_enemy_other_by_distance, distance_level="far")
         case ReaperActionTypes.use_super_power:
-            # TODO: currently we consider only wrecks for super powers, add new super power categories in the future
-            return partial(select_water_target_by_risk_level, risk_level="safe")
+            # the skill itself is placed by the skill placement optimizer
+            return select_super_power_target
         case ReaperActionTypes.wait:
             return no_op_target_selector
         case ReaperActionTypes.move_tanker_safe:
@@ -67,21 +67,63 @@ def select_water_target_by_risk_level(reaper_q_state: ReaperQState, risk_level:
 
 
 def select_enemy_reaper_by_distance(reaper_q_state: ReaperQState, distance_level: str) -> SelectedTargetInformation:
-    if relation := reaper_q_state.player_reaper_relation[(distance_level, "close")]:
-        return SelectedTargetInformation(relation[0], EntitiesForReaper.REAPER)
-    if relation := reaper_q_state.player_reaper_relation[(distance_level, "medium")]:
-        return SelectedTargetInformation(relation[0], EntitiesForReaper.REAPER)
+    if candidates := get_enemy_reaper_candidates(reaper_q_state, distance_level):
+        return candidates[0]
     raise ImpossibleTarget(f"No enemy reaper found for distance level: {distance_level}")
 
 
 def select_enemy_other_by_distance(reaper_q_state: ReaperQState, distance_level: str) -> SelectedTargetInformation:
-    if relation := reaper_q_state.player_other_relation[(distance_level, "close")]:
-        return SelectedTargetInformation(relation[0], EntitiesForReaper.OTHER_ENEMY)
-    if relation := reaper_q_state.player_other_relation[(distance_level, "medium")]:
-        return SelectedTargetInformation(relation[0], EntitiesForReaper.OTHER_ENEMY)
+    if candidates := get_enemy_other_candidates(reaper_q_state, distance_level):
+        return candidates[0]
     raise ImpossibleTarget(f"No other enemy found for distance level: {distance_level}")
 
 
+def get_enemy_reaper_candidates(reaper_q_state: ReaperQState, distance_level: str) -> list[SelectedTargetInformation]:
+    """
+    enemy reapers at the distance level, the ones close to water first
+    """
+    return [
+        SelectedTargetInformation(enemy_id, EntitiesForReaper.REAPER)
+        for water_distance_level in ("close", "medium")
+        for enemy_id in reaper_q_state.player_reaper_relation[(distance_level, water_distance_level)]
+    ]
+
+
+def get_enemy_other_candidates(reaper_q_state: ReaperQState, distance_level: str) -> list[SelectedTargetInformation]:
+    """
+    enemy destroyers and doofs at the distance level, the ones close to water first
+    """
+    return [
+        SelectedTargetInformation(enemy_id, EntitiesForReaper.OTHER_ENEMY)
+        for water_distance_level in ("close", "medium")
+        for enemy_id in reaper_q_state.player_other_relation[(distance_level, water_distance_level)]
+    ]
+
+
+def get_ram_target_candidates(
+    reaper_q_state: ReaperQState,
+    reaper_goal_type: ReaperActionTypes,
+) -> list[SelectedTargetInformation]:
+    """
+    every target the ram goal could select, in the order of the selectors
+    """
+    match reaper_goal_type:
+        case ReaperActionTypes.ram_reaper_close:
+            return get_enemy_reaper_candidates(reaper_q_state, "close")
+        case ReaperActionTypes.ram_reaper_medium:
+            return get_enemy_reaper_candidates(reaper_q_state, "medium")
+        case ReaperActionTypes.ram_reaper_far:
+            return get_enemy_reaper_candidates(reaper_q_state, "far")
+        case ReaperActionTypes.ram_other_close:
+            return get_enemy_other_candidates(reaper_q_state, "close")
+        case ReaperActionTypes.ram_other_medium:
+            return get_enemy_other_candidates(reaper_q_state, "medium")
+        case ReaperActionTypes.ram_other_far:
+            return get_enemy_other_candidates(reaper_q_state, "far")
+        case _:
+            raise ValueError(f"Not a ram goal type: {reaper_goal_type}")
+
+
 def select_tanker_target_by_risk_level(reaper_q_state: ReaperQState, risk_level: str) -> SelectedTargetInformation:
     if relation := reaper_q_state.tanker_enemy_relation[("close", risk_level)]:
         return SelectedTargetInformation(relation[0], EntitiesForReaper.TANKER)
@@ -92,5 +134,54 @@ def select_tanker_target_by_risk_level(reaper_q_state: ReaperQState, risk_level:
     raise ImpossibleTarget(f"No tanker target found for risk level: {risk_level}")
 
 
+def get_goal_target_candidates(
+    reaper_q_state: ReaperQState,
+    reaper_goal_type: ReaperActionTypes,
+) -> list[SelectedTargetInformation]:
+    """
+    every target the goal could select, in the order of the selectors. Goals
+    without a target to move to (wait, super power) have no candidates
+    """
+    match reaper_goal_type:
+        case ReaperActionTypes.harvest_safe | ReaperActionTypes.harvest_risky | ReaperActionTypes.harvest_dangerous:
+            risk_level = reaper_goal_type.name.removeprefix("harvest_")
+            return [
+                SelectedTargetInformation(wreck_id, EntitiesForReaper.WRECK)
+                for distance_level in ("close", "medium", "far")
+                for wreck_id in reaper_q_state.water_reaper_relation[(distance_level, risk_level)]
+            ]
+        case (
+            ReaperActionTypes.move_tanker_safe
+            | ReaperActionTypes.move_tanker_risky
+            | ReaperActionTypes.move_tanker_dangerous
+        ):
+            risk_level = reaper_goal_type.name.removeprefix("move_tanker_")
+            return [
+                SelectedTargetInformation(tanker_id, EntitiesForReaper.TANKER)
+                for distance_level in ("close", "medium", "far")
+                for tanker_id in reaper_q_state.tanker_enemy_relation[(distance_level, risk_level)]
+            ]
+        case ReaperActionTypes.use_super_power | ReaperActionTypes.wait:
+            return []
+        case _:
+            return get_ram_target_candidates(reaper_q_state, reaper_goal_type)
+
+
+def select_super_power_target(reaper_q_state: ReaperQState) -> SelectedTargetInformation:
+    """
+    the skills are most worth it against the enemy reapers close to water,
+    then the other enemies nearby
+    """
+    for distance_level in ("close", "medium"):
+        for water_distance_level in ("close", "medium"):
+            if relation := reaper_q_state.player_reaper_relation[(distance_level, water_distance_level)]:
+                return SelectedTargetInformation(relation[0], EntitiesForReaper.REAPER)
+    for distance_level in ("close", "medium"):
+        for water_distance_level in ("close", "medium"):
+            if relation := reaper_q_state.player_other_relation[(distance_level, water_distance_level)]:
+                return SelectedTargetInformation(relation[0], EntitiesForReaper.OTHER_ENEMY)
+    raise ImpossibleTarget("No enemy found for the super power")
+
+
 def no_op_target_selector(reaper_q_state: ReaperQState) -> None:
     return
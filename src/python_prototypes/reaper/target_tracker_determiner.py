@@ -3,6 +3,10 @@ Trackers are the object that track the effect of a strategy
 i.e. the tracks the changes between rounds, and decision about the
 effectiveness / result of the strategy can be decided based on that
 information
+
+The moving targets move as the enemy motion prediction of the round says
+(the one the decider and the planners read), their velocity is only a
+fallback for the units without a prediction
 """
 
 from abc import ABC, abstractmethod
@@ -10,6 +14,8 @@ from abc import ABC, abstractmethod
 from python_prototypes.field_tools import get_manhattan_distance, get_euclidean_distance
 from python_prototypes.field_types import GridUnitState
 from python_prototypes.reaper.q_state_types import ReaperActionTypes
+from python_prototypes.simulation.collisions import get_collision_time
+from python_prototypes.simulation.enemy_predictor import EnemyMotionPrediction
 
 
 def get_target_tracker(reaper_goal_type: ReaperActionTypes) -> "BaseTracker":
@@ -55,11 +61,19 @@ def get_target_tracker(reaper_goal_type: ReaperActionTypes) -> "BaseTracker":
 
 
 class BaseTracker(ABC):
+    __slots__ = ()
+
     @abstractmethod
-    def track(self, player_reaper_unit: GridUnitState, target_unit: GridUnitState):
+    def track(
+        self,
+        player_reaper_unit: GridUnitState,
+        target_unit: GridUnitState,
+        enemy_prediction: EnemyMotionPrediction | None = None,
+    ):
         """
         :param player_reaper_unit:
         :param target_unit:
+        :param enemy_prediction: the shared prediction of the round
         :return:
 
         TODO: change the type of target_unit, it can be None
@@ -113,13 +127,25 @@ class BaseTracker(ABC):
 
 
 class StaticTargetTracker(BaseTracker):
+    __slots__ = (
+        "manhattan_distances_from_target",
+        "manhattan_distance_changes",
+        "euclidean_distances_from_target",
+        "euclidean_distance_changes",
+    )
+
     def __init__(self):
         self.manhattan_distances_from_target = []
         self.manhattan_distance_changes = []
         self.euclidean_distances_from_target = []
         self.euclidean_distance_changes = []
 
-    def track(self, player_reaper_unit: GridUnitState, target_unit: GridUnitState):
+    def track(
+        self,
+        player_reaper_unit: GridUnitState,
+        target_unit: GridUnitState,
+        enemy_prediction: EnemyMotionPrediction | None = None,
+    ):
         manhattan_distance = get_manhattan_distance(player_reaper_unit.grid_coordinate, target_unit.grid_coordinate)
         self.manhattan_distances_from_target.append(manhattan_distance)
         if len(self.manhattan_distances_from_target) > 1:
@@ -177,6 +203,24 @@ class StaticTargetTracker(BaseTracker):
 
 
 class DynamicTargetTracker(BaseTracker):
+    __slots__ = (
+        "manhattan_distances_from_target",
+        "manhattan_distance_changes",
+        "euclidean_distances_from_target",
+        "euclidean_distance_changes",
+        "dx_vectors",
+        "dy_vectors",
+        "player_speed_vectors",
+        "player_speed_changes",
+        "target_speed_vectors",
+        "target_speed_changes",
+        "target_displacements",
+        "player_mass",
+        "target_mass",
+        "player_radius",
+        "target_radius",
+    )
+
     def __init__(self):
         self.manhattan_distances_from_target = []
         self.manhattan_distance_changes = []
@@ -188,12 +232,19 @@ class DynamicTargetTracker(BaseTracker):
         self.player_speed_changes = []
         self.target_speed_vectors: list[tuple[int, int]] = []
         self.target_speed_changes = []
+        # predicted movement of the target in the next round
+        self.target_displacements: list[tuple[float, float]] = []
         self.player_mass = None
         self.target_mass = None
         self.player_radius = None
         self.target_radius = None
 
-    def track(self, player_reaper_unit: GridUnitState, target_unit: GridUnitState):
+    def track(
+        self,
+        player_reaper_unit: GridUnitState,
+        target_unit: GridUnitState,
+        enemy_prediction: EnemyMotionPrediction | None = None,
+    ):
         manhattan_distance = get_manhattan_distance(player_reaper_unit.grid_coordinate, target_unit.grid_coordinate)
         self.manhattan_distances_from_target.append(manhattan_distance)
         if len(self.manhattan_distances_from_target) > 1:
@@ -228,6 +279,12 @@ class DynamicTargetTracker(BaseTracker):
                 )
             )
 
+        target_displacement = (target_unit.unit.vx, target_unit.unit.vy)
+        if enemy_prediction is not None and enemy_prediction.has_unit(target_unit.unit.unit_id):
+            predicted_x, predicted_y = enemy_prediction.get_position(target_unit.unit.unit_id, 1)
+            target_displacement = (predicted_x - target_unit.unit.x, predicted_y - target_unit.unit.y)
+        self.target_displacements.append(target_displacement)
+
         self.player_mass = player_reaper_unit.unit.mass
         self.target_mass = target_unit.unit.mass
         self.player_radius = player_reaper_unit.unit.radius
@@ -300,11 +357,11 @@ class DynamicTargetTracker(BaseTracker):
         actual_dx = self.dx_vectors[-1]
         actual_dy = self.dy_vectors[-1]
         player_latest_speed = self.player_speed_vectors[-1]
-        target_latest_speed = self.target_speed_vectors[-1]
+        target_displacement = self.target_displacements[-1]
 
         relative_velocity = (
-            target_latest_speed[0] - player_latest_speed[0],
-            target_latest_speed[1] - player_latest_speed[1],
+            target_displacement[0] - player_latest_speed[0],
+            target_displacement[1] - player_latest_speed[1],
         )
 
         dot_product = (relative_velocity[0] * actual_dx) + (relative_velocity[1] * actual_dy)
@@ -314,12 +371,42 @@ class DynamicTargetTracker(BaseTracker):
         return True
 
     def is_within_collision_radius(self) -> bool:
+        """
+        the referee resolves collisions within the round, so the observed
+        positions rarely overlap. A collision is also reported if the units
+        touch within the next round, the player keeping its latest velocity
+        and the target moving as predicted
+        """
         collision_radius = self.player_radius + self.target_radius
-        return self.is_target_within_threshold(collision_radius)
+        if self.is_target_within_threshold(collision_radius):
+            return True
+
+        player_latest_speed = self.player_speed_vectors[-1]
+        target_latest_speed = self.target_displacements[-1]
+        collision_time = get_collision_time(
+            0,
+            0,
+            player_latest_speed[0],
+            player_latest_speed[1],
+            self.player_radius,
+            self.dx_vectors[-1],
+            self.dy_vectors[-1],
+            target_latest_speed[0],
+            target_latest_speed[1],
+            self.target_radius,
+        )
+        return collision_time is not None and collision_time <= 1
 
 
 class NoOpTracker(BaseTracker):
-    def track(self, player_reaper_unit: GridUnitState, target_unit: GridUnitState):
+    __slots__ = ()
+
+    def track(
+        self,
+        player_reaper_unit: GridUnitState,
+        target_unit: GridUnitState,
+        enemy_prediction: EnemyMotionPrediction | None = None,
+    ):
         pass
 
     @property
@@ -355,10 +442,17 @@ class NoOpTracker(BaseTracker):
 
 
 class RoundCountTracker(BaseTracker):
+    __slots__ = ("_round_count",)
+
     def __init__(self):
         self._round_count = 0
 
-    def track(self, player_reaper_unit: GridUnitState, target_unit: GridUnitState):
+    def track(
+        self,
+        player_reaper_unit: GridUnitState,
+        target_unit: GridUnitState,
+        enemy_prediction: EnemyMotionPrediction | None = None,
+    ):
         self._round_count += 1
 
     @property
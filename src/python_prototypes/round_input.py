@@ -0,0 +1,159 @@
+"""
+The per round input of the game (from the perspective of one player). The
+engine plays it through `main_game_engine.run_engine_round`
+
+It is shared by every source of rounds: the codingame stdin loop
+(`input_handler`) and the local referee. Keep it free of any non standard
+library dependency, it is merged into the single file solution
+"""
+
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterable, Iterator
+
+from python_prototypes.field_types import Unit, UnitTable
+
+HEADER_LINE_COUNT = 7
+# unit_id unit_type player mass radius x y vx vy extra extra_2, only the mass is a float
+UNIT_COLUMN_COUNT = 11
+MASS_COLUMN = 3
+
+
+@dataclass
+class RoundInput:
+    """
+    the 7 header lines of the round, followed by the units. The player is
+    always 0, the enemies are 1 and 2
+    """
+
+    my_score: int
+    enemy_1_score: int
+    enemy_2_score: int
+    my_rage: int
+    enemy_1_rage: int
+    enemy_2_rage: int
+    units: list[Unit] = field(default_factory=list)
+    unit_table: UnitTable | None = None
+
+    def get_unit_table(self) -> UnitTable:
+        if self.unit_table is None:
+            self.unit_table = UnitTable.from_units(self.units)
+        return self.unit_table
+
+    def to_lines(self) -> list[str]:
+        """
+        :return: the round in the text protocol of the game
+        """
+        lines = [
+            str(self.my_score),
+            str(self.enemy_1_score),
+            str(self.enemy_2_score),
+            str(self.my_rage),
+            str(self.enemy_1_rage),
+            str(self.enemy_2_rage),
+            str(len(self.units)),
+        ]
+        lines.extend(format_unit_line(unit) for unit in self.units)
+        return lines
+
+
+@dataclass
+class RecordedRound:
+    """
+    a round of a recorded game: the input of the player and the reaper,
+    destroyer and doof commands it answered with. Text recordings are the
+    text protocol of the rounds, each followed by its 3 command lines (the
+    binary ones of `frame_recorder` keep the timings too)
+
+    :param timings: seconds spent in the phases of the round, by their name
+    """
+
+    round_input: RoundInput
+    commands: tuple[str, str, str]
+    timings: dict[str, float] = field(default_factory=dict)
+
+    def to_lines(self) -> list[str]:
+        return [*self.round_input.to_lines(), *self.commands]
+
+
+def read_round_input(lines: Iterator[str]) -> RoundInput:
+    """
+    :param lines: consumed up to the last unit line of the round
+    :raises StopIteration: at the end of the lines
+    """
+    header = [int(next(lines)) for _ in range(HEADER_LINE_COUNT)]
+    units = [parse_unit_line(next(lines)) for _ in range(header[6])]
+    return RoundInput(*header[:6], units=units)
+
+
+def read_recorded_rounds(lines: Iterable[str]) -> Iterator[RecordedRound]:
+    """
+    streams the rounds of a recording, see `RecordedRound`
+    """
+    line_iterator = (line.rstrip("\n") for line in lines if line.strip())
+    while True:
+        try:
+            round_input = read_round_input(line_iterator)
+        except StopIteration:
+            return
+        try:
+            commands = (next(line_iterator), next(line_iterator), next(line_iterator))
+        except StopIteration:
+            raise ValueError("The recording ends without the commands of the last round")
+        yield RecordedRound(round_input, commands)
+
+
+def read_round_input_from_buffer(stream: BinaryIO) -> RoundInput:
+    """
+    reads a round of the text protocol from a binary stream (e.g.
+    `sys.stdin.buffer`): the header lines one by one, then all the unit
+    lines together. Only the lines of the round are consumed, the next
+    round is sent by the game after the commands
+
+    :raises EOFError: at the end of the stream
+    """
+    header_lines = [stream.readline() for _ in range(HEADER_LINE_COUNT)]
+    if not header_lines[-1]:
+        raise EOFError("The input ended before the round")
+    header = [int(line) for line in header_lines]
+    unit_count = header[6]
+    unit_table = parse_unit_block(b"".join([stream.readline() for _ in range(unit_count)]), unit_count)
+    return RoundInput(*header[:6], units=unit_table.get_units(), unit_table=unit_table)
+
+
+def parse_unit_block(unit_block: bytes, unit_count: int) -> UnitTable:
+    """
+    parses the unit lines of a round at once: the tokens are split in one
+    call, and every column is converted in bulk
+    """
+    tokens = unit_block.split()
+    if len(tokens) != unit_count * UNIT_COLUMN_COUNT:
+        raise ValueError(f"Expected {unit_count} units, got {len(tokens) / UNIT_COLUMN_COUNT} units worth of values")
+    return UnitTable.from_columns(
+        map(float if column == MASS_COLUMN else int, tokens[column::UNIT_COLUMN_COUNT])
+        for column in range(UNIT_COLUMN_COUNT)
+    )
+
+
+def parse_unit_line(line: str) -> Unit:
+    inputs = line.split()
+    return Unit(
+        unit_id=int(inputs[0]),
+        unit_type=int(inputs[1]),
+        player=int(inputs[2]),
+        mass=float(inputs[3]),
+        radius=int(inputs[4]),
+        x=int(inputs[5]),
+        y=int(inputs[6]),
+        vx=int(inputs[7]),
+        vy=int(inputs[8]),
+        extra=int(inputs[9]),
+        extra_2=int(inputs[10]),
+    )
+
+
+def format_unit_line(unit: Unit) -> str:
+    return (
+        f"{unit.unit_id} {unit.unit_type} {unit.player} {unit.mass} {unit.radius} "
+        f"{unit.x} {unit.y} {unit.vx} {unit.vy} {unit.extra} {unit.extra_2}"
+    )
+
@@ -0,0 +1,435 @@
+"""
+Collision handling of the simulator
+
+- narrow phase: continuous time of impact between moving circles (and
+between looters and the border of the map)
+- broad phase: uniform spatial hash over the `SQUARE_SPLIT` grid (the same
+grid the q states are built on), only units sharing a cell with their swept
+bounding box are tested
+- response: the elastic impulse of the referee (weighted by mass, halved,
+with a minimum impulse)
+
+Everything works on batched states, every rollout resolves its own earliest
+collision in the same numpy pass
+"""
+
+import math
+
+import numpy as np
+
+from python_prototypes.field_tools import PLAYFIELD_RADIUS, SQUARE_SPLIT
+from python_prototypes.simulation.physics import (
+    UnitCommands,
+    apply_thrust,
+    apply_friction_and_rounding,
+)
+from python_prototypes.simulation.state import SimulationState
+
+COLLISION_IMPULSE_COEFFICIENT = 0.5
+COLLISION_MIN_IMPULSE = 30.0
+MAX_COLLISIONS_PER_ROUND = 32
+# below this many unit pairs (over all rollouts) testing every pair is
+# cheaper than building the spatial hash
+BRUTE_FORCE_PAIR_LIMIT = 2048
+# event partner of collisions with the border of the map
+BORDER = -1
+
+_CELL_OFFSET = 1 << 10
+_CELL_RANGE = 1 << 11
+
+
+def get_collision_time(
+    x1: float,
+    y1: float,
+    vx1: float,
+    vy1: float,
+    radius_1: float,
+    x2: float,
+    y2: float,
+    vx2: float,
+    vy2: float,
+    radius_2: float,
+) -> float | None:
+    """
+    Time (fraction of the round) when two moving circles first touch, None
+    if they don't collide while moving with these velocities. Overlapping
+    circles collide immediately if they are getting closer
+    """
+    dx = x2 - x1
+    dy = y2 - y1
+    dvx = vx2 - vx1
+    dvy = vy2 - vy1
+    radius_sum = radius_1 + radius_2
+
+    c = dx * dx + dy * dy - radius_sum * radius_sum
+    b = 2 * (dx * dvx + dy * dvy)
+    if c <= 0:
+        return 0.0 if b < 0 else None
+    a = dvx * dvx + dvy * dvy
+    if a == 0:
+        return None
+    discriminant = b * b - 4 * a * c
+    if discriminant < 0:
+        return None
+    collision_time = (-b - math.sqrt(discriminant)) / (2 * a)
+    if collision_time < 0:
+        return None
+    return collision_time
+
+
+def get_collision_times(
+    dx: np.ndarray,
+    dy: np.ndarray,
+    dvx: np.ndarray,
+    dvy: np.ndarray,
+    radius_sum: np.ndarray,
+) -> np.ndarray:
+    """
+    vectorized `get_collision_time` on relative positions and velocities (of
+    the second circle relative to the first one)
+
+    :return: collision times, inf where there is no collision
+    """
+    c = dx * dx + dy * dy - radius_sum * radius_sum
+    b = 2 * (dx * dvx + dy * dvy)
+    a = dvx * dvx + dvy * dvy
+    discriminant = b * b - 4 * a * c
+    is_solvable = (a > 0) & (discriminant >= 0)
+    safe_a = np.where(is_solvable, a, 1.0)
+    root = (-b - np.sqrt(np.where(is_solvable, discriminant, 0.0))) / (2 * safe_a)
+
+    collision_times = np.where(is_solvable & (root >= 0), root, np.inf)
+    return np.where(c <= 0, np.where(b < 0, 0.0, np.inf), collision_times)
+
+
+def get_border_collision_times(
+    x: np.ndarray,
+    y: np.ndarray,
+    vx: np.ndarray,
+    vy: np.ndarray,
+    radius: np.ndarray,
+) -> np.ndarray:
+    """
+    time when circles (inside the map) touch the border of the map while
+    moving outwards, inf if they don't
+    """
+    limit = PLAYFIELD_RADIUS - radius
+    a = vx * vx + vy * vy
+    b = 2 * (x * vx + y * vy)
+    c = x * x + y * y - limit * limit
+    discriminant = b * b - 4 * a * c
+    is_solvable = (a > 0) & (discriminant >= 0)
+    safe_a = np.where(is_solvable, a, 1.0)
+    root = (-b + np.sqrt(np.where(is_solvable, discriminant, 0.0))) / (2 * safe_a)
+
+    collision_times = np.where(is_solvable & (root >= 0), root, np.inf)
+    return np.where(c >= 0, np.where(b > 0, 0.0, np.inf), collision_times)
+
+
+def get_candidate_pairs(
+    x: np.ndarray,
+    y: np.ndarray,
+    vx: np.ndarray,
+    vy: np.ndarray,
+    radius: np.ndarray,
+    is_collidable: np.ndarray,
+    time_left: np.ndarray,
+    cell_size: int = SQUARE_SPLIT,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Broad phase: hashes every unit into the grid cells touched by its swept
+    bounding box, and pairs the units sharing a cell
+
+    :param x: (batch, unit_count) shaped columns, same for the rest
+    :param y:
+    :param vx:
+    :param vy:
+    :param radius:
+    :param is_collidable:
+    :param time_left: (batch,) remaining part of the round
+    :param cell_size:
+    :return: batch indices, first and second unit indices (first < second)
+        of the unique candidate pairs
+    """
+    batch_indices, unit_indices = np.nonzero(is_collidable)
+    if batch_indices.size < 2:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+
+    unit_time_left = time_left[batch_indices]
+    start_x = x[batch_indices, unit_indices]
+    start_y = y[batch_indices, unit_indices]
+    end_x = start_x + vx[batch_indices, unit_indices] * unit_time_left
+    end_y = start_y + vy[batch_indices, unit_indices] * unit_time_left
+    unit_radius = radius[batch_indices, unit_indices]
+
+    min_cell_x = np.floor((np.minimum(start_x, end_x) - unit_radius) / cell_size).astype(np.int64)
+    max_cell_x = np.floor((np.maximum(start_x, end_x) + unit_radius) / cell_size).astype(np.int64)
+    min_cell_y = np.floor((np.minimum(start_y, end_y) - unit_radius) / cell_size).astype(np.int64)
+    max_cell_y = np.floor((np.maximum(start_y, end_y) + unit_radius) / cell_size).astype(np.int64)
+    span_x = max_cell_x - min_cell_x + 1
+    span_y = max_cell_y - min_cell_y + 1
+
+    entry_keys = []
+    entry_batches = []
+    entry_units = []
+    for offset_x in range(int(span_x.max())):
+        for offset_y in range(int(span_y.max())):
+            is_covered = (offset_x < span_x) & (offset_y < span_y)
+            cell_x = min_cell_x[is_covered] + offset_x + _CELL_OFFSET
+            cell_y = min_cell_y[is_covered] + offset_y + _CELL_OFFSET
+            covered_batches = batch_indices[is_covered]
+            entry_keys.append((covered_batches * _CELL_RANGE + cell_x) * _CELL_RANGE + cell_y)
+            entry_batches.append(covered_batches)
+            entry_units.append(unit_indices[is_covered])
+
+    keys = np.concatenate(entry_keys)
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    batches = np.concatenate(entry_batches)[order]
+    units = np.concatenate(entry_units)[order]
+
+    pair_batches = []
+    pair_first = []
+    pair_second = []
+    for distance in range(1, keys.size):
+        is_same_cell = keys[distance:] == keys[:-distance]
+        if not is_same_cell.any():
+            break
+        first_units = units[:-distance][is_same_cell]
+        second_units = units[distance:][is_same_cell]
+        pair_batches.append(batches[distance:][is_same_cell])
+        pair_first.append(np.minimum(first_units, second_units))
+        pair_second.append(np.maximum(first_units, second_units))
+
+    if not pair_batches:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+
+    unit_count = x.shape[1]
+    pair_keys = np.unique(
+        (np.concatenate(pair_batches) * unit_count + np.concatenate(pair_first)) * unit_count
+        + np.concatenate(pair_second)
+    )
+    pair_keys, second = np.divmod(pair_keys, unit_count)
+    batch, first = np.divmod(pair_keys, unit_count)
+    return batch, first, second
+
+
+def get_all_pairs(is_collidable: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    every pair of collidable units of every rollout, same output as
+    `get_candidate_pairs`
+    """
+    batch_count, unit_count = is_collidable.shape
+    first, second = np.triu_indices(unit_count, k=1)
+    is_pair_collidable = is_collidable[:, first] & is_collidable[:, second]
+    batch, pair_indices = np.nonzero(is_pair_collidable)
+    return batch, first[pair_indices], second[pair_indices]
+
+
+def apply_collision_impulse(
+    vx1: np.ndarray,
+    vy1: np.ndarray,
+    mass_1: np.ndarray,
+    vx2: np.ndarray,
+    vy2: np.ndarray,
+    mass_2: np.ndarray,
+    normal_x: np.ndarray,
+    normal_y: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Elastic impulse of the referee: full exchange along the normal, then a
+    second, halved push (at least `COLLISION_MIN_IMPULSE`). An infinite mass
+    (e.g. the border of the map) doesn't move
+
+    :param normal_x: from the second circle towards the first one
+    :param normal_y:
+    :return: the new velocities of both circles
+    """
+    inverse_mass_1 = 1 / mass_1
+    inverse_mass_2 = np.where(np.isinf(mass_2), 0.0, 1 / mass_2)
+    normal_square = normal_x * normal_x + normal_y * normal_y
+    safe_normal_square = np.where(normal_square > 0, normal_square, 1.0)
+
+    product = ((vx1 - vx2) * normal_x + (vy1 - vy2) * normal_y) / (
+        safe_normal_square * (inverse_mass_1 + inverse_mass_2)
+    )
+    force_x = normal_x * product
+    force_y = normal_y * product
+    vx1 = vx1 - force_x * inverse_mass_1
+    vy1 = vy1 - force_y * inverse_mass_1
+    vx2 = vx2 + force_x * inverse_mass_2
+    vy2 = vy2 + force_y * inverse_mass_2
+
+    force_x = force_x * COLLISION_IMPULSE_COEFFICIENT
+    force_y = force_y * COLLISION_IMPULSE_COEFFICIENT
+    impulse = np.hypot(force_x, force_y)
+    is_weak_impulse = (impulse > 0) & (impulse < COLLISION_MIN_IMPULSE)
+    scale = np.where(is_weak_impulse, COLLISION_MIN_IMPULSE / np.where(is_weak_impulse, impulse, 1.0), 1.0)
+    force_x = force_x * scale
+    force_y = force_y * scale
+    vx1 = vx1 - force_x * inverse_mass_1
+    vy1 = vy1 - force_y * inverse_mass_1
+    vx2 = vx2 + force_x * inverse_mass_2
+    vy2 = vy2 + force_y * inverse_mass_2
+    return vx1, vy1, vx2, vy2
+
+
+def move_with_collisions(
+    state: SimulationState,
+    max_collisions: int = MAX_COLLISIONS_PER_ROUND,
+    collision_events: list[tuple[np.ndarray, np.ndarray, np.ndarray]] | None = None,
+) -> int:
+    """
+    Moves the units for a full round, stopping at every collision (the
+    earliest one of every rollout) to bounce the colliding units. After
+    `max_collisions` the units move for the rest of the round without
+    colliding
+
+    :param state:
+    :param max_collisions:
+    :param collision_events: if set, the (batch indices, first units, second
+        units) of every resolved collision step are appended to it, second
+        units are `BORDER` for the border of the map
+    :return: the number of resolved collisions over all rollouts
+    """
+    unit_count = state.unit_count
+    x = state.x.reshape(-1, unit_count)
+    y = state.y.reshape(-1, unit_count)
+    vx = state.vx.reshape(-1, unit_count)
+    vy = state.vy.reshape(-1, unit_count)
+    radius = state.radius.reshape(-1, unit_count)
+    mass = state.mass.reshape(-1, unit_count)
+    is_moving = state.is_moving.reshape(-1, unit_count)
+    is_looter = state.is_looter.reshape(-1, unit_count)
+    batch_count = x.shape[0]
+    all_pairs = None
+    if batch_count * unit_count * (unit_count - 1) // 2 <= BRUTE_FORCE_PAIR_LIMIT:
+        all_pairs = get_all_pairs(is_moving)
+
+    time_left = np.ones(batch_count)
+    # the same pair can't collide twice at the very same moment
+    last_first = np.full(batch_count, -2)
+    last_second = np.full(batch_count, -2)
+    resolved_collision_count = 0
+
+    for _ in range(max_collisions):
+        if all_pairs is not None:
+            pair_batches, pair_first, pair_second = all_pairs
+        else:
+            pair_batches, pair_first, pair_second = get_candidate_pairs(x, y, vx, vy, radius, is_moving, time_left)
+        pair_times = get_collision_times(
+            x[pair_batches, pair_second] - x[pair_batches, pair_first],
+            y[pair_batches, pair_second] - y[pair_batches, pair_first],
+            vx[pair_batches, pair_second] - vx[pair_batches, pair_first],
+            vy[pair_batches, pair_second] - vy[pair_batches, pair_first],
+            radius[pair_batches, pair_first] + radius[pair_batches, pair_second],
+        )
+        border_batches, border_units = np.nonzero(is_looter)
+        border_times = get_border_collision_times(
+            x[border_batches, border_units],
+            y[border_batches, border_units],
+            vx[border_batches, border_units],
+            vy[border_batches, border_units],
+            radius[border_batches, border_units],
+        )
+
+        event_batches = np.concatenate([pair_batches, border_batches])
+        event_first = np.concatenate([pair_first, border_units])
+        event_second = np.concatenate([pair_second, np.full(border_units.size, BORDER)])
+        event_times = np.concatenate([pair_times, border_times])
+        is_repeated = (
+            (event_times == 0)
+            & (event_first == last_first[event_batches])
+            & (event_second == last_second[event_batches])
+        )
+        is_valid = (event_times <= time_left[event_batches]) & ~is_repeated
+        event_batches = event_batches[is_valid]
+        event_first = event_first[is_valid]
+        event_second = event_second[is_valid]
+        event_times = event_times[is_valid]
+
+        first_event_time = np.full(batch_count, np.inf)
+        np.minimum.at(first_event_time, event_batches, event_times)
+        move_time = np.minimum(first_event_time, time_left)
+        x += np.where(is_moving, vx * move_time[:, np.newaxis], 0.0)
+        y += np.where(is_moving, vy * move_time[:, np.newaxis], 0.0)
+        time_left -= move_time
+        if not event_batches.size:
+            break
+
+        # one (the earliest) collision per rollout
+        is_earliest = event_times == first_event_time[event_batches]
+        earliest_batches, first_indices = np.unique(event_batches[is_earliest], return_index=True)
+        first_units = event_first[is_earliest][first_indices]
+        second_units = event_second[is_earliest][first_indices]
+        resolve_collisions(x, y, vx, vy, mass, earliest_batches, first_units, second_units)
+        if collision_events is not None:
+            collision_events.append((earliest_batches, first_units, second_units))
+        last_first[earliest_batches] = first_units
+        last_second[earliest_batches] = second_units
+        resolved_collision_count += earliest_batches.size
+
+    # out of collisions, the rest of the round is moved without them
+    x += np.where(is_moving, vx * time_left[:, np.newaxis], 0.0)
+    y += np.where(is_moving, vy * time_left[:, np.newaxis], 0.0)
+    return resolved_collision_count
+
+
+def resolve_collisions(
+    x: np.ndarray,
+    y: np.ndarray,
+    vx: np.ndarray,
+    vy: np.ndarray,
+    mass: np.ndarray,
+    batches: np.ndarray,
+    first_units: np.ndarray,
+    second_units: np.ndarray,
+) -> None:
+    """
+    bounces the colliding units in place, at most one collision per rollout
+    """
+    is_border = second_units == BORDER
+    safe_second_units = np.where(is_border, first_units, second_units)
+
+    first_x = x[batches, first_units]
+    first_y = y[batches, first_units]
+    normal_x = np.where(is_border, -first_x, first_x - x[batches, safe_second_units])
+    normal_y = np.where(is_border, -first_y, first_y - y[batches, safe_second_units])
+    second_mass = np.where(is_border, np.inf, mass[batches, safe_second_units])
+    second_vx = np.where(is_border, 0.0, vx[batches, safe_second_units])
+    second_vy = np.where(is_border, 0.0, vy[batches, safe_second_units])
+
+    new_vx1, new_vy1, new_vx2, new_vy2 = apply_collision_impulse(
+        vx[batches, first_units],
+        vy[batches, first_units],
+        mass[batches, first_units],
+        second_vx,
+        second_vy,
+        second_mass,
+        normal_x,
+        normal_y,
+    )
+    vx[batches, first_units] = new_vx1
+    vy[batches, first_units] = new_vy1
+    is_pair = ~is_border
+    vx[batches[is_pair], second_units[is_pair]] = new_vx2[is_pair]
+    vy[batches[is_pair], second_units[is_pair]] = new_vy2[is_pair]
+
+
+def step_with_collisions(
+    state: SimulationState,
+    commands: UnitCommands,
+    collision_events: list[tuple[np.ndarray, np.ndarray, np.ndarray]] | None = None,
+) -> int:
+    """
+    full round of the referee: thrust, move with collisions, friction and
+    rounding
+
+    :return: the number of resolved collisions
+    """
+    apply_thrust(state, commands)
+    resolved_collision_count = move_with_collisions(state, collision_events=collision_events)
+    apply_friction_and_rounding(state)
+    return resolved_collision_count
@@ -0,0 +1,230 @@
+"""
+Fidelity of the simulator against recorded games
+
+Every recorded round is stepped one round with the simulator, with the
+commands the player issued, and the moved units are compared with the next
+recorded round. The movement is prepared the same way as the local referee
+does it (tar, grenades, tankers), so only the movement rules of the
+simulator are measured.
+
+The commands of the enemies are not recorded, their looters drift in the
+simulation. Their errors are reported separately (uncommanded), they
+measure how far the enemies deviate from drifting rather than the
+simulator itself.
+
+The recordings are streamed round by round, and only the running sums of
+the errors are kept, so corpora of any size can be checked. Both the
+binary frame logs and the text recordings are read (see `iter_recording`):
+
+    python -m python_prototypes.simulation.divergence_checker recordings/*.mmf recordings/*.txt
+"""
+
+import argparse
+import math
+from dataclasses import dataclass
+from itertools import pairwise
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from python_prototypes.field_types import Entity, PlayerFieldTypes, Unit
+from python_prototypes.frame_recorder import iter_recording
+from python_prototypes.round_input import RecordedRound
+from python_prototypes.simulation.collisions import step_with_collisions
+from python_prototypes.simulation.referee import (
+    LOOTER_ORDER,
+    SKILL_BY_LOOTER,
+    SKILL_COSTS,
+    SKILL_RADIUS,
+    SKILL_RANGE,
+    LooterCommand,
+    parse_looter_command,
+    prepare_movement,
+)
+
+
+@dataclass
+class UnitDivergence:
+    """
+    :param position_error: distance of the simulated and the recorded
+        position
+    :param velocity_error: length of the difference of the velocities
+    :param is_commanded: the commands of the unit are known (the player's
+        looters and the tankers)
+    """
+
+    round_index: int
+    unit_id: int
+    unit_type: int
+    player: int
+    position_error: float
+    velocity_error: float
+    is_commanded: bool
+
+
+@dataclass
+class DivergenceStats:
+    count: int = 0
+    exact_count: int = 0
+    position_error_sum: float = 0.0
+    position_error_max: float = 0.0
+    velocity_error_sum: float = 0.0
+    velocity_error_max: float = 0.0
+
+    def add(self, divergence: UnitDivergence) -> None:
+        self.count += 1
+        self.exact_count += divergence.position_error == 0 and divergence.velocity_error == 0
+        self.position_error_sum += divergence.position_error
+        self.position_error_max = max(self.position_error_max, divergence.position_error)
+        self.velocity_error_sum += divergence.velocity_error
+        self.velocity_error_max = max(self.velocity_error_max, divergence.velocity_error)
+
+    @property
+    def position_error_mean(self) -> float:
+        return self.position_error_sum / self.count if self.count else 0.0
+
+    @property
+    def velocity_error_mean(self) -> float:
+        return self.velocity_error_sum / self.count if self.count else 0.0
+
+
+class DivergenceReport:
+    """
+    the errors grouped by the unit type and whether the unit was commanded
+    """
+
+    def __init__(self):
+        self.round_count = 0
+        self.stats: dict[tuple[int, bool], DivergenceStats] = {}
+
+    def add_round(self, divergences: list[UnitDivergence]) -> None:
+        self.round_count += 1
+        for divergence in divergences:
+            key = (divergence.unit_type, divergence.is_commanded)
+            self.stats.setdefault(key, DivergenceStats()).add(divergence)
+
+    def format_lines(self) -> list[str]:
+        lines = [f"{self.round_count} rounds checked"]
+        for (unit_type, is_commanded), stats in sorted(self.stats.items()):
+            command_label = "commanded" if is_commanded else "uncommanded"
+            lines.append(
+                f"{Entity(unit_type).name.lower()} ({command_label}): {stats.count} units, "
+                f"{stats.exact_count / stats.count:.1%} exact, "
+                f"position error mean {stats.position_error_mean:.2f} max {stats.position_error_max:.2f}, "
+                f"velocity error mean {stats.velocity_error_mean:.2f} max {stats.velocity_error_max:.2f}"
+            )
+        return lines
+
+
+def get_player_looter_commands(recorded_round: RecordedRound) -> dict[Entity, tuple[Unit, LooterCommand | None]]:
+    player_looters = {
+        Entity(unit.unit_type): unit
+        for unit in recorded_round.round_input.units
+        if unit.player == PlayerFieldTypes.PLAYER.value
+    }
+    return {
+        looter_type: (player_looters[looter_type], parse_looter_command(raw_command))
+        for looter_type, raw_command in zip(LOOTER_ORDER, recorded_round.commands)
+        if looter_type in player_looters
+    }
+
+
+def get_cast_skills(
+    recorded_round: RecordedRound,
+    player_looter_commands: dict[Entity, tuple[Unit, LooterCommand | None]],
+) -> tuple[list[Unit], list[tuple[int, int]]]:
+    """
+    the skills of the player taking effect in the round, like in
+    `LocalReferee._apply_skills`
+
+    :return: the new tar pools and the grenade centres
+    """
+    rage = recorded_round.round_input.my_rage
+    tar_pools = []
+    grenade_centres = []
+    for looter_type, (looter, command) in player_looter_commands.items():
+        if command is None or not command.is_skill:
+            continue
+        skill_cost = SKILL_COSTS[looter_type]
+        if rage < skill_cost or math.hypot(command.target_x - looter.x, command.target_y - looter.y) > SKILL_RANGE:
+            continue
+        rage -= skill_cost
+        pool_type = SKILL_BY_LOOTER[looter_type]
+        if pool_type is None:
+            grenade_centres.append((command.target_x, command.target_y))
+        elif pool_type == Entity.TAR_POOL:
+            tar_pools.append(
+                Unit(command.target_x, command.target_y, 0, 0, SKILL_RADIUS, Entity.TAR_POOL.value, 0, -1, -1)
+            )
+    return tar_pools, grenade_centres
+
+
+def check_round_divergence(
+    recorded_round: RecordedRound,
+    next_round: RecordedRound,
+    round_index: int = 0,
+) -> list[UnitDivergence]:
+    """
+    :return: the errors of the moving units present in both rounds
+    """
+    player_looter_commands = get_player_looter_commands(recorded_round)
+    tar_pools, grenade_centres = get_cast_skills(recorded_round, player_looter_commands)
+    looter_commands = {looter.unit_id: command for looter, command in player_looter_commands.values()}
+    moving_units, state, commands = prepare_movement(
+        recorded_round.round_input.units + tar_pools, looter_commands, grenade_centres
+    )
+    step_with_collisions(state, commands)
+
+    next_units = {unit.unit_id: unit for unit in next_round.round_input.units}
+    divergences = []
+    for index, unit in enumerate(moving_units):
+        next_unit = next_units.get(unit.unit_id)
+        if next_unit is None:
+            continue
+        is_commanded = unit.unit_id in looter_commands or unit.unit_type == Entity.TANKER.value
+        divergences.append(
+            UnitDivergence(
+                round_index=round_index,
+                unit_id=unit.unit_id,
+                unit_type=unit.unit_type,
+                player=unit.player,
+                position_error=float(np.hypot(state.x[index] - next_unit.x, state.y[index] - next_unit.y)),
+                velocity_error=float(np.hypot(state.vx[index] - next_unit.vx, state.vy[index] - next_unit.vy)),
+                is_commanded=is_commanded,
+            )
+        )
+    return divergences
+
+
+def iter_recording_divergences(recorded_rounds: Iterable[RecordedRound]) -> Iterator[list[UnitDivergence]]:
+    """
+    the divergences of every consecutive round pair of one recording
+    """
+    for round_index, (recorded_round, next_round) in enumerate(pairwise(recorded_rounds)):
+        yield check_round_divergence(recorded_round, next_round, round_index)
+
+
+def check_recordings(paths: Iterable[Path | str], report: DivergenceReport | None = None) -> DivergenceReport:
+    """
+    every file is a separate recording (a frame log or a text recording),
+    streamed round by round
+    """
+    if report is None:
+        report = DivergenceReport()
+    for path in paths:
+        for divergences in iter_recording_divergences(iter_recording(path)):
+            report.add_round(divergences)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulator divergence from recorded games")
+    parser.add_argument("recordings", type=Path, nargs="+", help="binary frame logs or text recordings")
+    arguments = parser.parse_args()
+    for line in check_recordings(arguments.recordings).format_lines():
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Multi round motion prediction of the enemy units
+
+The enemies' commands are unknown, so they are extrapolated as drifting
+units: moving with their current velocity, slowed by the friction of their
+unit type. Without thrust the rounds have a closed form, so every enemy and
+every predicted round is calculated in the same numpy pass:
+
+    v_k = v_0 * (1 - f)^k
+    p_k = p_0 + v_0 * (1 - (1 - f)^k) / f
+
+The prediction is made once per round (see `EnemyMotionPredictor.update`),
+and read by everything that targets enemies in the same round
+"""
+
+from typing import Iterable
+
+import numpy as np
+
+from python_prototypes.field_types import GameGridInformation, Unit
+from python_prototypes.simulation.intercept_solver import InterceptEstimates, get_intercepts
+from python_prototypes.simulation.state import UNIT_TYPE_FRICTION
+
+PREDICTION_ROUND_COUNT = 10
+
+
+class EnemyMotionPrediction:
+    """
+    :param unit_ids: (unit_count,)
+    :param x: (round_count + 1, unit_count), row k is k rounds ahead, row 0
+        is the current position
+    :param y:
+    """
+
+    def __init__(self, unit_ids: np.ndarray, x: np.ndarray, y: np.ndarray):
+        self.unit_ids = unit_ids
+        self.x = x
+        self.y = y
+        self._unit_index = {unit_id: index for index, unit_id in enumerate(unit_ids.tolist())}
+
+    @property
+    def round_count(self) -> int:
+        return self.x.shape[0] - 1
+
+    def has_unit(self, unit_id: int) -> bool:
+        return unit_id in self._unit_index
+
+    def get_position(self, unit_id: int, rounds_ahead: int) -> tuple[float, float]:
+        """
+        :param unit_id:
+        :param rounds_ahead: clipped to the predicted rounds
+        """
+        index = self._unit_index[unit_id]
+        rounds_ahead = min(max(rounds_ahead, 0), self.round_count)
+        return float(self.x[rounds_ahead, index]), float(self.y[rounds_ahead, index])
+
+    def get_trajectory(self, unit_id: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        :return: the (round_count + 1,) predicted x and y of the unit
+        """
+        index = self._unit_index[unit_id]
+        return self.x[:, index], self.y[:, index]
+
+
+def predict_unit_motion(units: Iterable[Unit], round_count: int = PREDICTION_ROUND_COUNT) -> EnemyMotionPrediction:
+    units = list(units)
+    unit_ids = np.array([unit.unit_id for unit in units], dtype=np.int64)
+    x = np.array([unit.x for unit in units], dtype=np.float64)
+    y = np.array([unit.y for unit in units], dtype=np.float64)
+    vx = np.array([unit.vx for unit in units], dtype=np.float64)
+    vy = np.array([unit.vy for unit in units], dtype=np.float64)
+    friction = UNIT_TYPE_FRICTION[np.array([unit.unit_type for unit in units], dtype=np.int64)]
+
+    rounds = np.arange(round_count + 1, dtype=np.float64)[:, np.newaxis]
+    has_friction = friction > 0
+    safe_friction = np.where(has_friction, friction, 1.0)
+    # total distance travelled in k rounds, in units of the starting velocity
+    travelled = np.where(has_friction, (1 - (1 - friction) ** rounds) / safe_friction, rounds)
+    return EnemyMotionPrediction(unit_ids=unit_ids, x=x + vx * travelled, y=y + vy * travelled)
+
+
+class EnemyMotionPredictor:
+    """
+    Holds the prediction of the actual round, everything reading it within
+    a round sees the same future positions
+    """
+
+    def __init__(self, round_count: int = PREDICTION_ROUND_COUNT):
+        self.round_count = round_count
+        self.prediction = predict_unit_motion([], round_count)
+        self.intercepts: InterceptEstimates | None = None
+        self._intercept_coordinates: dict[int, tuple[int, int]] = {}
+
+    def update(
+        self,
+        game_grid_information: GameGridInformation,
+        chaser_unit: Unit | None = None,
+    ) -> EnemyMotionPrediction:
+        """
+        predicts the enemy reapers, destroyers and doofs, call it once per round
+
+        :param game_grid_information:
+        :param chaser_unit: if given (the player's reaper), the earliest
+            interception of every enemy is solved for it, see `intercepts`
+        """
+        enemy_grid_states = (
+            game_grid_information.enemy_reaper_grid_state,
+            game_grid_information.enemy_others_grid_state,
+        )
+        enemy_units = [
+            grid_unit.unit
+            for grid_state in enemy_grid_states
+            for grid_units in grid_state.values()
+            for grid_unit in grid_units
+        ]
+        self.prediction = predict_unit_motion(enemy_units, self.round_count)
+        self.intercepts = get_intercepts(chaser_unit, enemy_units) if chaser_unit is not None else None
+        self._intercept_coordinates = {}
+        return self.prediction
+
+    def get_intercept_coordinate(self, chaser_unit: Unit, target_unit: Unit) -> tuple[int, int]:
+        """
+        where the chaser (at full throttle) can meet the drifting target: the
+        point of `intercepts`, the ram targets are ranked by the same
+        solution. Cached for the round. Falls back to the current position of
+        units without a prediction (e.g. wrecks, tankers) and of unreachable
+        targets
+        """
+        if not self.prediction.has_unit(target_unit.unit_id):
+            return target_unit.x, target_unit.y
+        if target_unit.unit_id in self._intercept_coordinates:
+            return self._intercept_coordinates[target_unit.unit_id]
+
+        intercepts = self.intercepts
+        if intercepts is None or intercepts.get_eta(target_unit.unit_id) is None:
+            # updated without a chaser
+            intercepts = get_intercepts(chaser_unit, [target_unit])
+        x, y = intercepts.get_coordinate(target_unit.unit_id)
+        intercept_coordinate = (round(x), round(y))
+        self._intercept_coordinates[target_unit.unit_id] = intercept_coordinate
+        return intercept_coordinate
@@ -0,0 +1,307 @@
+"""
+Beam search over multi-wreck harvest tours
+
+A tour is a sequence of stops, a stop is a harvest point (a wreck centre or
+a point of an overlap, see `WaterExtractionMap`) where the reaper stays until
+the wrecks covering it run dry. The value of a tour is the water collected
+within a round horizon, the remaining water of every wreck is tracked along
+the tour, so stops sharing a wreck don't count it twice.
+
+The travel times come from a kinematics table: the full throttle reach of
+the reaper after every round. The first leg starts with the actual velocity
+of the reaper, the later legs start from a standstill (the reaper brakes to
+harvest). Every depth of the beam expands all its tours with all the stops
+at once, so dozens of wrecks are planned in a few milliseconds
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from python_prototypes.field_tools import get_drift_factor, get_thrust_reach
+from python_prototypes.field_types import Unit
+from python_prototypes.simulation.water_extraction import WaterExtractionMap
+from python_prototypes.unit_parameters import UnitFriction, UnitMass, UnitThrust
+
+TOUR_HORIZON = 40
+TOUR_BEAM_WIDTH = 8
+MAX_TOUR_STOP_COUNT = 4
+# the stops are also accepted from this far, the reaper brakes into them
+MIN_ARRIVAL_MARGIN = 50
+
+
+@dataclass
+class TourStop:
+    """
+    :param x:
+    :param y:
+    :param wreck_ids: wrecks covering the stop
+    :param arrival_round: rounds from now until the reaper gets there
+    :param stay_round_count: rounds spent harvesting there
+    :param water: water collected there
+    """
+
+    x: int
+    y: int
+    wreck_ids: list[int]
+    arrival_round: int
+    stay_round_count: int
+    water: int
+
+
+@dataclass
+class HarvestTour:
+    stops: list[TourStop] = field(default_factory=list)
+
+    @property
+    def water(self) -> int:
+        return sum(stop.water for stop in self.stops)
+
+    @property
+    def round_count(self) -> int:
+        if not self.stops:
+            return 0
+        return self.stops[-1].arrival_round + self.stops[-1].stay_round_count
+
+
+def get_reach_table(
+    round_limit: int = TOUR_HORIZON,
+    acceleration: float = UnitThrust.max_looter / UnitMass.reaper,
+    friction: float = UnitFriction.reaper,
+) -> np.ndarray:
+    """
+    :return: (round_limit + 1,) distance covered from a standstill at full
+        throttle after every round
+    """
+    return get_thrust_reach(acceleration, friction, np.arange(round_limit + 1, dtype=np.float64))
+
+
+def get_tour_stops(water_extraction_map: WaterExtractionMap) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    the harvest points, one for every distinct set of wrecks
+
+    :return: x, y and the (stop_count, wreck_count) containment
+    """
+    x, y = water_extraction_map.get_candidate_points()
+    containment = water_extraction_map.get_containment(x, y)
+    is_harvestable = containment.any(axis=1)
+    x, y, containment = x[is_harvestable], y[is_harvestable], containment[is_harvestable]
+    # the centres and the overlap middles come first, they represent their wreck sets
+    _, first_indices = np.unique(containment, axis=0, return_index=True)
+    first_indices.sort()
+    return x[first_indices], y[first_indices], containment[first_indices]
+
+
+def get_arrival_margins(
+    water_extraction_map: WaterExtractionMap,
+    x: np.ndarray,
+    y: np.ndarray,
+    containment: np.ndarray,
+) -> np.ndarray:
+    """
+    :return: (stop_count,) how far the reaper can stop from the point and
+        still be inside all of its wrecks
+    """
+    distances = np.hypot(
+        x[:, np.newaxis] - water_extraction_map.wreck_x,
+        y[:, np.newaxis] - water_extraction_map.wreck_y,
+    )
+    depths = np.where(containment, water_extraction_map.wreck_radius - distances, np.inf)
+    return np.maximum(depths.min(axis=1), MIN_ARRIVAL_MARGIN)
+
+
+def get_first_leg_rounds(
+    reaper: Unit,
+    x: np.ndarray,
+    y: np.ndarray,
+    margins: np.ndarray,
+    reach_table: np.ndarray,
+) -> np.ndarray:
+    """
+    :return: (stop_count,) rounds to get to the stops with the velocity of
+        the reaper, beyond the table's rounds if it can't
+    """
+    rounds = np.arange(reach_table.size, dtype=np.float64)[:, np.newaxis]
+    drift = get_drift_factor(UnitFriction.reaper, rounds)
+    distances = np.hypot(x - (reaper.x + reaper.vx * drift), y - (reaper.y + reaper.vy * drift))
+    gaps = distances - margins - reach_table[:, np.newaxis]
+    is_reached = gaps <= 0
+    return np.where(is_reached.any(axis=0), np.argmax(is_reached, axis=0), reach_table.size)
+
+
+def get_leg_rounds(x: np.ndarray, y: np.ndarray, margins: np.ndarray, reach_table: np.ndarray) -> np.ndarray:
+    """
+    :return: (stop_count, stop_count) rounds from a standstill at the first
+        stop to the second one
+    """
+    distances = np.hypot(x[:, np.newaxis] - x, y[:, np.newaxis] - y) - margins
+    return np.searchsorted(reach_table, distances)
+
+
+def plan_harvest_tour(
+    reaper: Unit,
+    water_extraction_map: WaterExtractionMap,
+    first_wreck_ids: list[int] | None = None,
+    horizon: int = TOUR_HORIZON,
+    beam_width: int = TOUR_BEAM_WIDTH,
+    max_stop_count: int = MAX_TOUR_STOP_COUNT,
+) -> HarvestTour:
+    """
+    :param reaper:
+    :param water_extraction_map: updated for the round
+    :param first_wreck_ids: the first stop must cover one of these wrecks (if
+        given)
+    :param horizon: the water collected after this many rounds doesn't count
+    :param beam_width:
+    :param max_stop_count:
+    :return: the tour collecting the most water (the faster one of equal
+        tours), empty if there is nothing to harvest
+    """
+    x, y, containment = get_tour_stops(water_extraction_map)
+    if not x.size:
+        return HarvestTour()
+    stop_count = x.size
+    reach_table = get_reach_table(horizon)
+    margins = get_arrival_margins(water_extraction_map, x, y, containment)
+    first_leg_rounds = get_first_leg_rounds(reaper, x, y, margins, reach_table)
+    leg_rounds = get_leg_rounds(x, y, margins, reach_table)
+    is_first_allowed = np.ones(stop_count, dtype=bool)
+    if first_wreck_ids is not None:
+        is_first_allowed = containment[:, np.isin(water_extraction_map.wreck_ids, first_wreck_ids)].any(axis=1)
+
+    # the beam, every row is a tour
+    positions = np.array([-1])
+    finish_rounds = np.zeros(1)
+    collected_water = np.zeros(1)
+    remaining_water = water_extraction_map.wreck_water[np.newaxis, :].copy()
+    visited = np.zeros((1, stop_count), dtype=bool)
+    sequences: list[list[tuple[int, int, int, int]]] = [[]]
+    best_value, best_sequence = (0.0, 0.0), []
+
+    for depth in range(max_stop_count):
+        # (beam, stop_count)
+        travel_rounds = np.where(
+            positions[:, np.newaxis] < 0, first_leg_rounds, leg_rounds[np.maximum(positions, 0)]
+        )
+        arrival_rounds = finish_rounds[:, np.newaxis] + travel_rounds
+        harvest_rounds = np.clip(horizon - arrival_rounds, 0, None)
+        # (beam, stop_count, wreck_count) water taken from every wreck
+        taken_water = containment * np.minimum(remaining_water[:, np.newaxis, :], harvest_rounds[:, :, np.newaxis])
+        stop_water = taken_water.sum(axis=2)
+        stay_rounds = taken_water.max(axis=2)
+        is_valid = ~visited & (stop_water > 0)
+        if depth == 0:
+            is_valid &= is_first_allowed
+        if not is_valid.any():
+            break
+
+        values = np.where(is_valid, collected_water[:, np.newaxis] + stop_water, -np.inf)
+        new_finish_rounds = arrival_rounds + stay_rounds
+        # the faster of the equal tours first
+        ranking = np.lexsort((new_finish_rounds.ravel(), -values.ravel()))
+        ranking = ranking[np.isfinite(values.ravel()[ranking])][:beam_width]
+        beam_indices, stop_indices = np.divmod(ranking, stop_count)
+
+        positions = stop_indices
+        finish_rounds = new_finish_rounds[beam_indices, stop_indices]
+        collected_water = values[beam_indices, stop_indices]
+        remaining_water = remaining_water[beam_indices] - taken_water[beam_indices, stop_indices]
+        visited = visited[beam_indices].copy()
+        visited[np.arange(stop_indices.size), stop_indices] = True
+        sequences = [
+            sequences[beam_index]
+            + [
+                (
+                    stop_index,
+                    int(arrival_rounds[beam_index, stop_index]),
+                    int(stay_rounds[beam_index, stop_index]),
+                    int(stop_water[beam_index, stop_index]),
+                )
+            ]
+            for beam_index, stop_index in zip(beam_indices.tolist(), stop_indices.tolist())
+        ]
+        value = (float(collected_water[0]), -float(finish_rounds[0]))
+        if value > best_value:
+            best_value, best_sequence = value, sequences[0]
+
+    wreck_ids = water_extraction_map.wreck_ids
+    return HarvestTour(
+        stops=[
+            TourStop(
+                x=int(x[stop_index]),
+                y=int(y[stop_index]),
+                wreck_ids=wreck_ids[containment[stop_index]].tolist(),
+                arrival_round=arrival_round,
+                stay_round_count=stay_round_count,
+                water=water,
+            )
+            for stop_index, arrival_round, stay_round_count, water in best_sequence
+        ]
+    )
+
+
+class HarvestTourPlanner:
+    """
+    keeps the planned tour between the harvest goals: a new harvest target
+    is the next stop of the tour as long as it is still worth going there,
+    the tour is replanned otherwise
+    """
+
+    def __init__(self, max_stop_count: int = MAX_TOUR_STOP_COUNT):
+        self.max_stop_count = max_stop_count
+        self.tour = HarvestTour()
+
+    def select_wreck(
+        self,
+        reaper: Unit,
+        water_extraction_map: WaterExtractionMap,
+        candidate_wreck_ids: list[int],
+    ) -> int | None:
+        """
+        call it when a new harvest target is needed, the stop of a failed (or
+        aborted) harvest is kept, only `complete_stop` moves the tour on
+
+        :param candidate_wreck_ids: the wrecks the goal allows
+        :return: the wreck of the first stop, None if there is nothing to
+            harvest among the candidates
+        """
+        next_wreck_id = self._get_next_wreck_id(water_extraction_map, candidate_wreck_ids)
+        if next_wreck_id is not None:
+            return next_wreck_id
+
+        self.tour = plan_harvest_tour(
+            reaper, water_extraction_map, candidate_wreck_ids, max_stop_count=self.max_stop_count
+        )
+        return self._get_next_wreck_id(water_extraction_map, candidate_wreck_ids)
+
+    def complete_stop(self) -> None:
+        """
+        the first stop was harvested, the next target is the following one
+        """
+        if self.tour.stops:
+            self.tour.stops.pop(0)
+
+    def get_stop_coordinate(self, wreck_id: int) -> tuple[int, int] | None:
+        """
+        :return: the harvest point of the first stop, None if the wreck is
+            not one of its wrecks
+        """
+        if not self.tour.stops or wreck_id not in self.tour.stops[0].wreck_ids:
+            return None
+        return self.tour.stops[0].x, self.tour.stops[0].y
+
+    def _get_next_wreck_id(
+        self, water_extraction_map: WaterExtractionMap, candidate_wreck_ids: list[int]
+    ) -> int | None:
+        if not self.tour.stops:
+            return None
+        next_stop = self.tour.stops[0]
+        harvestable_wreck_ids = set(water_extraction_map.wreck_ids[water_extraction_map.wreck_water > 0].tolist())
+        candidate_ids = [
+            wreck_id
+            for wreck_id in next_stop.wreck_ids
+            if wreck_id in candidate_wreck_ids and wreck_id in harvestable_wreck_ids
+        ]
+        if not candidate_ids:
+            return None
+        return candidate_ids[0]
@@ -0,0 +1,120 @@
+"""
+2D intercept planning against a predicted target trajectory
+
+The throttle planners solve a scalar distance towards a fixed point, which
+keeps missing targets that move. Here the chaser is rolled out with the
+simulator against the predicted positions of the target, with a batch of
+command strategies at once:
+- aiming at where the target will be at a fixed round (for every round of
+  the prediction)
+- pursuit: aiming every round at the target's position a few rounds ahead
+each with a few throttles. The strategy touching the target first wins
+(the closest approach if none of them does), and its per round
+(x, y, throttle) commands are the plan
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from python_prototypes.field_types import Unit
+from python_prototypes.simulation.physics import UnitCommands, step
+from python_prototypes.simulation.state import SimulationState
+
+INTERCEPT_THROTTLES = (300, 200, 100)
+PURSUIT_LEADS = (1, 2, 3)
+
+
+@dataclass
+class InterceptPlan:
+    """
+    :param commands: (x, y, throttle) of every planned round
+    :param expected_target_positions: position of the target at the start
+        of every planned round, the plan holds while the target follows it
+    :param intercept_round: rounds until the contact, None if the target
+        can't be reached within the prediction (the plan gets closest to it)
+    """
+
+    commands: list[tuple[int, int, int]]
+    expected_target_positions: list[tuple[int, int]]
+    intercept_round: int | None
+
+
+def get_aim_points(target_x: np.ndarray, target_y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    :param target_x: (round_count + 1,) predicted target positions, row 0 is
+        the current one
+    :param target_y:
+    :return: (strategy_count, round_count) aim points of every strategy
+    """
+    round_count = target_x.size - 1
+    rounds = np.arange(round_count)
+    aim_rounds = [np.full(round_count, aim_round) for aim_round in range(1, round_count + 1)]
+    aim_rounds.extend(np.minimum(rounds + lead, round_count) for lead in PURSUIT_LEADS)
+    aim_rounds = np.array(aim_rounds)
+    return target_x[aim_rounds], target_y[aim_rounds]
+
+
+def plan_intercept(
+    chaser: Unit,
+    target_x: np.ndarray,
+    target_y: np.ndarray,
+    contact_distance: float,
+    throttles: tuple[int, ...] = INTERCEPT_THROTTLES,
+) -> InterceptPlan:
+    """
+    :param chaser:
+    :param target_x: see `get_aim_points`
+    :param target_y:
+    :param contact_distance: sum of the radii
+    :param throttles: the earlier entries win the ties
+    :return:
+    """
+    round_count = target_x.size - 1
+    aim_x, aim_y = get_aim_points(target_x, target_y)
+    # (throttle_count * strategy_count, round_count), throttles are the slow axis
+    aim_x = np.tile(aim_x, (len(throttles), 1))
+    aim_y = np.tile(aim_y, (len(throttles), 1))
+    power = np.repeat(np.array(throttles, dtype=np.float64), aim_x.shape[0] // len(throttles))
+    batch_size = aim_x.shape[0]
+
+    state = SimulationState.from_units([chaser]).repeat(batch_size)
+    distances = np.empty((batch_size, round_count))
+    for round_index in range(round_count):
+        commands = UnitCommands(
+            target_x=aim_x[:, round_index, np.newaxis],
+            target_y=aim_y[:, round_index, np.newaxis],
+            power=power[:, np.newaxis],
+        )
+        step(state, commands)
+        distances[:, round_index] = np.hypot(
+            state.x[:, 0] - target_x[round_index + 1],
+            state.y[:, 0] - target_y[round_index + 1],
+        )
+
+    is_contact = distances <= contact_distance
+    has_contact = is_contact.any(axis=1)
+    if has_contact.any():
+        contact_rounds = np.where(has_contact, np.argmax(is_contact, axis=1), round_count)
+        best_index = int(np.argmin(contact_rounds))
+        planned_round_count = int(contact_rounds[best_index]) + 1
+        intercept_round = planned_round_count
+    else:
+        closest_rounds = np.argmin(distances, axis=1)
+        best_index = int(np.argmin(distances[np.arange(batch_size), closest_rounds]))
+        planned_round_count = int(closest_rounds[best_index]) + 1
+        intercept_round = None
+
+    commands = [
+        (round(float(x)), round(float(y)), int(power[best_index]))
+        for x, y in zip(aim_x[best_index, :planned_round_count], aim_y[best_index, :planned_round_count])
+    ]
+    expected_target_positions = [
+        (round(float(target_x[round_index])), round(float(target_y[round_index])))
+        for round_index in range(planned_round_count)
+    ]
+    return InterceptPlan(
+        commands=commands,
+        expected_target_positions=expected_target_positions,
+        intercept_round=intercept_round,
+    )
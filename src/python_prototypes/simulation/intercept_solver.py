@@ -0,0 +1,181 @@
+"""
+Vectorized variant of `field_tools.get_intercept`, solving the earliest
+interception of every target at once
+
+The gaps of every (whole round, target) pair are evaluated in one pass. The
+first reachable round of every target is then refined by splitting it into
+evenly spaced times, evaluated in one pass as well (a bisection with 16
+branches), all targets stepping together
+
+The numpy passes have a fixed cost of ~130us, so a few targets (the enemy
+looters of a match are at most 6) are solved one by one with the scalar
+solver instead, see `benchmarks/intercept_benchmark.py`
+"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from python_prototypes.field_tools import get_drift_factor, get_intercept, get_thrust_reach
+from python_prototypes.field_types import Unit
+from python_prototypes.simulation.state import UNIT_TYPE_FRICTION
+from python_prototypes.unit_parameters import UnitThrust
+
+INTERCEPT_ROUND_LIMIT = 20
+# every refinement pass splits the interval into this many parts, i.e. a
+# precision of 1 / 16**2 rounds
+SUBDIVISION_COUNT = 16
+REFINEMENT_PASSES = 2
+# up to this many targets the scalar solver is faster than the numpy passes
+SCALAR_TARGET_LIMIT = 6
+# the bisection steps of the scalar solver, the same precision
+SCALAR_BISECTION_STEPS = 8
+
+
+@dataclass
+class InterceptEstimates:
+    """
+    :param unit_ids: (target_count,)
+    :param eta: time of the interception in rounds, inf if the target can't
+        be reached within the round limit
+    :param x: position of the target at the interception, the current one
+        if it can't be reached
+    :param y:
+    """
+
+    unit_ids: np.ndarray
+    eta: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+
+    def get_eta(self, unit_id: int) -> float | None:
+        """
+        :return: None for unknown units
+        """
+        indices = np.flatnonzero(self.unit_ids == unit_id)
+        if not indices.size:
+            return None
+        return float(self.eta[indices[0]])
+
+    def get_coordinate(self, unit_id: int) -> tuple[float, float] | None:
+        """
+        :return: None for unknown units
+        """
+        indices = np.flatnonzero(self.unit_ids == unit_id)
+        if not indices.size:
+            return None
+        return float(self.x[indices[0]]), float(self.y[indices[0]])
+
+
+def get_intercept_gaps(chaser: Unit, targets: dict[str, np.ndarray], rounds: np.ndarray, throttle: float) -> np.ndarray:
+    """
+    :param rounds: broadcast against the (target_count,) target columns
+    :return: see `field_tools.get_intercept_gap`
+    """
+    chaser_friction = float(UNIT_TYPE_FRICTION[chaser.unit_type])
+    chaser_drift = get_drift_factor(chaser_friction, rounds)
+    target_drift = get_drift_factor(targets["friction"], rounds)
+    dx = (targets["x"] + targets["vx"] * target_drift) - (chaser.x + chaser.vx * chaser_drift)
+    dy = (targets["y"] + targets["vy"] * target_drift) - (chaser.y + chaser.vy * chaser_drift)
+    reach = get_thrust_reach(throttle / chaser.mass, chaser_friction, rounds)
+    return np.hypot(dx, dy) - (chaser.radius + targets["radius"]) - reach
+
+
+def get_intercepts(
+    chaser: Unit,
+    targets: list[Unit],
+    throttle: float = UnitThrust.max_looter,
+    round_limit: int = INTERCEPT_ROUND_LIMIT,
+) -> InterceptEstimates:
+    """
+    :param chaser: accelerates with full `throttle`
+    :param targets: drift with their current velocity
+    :param throttle:
+    :param round_limit:
+    :return:
+    """
+    if len(targets) <= SCALAR_TARGET_LIMIT:
+        return get_scalar_intercepts(chaser, targets, throttle, round_limit)
+    return get_vectorized_intercepts(chaser, targets, throttle, round_limit)
+
+
+def get_scalar_intercepts(
+    chaser: Unit,
+    targets: list[Unit],
+    throttle: float = UnitThrust.max_looter,
+    round_limit: int = INTERCEPT_ROUND_LIMIT,
+) -> InterceptEstimates:
+    """
+    solves the targets one by one with `field_tools.get_intercept`
+    """
+    friction_by_type = UNIT_TYPE_FRICTION.tolist()
+    eta, x, y = [], [], []
+    for target in targets:
+        intercept = get_intercept(
+            chaser_coordinate=(chaser.x, chaser.y),
+            chaser_velocity=(chaser.vx, chaser.vy),
+            chaser_friction=friction_by_type[chaser.unit_type],
+            chaser_acceleration=throttle / chaser.mass,
+            target_coordinate=(target.x, target.y),
+            target_velocity=(target.vx, target.vy),
+            target_friction=friction_by_type[target.unit_type],
+            contact_distance=chaser.radius + target.radius,
+            max_round_count=round_limit,
+            bisection_steps=SCALAR_BISECTION_STEPS,
+        )
+        if intercept is None:
+            intercept = math.inf, (target.x, target.y)
+        eta.append(intercept[0])
+        x.append(intercept[1][0])
+        y.append(intercept[1][1])
+    return InterceptEstimates(
+        unit_ids=np.array([target.unit_id for target in targets], dtype=np.int64),
+        eta=np.array(eta, dtype=np.float64),
+        x=np.array(x, dtype=np.float64),
+        y=np.array(y, dtype=np.float64),
+    )
+
+
+def get_vectorized_intercepts(
+    chaser: Unit,
+    targets: list[Unit],
+    throttle: float = UnitThrust.max_looter,
+    round_limit: int = INTERCEPT_ROUND_LIMIT,
+) -> InterceptEstimates:
+    """
+    solves every target in the same numpy passes
+    """
+    target_columns = {
+        "x": np.array([target.x for target in targets], dtype=np.float64),
+        "y": np.array([target.y for target in targets], dtype=np.float64),
+        "vx": np.array([target.vx for target in targets], dtype=np.float64),
+        "vy": np.array([target.vy for target in targets], dtype=np.float64),
+        "radius": np.array([target.radius for target in targets], dtype=np.float64),
+        "friction": UNIT_TYPE_FRICTION[np.array([target.unit_type for target in targets], dtype=np.int64)],
+    }
+    # (round_limit + 1, target_count), row 0 is the current state
+    rounds = np.arange(round_limit + 1, dtype=np.float64)[:, np.newaxis]
+    is_reachable = get_intercept_gaps(chaser, target_columns, rounds, throttle) <= 0
+    has_intercept = is_reachable.any(axis=0)
+    first_round = np.where(has_intercept, np.argmax(is_reachable, axis=0), round_limit).astype(np.float64)
+
+    low = np.maximum(first_round - 1, 0.0)
+    high = first_round
+    subdivisions = np.arange(1, SUBDIVISION_COUNT + 1, dtype=np.float64)[:, np.newaxis] / SUBDIVISION_COUNT
+    for _ in range(REFINEMENT_PASSES):
+        # the first reachable of the evenly split (low, high] intervals
+        rounds = low + (high - low) * subdivisions
+        is_reachable = get_intercept_gaps(chaser, target_columns, rounds, throttle) <= 0
+        first_index = np.argmax(is_reachable, axis=0)
+        high = rounds[first_index, np.arange(rounds.shape[1])]
+        low = np.where(first_index > 0, rounds[first_index - 1, np.arange(rounds.shape[1])], low)
+    eta = np.where(first_round == 0, 0.0, high)
+
+    target_drift = np.where(has_intercept, get_drift_factor(target_columns["friction"], eta), 0.0)
+    return InterceptEstimates(
+        unit_ids=np.array([target.unit_id for target in targets], dtype=np.int64),
+        eta=np.where(has_intercept, eta, np.inf),
+        x=target_columns["x"] + target_columns["vx"] * target_drift,
+        y=target_columns["y"] + target_columns["vy"] * target_drift,
+    )
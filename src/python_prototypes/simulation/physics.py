@@ -0,0 +1,136 @@
+"""
+Vectorized movement rules of Mean Max
+
+One round is:
+1. thrust: every unit accelerates towards its target with power / mass
+2. move: position += velocity (collisions are resolved within this phase)
+3. friction: velocity *= (1 - friction)
+4. rounding: positions and velocities are rounded (java's Math.round)
+
+Units are stepped together, see `SimulationState` for the array layout. The
+steps are in place: the columns of the state keep their arrays (e.g. the
+buffers of a `StateArena`), only numpy's temporaries of the expressions are
+allocated
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from python_prototypes.field_tools import PLAYFIELD_RADIUS
+from python_prototypes.field_types import Entity
+from python_prototypes.simulation.state import SimulationState
+from python_prototypes.unit_parameters import UnitThrust
+
+
+@dataclass
+class UnitCommands:
+    """
+    per unit thrust commands, every array has the same shape as the unit
+    columns of the state. Units with 0 power just drift
+    """
+
+    target_x: np.ndarray
+    target_y: np.ndarray
+    power: np.ndarray
+
+
+def java_round(values: np.ndarray) -> np.ndarray:
+    """
+    Math.round of the referee: halves are always rounded up
+    """
+    return np.floor(values + 0.5)
+
+
+def create_idle_commands(state: SimulationState) -> UnitCommands:
+    """
+    looters drift, tankers keep heading towards the centre of the map
+    """
+    is_tanker = (state.unit_type == Entity.TANKER.value) & state.alive
+    return UnitCommands(
+        target_x=np.zeros_like(state.x),
+        target_y=np.zeros_like(state.y),
+        power=np.where(is_tanker, float(UnitThrust.tanker), 0.0),
+    )
+
+
+def apply_thrust(state: SimulationState, commands: UnitCommands) -> None:
+    dx = commands.target_x - state.x
+    dy = commands.target_y - state.y
+    distance = np.hypot(dx, dy)
+    is_thrusting = (commands.power > 0) & (distance > 0) & state.is_moving
+    safe_distance = np.where(is_thrusting, distance, 1.0)
+    safe_mass = np.where(is_thrusting, state.mass, 1.0)
+    acceleration = np.where(is_thrusting, commands.power / safe_mass, 0.0)
+    state.vx += dx / safe_distance * acceleration
+    state.vy += dy / safe_distance * acceleration
+
+
+def move(state: SimulationState, time: float | np.ndarray = 1.0) -> None:
+    """
+    :param state:
+    :param time: fraction of the round, broadcast against the unit columns
+    """
+    is_moving = state.is_moving
+    state.x += np.where(is_moving, state.vx * time, 0.0)
+    state.y += np.where(is_moving, state.vy * time, 0.0)
+
+
+def apply_playfield_bounds(state: SimulationState) -> None:
+    """
+    looters can't leave the map: they are put back to the border, and the
+    outwards (radial) part of their velocity is removed. Tankers can leave
+    the map
+    """
+    distance_from_centre = np.hypot(state.x, state.y)
+    limit = PLAYFIELD_RADIUS - state.radius
+    is_outside = state.is_looter & (distance_from_centre > limit)
+    if not is_outside.any():
+        return
+
+    safe_distance = np.where(is_outside, distance_from_centre, 1.0)
+    normal_x = state.x / safe_distance
+    normal_y = state.y / safe_distance
+    radial_speed = np.maximum(state.vx * normal_x + state.vy * normal_y, 0.0)
+    np.copyto(state.x, normal_x * limit, where=is_outside)
+    np.copyto(state.y, normal_y * limit, where=is_outside)
+    np.copyto(state.vx, state.vx - radial_speed * normal_x, where=is_outside)
+    np.copyto(state.vy, state.vy - radial_speed * normal_y, where=is_outside)
+
+
+def apply_friction_and_rounding(state: SimulationState) -> None:
+    is_moving = state.is_moving
+    friction = state.friction
+    np.copyto(state.vx, java_round(state.vx * (1 - friction)), where=is_moving)
+    np.copyto(state.vy, java_round(state.vy * (1 - friction)), where=is_moving)
+    np.copyto(state.x, java_round(state.x), where=is_moving)
+    np.copyto(state.y, java_round(state.y), where=is_moving)
+
+
+def step(state: SimulationState, commands: UnitCommands) -> None:
+    """
+    plays one round in place (without collisions between the units)
+    """
+    apply_thrust(state, commands)
+    move(state, 1.0)
+    apply_playfield_bounds(state)
+    apply_friction_and_rounding(state)
+
+
+def roll_out(state: SimulationState, round_count: int, commands: UnitCommands | None = None) -> SimulationState:
+    """
+    repeats the same commands for `round_count` rounds on a copy of the state
+    (the only allocation of the columns)
+
+    :param state:
+    :param round_count:
+    :param commands: defaults to the idle commands
+    :return: the state after the last round
+    """
+    rolled_state = state.copy()
+    if commands is None:
+        # no unit dies within a step, the idle commands don't change
+        commands = create_idle_commands(rolled_state)
+    for _ in range(round_count):
+        step(rolled_state, commands)
+    return rolled_state
@@ -0,0 +1,563 @@
+"""
+Headless local referee of Mean Max
+
+Plays full matches between three bots without any text io: every round the
+bots receive a `RoundInput` from their own perspective (the same input the
+codingame loop builds from stdin), and answer with the 3 command lines of
+the game. `EngineBot` plays with `MainGameEngine` through `run_round_grid`.
+
+The rules follow the official referee closely enough for training and
+benchmarks, with some simplifications:
+- fixed starting positions, tankers spawn randomly at the edge of the map
+- tankers fill up with water (1 per round) inside the map, then leave it
+- a destroyer hitting a tanker destroys it, leaving a wreck with its water
+- reapers harvest 1 water per round from every wreck they are in (unless
+  they are covered by oil), doofs gain rage from their speed
+- skills: tar (more mass), oil (no harvesting) and grenade (a push)
+"""
+
+import math
+import random
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from python_prototypes.field_tools import PLAYFIELD_RADIUS
+from python_prototypes.field_types import Entity, Unit
+from python_prototypes.input_handler import GameLoop
+from python_prototypes.main_game_engine import MainGameEngine
+from python_prototypes.reaper.q_orchestrator import ReaperGameState
+from python_prototypes.round_input import RecordedRound, RoundInput
+from python_prototypes.simulation.collisions import step_with_collisions
+from python_prototypes.simulation.physics import UnitCommands
+from python_prototypes.simulation.state import MOVING_UNIT_TYPES, SimulationState
+from python_prototypes.unit_parameters import UnitMass, UnitRadius, UnitSkill, UnitThrust
+
+PLAYER_COUNT = 3
+MAX_ROUND_COUNT = 200
+WINNING_SCORE = 50
+MAX_RAGE = 300
+RAGE_SPEED_DIVIDER = 100
+
+SKILL_RANGE = UnitSkill.range
+SKILL_RADIUS = UnitSkill.radius
+SKILL_DURATION = UnitSkill.duration
+TAR_SKILL_COST = UnitSkill.tar_cost
+OIL_SKILL_COST = UnitSkill.oil_cost
+GRENADE_SKILL_COST = UnitSkill.grenade_cost
+TAR_MASS_BONUS = 10
+GRENADE_POWER = 1000
+
+TANKER_SPAWN_RADIUS = 8000
+TANKER_MIN_CAPACITY = 4
+TANKER_MAX_CAPACITY = 10
+TANKER_SPAWN_CHANCE = 0.15
+MAX_TANKERS_PER_PLAYER = 2
+
+LOOTER_START_DISTANCES = {
+    Entity.REAPER: 1100,
+    Entity.DESTROYER: 2300,
+    Entity.DOOF: 3500,
+}
+LOOTER_MASSES = {
+    Entity.REAPER: UnitMass.reaper,
+    Entity.DESTROYER: UnitMass.destroyer,
+    Entity.DOOF: UnitMass.doof,
+}
+LOOTER_ORDER = (Entity.REAPER, Entity.DESTROYER, Entity.DOOF)
+LOOTER_TYPE_VALUES = frozenset(looter_type.value for looter_type in LOOTER_ORDER)
+SKILL_BY_LOOTER = {
+    Entity.REAPER: Entity.TAR_POOL,
+    Entity.DESTROYER: None,
+    Entity.DOOF: Entity.OIL_POOL,
+}
+SKILL_COSTS = {
+    Entity.REAPER: TAR_SKILL_COST,
+    Entity.DESTROYER: GRENADE_SKILL_COST,
+    Entity.DOOF: OIL_SKILL_COST,
+}
+
+
+@dataclass
+class LooterCommand:
+    """
+    a parsed command line, skills are casted at (target_x, target_y)
+    """
+
+    target_x: int
+    target_y: int
+    throttle: int = 0
+    is_skill: bool = False
+
+
+def parse_looter_command(raw_command: str) -> LooterCommand | None:
+    """
+    parses `x y throttle [message]`, `SKILL x y [message]` and `WAIT`
+
+    :return: None for waiting (and for invalid commands)
+    """
+    inputs = raw_command.split()
+    if not inputs or inputs[0] == "WAIT":
+        return None
+    try:
+        if inputs[0] == "SKILL":
+            return LooterCommand(target_x=int(inputs[1]), target_y=int(inputs[2]), is_skill=True)
+        throttle = min(max(int(inputs[2]), 0), UnitThrust.max_looter)
+        return LooterCommand(target_x=int(inputs[0]), target_y=int(inputs[1]), throttle=throttle)
+    except (IndexError, ValueError):
+        return None
+
+
+def prepare_movement(
+    units: list[Unit],
+    looter_commands: dict[int, LooterCommand | None],
+    grenade_centres: list[tuple[int, int]],
+) -> tuple[list[Unit], SimulationState, UnitCommands]:
+    """
+    the state and commands of the moving units right before the movement of
+    the round: tar and grenades are applied, tankers head to the centre (or
+    leave the map when full), looters follow their commands
+
+    :param units: every unit of the round
+    :param looter_commands: by unit id, the missing looters wait
+    :param grenade_centres:
+    :return: the moving units, in the order of the state
+    """
+    moving_units = [unit for unit in units if unit.unit_type in MOVING_UNIT_TYPES]
+    state = SimulationState.from_units(moving_units)
+    tar_pools = [unit for unit in units if unit.unit_type == Entity.TAR_POOL.value]
+    for tar_pool in tar_pools:
+        is_in_tar = np.hypot(state.x - tar_pool.x, state.y - tar_pool.y) < tar_pool.radius
+        state.mass = np.where(is_in_tar, state.mass + TAR_MASS_BONUS, state.mass)
+
+    for centre_x, centre_y in grenade_centres:
+        dx = state.x - centre_x
+        dy = state.y - centre_y
+        distance = np.hypot(dx, dy)
+        is_pushed = (distance < SKILL_RADIUS) & (distance > 0)
+        safe_distance = np.where(is_pushed, distance, 1.0)
+        push = np.where(is_pushed, GRENADE_POWER / state.mass, 0.0)
+        state.vx += dx / safe_distance * push
+        state.vy += dy / safe_distance * push
+
+    commands = UnitCommands(
+        target_x=np.zeros(len(moving_units)),
+        target_y=np.zeros(len(moving_units)),
+        power=np.zeros(len(moving_units)),
+    )
+    for index, unit in enumerate(moving_units):
+        if unit.unit_type == Entity.TANKER.value:
+            is_full = unit.extra >= unit.extra_2
+            # full tankers leave the map straight away from the centre
+            commands.target_x[index] = unit.x * 2 if is_full else 0
+            commands.target_y[index] = unit.y * 2 if is_full else 0
+            commands.power[index] = UnitThrust.tanker
+            continue
+        command = looter_commands.get(unit.unit_id)
+        if command is None or command.is_skill:
+            continue
+        commands.target_x[index] = command.target_x
+        commands.target_y[index] = command.target_y
+        commands.power[index] = command.throttle
+    return moving_units, state, commands
+
+
+class BaseRefereeBot(ABC):
+    @abstractmethod
+    def play_round(self, round_input: RoundInput) -> tuple[str, str, str]:
+        """
+        :return: the reaper, destroyer and doof commands
+        """
+        pass
+
+
+class EngineBot(BaseRefereeBot):
+    """
+    plays the rounds through the game loop of the game, see `GameLoop`
+    """
+
+    def __init__(self, main_game_engine: MainGameEngine | None = None):
+        if main_game_engine is None:
+            main_game_engine = MainGameEngine(ReaperGameState())
+        self.main_game_engine = main_game_engine
+        self.game_loop = GameLoop(main_game_engine)
+
+    def play_round(self, round_input: RoundInput) -> tuple[str, str, str]:
+        return self.game_loop.play_round(round_input)
+
+
+class RecordingBot(BaseRefereeBot):
+    """
+    plays with another bot, and keeps every round it played
+    """
+
+    def __init__(self, bot: BaseRefereeBot):
+        self.bot = bot
+        self.recorded_rounds: list[RecordedRound] = []
+
+    def play_round(self, round_input: RoundInput) -> tuple[str, str, str]:
+        commands = self.bot.play_round(round_input)
+        self.recorded_rounds.append(RecordedRound(round_input, tuple(commands)))
+        return commands
+
+
+class WaitBot(BaseRefereeBot):
+    def play_round(self, round_input: RoundInput) -> tuple[str, str, str]:
+        return "WAIT", "WAIT", "WAIT"
+
+
+class GreedyHarvesterBot(BaseRefereeBot):
+    """
+    cheap scripted opponent: the reaper goes for the closest wreck, the
+    destroyer for the closest tanker, the doof chases the closest enemy reaper
+    """
+
+    def play_round(self, round_input: RoundInput) -> tuple[str, str, str]:
+        own_units = {Entity(unit.unit_type): unit for unit in round_input.units if unit.player == 0}
+        wrecks = [unit for unit in round_input.units if unit.unit_type == Entity.WRECK.value]
+        tankers = [unit for unit in round_input.units if unit.unit_type == Entity.TANKER.value]
+        enemy_reapers = [
+            unit for unit in round_input.units if unit.unit_type == Entity.REAPER.value and unit.player != 0
+        ]
+        return (
+            self._get_move_command(own_units[Entity.REAPER], wrecks),
+            self._get_move_command(own_units[Entity.DESTROYER], tankers),
+            self._get_move_command(own_units[Entity.DOOF], enemy_reapers),
+        )
+
+    @staticmethod
+    def _get_move_command(looter: Unit, targets: list[Unit]) -> str:
+        if not targets:
+            return "WAIT"
+        target = min(targets, key=lambda unit: (unit.x - looter.x) ** 2 + (unit.y - looter.y) ** 2)
+        return f"{target.x} {target.y} {UnitThrust.max_looter}"
+
+
+@dataclass
+class MatchResult:
+    """
+    :param scores: by player index (the order of the bots)
+    :param rages:
+    :param round_count: number of played rounds
+    :param bot_round_seconds: time spent by each bot in every round
+    """
+
+    scores: list[int]
+    rages: list[int]
+    round_count: int
+    bot_round_seconds: list[list[float]] = field(default_factory=list)
+
+    @property
+    def winners(self) -> list[int]:
+        best_score = max(self.scores)
+        return [player for player, score in enumerate(self.scores) if score == best_score]
+
+
+class LocalReferee:
+    def __init__(
+        self,
+        bots: list[BaseRefereeBot],
+        seed: int | None = None,
+        max_round_count: int = MAX_ROUND_COUNT,
+    ):
+        if len(bots) != PLAYER_COUNT:
+            raise ValueError(f"Mean Max is played by {PLAYER_COUNT} bots, got {len(bots)}")
+        self.bots = bots
+        self.max_round_count = max_round_count
+        self.random = random.Random(seed)
+        self.scores = [0] * PLAYER_COUNT
+        self.rages = [0] * PLAYER_COUNT
+        self.round_nr = 0
+        self.units: list[Unit] = []
+        self.bot_round_seconds: list[list[float]] = [[] for _ in range(PLAYER_COUNT)]
+        self._next_unit_id = 0
+        self._spawn_looters()
+        for player in range(PLAYER_COUNT):
+            self._spawn_tanker(player)
+
+    def play_match(self) -> MatchResult:
+        while not self.is_game_over():
+            self.play_round()
+        return MatchResult(
+            scores=list(self.scores),
+            rages=list(self.rages),
+            round_count=self.round_nr,
+            bot_round_seconds=self.bot_round_seconds,
+        )
+
+    def is_game_over(self) -> bool:
+        return self.round_nr >= self.max_round_count or max(self.scores) >= WINNING_SCORE
+
+    def play_round(self) -> None:
+        looter_commands: dict[int, LooterCommand | None] = {}
+        for player, bot in enumerate(self.bots):
+            round_input = self.get_round_input(player)
+            start_time = time.perf_counter()
+            raw_commands = bot.play_round(round_input)
+            self.bot_round_seconds[player].append(time.perf_counter() - start_time)
+            for looter_type, raw_command in zip(LOOTER_ORDER, raw_commands):
+                looter = self._get_looter(player, looter_type)
+                looter_commands[looter.unit_id] = parse_looter_command(raw_command)
+
+        grenade_centres = self._apply_skills(looter_commands)
+        destroyed_tanker_ids = self._move_units(looter_commands, grenade_centres)
+        self._destroy_tankers(destroyed_tanker_ids)
+        self._update_tankers()
+        self._harvest_wrecks()
+        self._gain_rage()
+        self._age_skill_pools()
+        self._spawn_tankers()
+        self.round_nr += 1
+
+    def get_round_input(self, player: int) -> RoundInput:
+        """
+        the round from the perspective of `player`: it is player 0, the next
+        players are the enemies 1 and 2
+        """
+        units = [self._get_protocol_unit(unit, player) for unit in self.units]
+        return RoundInput(
+            my_score=self.scores[player],
+            enemy_1_score=self.scores[(player + 1) % PLAYER_COUNT],
+            enemy_2_score=self.scores[(player + 2) % PLAYER_COUNT],
+            my_rage=self.rages[player],
+            enemy_1_rage=self.rages[(player + 1) % PLAYER_COUNT],
+            enemy_2_rage=self.rages[(player + 2) % PLAYER_COUNT],
+            units=units,
+        )
+
+    @staticmethod
+    def _get_protocol_unit(unit: Unit, player: int) -> Unit:
+        """
+        a fresh copy with the values of the text protocol, as bots keep
+        references to the units of earlier rounds
+        """
+        if unit.unit_type in LOOTER_TYPE_VALUES:
+            return Unit(
+                x=unit.x,
+                y=unit.y,
+                vx=unit.vx,
+                vy=unit.vy,
+                radius=unit.radius,
+                unit_type=unit.unit_type,
+                player=(unit.player - player) % PLAYER_COUNT,
+                unit_id=unit.unit_id,
+                mass=unit.mass,
+                extra=-1,
+                extra_2=-1,
+            )
+        if unit.unit_type == Entity.TANKER.value:
+            return Unit(
+                x=unit.x,
+                y=unit.y,
+                vx=unit.vx,
+                vy=unit.vy,
+                radius=unit.radius,
+                unit_type=unit.unit_type,
+                player=-1,
+                unit_id=unit.unit_id,
+                mass=unit.mass,
+                extra=unit.extra,
+                extra_2=unit.extra_2,
+            )
+        return Unit(
+            x=unit.x,
+            y=unit.y,
+            vx=0,
+            vy=0,
+            radius=unit.radius,
+            unit_type=unit.unit_type,
+            player=-1,
+            unit_id=unit.unit_id,
+            mass=-1,
+            extra=unit.extra,
+            extra_2=-1,
+        )
+
+    def _create_unit(self, **unit_attributes) -> Unit:
+        unit = Unit(unit_id=self._next_unit_id, **unit_attributes)
+        self._next_unit_id += 1
+        self.units.append(unit)
+        return unit
+
+    def _spawn_looters(self) -> None:
+        for player in range(PLAYER_COUNT):
+            angle = 2 * math.pi * player / PLAYER_COUNT
+            for looter_type in LOOTER_ORDER:
+                distance = LOOTER_START_DISTANCES[looter_type]
+                self._create_unit(
+                    x=round(math.cos(angle) * distance),
+                    y=round(math.sin(angle) * distance),
+                    vx=0,
+                    vy=0,
+                    radius=UnitRadius.looter,
+                    unit_type=looter_type.value,
+                    player=player,
+                    mass=LOOTER_MASSES[looter_type],
+                    extra=-1,
+                    extra_2=-1,
+                )
+
+    def _spawn_tanker(self, player: int) -> None:
+        """
+        tankers come from the edge of the map behind the player's looters
+        """
+        angle = 2 * math.pi * player / PLAYER_COUNT + self.random.uniform(-math.pi / 3, math.pi / 3)
+        capacity = self.random.randint(TANKER_MIN_CAPACITY, TANKER_MAX_CAPACITY)
+        water = 1
+        self._create_unit(
+            x=round(math.cos(angle) * TANKER_SPAWN_RADIUS),
+            y=round(math.sin(angle) * TANKER_SPAWN_RADIUS),
+            vx=0,
+            vy=0,
+            radius=UnitRadius.tanker_base + UnitRadius.tanker_per_capacity * capacity,
+            unit_type=Entity.TANKER.value,
+            player=player,
+            mass=UnitMass.tanker_empty + UnitMass.tanker_per_water * water,
+            extra=water,
+            extra_2=capacity,
+        )
+
+    def _spawn_tankers(self) -> None:
+        for player in range(PLAYER_COUNT):
+            tanker_count = sum(
+                1 for unit in self.units if unit.unit_type == Entity.TANKER.value and unit.player == player
+            )
+            if tanker_count < MAX_TANKERS_PER_PLAYER and self.random.random() < TANKER_SPAWN_CHANCE:
+                self._spawn_tanker(player)
+
+    def _get_looter(self, player: int, looter_type: Entity) -> Unit:
+        # the looters are created first, in a fixed order
+        return self.units[player * len(LOOTER_ORDER) + LOOTER_ORDER.index(looter_type)]
+
+    def _apply_skills(self, looter_commands: dict[int, LooterCommand | None]) -> list[tuple[int, int]]:
+        """
+        casts the affordable skills within range, creates the tar and oil pools
+
+        :return: the centres of the thrown grenades
+        """
+        grenade_centres = []
+        for player in range(PLAYER_COUNT):
+            for looter_type in LOOTER_ORDER:
+                looter = self._get_looter(player, looter_type)
+                command = looter_commands[looter.unit_id]
+                if command is None or not command.is_skill:
+                    continue
+                skill_cost = SKILL_COSTS[looter_type]
+                distance = math.hypot(command.target_x - looter.x, command.target_y - looter.y)
+                if self.rages[player] < skill_cost or distance > SKILL_RANGE:
+                    continue
+                self.rages[player] -= skill_cost
+
+                pool_type = SKILL_BY_LOOTER[looter_type]
+                if pool_type is None:
+                    grenade_centres.append((command.target_x, command.target_y))
+                    continue
+                self._create_unit(
+                    x=command.target_x,
+                    y=command.target_y,
+                    vx=0,
+                    vy=0,
+                    radius=SKILL_RADIUS,
+                    unit_type=pool_type.value,
+                    player=player,
+                    mass=-1,
+                    extra=SKILL_DURATION,
+                    extra_2=-1,
+                )
+        return grenade_centres
+
+    def _move_units(
+        self,
+        looter_commands: dict[int, LooterCommand | None],
+        grenade_centres: list[tuple[int, int]],
+    ) -> set[int]:
+        """
+        thrust, movement with collisions, friction and rounding of every
+        moving unit
+
+        :return: ids of the tankers hit by a destroyer
+        """
+        moving_units, state, commands = prepare_movement(self.units, looter_commands, grenade_centres)
+        collision_events: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        step_with_collisions(state, commands, collision_events)
+
+        destroyed_tanker_ids = set()
+        for _, first_units, second_units in collision_events:
+            for first, second in zip(first_units.tolist(), second_units.tolist()):
+                if second < 0:
+                    continue
+                unit_types = {moving_units[first].unit_type, moving_units[second].unit_type}
+                if unit_types == {Entity.DESTROYER.value, Entity.TANKER.value}:
+                    tanker = moving_units[first if moving_units[first].unit_type == Entity.TANKER.value else second]
+                    destroyed_tanker_ids.add(tanker.unit_id)
+
+        for index, unit in enumerate(moving_units):
+            unit.x = int(state.x[index])
+            unit.y = int(state.y[index])
+            unit.vx = int(state.vx[index])
+            unit.vy = int(state.vy[index])
+        return destroyed_tanker_ids
+
+    def _destroy_tankers(self, destroyed_tanker_ids: set[int]) -> None:
+        for tanker in [unit for unit in self.units if unit.unit_id in destroyed_tanker_ids]:
+            self.units.remove(tanker)
+            self._create_unit(
+                x=tanker.x,
+                y=tanker.y,
+                vx=0,
+                vy=0,
+                radius=tanker.radius,
+                unit_type=Entity.WRECK.value,
+                player=-1,
+                mass=-1,
+                extra=tanker.extra,
+                extra_2=-1,
+            )
+
+    def _update_tankers(self) -> None:
+        """
+        tankers fill up inside the map, full tankers disappear after leaving it
+        """
+        for tanker in [unit for unit in self.units if unit.unit_type == Entity.TANKER.value]:
+            distance_from_centre = math.hypot(tanker.x, tanker.y)
+            is_full = tanker.extra >= tanker.extra_2
+            if is_full and distance_from_centre > TANKER_SPAWN_RADIUS:
+                self.units.remove(tanker)
+                continue
+            if not is_full and distance_from_centre < PLAYFIELD_RADIUS:
+                tanker.extra += 1
+                tanker.mass = UnitMass.tanker_empty + UnitMass.tanker_per_water * tanker.extra
+
+    def _harvest_wrecks(self) -> None:
+        reapers = [self._get_looter(player, Entity.REAPER) for player in range(PLAYER_COUNT)]
+        oil_pools = [unit for unit in self.units if unit.unit_type == Entity.OIL_POOL.value]
+        harvesting_reapers = [
+            reaper
+            for reaper in reapers
+            if not any(math.hypot(reaper.x - pool.x, reaper.y - pool.y) < pool.radius for pool in oil_pools)
+        ]
+        for wreck in [unit for unit in self.units if unit.unit_type == Entity.WRECK.value]:
+            for reaper in harvesting_reapers:
+                if wreck.extra <= 0:
+                    break
+                if math.hypot(reaper.x - wreck.x, reaper.y - wreck.y) < wreck.radius:
+                    wreck.extra -= 1
+                    self.scores[reaper.player] += 1
+            if wreck.extra <= 0:
+                self.units.remove(wreck)
+
+    def _gain_rage(self) -> None:
+        for player in range(PLAYER_COUNT):
+            doof = self._get_looter(player, Entity.DOOF)
+            gained_rage = int(math.hypot(doof.vx, doof.vy) // RAGE_SPEED_DIVIDER)
+            self.rages[player] = min(self.rages[player] + gained_rage, MAX_RAGE)
+
+    def _age_skill_pools(self) -> None:
+        for pool in [
+            unit for unit in self.units if unit.unit_type in (Entity.TAR_POOL.value, Entity.OIL_POOL.value)
+        ]:
+            pool.extra -= 1
+            if pool.extra <= 0:
+                self.units.remove(pool)
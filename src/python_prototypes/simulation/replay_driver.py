@@ -0,0 +1,249 @@
+"""
+Replays recorded rounds through `MainGameEngine`
+
+The rounds come from the binary frame logs (see `frame_recorder`), from the
+text recordings (see `RecordedRound`) or from hand built scenarios (a
+`GameGridInformation`, like the ones of the test mocks). Every round goes
+through `run_engine_round`, the same path the game loop takes, and the
+commands of the engine are reported with the time the round took, next to
+the commands recorded with the round.
+
+The recordings are streamed one round at a time, and every recording is
+replayed with a fresh engine (a recording is a match), so corpora of any
+size can be replayed:
+
+    python -m python_prototypes.simulation.replay_driver recordings/*.mmf
+
+The replays measure the engine, they don't reproduce matches: the throttle
+optimization stops on a wall clock timeout (and the rollouts and the skill
+placement have time budgets too), so the commands depend on the speed of
+the machine and differ from one replay to the next. The random generator is
+seeded before every recording, to keep at least the random draws the same
+"""
+
+import argparse
+import contextlib
+import math
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from python_prototypes.field_types import GameGridInformation, PlayerFieldTypes, Unit, UnitTable
+from python_prototypes.frame_recorder import iter_recording
+from python_prototypes.main_game_engine import MainGameEngine, run_engine_round
+from python_prototypes.reaper.q_orchestrator import ReaperGameState
+from python_prototypes.round_input import RecordedRound, RoundInput
+from python_prototypes.simulation.referee import LOOTER_MASSES, LOOTER_ORDER
+from python_prototypes.simulation.tournament import SeatLatency
+from python_prototypes.unit_parameters import UnitRadius
+
+# the looters a scenario doesn't have are parked this far from the centre
+PARKED_LOOTER_DISTANCE = 5500
+# the round time histogram of the reports, up to 100 ms
+LATENCY_BUCKET_MS = 0.1
+LATENCY_BUCKET_COUNT = 1000
+
+
+@dataclass
+class ReplayedRound:
+    """
+    :param round_index: within its recording
+    :param commands: the reaper, destroyer and doof commands of the engine
+    :param recorded_commands: the commands recorded with the round, None for
+        the scenarios
+    :param seconds: time spent in `run_engine_round`
+    """
+
+    round_index: int
+    commands: tuple[str, str, str]
+    recorded_commands: tuple[str, str, str] | None
+    seconds: float
+
+
+@dataclass
+class ReplayReport:
+    """
+    the running totals of a replay. The memory doesn't grow with the rounds:
+    the round times are counted in a fixed histogram, the p95 is the upper
+    edge of its bucket (the mean and the max are exact)
+    """
+
+    round_count: int = 0
+    recorded_round_count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    bucket_counts: list[int] = field(default_factory=lambda: [0] * LATENCY_BUCKET_COUNT)
+
+    def add_round(self, replayed_round: ReplayedRound) -> None:
+        self.round_count += 1
+        self.total_seconds += replayed_round.seconds
+        self.max_seconds = max(self.max_seconds, replayed_round.seconds)
+        # the last bucket takes every slower round
+        bucket_index = min(int(replayed_round.seconds * 1000 / LATENCY_BUCKET_MS), LATENCY_BUCKET_COUNT - 1)
+        self.bucket_counts[bucket_index] += 1
+        if replayed_round.recorded_commands is not None:
+            self.recorded_round_count += 1
+
+    def get_percentile_ms(self, percentile: float) -> float:
+        """
+        :param percentile: within [0, 1]
+        :return: the upper edge of the bucket of the percentile, at most the max
+        """
+        if not self.round_count:
+            return 0.0
+        rank = max(math.ceil(percentile * self.round_count), 1)
+        counted_round_count = 0
+        for bucket_index, bucket_count in enumerate(self.bucket_counts):
+            counted_round_count += bucket_count
+            if counted_round_count >= rank:
+                return min((bucket_index + 1) * LATENCY_BUCKET_MS, self.max_seconds * 1000)
+        return self.max_seconds * 1000
+
+    @property
+    def latency(self) -> SeatLatency:
+        if not self.round_count:
+            return SeatLatency(mean_ms=0.0, p95_ms=0.0, max_ms=0.0)
+        return SeatLatency(
+            mean_ms=self.total_seconds * 1000 / self.round_count,
+            p95_ms=self.get_percentile_ms(0.95),
+            max_ms=self.max_seconds * 1000,
+        )
+
+    def format_lines(self) -> list[str]:
+        latency = self.latency
+        return [
+            f"{self.round_count} rounds replayed, round time mean {latency.mean_ms:.2f} ms, "
+            f"p95 {latency.p95_ms:.2f} ms, max {latency.max_ms:.2f} ms",
+            f"{self.recorded_round_count} of them recorded",
+        ]
+
+
+def get_parked_looters(units: list[Unit]) -> list[Unit]:
+    """
+    the engine expects the 3 looters of every player, the scenarios usually
+    have a few of them only. The missing ones are added far from the centre,
+    standing still, with the mass and the radius of their type
+
+    :return: the missing looters
+    """
+    present_looters = {(unit.player, unit.unit_type) for unit in units}
+    next_unit_id = max((unit.unit_id for unit in units), default=-1) + 1
+    parked_looters = []
+    for player in PlayerFieldTypes:
+        for looter_type in LOOTER_ORDER:
+            if (player.value, looter_type.value) in present_looters:
+                continue
+            parked_looters.append(
+                Unit(
+                    x=PARKED_LOOTER_DISTANCE * (player.value - 1),
+                    y=-PARKED_LOOTER_DISTANCE // 2 + 500 * looter_type.value,
+                    vx=0,
+                    vy=0,
+                    radius=UnitRadius.looter,
+                    unit_type=looter_type.value,
+                    player=player.value,
+                    unit_id=next_unit_id,
+                    mass=LOOTER_MASSES[looter_type],
+                )
+            )
+            next_unit_id += 1
+    return parked_looters
+
+
+def get_scenario_round_input(game_grid_information: GameGridInformation) -> RoundInput:
+    """
+    a round with the units of the grid, the scores and the rages are 0. The
+    units go through a `UnitTable`, the missing values become -1 like in the
+    game input
+    """
+    units = [
+        grid_unit.unit
+        for grid_units in game_grid_information.full_grid_state.values()
+        for grid_unit in grid_units
+    ]
+    unit_table = UnitTable.from_units(units + get_parked_looters(units))
+    # without the units, they are rebuilt from the columns
+    unit_table = UnitTable(*(getattr(unit_table, column_name) for column_name in UnitTable.COLUMNS))
+    return RoundInput(0, 0, 0, 0, 0, 0, units=unit_table.get_units(), unit_table=unit_table)
+
+
+def replay_rounds(
+    rounds: Iterable[RecordedRound | RoundInput],
+    main_game_engine: MainGameEngine | None = None,
+) -> Iterator[ReplayedRound]:
+    """
+    :param rounds: the consecutive rounds of a match
+    :param main_game_engine: a fresh one by default
+    """
+    if main_game_engine is None:
+        main_game_engine = MainGameEngine(ReaperGameState())
+    for round_index, recorded_round in enumerate(rounds):
+        if isinstance(recorded_round, RecordedRound):
+            round_input, recorded_commands = recorded_round.round_input, recorded_round.commands
+        else:
+            round_input, recorded_commands = recorded_round, None
+
+        start = time.perf_counter()
+        round_command = run_engine_round(main_game_engine, round_input)
+        seconds = time.perf_counter() - start
+        yield ReplayedRound(
+            round_index=round_index,
+            commands=(round_command.reaper_command, round_command.destroyer_command, round_command.doof_command),
+            recorded_commands=recorded_commands,
+            seconds=seconds,
+        )
+
+
+def replay_recordings(
+    paths: Iterable[Path | str],
+    seed: int = 0,
+    report: ReplayReport | None = None,
+    on_round: Callable[[Path, ReplayedRound], None] | None = None,
+) -> ReplayReport:
+    """
+    the debug output of the engine is dropped
+
+    :param paths: binary logs or text recordings, one match each
+    :param seed: of the random generator, set before every recording
+    :param report: the rounds are added to it
+    :param on_round: called with every replayed round
+    """
+    if report is None:
+        report = ReplayReport()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull):
+        for path in paths:
+            random.seed(seed)
+            for replayed_round in replay_rounds(iter_recording(path)):
+                report.add_round(replayed_round)
+                if on_round is not None:
+                    on_round(Path(path), replayed_round)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded rounds through the engine")
+    parser.add_argument("recordings", type=Path, nargs="+", help="binary frame logs or text recordings")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="print the commands of every round")
+    arguments = parser.parse_args()
+
+    def print_round(path: Path, replayed_round: ReplayedRound) -> None:
+        recorded_commands = replayed_round.recorded_commands
+        print(
+            f"{path.name} {replayed_round.round_index}: {replayed_round.seconds * 1000:.2f} ms "
+            f"{' | '.join(replayed_round.commands)}"
+            + ("" if recorded_commands is None else f" (recorded {' | '.join(recorded_commands)})")
+        )
+
+    report = replay_recordings(
+        arguments.recordings, arguments.seed, on_round=print_round if arguments.verbose else None
+    )
+    for line in report.format_lines():
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""
+Monte Carlo rollout evaluation of (goal, target) candidates
+
+Every candidate is played out by the local simulator for a few rounds, many
+times, with a default policy for everyone:
+- the player's reaper heads to the candidate's target at full throttle (and
+  stops once it is inside a target wreck)
+- enemy reapers head to their closest wreck, with a random throttle per
+  rollout (this is the randomness of the rollouts)
+- destroyers head to their closest tanker, the player's doof drifts
+
+All the candidates and all their rollouts are a single batched state, so
+a round of every rollout is one step of the simulator. Water is harvested
+from the (static) wrecks every round, rage is gained from the speed of the
+player's doof.
+
+The time budget is kept by estimates, not by checks after the fact: the
+cost of a round grows with the batch rows and the unit pairs (the collision
+search), the slowest round of the previous evaluation gives the cost of a
+row and pair. The rollouts per candidate are cut to what fits into the
+budget (there is no evaluation at all if a single rollout doesn't fit, the
+estimate is halved then), and a round is only started if it fits into what
+is left (by the estimate or the slowest round so far, with a margin for the
+rounds slower than both of them), so every candidate is evaluated over the
+same number of rounds. A round of 16 rows (4 candidates,
+the default rollout count) costs ~1.5-2.5 ms in the early game
+"""
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from python_prototypes.field_types import Entity, PlayerFieldTypes, Unit
+from python_prototypes.simulation.collisions import step_with_collisions
+from python_prototypes.simulation.physics import UnitCommands, create_idle_commands
+from python_prototypes.simulation.state import MOVING_UNIT_TYPES, SimulationState
+from python_prototypes.simulation.state_arena import StateArena
+from python_prototypes.unit_parameters import UnitThrust
+
+ROLLOUT_ROUND_COUNT = 5
+ROLLOUT_COUNT = 4
+ROLLOUT_BUDGET_MS = 5.0
+ENEMY_THROTTLE_RANGE = (150, 300)
+RAGE_SPEED_DIVIDER = 100
+# a round can be slower than the slowest one so far (a garbage collection, a
+# collision heavy round), the next round needs this many times its estimate
+ROUND_SECONDS_MARGIN = 1.5
+# value of the gains relative to the player's score
+ENEMY_SCORE_WEIGHT = 0.5
+RAGE_WEIGHT = 0.05
+
+
+@dataclass
+class RolloutCandidate:
+    """
+    :param goal: the goal type (or anything identifying the candidate)
+    :param target_id: unit id of the target, it must be in the rolled out units
+    """
+
+    goal: object
+    target_id: int
+
+
+@dataclass
+class RolloutEvaluation:
+    """
+    expected gains over the rollouts of one candidate
+    """
+
+    candidate: RolloutCandidate
+    score_gain: float
+    rage_gain: float
+    enemy_score_gain: float
+    round_count: int
+
+    @property
+    def value(self) -> float:
+        return self.score_gain - ENEMY_SCORE_WEIGHT * self.enemy_score_gain + RAGE_WEIGHT * self.rage_gain
+
+
+class RolloutEvaluator:
+    def __init__(
+        self,
+        rollout_count: int = ROLLOUT_COUNT,
+        round_count: int = ROLLOUT_ROUND_COUNT,
+        time_budget_ms: float = ROLLOUT_BUDGET_MS,
+        seed: int | None = None,
+    ):
+        self.rollout_count = rollout_count
+        self.round_count = round_count
+        self.time_budget_ms = time_budget_ms
+        self.random_generator = np.random.default_rng(seed)
+        self.state_arena = StateArena(snapshot_count=0)
+        # measured by the previous evaluation, sizes the batch of the next one
+        self.round_seconds_per_pair: float | None = None
+
+    def evaluate(self, units: list[Unit], candidates: list[RolloutCandidate]) -> list[RolloutEvaluation]:
+        return self.evaluate_state(SimulationState.from_units(units), candidates)
+
+    def evaluate_state(
+        self,
+        turn_state: SimulationState,
+        candidates: list[RolloutCandidate],
+    ) -> list[RolloutEvaluation]:
+        """
+        :param turn_state: unbatched state of every unit of the round, see
+            `StateArena.turn_state`
+        :param candidates:
+        :return: in the order of the candidates, empty if a round of a
+            single rollout doesn't fit into the time budget
+        """
+        start = time.perf_counter()
+        if not candidates:
+            return []
+        unit_type = turn_state.unit_type
+        moving_state = turn_state.take(np.flatnonzero(np.isin(unit_type, MOVING_UNIT_TYPES)))
+        wrecks = turn_state.take(np.flatnonzero(unit_type == Entity.WRECK.value))
+        oil_pools = turn_state.take(np.flatnonzero(unit_type == Entity.OIL_POOL.value))
+        budget_seconds = self.time_budget_ms / 1000
+        unit_count = max(moving_state.unit_count, 1)
+        rollout_count = self.get_rollout_count(
+            len(candidates), unit_count, budget_seconds - (time.perf_counter() - start)
+        )
+        if not rollout_count:
+            # a single slow measurement must not turn the rollouts off for good
+            self.round_seconds_per_pair /= 2
+            return []
+        batch_size = len(candidates) * rollout_count
+        # the buffers are reused as long as the units and the candidate count don't change
+        self.state_arena.load(moving_state, batch_size)
+        state = self.state_arena.state
+
+        reaper_indices = np.flatnonzero(moving_state.unit_type == Entity.REAPER.value)
+        player_reaper_index = self._get_player_unit_index(moving_state, Entity.REAPER)
+        player_doof_index = self._get_player_unit_index(moving_state, Entity.DOOF)
+        is_player_reaper = reaper_indices == player_reaper_index
+
+        commands = self._get_default_commands(state, moving_state, wrecks)
+        candidate_target_x, candidate_target_y, is_wreck_target, target_radius = self._get_candidate_targets(
+            candidates, moving_state, wrecks
+        )
+        # (batch,) rollouts of the same candidate are next to each other
+        target_x = np.repeat(candidate_target_x, rollout_count)
+        target_y = np.repeat(candidate_target_y, rollout_count)
+        is_wreck_target = np.repeat(is_wreck_target, rollout_count)
+        target_radius = np.repeat(target_radius, rollout_count)
+        moving_target_indices = np.repeat(
+            [self._get_unit_index(moving_state, candidate.target_id) for candidate in candidates],
+            rollout_count,
+        )
+
+        wreck_water = np.tile(wrecks.extra.astype(np.float64), (batch_size, 1))
+        batch_indices = np.arange(batch_size)
+
+        scores = np.zeros((batch_size, reaper_indices.size))
+        rage = np.zeros(batch_size)
+        played_round_count = 0
+        estimated_round_seconds = self.get_round_seconds(batch_size, unit_count)
+        slowest_round_seconds = 0.0
+        for _ in range(self.round_count):
+            round_start = time.perf_counter()
+            round_seconds = max(estimated_round_seconds, slowest_round_seconds)
+            if played_round_count and not self.is_round_affordable(round_start - start, round_seconds, budget_seconds):
+                break
+            if player_reaper_index is not None:
+                # moving targets are followed, the rest of the targets are static
+                is_moving_target = moving_target_indices >= 0
+                safe_target_indices = np.where(is_moving_target, moving_target_indices, 0)
+                target_x = np.where(is_moving_target, state.x[batch_indices, safe_target_indices], target_x)
+                target_y = np.where(is_moving_target, state.y[batch_indices, safe_target_indices], target_y)
+                distance = np.hypot(
+                    state.x[:, player_reaper_index] - target_x,
+                    state.y[:, player_reaper_index] - target_y,
+                )
+                is_arrived = is_wreck_target & (distance < target_radius)
+                commands.target_x[:, player_reaper_index] = target_x
+                commands.target_y[:, player_reaper_index] = target_y
+                commands.power[:, player_reaper_index] = np.where(is_arrived, 0.0, UnitThrust.max_looter)
+
+            step_with_collisions(state, commands)
+            played_round_count += 1
+
+            if wrecks.unit_count:
+                scores += self._harvest(state, reaper_indices, wrecks, wreck_water, oil_pools)
+            if player_doof_index is not None:
+                speed = np.hypot(state.vx[:, player_doof_index], state.vy[:, player_doof_index])
+                rage += speed // RAGE_SPEED_DIVIDER
+            slowest_round_seconds = max(slowest_round_seconds, time.perf_counter() - round_start)
+
+        self.round_seconds_per_pair = slowest_round_seconds / (batch_size * unit_count**2)
+
+        player_scores = scores[:, is_player_reaper].sum(axis=1)
+        enemy_scores = scores[:, ~is_player_reaper].max(axis=1) if (~is_player_reaper).any() else np.zeros(batch_size)
+        evaluations = []
+        for candidate_index, candidate in enumerate(candidates):
+            rollouts = slice(candidate_index * rollout_count, (candidate_index + 1) * rollout_count)
+            evaluations.append(
+                RolloutEvaluation(
+                    candidate=candidate,
+                    score_gain=float(player_scores[rollouts].mean()),
+                    rage_gain=float(rage[rollouts].mean()),
+                    enemy_score_gain=float(enemy_scores[rollouts].mean()),
+                    round_count=played_round_count,
+                )
+            )
+        return evaluations
+
+    def get_round_seconds(self, batch_size: int, unit_count: int) -> float:
+        """
+        :return: the estimated cost of a round, 0 before the first evaluation
+            (the first round is played anyway)
+        """
+        if self.round_seconds_per_pair is None:
+            return 0.0
+        return self.round_seconds_per_pair * batch_size * unit_count**2
+
+    @staticmethod
+    def is_round_affordable(elapsed_seconds: float, round_seconds: float, budget_seconds: float) -> bool:
+        """
+        :param elapsed_seconds: the time spent by the evaluation so far
+        :param round_seconds: the worst case estimate of the next round
+        :param budget_seconds:
+        """
+        return elapsed_seconds + ROUND_SECONDS_MARGIN * round_seconds <= budget_seconds
+
+    def get_rollout_count(self, candidate_count: int, unit_count: int, budget_seconds: float) -> int:
+        """
+        :param candidate_count:
+        :param unit_count: the moving units
+        :param budget_seconds: what is left of the budget
+        :return: the rollouts per candidate, cut to what a round fits into
+            the budget, 0 if not even a single rollout fits. All of them
+            before the first evaluation
+        """
+        if self.round_seconds_per_pair is None:
+            return self.rollout_count
+        affordable_row_count = budget_seconds / max(self.get_round_seconds(1, unit_count), 1e-9)
+        return min(self.rollout_count, int(affordable_row_count / candidate_count))
+
+    def get_best_candidate(self, evaluations: list[RolloutEvaluation]) -> RolloutCandidate | None:
+        if not evaluations:
+            return None
+        return max(evaluations, key=lambda evaluation: evaluation.value).candidate
+
+    @staticmethod
+    def _get_player_unit_index(state: SimulationState, entity: Entity) -> int | None:
+        indices = np.flatnonzero((state.unit_type == entity.value) & (state.player == PlayerFieldTypes.PLAYER.value))
+        return int(indices[0]) if indices.size else None
+
+    @staticmethod
+    def _get_unit_index(state: SimulationState, unit_id: int) -> int:
+        """
+        :return: -1 for unknown units
+        """
+        indices = np.flatnonzero(state.unit_id == unit_id)
+        return int(indices[0]) if indices.size else -1
+
+    def _get_candidate_targets(
+        self,
+        candidates: list[RolloutCandidate],
+        moving_state: SimulationState,
+        wrecks: SimulationState,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        :return: the starting position of the targets, whether they are
+            wrecks, and their radius
+        """
+        x, y, is_wreck, radius = [], [], [], []
+        for candidate in candidates:
+            target_state = wrecks
+            index = self._get_unit_index(wrecks, candidate.target_id)
+            if index < 0:
+                target_state = moving_state
+                index = self._get_unit_index(moving_state, candidate.target_id)
+            if index < 0:
+                raise ValueError(f"Unknown rollout target: {candidate.target_id}")
+            x.append(target_state.x[index])
+            y.append(target_state.y[index])
+            is_wreck.append(target_state is wrecks)
+            radius.append(target_state.radius[index])
+        return (
+            np.array(x, dtype=np.float64),
+            np.array(y, dtype=np.float64),
+            np.array(is_wreck, dtype=bool),
+            np.array(radius, dtype=np.float64),
+        )
+
+    def _get_default_commands(
+        self,
+        state: SimulationState,
+        moving_state: SimulationState,
+        wrecks: SimulationState,
+    ) -> UnitCommands:
+        """
+        the commands of everyone but the player's reaper, fixed for the
+        whole rollout
+        """
+        batch_size = state.batch_shape[0]
+        commands = create_idle_commands(state)
+        tanker_indices = np.flatnonzero(moving_state.unit_type == Entity.TANKER.value)
+        is_enemy = moving_state.player > PlayerFieldTypes.PLAYER.value
+        for index in np.flatnonzero(is_enemy & (moving_state.unit_type == Entity.REAPER.value)):
+            if not wrecks.unit_count:
+                break
+            closest = self._get_closest_index(moving_state, index, wrecks.x, wrecks.y)
+            commands.target_x[:, index] = wrecks.x[closest]
+            commands.target_y[:, index] = wrecks.y[closest]
+            commands.power[:, index] = self.random_generator.integers(*ENEMY_THROTTLE_RANGE, batch_size, endpoint=True)
+        for index in np.flatnonzero(moving_state.unit_type == Entity.DESTROYER.value):
+            if not tanker_indices.size:
+                break
+            tanker_x = moving_state.x[tanker_indices]
+            tanker_y = moving_state.y[tanker_indices]
+            closest = self._get_closest_index(moving_state, index, tanker_x, tanker_y)
+            commands.target_x[:, index] = tanker_x[closest]
+            commands.target_y[:, index] = tanker_y[closest]
+            commands.power[:, index] = UnitThrust.max_looter
+        return commands
+
+    @staticmethod
+    def _get_closest_index(state: SimulationState, index: int, x: np.ndarray, y: np.ndarray) -> int:
+        return int(np.argmin((x - state.x[index]) ** 2 + (y - state.y[index]) ** 2))
+
+    @staticmethod
+    def _harvest(
+        state: SimulationState,
+        reaper_indices: np.ndarray,
+        wrecks: SimulationState,
+        wreck_water: np.ndarray,
+        oil_pools: SimulationState,
+    ) -> np.ndarray:
+        """
+        every reaper inside a wreck (and not in oil) takes 1 water, a wreck
+        with less water than reapers shares it evenly. Updates the water in place
+
+        :return: (batch, reaper_count) water harvested in the round
+        """
+        # (batch, reaper_count, wreck_count)
+        reaper_x = state.x[:, reaper_indices, np.newaxis]
+        reaper_y = state.y[:, reaper_indices, np.newaxis]
+        is_inside = np.hypot(reaper_x - wrecks.x, reaper_y - wrecks.y) < wrecks.radius
+        if oil_pools.unit_count:
+            is_in_oil = np.hypot(reaper_x - oil_pools.x, reaper_y - oil_pools.y) < oil_pools.radius
+            is_inside &= ~is_in_oil.any(axis=2, keepdims=True)
+        reaper_counts = is_inside.sum(axis=1)
+        harvested = np.minimum(reaper_counts, wreck_water)
+        share = np.divide(harvested, reaper_counts, out=np.zeros_like(harvested), where=reaper_counts > 0)
+        wreck_water -= harvested
+        return (is_inside * share[:, np.newaxis, :]).sum(axis=2)
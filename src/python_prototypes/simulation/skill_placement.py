@@ -0,0 +1,250 @@
+"""
+Placement of the tar, oil and grenade skills
+
+Every skill covers a circle (radius 1000) centred anywhere within the cast
+range (2000) of its caster: tar is cast by the reaper, oil by the doof and
+the grenade by the destroyer. A candidate centre is scored by the units it
+covers, weighted per skill (e.g. oil only hurts reapers, and it hurts them
+most while they are harvesting), enemies counting as positive and the
+player's own units as negative. Covered units closer to the centre count a
+bit more, so the best centre doesn't graze the targets.
+
+The candidates are a grid of offsets around the caster, scored against all
+the units in one vectorized pass. Both passes are sized by the time budget:
+the coarse grid is the densest one whose (estimated) scoring fits into half
+of what is left of the budget, and the finer grid around the best coarse
+candidate refines the placement only if its estimate fits into the rest
+"""
+
+import time
+from dataclasses import dataclass
+from enum import Enum
+
+import numpy as np
+
+from python_prototypes.field_types import Entity, GameGridInformation, PlayerFieldTypes, Unit
+from python_prototypes.unit_parameters import UnitSkill
+
+# from the densest to the sparsest, the sparsest is used even if it doesn't
+# fit into the budget
+COARSE_GRID_SPACINGS = (200, 300, 400, 500)
+# the fine grid covers a coarse grid cell, with this many steps per side
+FINE_GRID_DIVISION = 5
+# scoring cost of candidate count x unit count pairs, measured for 50-320
+# candidates and 3-9 units
+SCORING_OVERHEAD_US = 12.0
+SCORING_PAIR_US = 0.013
+# the depth of a covered unit (1 at the centre, 0 at the border) is worth
+# this fraction of the unit's weight
+DEPTH_WEIGHT = 0.1
+SKILL_PLACEMENT_BUDGET_US = 300
+
+
+class SkillType(Enum):
+    tar = 1
+    oil = 2
+    grenade = 3
+
+
+SKILL_CASTERS = {
+    SkillType.tar: Entity.REAPER,
+    SkillType.oil: Entity.DOOF,
+    SkillType.grenade: Entity.DESTROYER,
+}
+SKILL_COSTS = {
+    SkillType.tar: UnitSkill.tar_cost,
+    SkillType.oil: UnitSkill.oil_cost,
+    SkillType.grenade: UnitSkill.grenade_cost,
+}
+# weight of the covered enemy units by their type, the player's own units
+# count with the negative weights
+SKILL_UNIT_WEIGHTS = {
+    SkillType.tar: {Entity.REAPER: 3.0, Entity.DESTROYER: 1.0, Entity.DOOF: 1.0},
+    SkillType.oil: {Entity.REAPER: 2.0},
+    SkillType.grenade: {Entity.REAPER: 3.0, Entity.DESTROYER: 1.0, Entity.DOOF: 1.0},
+}
+# oil stops the harvesting, reapers inside wrecks count this much more
+OIL_HARVESTING_REAPER_BONUS = 2.0
+
+
+def get_grid_offsets(spacing: int, radius: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    :return: the (dx, dy) offsets of a square grid, within the radius
+    """
+    steps = np.arange(-radius // spacing, radius // spacing + 1) * spacing
+    dx, dy = np.meshgrid(steps, steps)
+    is_within = dx**2 + dy**2 <= radius**2
+    return dx[is_within].astype(np.float64), dy[is_within].astype(np.float64)
+
+
+COARSE_OFFSETS = {spacing: get_grid_offsets(spacing, UnitSkill.range) for spacing in COARSE_GRID_SPACINGS}
+FINE_OFFSETS = {
+    spacing: get_grid_offsets(spacing // FINE_GRID_DIVISION, spacing) for spacing in COARSE_GRID_SPACINGS
+}
+
+
+def get_scoring_cost_us(candidate_count: int, unit_count: int) -> float:
+    """
+    the estimated time of `score_skill_centres`
+    """
+    return SCORING_OVERHEAD_US + SCORING_PAIR_US * candidate_count * unit_count
+
+
+def get_coarse_grid_spacing(unit_count: int, time_budget_us: float) -> int:
+    """
+    the densest coarse grid whose scoring fits into half of the budget, the
+    other half is left for the refinement
+
+    :param unit_count:
+    :param time_budget_us: what is left of the budget
+    """
+    for spacing in COARSE_GRID_SPACINGS:
+        if get_scoring_cost_us(COARSE_OFFSETS[spacing][0].size, unit_count) <= time_budget_us / 2:
+            return spacing
+    return COARSE_GRID_SPACINGS[-1]
+
+
+@dataclass
+class SkillPlacement:
+    skill_type: SkillType
+    x: int
+    y: int
+    score: float
+
+    @property
+    def command(self) -> str:
+        return f"SKILL {self.x} {self.y}"
+
+
+def get_skill_unit_weights(skill_type: SkillType, units: list[Unit], wrecks: list[Unit] | None = None) -> np.ndarray:
+    """
+    :param skill_type:
+    :param units: looters of every player
+    :param wrecks: needed for the oil, to find the harvesting reapers
+    :return: (unit_count,) positive for enemies, negative for the player's units
+    """
+    type_weights = SKILL_UNIT_WEIGHTS[skill_type]
+    weights = np.array([type_weights.get(Entity(unit.unit_type), 0.0) for unit in units], dtype=np.float64)
+    if skill_type == SkillType.oil and wrecks and units:
+        unit_x = np.array([unit.x for unit in units], dtype=np.float64)[:, np.newaxis]
+        unit_y = np.array([unit.y for unit in units], dtype=np.float64)[:, np.newaxis]
+        wreck_x = np.array([wreck.x for wreck in wrecks], dtype=np.float64)
+        wreck_y = np.array([wreck.y for wreck in wrecks], dtype=np.float64)
+        wreck_radius = np.array([wreck.radius for wreck in wrecks], dtype=np.float64)
+        is_harvesting = ((unit_x - wreck_x) ** 2 + (unit_y - wreck_y) ** 2 < wreck_radius**2).any(axis=1)
+        weights = np.where(is_harvesting & (weights > 0), weights + OIL_HARVESTING_REAPER_BONUS, weights)
+    is_player = np.array([unit.player == PlayerFieldTypes.PLAYER.value for unit in units], dtype=bool)
+    return np.where(is_player, -weights, weights)
+
+
+def score_skill_centres(
+    centre_x: np.ndarray,
+    centre_y: np.ndarray,
+    unit_x: np.ndarray,
+    unit_y: np.ndarray,
+    weights: np.ndarray,
+) -> np.ndarray:
+    """
+    :param centre_x: (candidate_count,)
+    :param centre_y:
+    :param unit_x: (unit_count,)
+    :param unit_y:
+    :param weights: (unit_count,)
+    :return: (candidate_count,)
+    """
+    distances = np.hypot(centre_x[:, np.newaxis] - unit_x, centre_y[:, np.newaxis] - unit_y)
+    is_covered = distances < UnitSkill.radius
+    depth = np.where(is_covered, 1 - distances / UnitSkill.radius, 0.0)
+    return is_covered @ weights + DEPTH_WEIGHT * (depth @ weights)
+
+
+def find_skill_placement(
+    skill_type: SkillType,
+    caster: Unit,
+    units: list[Unit],
+    wrecks: list[Unit] | None = None,
+    time_budget_us: float = SKILL_PLACEMENT_BUDGET_US,
+) -> SkillPlacement | None:
+    """
+    :param skill_type:
+    :param caster: the looter casting the skill
+    :param units: the looters (of every player) the skill can affect
+    :param wrecks: see `get_skill_unit_weights`
+    :param time_budget_us: sizes the coarse grid, and the refinement is
+        skipped if it doesn't fit into what is left
+    :return: None if no centre affects the enemies more than the player
+    """
+    start = time.perf_counter()
+    weights = get_skill_unit_weights(skill_type, units, wrecks)
+    if not np.any(weights > 0):
+        return None
+    unit_x = np.array([unit.x for unit in units], dtype=np.float64)
+    unit_y = np.array([unit.y for unit in units], dtype=np.float64)
+
+    # the weights and the positions are taken out of the budget first
+    spacing = get_coarse_grid_spacing(len(units), time_budget_us - (time.perf_counter() - start) * 1_000_000)
+    centre_x = caster.x + COARSE_OFFSETS[spacing][0]
+    centre_y = caster.y + COARSE_OFFSETS[spacing][1]
+    scores = score_skill_centres(centre_x, centre_y, unit_x, unit_y, weights)
+    best_index = int(np.argmax(scores))
+    best_x, best_y, best_score = centre_x[best_index], centre_y[best_index], scores[best_index]
+
+    fine_offsets = FINE_OFFSETS[spacing]
+    elapsed_us = (time.perf_counter() - start) * 1_000_000
+    if elapsed_us + get_scoring_cost_us(fine_offsets[0].size, len(units)) <= time_budget_us:
+        fine_x = best_x + fine_offsets[0]
+        fine_y = best_y + fine_offsets[1]
+        is_in_range = (fine_x - caster.x) ** 2 + (fine_y - caster.y) ** 2 <= UnitSkill.range**2
+        fine_x, fine_y = fine_x[is_in_range], fine_y[is_in_range]
+        fine_scores = score_skill_centres(fine_x, fine_y, unit_x, unit_y, weights)
+        fine_index = int(np.argmax(fine_scores))
+        if fine_scores[fine_index] > best_score:
+            best_x, best_y, best_score = fine_x[fine_index], fine_y[fine_index], fine_scores[fine_index]
+
+    if best_score <= 0:
+        return None
+    return SkillPlacement(skill_type=skill_type, x=int(best_x), y=int(best_y), score=float(best_score))
+
+
+def find_best_skill_placement(
+    game_grid_information: GameGridInformation,
+    casters: dict[Entity, Unit | None],
+    rage: int,
+    time_budget_us: float = SKILL_PLACEMENT_BUDGET_US,
+) -> SkillPlacement | None:
+    """
+    the best placement of the affordable skills, the budget is shared
+
+    :param game_grid_information:
+    :param casters: the player's looters by their type
+    :param rage: the player's rage
+    :param time_budget_us:
+    :return:
+    """
+    unit_table = game_grid_information.get_unit_table()
+    looters = [
+        looter
+        for looter_type in (Entity.REAPER, Entity.DESTROYER, Entity.DOOF)
+        for looter in unit_table.get_units(unit_table.get_indices(looter_type.value))
+    ]
+    wrecks = unit_table.get_units(unit_table.get_indices(Entity.WRECK.value))
+
+    affordable_skills = [
+        skill_type
+        for skill_type, cost in SKILL_COSTS.items()
+        if cost <= rage and casters.get(SKILL_CASTERS[skill_type]) is not None
+    ]
+    best_placement = None
+    for skill_type in affordable_skills:
+        skill_placement = find_skill_placement(
+            skill_type,
+            casters[SKILL_CASTERS[skill_type]],
+            looters,
+            wrecks,
+            time_budget_us / len(affordable_skills),
+        )
+        if skill_placement is None:
+            continue
+        if best_placement is None or skill_placement.score > best_placement.score:
+            best_placement = skill_placement
+    return best_placement
@@ -0,0 +1,200 @@
+"""
+Struct of arrays representation of the units of the game
+
+Every unit column is a numpy array with the shape (..., unit_count). The
+leading axes (if any) are independent rollouts, so thousands of futures can
+be stepped with the same numpy operations as a single one
+"""
+
+from typing import Iterable
+
+import numpy as np
+
+from python_prototypes.field_types import Entity, GameGridInformation, Unit, UnitTable
+from python_prototypes.unit_parameters import UnitFriction
+
+# indexed by the unit type, static units (wrecks, pools) don't move at all
+UNIT_TYPE_FRICTION = np.array(
+    [
+        UnitFriction.reaper,
+        UnitFriction.destroyer,
+        UnitFriction.doof,
+        UnitFriction.tanker,
+        0.0,
+        0.0,
+        0.0,
+    ]
+)
+MOVING_UNIT_TYPES = (Entity.REAPER.value, Entity.DESTROYER.value, Entity.DOOF.value, Entity.TANKER.value)
+LOOTER_UNIT_TYPES = (Entity.REAPER.value, Entity.DESTROYER.value, Entity.DOOF.value)
+
+
+class SimulationState:
+    """
+    :param unit_id:
+    :param unit_type: `Entity` values
+    :param player: player index, -1 for tankers, wrecks
+    :param mass:
+    :param radius:
+    :param x:
+    :param y:
+    :param vx:
+    :param vy:
+    :param extra: water for tankers and wrecks, remaining rounds for pools
+    :param extra_2: water capacity of tankers
+    :param alive: units are never removed from the arrays (it would break
+        the batching), they are masked out instead
+    """
+
+    COLUMNS = ("unit_id", "unit_type", "player", "mass", "radius", "x", "y", "vx", "vy", "extra", "extra_2", "alive")
+
+    def __init__(
+        self,
+        unit_id: np.ndarray,
+        unit_type: np.ndarray,
+        player: np.ndarray,
+        mass: np.ndarray,
+        radius: np.ndarray,
+        x: np.ndarray,
+        y: np.ndarray,
+        vx: np.ndarray,
+        vy: np.ndarray,
+        extra: np.ndarray,
+        extra_2: np.ndarray,
+        alive: np.ndarray | None = None,
+    ):
+        self.unit_id = unit_id
+        self.unit_type = unit_type
+        self.player = player
+        self.mass = mass
+        self.radius = radius
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.extra = extra
+        self.extra_2 = extra_2
+        if alive is None:
+            alive = np.ones(unit_id.shape, dtype=bool)
+        self.alive = alive
+
+    @classmethod
+    def from_units(cls, units: Iterable[Unit]) -> "SimulationState":
+        units = list(units)
+        return cls(
+            unit_id=np.array([unit.unit_id for unit in units], dtype=np.int64),
+            unit_type=np.array([unit.unit_type for unit in units], dtype=np.int64),
+            player=np.array([-1 if unit.player is None else unit.player for unit in units], dtype=np.int64),
+            mass=np.array([unit.mass or 0.0 for unit in units], dtype=np.float64),
+            radius=np.array([unit.radius for unit in units], dtype=np.float64),
+            x=np.array([unit.x for unit in units], dtype=np.float64),
+            y=np.array([unit.y for unit in units], dtype=np.float64),
+            vx=np.array([unit.vx for unit in units], dtype=np.float64),
+            vy=np.array([unit.vy for unit in units], dtype=np.float64),
+            extra=np.array([unit.extra or 0 for unit in units], dtype=np.int64),
+            extra_2=np.array([unit.extra_2 or 0 for unit in units], dtype=np.int64),
+        )
+
+    @classmethod
+    def from_unit_table(cls, unit_table: UnitTable) -> "SimulationState":
+        """
+        the columns are copied from the buffers of the table
+        """
+        return cls(
+            unit_id=np.array(unit_table.unit_id, dtype=np.int64),
+            unit_type=np.array(unit_table.unit_type, dtype=np.int64),
+            player=np.array(unit_table.player, dtype=np.int64),
+            mass=np.array(unit_table.mass, dtype=np.float64),
+            radius=np.array(unit_table.radius, dtype=np.float64),
+            x=np.array(unit_table.x, dtype=np.float64),
+            y=np.array(unit_table.y, dtype=np.float64),
+            vx=np.array(unit_table.vx, dtype=np.float64),
+            vy=np.array(unit_table.vy, dtype=np.float64),
+            extra=np.array(unit_table.extra, dtype=np.int64),
+            extra_2=np.array(unit_table.extra_2, dtype=np.int64),
+        )
+
+    @classmethod
+    def from_grid_information(cls, game_grid_information: GameGridInformation) -> "SimulationState":
+        return cls.from_unit_table(game_grid_information.get_unit_table())
+
+    @property
+    def unit_count(self) -> int:
+        return self.unit_id.shape[-1]
+
+    @property
+    def batch_shape(self) -> tuple[int, ...]:
+        return self.unit_id.shape[:-1]
+
+    @property
+    def friction(self) -> np.ndarray:
+        return UNIT_TYPE_FRICTION[self.unit_type]
+
+    @property
+    def is_moving(self) -> np.ndarray:
+        return np.isin(self.unit_type, MOVING_UNIT_TYPES) & self.alive
+
+    @property
+    def is_looter(self) -> np.ndarray:
+        return np.isin(self.unit_type, LOOTER_UNIT_TYPES) & self.alive
+
+    def copy(self) -> "SimulationState":
+        return SimulationState(*(getattr(self, column).copy() for column in self.COLUMNS))
+
+    def copy_into(self, target: "SimulationState") -> None:
+        """
+        overwrites the columns of a state with the same shape, without any
+        allocation
+        """
+        for column in self.COLUMNS:
+            np.copyto(getattr(target, column), getattr(self, column))
+
+    def take(self, indices: np.ndarray) -> "SimulationState":
+        """
+        :param indices: of the units to keep (along the last axis)
+        """
+        return SimulationState(*(getattr(self, column)[..., indices] for column in self.COLUMNS))
+
+    def repeat(self, batch_size: int) -> "SimulationState":
+        """
+        :return: a batched state of `batch_size` independent copies
+        """
+        return SimulationState(
+            *(np.repeat(getattr(self, column)[np.newaxis, ...], batch_size, axis=0) for column in self.COLUMNS)
+        )
+
+    def get_unit_index(self, unit_id: int) -> int:
+        """
+        units have the same index in every batch
+        """
+        unit_ids = self.unit_id.reshape(-1, self.unit_count)[0]
+        indices = np.flatnonzero(unit_ids == unit_id)
+        if not indices.size:
+            raise KeyError(f"Unknown unit id: {unit_id}")
+        return int(indices[0])
+
+    def to_units(self) -> list[Unit]:
+        """
+        converts the live units of an unbatched state back to `Unit` objects
+        """
+        if self.batch_shape:
+            raise ValueError("Only unbatched states can be converted to units")
+        units = []
+        for index in np.flatnonzero(self.alive).tolist():
+            player = int(self.player[index])
+            units.append(
+                Unit(
+                    x=int(self.x[index]),
+                    y=int(self.y[index]),
+                    vx=int(self.vx[index]),
+                    vy=int(self.vy[index]),
+                    radius=int(self.radius[index]),
+                    unit_type=int(self.unit_type[index]),
+                    player=player,
+                    unit_id=int(self.unit_id[index]),
+                    mass=float(self.mass[index]),
+                    extra=int(self.extra[index]),
+                    extra_2=int(self.extra_2[index]),
+                )
+            )
+        return units
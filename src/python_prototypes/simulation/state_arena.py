@@ -0,0 +1,86 @@
+"""
+Preallocated simulation states for searches
+
+The `GameGridInformation` of the round is converted to a `SimulationState`
+once per turn (`load_grid`), every search works on the arena's buffers from
+then on:
+- the working state (`state`) is stepped in place by the simulator
+- snapshots are copied into fixed slots and restored from them
+- speculative steps go into the back buffer, and are either committed (the
+  buffers are swapped, no copy at all) or simply dropped
+The snapshots, the restores and the swaps don't allocate, and the steps keep
+the buffers (only numpy's temporaries of the steps are allocated). The
+buffers are reused between the turns as long as the shape of the state
+doesn't change
+"""
+
+from python_prototypes.field_types import GameGridInformation
+from python_prototypes.simulation.state import SimulationState
+
+SNAPSHOT_COUNT = 2
+
+
+class StateArena:
+    def __init__(self, snapshot_count: int = SNAPSHOT_COUNT):
+        self.snapshot_count = snapshot_count
+        # the unbatched state of the turn, never stepped
+        self.turn_state: SimulationState | None = None
+        self._front: SimulationState | None = None
+        self._back: SimulationState | None = None
+        self._snapshots: list[SimulationState] = []
+
+    @property
+    def state(self) -> SimulationState:
+        if self._front is None:
+            raise ValueError("The arena is not loaded")
+        return self._front
+
+    def load_grid(self, game_grid_information: GameGridInformation, batch_size: int | None = None) -> None:
+        """
+        call it once per turn
+        """
+        self.load(SimulationState.from_grid_information(game_grid_information), batch_size)
+
+    def load(self, turn_state: SimulationState, batch_size: int | None = None) -> None:
+        """
+        :param turn_state: unbatched
+        :param batch_size: the working state is `batch_size` copies of the
+            turn state if given
+        """
+        self.turn_state = turn_state
+        batch_shape = (batch_size,) if batch_size is not None else ()
+        if self._front is not None and self._front.unit_id.shape == (*batch_shape, turn_state.unit_count):
+            self.reset()
+            return
+        working_state = turn_state.repeat(batch_size) if batch_size is not None else turn_state.copy()
+        self._front = working_state
+        self._back = working_state.copy()
+        self._snapshots = [working_state.copy() for _ in range(self.snapshot_count)]
+
+    def reset(self) -> None:
+        """
+        sets the working state back to the turn state
+        """
+        for column in SimulationState.COLUMNS:
+            # broadcasts into every batch
+            getattr(self.state, column)[...] = getattr(self.turn_state, column)
+
+    def snapshot(self, slot: int = 0) -> None:
+        self.state.copy_into(self._snapshots[slot])
+
+    def restore(self, slot: int = 0) -> None:
+        self._snapshots[slot].copy_into(self.state)
+
+    def get_back_buffer(self) -> SimulationState:
+        """
+        :return: a copy of the working state to step speculatively, see
+            `commit`
+        """
+        self.state.copy_into(self._back)
+        return self._back
+
+    def commit(self) -> None:
+        """
+        the back buffer becomes the working state
+        """
+        self._front, self._back = self._back, self._front
@@ -0,0 +1,229 @@
+"""
+Tanker to wreck lifecycle forecasting
+
+Tankers are only worth following if they turn into wrecks, which happens
+when a destroyer hits them. Every round:
+- the tankers are followed by their ids, a tanker disappearing next to a
+  new wreck became that wreck
+- every tanker is rolled forward (heading to the centre while filling up,
+  leaving the map when full) together with the water it will carry, and
+  compared against how far every destroyer can get at full throttle. The
+  first round any destroyer can reach a tanker is the forecasted wreck
+  spawn time, its position at that round the spawn location
+
+All the tankers and destroyers are forecasted in the same numpy pass
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from python_prototypes.field_tools import PLAYFIELD_RADIUS
+from python_prototypes.field_types import Entity, GameGridInformation, Unit
+from python_prototypes.unit_parameters import UnitFriction, UnitMass, UnitThrust
+
+TANKER_FORECAST_ROUND_COUNT = 10
+
+
+@dataclass
+class TankerWreckForecast:
+    """
+    :param tanker_id:
+    :param rounds: rounds until the earliest destroyer can hit the tanker
+    :param x: predicted location of the wreck
+    :param y:
+    :param water: water of the tanker (i.e. of the wreck) at that round
+    """
+
+    tanker_id: int
+    rounds: int
+    x: int
+    y: int
+    water: int
+
+
+class TankerForecast:
+    """
+    :param tanker_ids: (tanker_count,)
+    :param wreck_rounds: inf for tankers no destroyer can reach in time
+    :param wreck_x:
+    :param wreck_y:
+    :param wreck_water:
+    """
+
+    def __init__(
+        self,
+        tanker_ids: np.ndarray,
+        wreck_rounds: np.ndarray,
+        wreck_x: np.ndarray,
+        wreck_y: np.ndarray,
+        wreck_water: np.ndarray,
+    ):
+        self.tanker_ids = tanker_ids
+        self.wreck_rounds = wreck_rounds
+        self.wreck_x = wreck_x
+        self.wreck_y = wreck_y
+        self.wreck_water = wreck_water
+        self._tanker_index = {tanker_id: index for index, tanker_id in enumerate(tanker_ids.tolist())}
+
+    def get_wreck_forecast(self, tanker_id: int) -> TankerWreckForecast | None:
+        """
+        :return: None if the tanker is unknown or is not expected to become
+            a wreck within the forecasted rounds
+        """
+        index = self._tanker_index.get(tanker_id)
+        if index is None or not np.isfinite(self.wreck_rounds[index]):
+            return None
+        return TankerWreckForecast(
+            tanker_id=tanker_id,
+            rounds=int(self.wreck_rounds[index]),
+            x=round(float(self.wreck_x[index])),
+            y=round(float(self.wreck_y[index])),
+            water=int(self.wreck_water[index]),
+        )
+
+
+def forecast_tanker_wrecks(
+    tankers: list[Unit],
+    destroyers: list[Unit],
+    round_count: int = TANKER_FORECAST_ROUND_COUNT,
+) -> TankerForecast:
+    """
+    :param tankers:
+    :param destroyers: every destroyer can hit tankers, the player's as well
+    :param round_count:
+    :return:
+    """
+    x = np.array([tanker.x for tanker in tankers], dtype=np.float64)
+    y = np.array([tanker.y for tanker in tankers], dtype=np.float64)
+    vx = np.array([tanker.vx for tanker in tankers], dtype=np.float64)
+    vy = np.array([tanker.vy for tanker in tankers], dtype=np.float64)
+    water = np.array([tanker.extra for tanker in tankers], dtype=np.float64)
+    capacity = np.array([tanker.extra_2 for tanker in tankers], dtype=np.float64)
+    tanker_radius = np.array([tanker.radius for tanker in tankers], dtype=np.float64)
+
+    # (round_count + 1, tanker_count), row 0 is the current state
+    predicted_x = np.empty((round_count + 1, len(tankers)))
+    predicted_y = np.empty((round_count + 1, len(tankers)))
+    predicted_water = np.empty((round_count + 1, len(tankers)))
+    predicted_x[0], predicted_y[0], predicted_water[0] = x, y, water
+    for round_index in range(1, round_count + 1):
+        distance_from_centre = np.hypot(x, y)
+        safe_distance = np.where(distance_from_centre > 0, distance_from_centre, 1.0)
+        # towards the centre while filling up, away from it when full
+        direction = np.where(water >= capacity, 1.0, -1.0)
+        acceleration = UnitThrust.tanker / (UnitMass.tanker_empty + UnitMass.tanker_per_water * water)
+        vx = vx + direction * x / safe_distance * acceleration
+        vy = vy + direction * y / safe_distance * acceleration
+        x = x + vx
+        y = y + vy
+        vx = vx * (1 - UnitFriction.tanker)
+        vy = vy * (1 - UnitFriction.tanker)
+        is_filling = (np.hypot(x, y) < PLAYFIELD_RADIUS) & (water < capacity)
+        water = water + is_filling
+        predicted_x[round_index], predicted_y[round_index], predicted_water[round_index] = x, y, water
+
+    wreck_rounds = np.full(len(tankers), np.inf)
+    if destroyers and tankers:
+        destroyer_x = np.array([destroyer.x for destroyer in destroyers], dtype=np.float64)
+        destroyer_y = np.array([destroyer.y for destroyer in destroyers], dtype=np.float64)
+        destroyer_radius = np.array([destroyer.radius for destroyer in destroyers], dtype=np.float64)
+        destroyer_speed = np.hypot(
+            np.array([destroyer.vx for destroyer in destroyers], dtype=np.float64),
+            np.array([destroyer.vy for destroyer in destroyers], dtype=np.float64),
+        )
+        # (round_count, destroyer_count)
+        reachable_distances = np.empty((round_count, len(destroyers)))
+        speed = destroyer_speed
+        distance = np.zeros(len(destroyers))
+        for round_index in range(round_count):
+            speed = speed + UnitThrust.max_looter / UnitMass.destroyer
+            distance = distance + speed
+            speed = speed * (1 - UnitFriction.destroyer)
+            reachable_distances[round_index] = distance
+
+        # (round_count, tanker_count, destroyer_count)
+        gaps = (
+            np.hypot(
+                predicted_x[1:, :, np.newaxis] - destroyer_x,
+                predicted_y[1:, :, np.newaxis] - destroyer_y,
+            )
+            - tanker_radius[:, np.newaxis]
+            - destroyer_radius
+        )
+        is_reachable = (gaps <= reachable_distances[:, np.newaxis, :]).any(axis=2)
+        has_reachable_round = is_reachable.any(axis=0)
+        first_reachable_round = np.argmax(is_reachable, axis=0) + 1
+        wreck_rounds = np.where(has_reachable_round, first_reachable_round, np.inf)
+
+    round_index = np.where(np.isfinite(wreck_rounds), wreck_rounds, 0).astype(np.int64)
+    tanker_index = np.arange(len(tankers))
+    return TankerForecast(
+        tanker_ids=np.array([tanker.unit_id for tanker in tankers], dtype=np.int64),
+        wreck_rounds=wreck_rounds,
+        wreck_x=predicted_x[round_index, tanker_index],
+        wreck_y=predicted_y[round_index, tanker_index],
+        wreck_water=predicted_water[round_index, tanker_index],
+    )
+
+
+class TankerLifecycleTracker:
+    """
+    Follows the tankers between rounds, call `update` once per round. The
+    destroyed tankers and the new wrecks are taken from the frame diff of
+    the round if there is one
+    """
+
+    def __init__(self, round_count: int = TANKER_FORECAST_ROUND_COUNT):
+        self.round_count = round_count
+        self.forecast = forecast_tanker_wrecks([], [], round_count)
+        self.tanker_to_wreck_id: dict[int, int] = {}
+        self._previous_tankers: dict[int, Unit] = {}
+        self._known_wreck_ids: set[int] = set()
+
+    def update(self, game_grid_information: GameGridInformation) -> TankerForecast:
+        unit_table = game_grid_information.get_unit_table()
+        tankers = {unit.unit_id: unit for unit in unit_table.get_units(unit_table.get_indices(Entity.TANKER.value))}
+        wrecks = {unit.unit_id: unit for unit in unit_table.get_units(unit_table.get_indices(Entity.WRECK.value))}
+        destroyers = unit_table.get_units(unit_table.get_indices(Entity.DESTROYER.value))
+
+        frame_diff = game_grid_information.frame_diff
+        if frame_diff is None:
+            new_wreck_ids = [wreck_id for wreck_id in wrecks if wreck_id not in self._known_wreck_ids]
+            gone_tanker_ids = [tanker_id for tanker_id in self._previous_tankers if tanker_id not in tankers]
+        else:
+            new_wreck_ids = [unit_id for unit_id in frame_diff.appeared_ids if unit_id in wrecks]
+            gone_tanker_ids = [unit_id for unit_id in frame_diff.disappeared_ids if unit_id in self._previous_tankers]
+
+        new_wrecks = [wrecks[wreck_id] for wreck_id in new_wreck_ids]
+        for tanker_id in gone_tanker_ids:
+            wreck = self._find_spawned_wreck(self._previous_tankers[tanker_id], new_wrecks)
+            if wreck is not None:
+                self.tanker_to_wreck_id[tanker_id] = wreck.unit_id
+
+        self._previous_tankers = tankers
+        self._known_wreck_ids.update(new_wreck_ids)
+        self.forecast = forecast_tanker_wrecks(list(tankers.values()), destroyers, self.round_count)
+        return self.forecast
+
+    def get_wreck_id(self, tanker_id: int) -> int | None:
+        """
+        :return: id of the wreck the tanker turned into, None if it didn't (yet)
+        """
+        return self.tanker_to_wreck_id.get(tanker_id)
+
+    @staticmethod
+    def _find_spawned_wreck(tanker: Unit, new_wrecks: list[Unit]) -> Unit | None:
+        """
+        the wreck is created where the tanker was hit, within one round of
+        movement from its last known position
+        """
+        reach = tanker.radius + np.hypot(tanker.vx, tanker.vy)
+        closest_wreck = None
+        closest_distance = reach
+        for wreck in new_wrecks:
+            distance = np.hypot(wreck.x - tanker.x, wreck.y - tanker.y)
+            if distance <= closest_distance:
+                closest_wreck = wreck
+                closest_distance = distance
+        return closest_wreck
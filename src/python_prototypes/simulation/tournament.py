@@ -0,0 +1,408 @@
+"""
+Parallel self-play tournaments between engine variants
+
+Every match is an independent three-bot `LocalReferee` game, so the matches
+are distributed over a process pool. Every variant plays a single seat of
+a match, so a match counts the same for all of them (2 variants play
+against a fixed baseline variant in the third seat). The seats are rotated
+between the variants, and the results (scores, per round latency stats)
+are written into a compact json lines file, one line per match
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from python_prototypes.main_game_engine import MainGameEngine
+from python_prototypes.reaper.path_planner import (
+    REAPER_BEST_PATH_CONFIGURATION,
+    REAPER_FAST_PATH_CONFIGURATION,
+    ReaperPathPlannerSettings,
+)
+from python_prototypes.reaper.q_orchestrator import ReaperGameState, STEP_PENALTY
+from python_prototypes.simulation.harvest_tour import HarvestTourPlanner
+from python_prototypes.simulation.referee import (
+    EngineBot,
+    LocalReferee,
+    MAX_ROUND_COUNT,
+    PLAYER_COUNT,
+)
+from python_prototypes.simulation.rollout_evaluator import RolloutEvaluator
+from python_prototypes.throttle_lookup.builder import create_empty_reaper_table
+from python_prototypes.throttle_lookup.refinement import ThrottleRefinementStore
+from python_prototypes.throttle_lookup.table import load_throttle_lookup_table
+from python_prototypes.throttle_optimization import GeneticConfiguration
+
+CONFIDENCE_Z_SCORE = 1.96
+BASELINE_VARIANT_NAME = "baseline"
+
+
+@dataclass
+class EngineVariant:
+    """
+    one configuration of `MainGameEngine` taking part in the tournament
+
+    :param name: unique within the tournament
+    :param step_penalty: see `ReaperGameState.step_penalty`
+    :param harvest_configuration:
+    :param fast_configuration:
+    :param use_rollouts: pick new goals and targets with the rollout evaluator
+    :param use_harvest_tours: pick harvest targets along planned multi-wreck tours
+    :param refinement_path: genetic results better than the table are
+        appended to it (json lines) at the end of every match, see
+        `ThrottleRefinementStore`
+    :param refinement_table_path: the table artifact the results are
+        compared with, an empty (distance, speed, heading) reaper table by
+        default (every covered result is recorded then)
+    :param heading_table_path: a (distance, speed, heading) table artifact
+        (see `throttle_lookup.builder`), the ram replans read their paths
+        from it instead of the intercept planner
+    """
+
+    name: str
+    step_penalty: float = STEP_PENALTY
+    harvest_configuration: GeneticConfiguration = field(default_factory=lambda: REAPER_BEST_PATH_CONFIGURATION)
+    fast_configuration: GeneticConfiguration = field(default_factory=lambda: REAPER_FAST_PATH_CONFIGURATION)
+    use_rollouts: bool = False
+    use_harvest_tours: bool = False
+    refinement_path: Path | None = None
+    refinement_table_path: Path | None = None
+    heading_table_path: Path | None = None
+
+    def create_bot(self) -> EngineBot:
+        reaper_game_state = ReaperGameState()
+        reaper_game_state.step_penalty = self.step_penalty
+        reaper_game_state.path_planner_settings = ReaperPathPlannerSettings(
+            refinement_store=self.create_refinement_store(),
+            harvest_configuration=self.harvest_configuration,
+            fast_configuration=self.fast_configuration,
+        )
+        if self.heading_table_path is not None:
+            heading_lookup_table = load_throttle_lookup_table(self.heading_table_path)
+            reaper_game_state.path_planner_settings.heading_lookup_table = heading_lookup_table
+        if self.use_rollouts:
+            reaper_game_state.rollout_evaluator = RolloutEvaluator()
+        if self.use_harvest_tours:
+            reaper_game_state.harvest_tour_planner = HarvestTourPlanner()
+        return EngineBot(MainGameEngine(reaper_game_state))
+
+    def create_refinement_store(self) -> ThrottleRefinementStore | None:
+        if self.refinement_path is None:
+            return None
+        if self.refinement_table_path is None:
+            table = create_empty_reaper_table()
+        else:
+            table = load_throttle_lookup_table(self.refinement_table_path)
+        return ThrottleRefinementStore(table, self.refinement_path)
+
+
+@dataclass
+class MatchTask:
+    match_index: int
+    seed: int
+    seat_variants: list[EngineVariant]
+    max_round_count: int = MAX_ROUND_COUNT
+
+
+@dataclass
+class SeatLatency:
+    """
+    per round bot latencies of one seat, in milliseconds
+    """
+
+    mean_ms: float
+    p95_ms: float
+    max_ms: float
+
+
+@dataclass
+class MatchRecord:
+    match_index: int
+    seed: int
+    variant_names: list[str]
+    scores: list[int]
+    round_count: int
+    latencies: list[SeatLatency]
+
+    @property
+    def winner_names(self) -> set[str]:
+        best_score = max(self.scores)
+        return {name for name, score in zip(self.variant_names, self.scores) if score == best_score}
+
+
+@dataclass
+class WinRateInterval:
+    """
+    :param wins: matches where the variant had (one of) the best scores
+    :param matches: matches the variant played in
+    :param low: lower bound of the wilson score interval
+    :param high: upper bound of the wilson score interval
+    """
+
+    wins: int
+    matches: int
+    low: float
+    high: float
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.matches if self.matches else 0.0
+
+
+def create_match_tasks(
+    variants: list[EngineVariant],
+    match_count: int,
+    seed: int = 0,
+    max_round_count: int = MAX_ROUND_COUNT,
+    baseline_variant: EngineVariant | None = None,
+) -> list[MatchTask]:
+    """
+    every variant plays one seat of a match at most. 2 variants play every
+    match against the baseline variant, in all the seat orders one after the
+    other. From 3 variants on the seats rotate between the variants (3
+    consecutive ones play a match), so every variant sits in every seat as
+    often
+
+    :param baseline_variant: the third seat of 2 variants, the default
+        engine if not given
+    """
+    if len(variants) == 2:
+        if baseline_variant is None:
+            baseline_variant = EngineVariant(BASELINE_VARIANT_NAME)
+        seat_orders = [list(seat_order) for seat_order in itertools.permutations([*variants, baseline_variant])]
+    else:
+        seat_orders = [
+            [variants[(offset + seat) % len(variants)] for seat in range(PLAYER_COUNT)]
+            for offset in range(len(variants))
+        ]
+    return [
+        MatchTask(
+            match_index=match_index,
+            seed=seed + match_index,
+            seat_variants=list(seat_orders[match_index % len(seat_orders)]),
+            max_round_count=max_round_count,
+        )
+        for match_index in range(match_count)
+    ]
+
+
+def play_tournament_match(match_task: MatchTask) -> MatchRecord:
+    """
+    runs in the worker processes, must stay a module level function (picklable).
+    The debug output of the engines is dropped, the refinement stores are
+    flushed at the end of the match
+    """
+    bots = [variant.create_bot() for variant in match_task.seat_variants]
+    referee = LocalReferee(bots, seed=match_task.seed, max_round_count=match_task.max_round_count)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull):
+        match_result = referee.play_match()
+    for bot in bots:
+        refinement_store = bot.main_game_engine.reaper_game_state.path_planner_settings.refinement_store
+        if refinement_store is not None:
+            refinement_store.flush()
+
+    return MatchRecord(
+        match_index=match_task.match_index,
+        seed=match_task.seed,
+        variant_names=[variant.name for variant in match_task.seat_variants],
+        scores=match_result.scores,
+        round_count=match_result.round_count,
+        latencies=[get_seat_latency(round_seconds) for round_seconds in match_result.bot_round_seconds],
+    )
+
+
+def get_seat_latency(round_seconds: list[float]) -> SeatLatency:
+    if not round_seconds:
+        return SeatLatency(mean_ms=0.0, p95_ms=0.0, max_ms=0.0)
+    sorted_ms = sorted(seconds * 1000 for seconds in round_seconds)
+    p95_index = min(len(sorted_ms) - 1, math.ceil(0.95 * len(sorted_ms)) - 1)
+    return SeatLatency(
+        mean_ms=sum(sorted_ms) / len(sorted_ms),
+        p95_ms=sorted_ms[p95_index],
+        max_ms=sorted_ms[-1],
+    )
+
+
+def run_tournament(
+    variants: list[EngineVariant],
+    match_count: int,
+    seed: int = 0,
+    max_round_count: int = MAX_ROUND_COUNT,
+    max_workers: int | None = None,
+    results_path: Path | str | None = None,
+    baseline_variant: EngineVariant | None = None,
+) -> list[MatchRecord]:
+    """
+    :param variants: at least 2, with unique names
+    :param match_count:
+    :param seed: the seed of the first match, the rest are consecutive
+    :param max_round_count:
+    :param max_workers: defaults to the number of cores
+    :param results_path: match records are appended to it as they finish
+    :param baseline_variant: plays the third seat of 2 variants, see
+        `create_match_tasks`
+    :return: the match records in match order
+    """
+    variant_names = [variant.name for variant in variants]
+    if len(variants) == 2:
+        variant_names.append(baseline_variant.name if baseline_variant else BASELINE_VARIANT_NAME)
+    if len(set(variant_names)) != len(variant_names) or len(variants) < 2:
+        raise ValueError("A tournament needs at least 2 variants with unique names (the baseline included)")
+
+    match_tasks = create_match_tasks(variants, match_count, seed, max_round_count, baseline_variant)
+    match_records = []
+    with contextlib.ExitStack() as exit_stack:
+        results_file = None
+        if results_path is not None:
+            results_file = exit_stack.enter_context(open(results_path, "a", encoding="utf-8"))
+        executor = exit_stack.enter_context(ProcessPoolExecutor(max_workers=max_workers))
+        for match_record in executor.map(play_tournament_match, match_tasks):
+            match_records.append(match_record)
+            if results_file is not None:
+                results_file.write(serialize_match_record(match_record) + "\n")
+                results_file.flush()
+    return match_records
+
+
+def serialize_match_record(match_record: MatchRecord) -> str:
+    raw_record = {
+        "match": match_record.match_index,
+        "seed": match_record.seed,
+        "variants": match_record.variant_names,
+        "scores": match_record.scores,
+        "rounds": match_record.round_count,
+        "latency_ms": [
+            [round(latency.mean_ms, 3), round(latency.p95_ms, 3), round(latency.max_ms, 3)]
+            for latency in match_record.latencies
+        ],
+    }
+    return json.dumps(raw_record, separators=(",", ":"))
+
+
+def read_match_records(path: Path | str) -> Iterator[MatchRecord]:
+    with open(path, "r", encoding="utf-8") as results_file:
+        for line in results_file:
+            if not line.strip():
+                continue
+            raw_record = json.loads(line)
+            yield MatchRecord(
+                match_index=raw_record["match"],
+                seed=raw_record["seed"],
+                variant_names=raw_record["variants"],
+                scores=raw_record["scores"],
+                round_count=raw_record["rounds"],
+                latencies=[SeatLatency(*latency) for latency in raw_record["latency_ms"]],
+            )
+
+
+def get_wilson_interval(wins: int, matches: int, z_score: float = CONFIDENCE_Z_SCORE) -> tuple[float, float]:
+    if not matches:
+        return 0.0, 1.0
+    win_rate = wins / matches
+    denominator = 1 + z_score**2 / matches
+    centre = (win_rate + z_score**2 / (2 * matches)) / denominator
+    margin = z_score * math.sqrt(win_rate * (1 - win_rate) / matches + z_score**2 / (4 * matches**2)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def get_win_rate_intervals(match_records: Iterable[MatchRecord]) -> dict[str, WinRateInterval]:
+    """
+    a match counts once for every variant in it (`create_match_tasks` gives
+    every variant one seat at most)
+    """
+    wins: dict[str, int] = {}
+    matches: dict[str, int] = {}
+    for match_record in match_records:
+        winner_names = match_record.winner_names
+        for variant_name in set(match_record.variant_names):
+            matches[variant_name] = matches.get(variant_name, 0) + 1
+            wins[variant_name] = wins.get(variant_name, 0) + (variant_name in winner_names)
+
+    win_rate_intervals = {}
+    for variant_name, match_count in matches.items():
+        low, high = get_wilson_interval(wins[variant_name], match_count)
+        win_rate_intervals[variant_name] = WinRateInterval(wins[variant_name], match_count, low, high)
+    return win_rate_intervals
+
+
+def print_win_rate_intervals(match_records: list[MatchRecord]) -> None:
+    for variant_name, interval in sorted(get_win_rate_intervals(match_records).items()):
+        variant_latencies = [
+            latency
+            for match_record in match_records
+            for name, latency in zip(match_record.variant_names, match_record.latencies)
+            if name == variant_name
+        ]
+        mean_ms = sum(latency.mean_ms for latency in variant_latencies) / len(variant_latencies)
+        worst_p95_ms = max(latency.p95_ms for latency in variant_latencies)
+        print(
+            f"{variant_name}: win rate {interval.win_rate:.3f} "
+            f"[{interval.low:.3f}, {interval.high:.3f}] over {interval.matches} matches, "
+            f"latency mean {mean_ms:.2f}ms, worst p95 {worst_p95_ms:.2f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Self-play tournament of engine variants on a process pool")
+    parser.add_argument("--matches", type=int, default=100)
+    parser.add_argument("--step-penalties", type=float, nargs="+", default=[STEP_PENALTY, 2 * STEP_PENALTY])
+    parser.add_argument("--timeout-ms", type=int, nargs="+", default=None, help="genetic timeouts per variant")
+    parser.add_argument("--rollouts", action="store_true", help="adds a rollout evaluator variant of the first one")
+    parser.add_argument("--harvest-tours", action="store_true", help="adds a harvest tour variant of the first one")
+    parser.add_argument("--rounds", type=int, default=MAX_ROUND_COUNT)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", type=Path, default=None, help="json lines file of the match records")
+    parser.add_argument("--refinements", type=Path, default=None, help="records better genetic results into it")
+    parser.add_argument("--refinement-table", type=Path, default=None, help="table the results are compared with")
+    parser.add_argument(
+        "--heading-table", type=Path, default=None, help="adds a variant of the first one ramming by this table"
+    )
+    arguments = parser.parse_args()
+
+    variants = []
+    for index, step_penalty in enumerate(arguments.step_penalties):
+        variant = EngineVariant(
+            name=f"step_penalty={step_penalty}",
+            step_penalty=step_penalty,
+            refinement_path=arguments.refinements,
+            refinement_table_path=arguments.refinement_table,
+        )
+        if arguments.timeout_ms:
+            timeout_ms = arguments.timeout_ms[index % len(arguments.timeout_ms)]
+            variant = replace(
+                variant,
+                name=f"{variant.name},timeout_ms={timeout_ms}",
+                harvest_configuration=replace(variant.harvest_configuration, timeout_ms=timeout_ms),
+                fast_configuration=replace(variant.fast_configuration, timeout_ms=timeout_ms),
+            )
+        variants.append(variant)
+    if arguments.rollouts:
+        variants.append(replace(variants[0], name=f"{variants[0].name},rollouts", use_rollouts=True))
+    if arguments.harvest_tours:
+        variants.append(replace(variants[0], name=f"{variants[0].name},harvest_tours", use_harvest_tours=True))
+    if arguments.heading_table:
+        variants.append(
+            replace(variants[0], name=f"{variants[0].name},heading_table", heading_table_path=arguments.heading_table)
+        )
+
+    match_records = run_tournament(
+        variants=variants,
+        match_count=arguments.matches,
+        seed=arguments.seed,
+        max_round_count=arguments.rounds,
+        max_workers=arguments.workers,
+        results_path=arguments.output,
+    )
+    print_win_rate_intervals(match_records)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Water extraction and score prediction over (overlapping) wrecks
+
+A reaper harvests 1 water per round from every wreck its centre is inside,
+so a position covered by several wrecks scores from each of them. Reapers
+inside an oil pool don't harvest at all.
+
+Every query is a vectorized circle containment test of (point_count,)
+candidate positions against all the (wreck_count,) wrecks. The best
+harvesting point is searched among the positions where the coverage can
+change: the wreck centres and the corners of the pairwise overlap regions
+(pulled slightly inside the overlap), plus the middle of each overlap
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from python_prototypes.field_types import Entity, GameGridInformation, Unit
+
+# the intersection points are on both circle borders, they are moved this
+# far towards the middle of the overlap to be strictly inside
+OVERLAP_CORNER_PULL = 0.1
+
+
+@dataclass
+class HarvestPoint:
+    """
+    :param x:
+    :param y:
+    :param wreck_count: wrecks covering the point
+    :param water: water extracted there during the queried rounds
+    """
+
+    x: int
+    y: int
+    wreck_count: int
+    water: int
+
+
+class WaterExtractionMap:
+    """
+    The wrecks (and oil pools) of the actual round, call `update` once per
+    round. The best harvest points are cached until the wrecks change: with
+    the frame diff of the round the map is only rebuilt if wrecks or pools
+    came or went, a change of the water (see `FrameDiff.changed_extra_ids`)
+    keeps the candidate points
+    """
+
+    def __init__(self):
+        self.wreck_ids = np.empty(0, dtype=np.int64)
+        self.oil_ids = np.empty(0, dtype=np.int64)
+        self.wreck_x = np.empty(0)
+        self.wreck_y = np.empty(0)
+        self.wreck_radius = np.empty(0)
+        self.wreck_water = np.empty(0)
+        self.oil_x = np.empty(0)
+        self.oil_y = np.empty(0)
+        self.oil_radius = np.empty(0)
+        self._candidate_x = np.empty(0)
+        self._candidate_y = np.empty(0)
+        self._best_harvest_points: dict[tuple[int | None, int], HarvestPoint | None] = {}
+
+    def update(self, game_grid_information: GameGridInformation) -> None:
+        """
+        :param game_grid_information: without a frame diff the map is
+            rebuilt
+        """
+        unit_table = game_grid_information.get_unit_table()
+        wreck_indices = np.array(unit_table.get_indices(Entity.WRECK.value), dtype=np.int64)
+        oil_indices = np.array(unit_table.get_indices(Entity.OIL_POOL.value), dtype=np.int64)
+        unit_ids = np.asarray(unit_table.unit_id)
+        wreck_ids = unit_ids[wreck_indices]
+        oil_ids = unit_ids[oil_indices]
+        frame_diff = game_grid_information.frame_diff
+        if (
+            frame_diff is not None
+            and np.array_equal(wreck_ids, self.wreck_ids)
+            and np.array_equal(oil_ids, self.oil_ids)
+        ):
+            # the same wrecks and pools, they don't move, only the water can change
+            if np.isin(frame_diff.changed_extra_ids, wreck_ids).any():
+                self.wreck_water = np.asarray(unit_table.extra)[wreck_indices].astype(np.float64)
+                self._best_harvest_points = {}
+            return
+
+        x = np.asarray(unit_table.x)
+        y = np.asarray(unit_table.y)
+        radius = np.asarray(unit_table.radius)
+        self.set_columns(
+            wreck_ids=wreck_ids,
+            wreck_x=x[wreck_indices],
+            wreck_y=y[wreck_indices],
+            wreck_radius=radius[wreck_indices],
+            wreck_water=np.asarray(unit_table.extra)[wreck_indices],
+            oil_x=x[oil_indices],
+            oil_y=y[oil_indices],
+            oil_radius=radius[oil_indices],
+            oil_ids=oil_ids,
+        )
+
+    def set_units(self, wrecks: list[Unit], oil_pools: list[Unit] | None = None) -> None:
+        oil_pools = oil_pools or []
+        self.set_columns(
+            wreck_ids=np.array([wreck.unit_id for wreck in wrecks], dtype=np.int64),
+            wreck_x=np.array([wreck.x for wreck in wrecks]),
+            wreck_y=np.array([wreck.y for wreck in wrecks]),
+            wreck_radius=np.array([wreck.radius for wreck in wrecks]),
+            wreck_water=np.array([wreck.extra for wreck in wrecks]),
+            oil_x=np.array([pool.x for pool in oil_pools]),
+            oil_y=np.array([pool.y for pool in oil_pools]),
+            oil_radius=np.array([pool.radius for pool in oil_pools]),
+            oil_ids=np.array([pool.unit_id for pool in oil_pools], dtype=np.int64),
+        )
+
+    def set_columns(
+        self,
+        wreck_ids: np.ndarray,
+        wreck_x: np.ndarray,
+        wreck_y: np.ndarray,
+        wreck_radius: np.ndarray,
+        wreck_water: np.ndarray,
+        oil_x: np.ndarray,
+        oil_y: np.ndarray,
+        oil_radius: np.ndarray,
+        oil_ids: np.ndarray | None = None,
+    ) -> None:
+        self.wreck_ids = wreck_ids.astype(np.int64)
+        self.oil_ids = (oil_ids if oil_ids is not None else np.full(oil_x.size, -1)).astype(np.int64)
+        self.wreck_x = wreck_x.astype(np.float64)
+        self.wreck_y = wreck_y.astype(np.float64)
+        self.wreck_radius = wreck_radius.astype(np.float64)
+        self.wreck_water = wreck_water.astype(np.float64)
+        self.oil_x = oil_x.astype(np.float64)
+        self.oil_y = oil_y.astype(np.float64)
+        self.oil_radius = oil_radius.astype(np.float64)
+        self._candidate_x, self._candidate_y = self._get_candidate_points()
+        self._best_harvest_points = {}
+
+    def get_containment(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        :param x: (point_count,)
+        :param y: (point_count,)
+        :return: (point_count, wreck_count) bool, whether the point is inside
+            the wreck (and can harvest it, i.e. not inside an oil pool)
+        """
+        x = np.asarray(x, dtype=np.float64)[:, np.newaxis]
+        y = np.asarray(y, dtype=np.float64)[:, np.newaxis]
+        is_inside = (x - self.wreck_x) ** 2 + (y - self.wreck_y) ** 2 < self.wreck_radius**2
+        if self.oil_x.size:
+            is_in_oil = ((x - self.oil_x) ** 2 + (y - self.oil_y) ** 2 < self.oil_radius**2).any(axis=1)
+            is_inside &= ~is_in_oil[:, np.newaxis]
+        return is_inside & (self.wreck_water > 0)
+
+    def get_wreck_counts(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        :return: (point_count,) number of wrecks harvested at the points
+        """
+        return self.get_containment(x, y).sum(axis=1)
+
+    def get_extracted_water(self, x: np.ndarray, y: np.ndarray, round_count: int = 1) -> np.ndarray:
+        """
+        water (i.e. score) extracted by a reaper staying at the points for
+        `round_count` rounds, every covering wreck gives 1 per round until it
+        runs dry. Other reapers in the same wrecks are not accounted for
+
+        :return: (point_count,)
+        """
+        return self.get_containment(x, y) @ np.minimum(self.wreck_water, round_count)
+
+    def predict_scores(self, reapers: list[Unit], round_count: int = 1) -> list[int]:
+        """
+        score gained by each reaper if they stayed where they are
+        """
+        if not reapers:
+            return []
+        x = np.array([reaper.x for reaper in reapers], dtype=np.float64)
+        y = np.array([reaper.y for reaper in reapers], dtype=np.float64)
+        return [int(water) for water in self.get_extracted_water(x, y, round_count)]
+
+    def get_best_harvest_point(
+        self,
+        wreck_id: int | None = None,
+        round_count: int = 1,
+    ) -> HarvestPoint | None:
+        """
+        the candidate point with the highest yield, ties go to the first
+        candidate (the wreck centres come first). Cached until the wrecks
+        change, every caller of the round gets the same point
+
+        :param wreck_id: only consider points inside this wreck
+        :param round_count: rounds the reaper is expected to stay
+        :return: None if there is no harvestable point
+        """
+        cache_key = (wreck_id, round_count)
+        if cache_key in self._best_harvest_points:
+            return self._best_harvest_points[cache_key]
+
+        x, y = self._candidate_x, self._candidate_y
+        containment = self.get_containment(x, y)
+        if wreck_id is not None:
+            wreck_index = np.flatnonzero(self.wreck_ids == wreck_id)
+            if not wreck_index.size:
+                return None
+            is_eligible = containment[:, wreck_index[0]]
+        else:
+            is_eligible = containment.any(axis=1)
+        if not is_eligible.any():
+            return None
+
+        water = containment @ np.minimum(self.wreck_water, round_count)
+        scores = np.where(is_eligible, water, -np.inf)
+        best_index = int(np.argmax(scores))
+        harvest_point = HarvestPoint(
+            x=int(x[best_index]),
+            y=int(y[best_index]),
+            wreck_count=int(containment[best_index].sum()),
+            water=int(water[best_index]),
+        )
+        self._best_harvest_points[cache_key] = harvest_point
+        return harvest_point
+
+    def get_candidate_points(self) -> tuple[np.ndarray, np.ndarray]:
+        return self._candidate_x, self._candidate_y
+
+    def _get_candidate_points(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        wreck centres, the middle of the overlaps and their (pulled in)
+        corners. Rounded to integers, as the game positions are
+        """
+        first, second = np.triu_indices(self.wreck_ids.size, k=1)
+        dx = self.wreck_x[second] - self.wreck_x[first]
+        dy = self.wreck_y[second] - self.wreck_y[first]
+        distance = np.hypot(dx, dy)
+        first_radius = self.wreck_radius[first]
+        second_radius = self.wreck_radius[second]
+        is_overlapping = (
+            (distance < first_radius + second_radius)
+            & (distance > np.abs(first_radius - second_radius))
+            & (distance > 0)
+        )
+        first, second = first[is_overlapping], second[is_overlapping]
+        dx, dy, distance = dx[is_overlapping], dy[is_overlapping], distance[is_overlapping]
+        first_radius, second_radius = first_radius[is_overlapping], second_radius[is_overlapping]
+
+        unit_x, unit_y = dx / distance, dy / distance
+        # the chord of the two circles is at `chord_offset` from the first centre
+        chord_offset = (first_radius**2 - second_radius**2 + distance**2) / (2 * distance)
+        half_chord = np.sqrt(np.maximum(first_radius**2 - chord_offset**2, 0))
+        chord_x = self.wreck_x[first] + unit_x * chord_offset
+        chord_y = self.wreck_y[first] + unit_y * chord_offset
+        # the middle of the overlap, halfway between the two inner borders
+        middle_offset = (first_radius + distance - second_radius) / 2
+        middle_x = self.wreck_x[first] + unit_x * middle_offset
+        middle_y = self.wreck_y[first] + unit_y * middle_offset
+
+        corner_x = np.concatenate([chord_x - unit_y * half_chord, chord_x + unit_y * half_chord])
+        corner_y = np.concatenate([chord_y + unit_x * half_chord, chord_y - unit_x * half_chord])
+        corner_x += (np.tile(middle_x, 2) - corner_x) * OVERLAP_CORNER_PULL
+        corner_y += (np.tile(middle_y, 2) - corner_y) * OVERLAP_CORNER_PULL
+
+        candidate_x = np.concatenate([self.wreck_x, middle_x, corner_x])
+        candidate_y = np.concatenate([self.wreck_y, middle_y, corner_y])
+        return np.round(candidate_x), np.round(candidate_y)
@@ -26,26 +26,30 @@ REAPER_BEST_PATH_CONFIGURATION = GeneticConfiguration(
 )
 
 
-planner = GeneticStraightPathPlanner(REAPER_BEST_PATH_CONFIGURATION)
-
 reaper_mass = 0.5
-
-reaper_throttle_calculation_input = ThrottleCalculationInput(
-    v0=0,
-    mass=reaper_mass,
-    friction=UnitFriction.reaper,
-    d_target=100,
-)
-strategy_path = planner.get_path(reaper_throttle_calculation_input)
 distance_range = range(12000, 0, -150)
 speed_range = range(0, 500, 50)
 
-for distance in distance_range:
-    for speed in speed_range:
-        reaper_throttle_calculation_input.d_target = distance
-        reaper_throttle_calculation_input.v0 = speed
-        strategy_path = planner.get_path(reaper_throttle_calculation_input)
-        print(f"({distance}, {speed}): {strategy_path.sequence}")
+
+def print_reaper_throttle_lookup():
+    """
+    (re)generates the lookup below, takes hours - the table itself is
+    importable without running the genetic algorithm
+    """
+    planner = GeneticStraightPathPlanner(REAPER_BEST_PATH_CONFIGURATION)
+    reaper_throttle_calculation_input = ThrottleCalculationInput(
+        v0=0,
+        mass=reaper_mass,
+        friction=UnitFriction.reaper,
+        d_target=100,
+    )
+    for distance in distance_range:
+        for speed in speed_range:
+            reaper_throttle_calculation_input.d_target = distance
+            reaper_throttle_calculation_input.v0 = speed
+            strategy_path = planner.get_path(reaper_throttle_calculation_input)
+            print(f"({distance}, {speed}): {strategy_path.sequence}")
+
 
 resulting_lookup = {
     (12000, 0): [50, 276, 185, 76, 95, 100, 55, 276, 185, 76, 296, 151, 55, 166, 147, 86, 282, 0, 171, 5, 103, 131, 58, 21, 103, 177, 184, 97, 100, 11, 174, 124, 4, 92, 36],
@@ -867,4 +871,8 @@ def find_closest_key(query: tuple[int, int]) -> tuple[int, int]:
     distance, speed = query
     nearest_distance = snap_to_nearest(distance, step=150, min_val=0, max_val=12000)
     nearest_speed = snap_to_nearest(speed, step=50, min_val=0, max_val=450)
-    return (nearest_distance, nearest_speed)
\ No newline at end of file
+    return (nearest_distance, nearest_speed)
+
+
+if __name__ == "__main__":
+    print_reaper_throttle_lookup()
@@ -0,0 +1,57 @@
+"""
+The offline commands of the throttle lookup table artifact
+
+    python -m python_prototypes.throttle_lookup export table.json
+    python -m python_prototypes.throttle_lookup merge table.json refinements/*.jsonl
+
+They live here and not in the modules the engine imports: the single file
+solution inlines those modules, their `__main__` blocks would run with the
+bot
+"""
+
+import argparse
+from pathlib import Path
+
+from python_prototypes.throttle_lookup.refinement import merge_refinements, read_refinement_records
+from python_prototypes.throttle_lookup.table import (
+    create_reaper_throttle_lookup_table,
+    load_throttle_lookup_table,
+    save_throttle_lookup_table,
+)
+
+
+def export_table(arguments: argparse.Namespace) -> None:
+    """
+    exports the lookup of `throttle_cacher` as the initial table artifact
+    """
+    save_throttle_lookup_table(create_reaper_throttle_lookup_table(), arguments.output)
+
+
+def merge_table(arguments: argparse.Namespace) -> None:
+    table = load_throttle_lookup_table(arguments.table)
+    all_records = (record for path in arguments.refinements for record in read_refinement_records(path))
+    merged_table, changed_cell_count = merge_refinements(table, all_records)
+    save_throttle_lookup_table(merged_table, arguments.output or arguments.table)
+    print(f"{changed_cell_count} cells changed, table version: {table.version} -> {merged_table.version}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throttle lookup table artifact")
+    subparsers = parser.add_subparsers(required=True)
+
+    export_parser = subparsers.add_parser("export", help="export the lookup of throttle_cacher as a table")
+    export_parser.add_argument("output", type=Path)
+    export_parser.set_defaults(command=export_table)
+
+    merge_parser = subparsers.add_parser("merge", help="merge refinement records into a table")
+    merge_parser.add_argument("table", type=Path)
+    merge_parser.add_argument("refinements", type=Path, nargs="+")
+    merge_parser.add_argument("--output", type=Path, default=None, help="defaults to overwriting the table")
+    merge_parser.set_defaults(command=merge_table)
+
+    arguments = parser.parse_args()
+    arguments.command(arguments)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Builds throttle lookup tables on every core
+
+Every cell is an independent genetic algorithm run (with a long timeout), so
+the cells are distributed over a process pool. A full (distance, speed,
+heading) table is hours of cpu time, that's why it's built offline
+"""
+
+import argparse
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+
+from python_prototypes.reaper.path_planner import REAPER_FAST_PATH_CONFIGURATION
+from python_prototypes.throttle_lookup.table import (
+    LookupAxis,
+    ThrottleLookupTable,
+    TABLE_CELL_KEY_T,
+    create_throttle_lookup_table,
+    save_throttle_lookup_table,
+)
+from python_prototypes.throttle_optimization import (
+    GeneticConfiguration,
+    find_optimal_throttle_sequence,
+)
+from python_prototypes.unit_parameters import UnitFriction
+
+REAPER_MASS = 0.5
+DEFAULT_DISTANCE_AXIS = LookupAxis(min_value=150, max_value=12000, step=150)
+DEFAULT_SPEED_AXIS = LookupAxis(min_value=0, max_value=450, step=50)
+DEFAULT_HEADING_AXIS = LookupAxis(min_value=0, max_value=180, step=30)
+
+
+def create_empty_reaper_table(heading_axis: LookupAxis | None = DEFAULT_HEADING_AXIS) -> ThrottleLookupTable:
+    """
+    the layout of the table `main` builds, without entries. A refinement
+    store over it records the first result of every cell it gets
+    """
+    return ThrottleLookupTable(
+        version=0,
+        mass=REAPER_MASS,
+        friction=UnitFriction.reaper,
+        genetic_configuration=REAPER_FAST_PATH_CONFIGURATION,
+        distance_axis=DEFAULT_DISTANCE_AXIS,
+        speed_axis=DEFAULT_SPEED_AXIS,
+        heading_axis=heading_axis,
+    )
+
+
+def build_throttle_lookup_table(
+    mass: float,
+    friction: float,
+    genetic_configuration: GeneticConfiguration,
+    distance_axis: LookupAxis,
+    speed_axis: LookupAxis,
+    heading_axis: LookupAxis | None = None,
+    max_workers: int | None = None,
+) -> ThrottleLookupTable:
+    """
+    :param mass:
+    :param friction:
+    :param genetic_configuration: used for every cell, the timeout is per cell
+    :param distance_axis:
+    :param speed_axis:
+    :param heading_axis: builds a (distance, speed, heading) table if set
+    :param max_workers: defaults to the number of cores
+    :return:
+    """
+    empty_table = ThrottleLookupTable(
+        version=1,
+        mass=mass,
+        friction=friction,
+        genetic_configuration=genetic_configuration,
+        distance_axis=distance_axis,
+        speed_axis=speed_axis,
+        heading_axis=heading_axis,
+    )
+    cell_keys = list(itertools.product(*(axis.values() for axis in empty_table.get_axes())))
+    cell_tasks = [(empty_table, cell_key) for cell_key in cell_keys]
+    # larger chunks keep the pickling overhead of the table low
+    chunk_size = max(1, len(cell_tasks) // ((max_workers or os.cpu_count() or 1) * 8))
+
+    raw_lookup: dict[TABLE_CELL_KEY_T, list[int]] = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for cell_key, sequence in executor.map(solve_table_cell, cell_tasks, chunksize=chunk_size):
+            raw_lookup[cell_key] = sequence
+            if len(raw_lookup) % 100 == 0:
+                print(f"{len(raw_lookup)}/{len(cell_tasks)} cells done", file=sys.stderr, flush=True)
+
+    return create_throttle_lookup_table(
+        raw_lookup=raw_lookup,
+        mass=mass,
+        friction=friction,
+        genetic_configuration=genetic_configuration,
+        distance_axis=distance_axis,
+        speed_axis=speed_axis,
+        heading_axis=heading_axis,
+    )
+
+
+def solve_table_cell(cell_task: tuple[ThrottleLookupTable, TABLE_CELL_KEY_T]) -> tuple[TABLE_CELL_KEY_T, list[int]]:
+    """
+    runs in the worker processes, must stay a module level function (picklable)
+    """
+    table, cell_key = cell_task
+    genetic_result = find_optimal_throttle_sequence(
+        throttle_calculation_input=table.get_cell_input(cell_key),
+        genetic_configration=table.genetic_configuration,
+    )
+    return cell_key, list(genetic_result.sequence)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a reaper throttle lookup table on a process pool")
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--heading-step", type=int, default=DEFAULT_HEADING_AXIS.step, help="degrees, 0 builds 2D")
+    parser.add_argument("--timeout-ms", type=int, default=2_000, help="genetic algorithm timeout per cell")
+    parser.add_argument("--workers", type=int, default=None)
+    arguments = parser.parse_args()
+
+    heading_axis = None
+    if arguments.heading_step:
+        heading_axis = LookupAxis(min_value=0, max_value=180, step=arguments.heading_step)
+    # the table is meant for ramming moving targets, same weights as the live ram planner
+    genetic_configuration = replace(REAPER_FAST_PATH_CONFIGURATION, timeout_ms=arguments.timeout_ms)
+
+    table = build_throttle_lookup_table(
+        mass=REAPER_MASS,
+        friction=UnitFriction.reaper,
+        genetic_configuration=genetic_configuration,
+        distance_axis=DEFAULT_DISTANCE_AXIS,
+        speed_axis=DEFAULT_SPEED_AXIS,
+        heading_axis=heading_axis,
+        max_workers=arguments.workers,
+    )
+    save_throttle_lookup_table(table, arguments.output)
+
+
+if __name__ == "__main__":
+    main()
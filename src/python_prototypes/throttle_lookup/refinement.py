@@ -0,0 +1,197 @@
+"""
+Online refinement of the throttle lookup table
+
+During a match (or a self-play run) the genetic algorithm regularly finds
+sequences that are better than the stored table entry of their cell. The
+refinement store (opt-in, see `ReaperPathPlannerSettings`, the tournament
+records with one if `EngineVariant.refinement_path` is set) records these
+together with their fitness into an append only json lines file, and
+`merge_refinements` folds them back into the table artifact offline (the
+`merge` command of `python -m python_prototypes.throttle_lookup`)
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from python_prototypes.throttle_lookup.table import (
+    ThrottleLookupTable,
+    ThrottleTableEntry,
+    TABLE_CELL_KEY_T,
+)
+from python_prototypes.throttle_optimization import (
+    ThrottleCalculationInput,
+    ThrottleSequenceGeneticResult,
+)
+
+
+@dataclass
+class RefinementRecord:
+    """
+    :param cell_key: the table cell the sequence was evaluated for
+    :param sequence:
+    :param fitness: fitness score at the cell's centre (lower is better)
+    :param table_version: version of the table the record improved on
+    :param recorded_at: unix timestamp, used to pick the last writer
+    """
+
+    cell_key: TABLE_CELL_KEY_T
+    sequence: list[int]
+    fitness: float
+    table_version: int
+    recorded_at: float
+
+
+class ThrottleRefinementStore:
+    """
+    Collects the genetic results that beat the table, nothing is written
+    until `flush` is called, so it is safe to use it within a round
+    """
+
+    def __init__(self, table: ThrottleLookupTable, output_path: Path | str):
+        self.table = table
+        self.output_path = Path(output_path)
+        self._best_records: dict[TABLE_CELL_KEY_T, RefinementRecord] = {}
+        self._unflushed_records: list[RefinementRecord] = []
+
+    def offer(
+        self,
+        throttle_calculation_input: ThrottleCalculationInput,
+        genetic_result: ThrottleSequenceGeneticResult,
+    ) -> RefinementRecord | None:
+        """
+        :param throttle_calculation_input: the input the genetic algorithm was run with
+        :param genetic_result:
+        :return: the new record if the sequence is better than anything known
+            for the cell, None otherwise
+        """
+        if not genetic_result.sequence:
+            return None
+        if not self.table.is_covered(throttle_calculation_input):
+            return None
+
+        cell_key = self.table.get_cell_key(throttle_calculation_input)
+        # the caller consumes (pops) the sequence of the result, keep a copy
+        sequence = list(genetic_result.sequence)
+        cell_fitness = self.table.evaluate(cell_key, sequence)
+        best_known_fitness = self.get_best_known_fitness(cell_key)
+        if best_known_fitness is not None and cell_fitness >= best_known_fitness:
+            return None
+
+        record = RefinementRecord(
+            cell_key=cell_key,
+            sequence=sequence,
+            fitness=cell_fitness,
+            table_version=self.table.version,
+            recorded_at=time.time(),
+        )
+        self._best_records[cell_key] = record
+        self._unflushed_records.append(record)
+        return record
+
+    def get_best_known_fitness(self, cell_key: TABLE_CELL_KEY_T) -> float | None:
+        if cell_key in self._best_records:
+            return self._best_records[cell_key].fitness
+        if cell_key in self.table.entries:
+            return self.table.entries[cell_key].fitness
+        return None
+
+    def flush(self) -> int:
+        """
+        appends the pending records to the output file
+
+        :return: the number of written records
+        """
+        if not self._unflushed_records:
+            return 0
+        # a single write, stores of parallel matches can append to the same file
+        with open(self.output_path, "a", encoding="utf-8") as output_file:
+            output_file.write("".join(serialize_refinement_record(record) + "\n" for record in self._unflushed_records))
+        written_count = len(self._unflushed_records)
+        self._unflushed_records = []
+        return written_count
+
+
+def serialize_refinement_record(record: RefinementRecord) -> str:
+    raw_record = {
+        "cell_key": list(record.cell_key),
+        "sequence": record.sequence,
+        "fitness": record.fitness,
+        "table_version": record.table_version,
+        "recorded_at": record.recorded_at,
+    }
+    return json.dumps(raw_record, separators=(",", ":"))
+
+
+def read_refinement_records(path: Path | str) -> Iterator[RefinementRecord]:
+    with open(path, "r", encoding="utf-8") as refinement_file:
+        for line in refinement_file:
+            if not line.strip():
+                continue
+            raw_record = json.loads(line)
+            yield RefinementRecord(
+                cell_key=tuple(raw_record["cell_key"]),
+                sequence=raw_record["sequence"],
+                fitness=raw_record["fitness"],
+                table_version=raw_record["table_version"],
+                recorded_at=raw_record["recorded_at"],
+            )
+
+
+def merge_refinements(
+    table: ThrottleLookupTable,
+    records: Iterable[RefinementRecord],
+) -> tuple[ThrottleLookupTable, int]:
+    """
+    Folds the records into a copy of the table:
+    - the best fitness wins (re-evaluated against this table, as records can
+    come from stores with older table versions)
+    - on equal fitness the last writer (latest `recorded_at`) wins, a table
+    entry counts as older than any record
+
+    :param table:
+    :param records:
+    :return: the merged table (with an increased version if anything
+        changed) and the number of changed cells
+    """
+    winning_records: dict[TABLE_CELL_KEY_T, RefinementRecord] = {}
+    for record in records:
+        if not table.is_valid_cell_key(record.cell_key) or not record.sequence:
+            continue
+        record.fitness = table.evaluate(record.cell_key, record.sequence)
+        current_winner = winning_records.get(record.cell_key)
+        if current_winner is None or _is_record_preferred(record, current_winner):
+            winning_records[record.cell_key] = record
+
+    merged_entries = {
+        cell_key: ThrottleTableEntry(list(entry.sequence), entry.fitness) for cell_key, entry in table.entries.items()
+    }
+    changed_cell_count = 0
+    for cell_key, record in winning_records.items():
+        table_entry = merged_entries.get(cell_key)
+        if table_entry is not None:
+            if record.fitness > table_entry.fitness or record.sequence == table_entry.sequence:
+                continue
+        merged_entries[cell_key] = ThrottleTableEntry(list(record.sequence), record.fitness)
+        changed_cell_count += 1
+
+    merged_table = ThrottleLookupTable(
+        version=table.version + 1 if changed_cell_count else table.version,
+        mass=table.mass,
+        friction=table.friction,
+        genetic_configuration=table.genetic_configuration,
+        distance_axis=table.distance_axis,
+        speed_axis=table.speed_axis,
+        entries=merged_entries,
+        heading_axis=table.heading_axis,
+    )
+    return merged_table, changed_cell_count
+
+
+def _is_record_preferred(record: RefinementRecord, other_record: RefinementRecord) -> bool:
+    if record.fitness != other_record.fitness:
+        return record.fitness < other_record.fitness
+    return record.recorded_at >= other_record.recorded_at
+
@@ -0,0 +1,244 @@
+"""
+Versioned and serializable form of the throttle lookup table (originally the
+`resulting_lookup` literal in `throttle_cacher`)
+
+The table is keyed by (distance, speed) cells, or by (distance, speed,
+heading) cells if it has a heading axis (the heading is the angle of the
+velocity relative to the target, in degrees). Every entry stores the fitness
+of its sequence evaluated at the cell's centre, so entries can be compared
+with (and replaced by) better solutions found later
+"""
+
+import json
+import math
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+
+from python_prototypes.throttle_optimization import (
+    STRAIGHT_HEADING_TOLERANCE,
+    GeneticConfiguration,
+    ThrottleCalculationInput,
+    get_fitness_function,
+)
+
+TABLE_CELL_KEY_T = tuple[int, ...]
+
+
+@dataclass
+class LookupAxis:
+    """
+    evenly spaced axis of the table, both limits are inclusive
+    """
+
+    min_value: int
+    max_value: int
+    step: int
+
+    def snap(self, value: float) -> int:
+        """
+        Round a value to the nearest valid grid step within bounds.
+        """
+        value = max(self.min_value, min(self.max_value, value))
+        offset = round((value - self.min_value) / self.step)
+        return self.min_value + offset * self.step
+
+    def values(self) -> range:
+        return range(self.min_value, self.max_value + 1, self.step)
+
+    def contains(self, value: int) -> bool:
+        if not self.min_value <= value <= self.max_value:
+            return False
+        return (value - self.min_value) % self.step == 0
+
+    def covers(self, value: float) -> bool:
+        """
+        whether the value is closer to a cell of the axis than half a step
+        """
+        half_step = self.step / 2
+        return self.min_value - half_step <= value <= self.max_value + half_step
+
+
+@dataclass
+class ThrottleTableEntry:
+    sequence: list[int]
+    fitness: float
+
+
+@dataclass
+class ThrottleLookupTable:
+    """
+    :param version: increased every time refinements are merged into the table
+    :param mass: mass of the unit the table was built for
+    :param friction: friction of the unit the table was built for
+    :param genetic_configuration: the configuration (mostly the weights) the
+        fitness of the entries is evaluated with
+    :param distance_axis:
+    :param speed_axis:
+    :param entries:
+    :param heading_axis: relative heading in degrees (0 - 180), the table is
+        2D without it
+    """
+
+    version: int
+    mass: float
+    friction: float
+    genetic_configuration: GeneticConfiguration
+    distance_axis: LookupAxis
+    speed_axis: LookupAxis
+    entries: dict[TABLE_CELL_KEY_T, ThrottleTableEntry] = field(default_factory=dict)
+    heading_axis: LookupAxis | None = None
+
+    def get_axes(self) -> list[LookupAxis]:
+        axes = [self.distance_axis, self.speed_axis]
+        if self.heading_axis:
+            axes.append(self.heading_axis)
+        return axes
+
+    def get_cell_key(self, throttle_calculation_input: ThrottleCalculationInput) -> TABLE_CELL_KEY_T:
+        cell_key = (
+            self.distance_axis.snap(throttle_calculation_input.d_target),
+            self.speed_axis.snap(throttle_calculation_input.v0),
+        )
+        if not self.heading_axis:
+            return cell_key
+        heading_degrees = math.degrees(throttle_calculation_input.relative_heading)
+        return *cell_key, self.heading_axis.snap(heading_degrees)
+
+    def is_valid_cell_key(self, cell_key: TABLE_CELL_KEY_T) -> bool:
+        axes = self.get_axes()
+        if len(cell_key) != len(axes):
+            return False
+        return all(axis.contains(value) for axis, value in zip(axes, cell_key))
+
+    def is_covered(self, throttle_calculation_input: ThrottleCalculationInput) -> bool:
+        """
+        whether the input is within the range of the table (and was built for
+        the same unit). A table without a heading axis covers the almost
+        straight movements, the ones planned in 1D
+        """
+        if throttle_calculation_input.mass != self.mass or throttle_calculation_input.friction != self.friction:
+            return False
+        if not self.distance_axis.covers(throttle_calculation_input.d_target):
+            return False
+        if not self.speed_axis.covers(throttle_calculation_input.v0):
+            return False
+        if self.heading_axis is None:
+            return throttle_calculation_input.relative_heading <= STRAIGHT_HEADING_TOLERANCE
+        return self.heading_axis.covers(math.degrees(throttle_calculation_input.relative_heading))
+
+    def get_cell_input(self, cell_key: TABLE_CELL_KEY_T) -> ThrottleCalculationInput:
+        distance, speed, *heading = cell_key
+        relative_heading = math.radians(heading[0]) if heading else 0.0
+        return ThrottleCalculationInput(
+            v0=speed,
+            mass=self.mass,
+            friction=self.friction,
+            d_target=distance,
+            relative_heading=relative_heading,
+        )
+
+    def evaluate(self, cell_key: TABLE_CELL_KEY_T, sequence: list[int]) -> float:
+        """
+        fitness score (lower is better) of the sequence at the cell's centre
+        """
+        cell_input = self.get_cell_input(cell_key)
+        configuration = self.genetic_configuration
+        fitness_function = get_fitness_function(cell_input)
+        fitness_score = fitness_function(
+            cell_input.v0,
+            list(sequence),
+            cell_input.mass,
+            cell_input.friction,
+            cell_input.d_target,
+            configuration.speed_threshold,
+            configuration.distance_weight,
+            configuration.speed_weight,
+            configuration.length_weight,
+            configuration.nonzero_weight,
+        )
+        return fitness_score.score
+
+    def lookup(self, throttle_calculation_input: ThrottleCalculationInput) -> ThrottleTableEntry | None:
+        if not self.is_covered(throttle_calculation_input):
+            return None
+        return self.entries.get(self.get_cell_key(throttle_calculation_input))
+
+
+def create_throttle_lookup_table(
+    raw_lookup: dict[TABLE_CELL_KEY_T, list[int]],
+    mass: float,
+    friction: float,
+    genetic_configuration: GeneticConfiguration,
+    distance_axis: LookupAxis,
+    speed_axis: LookupAxis,
+    version: int = 1,
+    heading_axis: LookupAxis | None = None,
+) -> ThrottleLookupTable:
+    """
+    wraps a raw cell key -> throttle sequence mapping and evaluates the
+    fitness of every entry
+    """
+    table = ThrottleLookupTable(
+        version=version,
+        mass=mass,
+        friction=friction,
+        genetic_configuration=genetic_configuration,
+        distance_axis=distance_axis,
+        speed_axis=speed_axis,
+        heading_axis=heading_axis,
+    )
+    for cell_key, sequence in raw_lookup.items():
+        table.entries[cell_key] = ThrottleTableEntry(list(sequence), table.evaluate(cell_key, sequence))
+    return table
+
+
+def create_reaper_throttle_lookup_table() -> ThrottleLookupTable:
+    """
+    version 1 of the table, i.e. the lookup computed by `throttle_cacher`
+    """
+    from python_prototypes import throttle_cacher
+
+    return create_throttle_lookup_table(
+        raw_lookup=throttle_cacher.resulting_lookup,
+        mass=throttle_cacher.reaper_mass,
+        friction=throttle_cacher.UnitFriction.reaper,
+        genetic_configuration=throttle_cacher.REAPER_BEST_PATH_CONFIGURATION,
+        distance_axis=LookupAxis(min_value=150, max_value=12000, step=150),
+        speed_axis=LookupAxis(min_value=0, max_value=450, step=50),
+    )
+
+
+def save_throttle_lookup_table(table: ThrottleLookupTable, path: Path | str) -> None:
+    raw_table = {
+        "version": table.version,
+        "mass": table.mass,
+        "friction": table.friction,
+        "genetic_configuration": asdict(table.genetic_configuration),
+        "distance_axis": asdict(table.distance_axis),
+        "speed_axis": asdict(table.speed_axis),
+        "heading_axis": asdict(table.heading_axis) if table.heading_axis else None,
+        "entries": [[*cell_key, entry.fitness, entry.sequence] for cell_key, entry in sorted(table.entries.items())],
+    }
+    with open(path, "w", encoding="utf-8") as table_file:
+        json.dump(raw_table, table_file, separators=(",", ":"))
+
+
+def load_throttle_lookup_table(path: Path | str) -> ThrottleLookupTable:
+    with open(path, "r", encoding="utf-8") as table_file:
+        raw_table = json.load(table_file)
+
+    raw_configuration = raw_table["genetic_configuration"]
+    raw_configuration["throttle_range"] = tuple(raw_configuration["throttle_range"])
+    raw_heading_axis = raw_table.get("heading_axis")
+    table = ThrottleLookupTable(
+        version=raw_table["version"],
+        mass=raw_table["mass"],
+        friction=raw_table["friction"],
+        genetic_configuration=GeneticConfiguration(**raw_configuration),
+        distance_axis=LookupAxis(**raw_table["distance_axis"]),
+        speed_axis=LookupAxis(**raw_table["speed_axis"]),
+        heading_axis=LookupAxis(**raw_heading_axis) if raw_heading_axis else None,
+    )
+    for *cell_key, entry_fitness, sequence in raw_table["entries"]:
+        table.entries[tuple(cell_key)] = ThrottleTableEntry(sequence, entry_fitness)
+    return table
@@ -3,15 +3,21 @@ Module contains functions to optimize the throttle sequence to a reach a given g
 Main entrypoint is the `genetic_algorithm` function
 """
 
+import math
 import random
 import sys
 
 import time
 from dataclasses import dataclass
+from functools import partial
 from typing import Tuple
 
 TIMEOUT_25_MS = 25
 TIMEOUT_1000_MS = 1000
+# below this relative heading (radians) the movement is planned in 1D: the
+# sideways drift of the initial velocity (v0 * sin(heading) * (1 - f) / f) is
+# ~100 units at most for the reaper
+STRAIGHT_HEADING_TOLERANCE = math.radians(5)
 # TODO: create a custom type
 FITNESS_SCORE_TYPE = Tuple[float, float, float, int]
 
@@ -45,12 +51,15 @@ class ThrottleCalculationInput:
     :param mass: mass
     :param friction: friction
     :param d_target: target distance
+    :param relative_heading: angle (radians) of the initial velocity relative
+        to the direction of the target, 0 means the movement is 1D
     """
 
     v0: float
     mass: float
     friction: float
     d_target: float
+    relative_heading: float = 0.0
 
 
 @dataclass
@@ -104,6 +113,7 @@ def find_optimal_throttle_sequence(
     mass = throttle_calculation_input.mass
     friction = throttle_calculation_input.friction
     d_target = throttle_calculation_input.d_target
+    fitness_function = get_fitness_function(throttle_calculation_input)
 
     # Step 1: Initialize the population
     population = generate_initial_population(
@@ -119,7 +129,7 @@ def find_optimal_throttle_sequence(
     for generation in range(genetic_configration.num_generations):
         # Step 2: Calculate fitness for each individual in the population
         fitness_scores: list[FitnessScore] = [
-            fitness(
+            fitness_function(
                 v0,
                 throttles,
                 mass,
@@ -181,6 +191,17 @@ def find_optimal_throttle_sequence(
     return ThrottleSequenceGeneticResult(best_throttle_sequence, best_fitness)
 
 
+def get_fitness_function(throttle_calculation_input: ThrottleCalculationInput):
+    """
+    the 1D `fitness` is enough (and ~2x faster than `heading_fitness`) if the
+    unit moves along the line towards the target, within
+    `STRAIGHT_HEADING_TOLERANCE`
+    """
+    if throttle_calculation_input.relative_heading <= STRAIGHT_HEADING_TOLERANCE:
+        return fitness
+    return partial(heading_fitness, relative_heading=throttle_calculation_input.relative_heading)
+
+
 def calculate_velocity(v0, throttle, m, f):
     """
     Calculate the velocity at time t given the throttle at that time.
@@ -263,6 +284,75 @@ def fitness(
     return FitnessScore(score, distance_diff, speed_penalty, length_penalty)
 
 
+def calculate_heading_final_state(v0, relative_heading, throttles, m, f, d_target):
+    """
+    2D variant of `calculate_total_distance`: the target is at (d_target, 0),
+    the initial velocity points `relative_heading` away from it, and every
+    throttle is applied towards the target (the same as the `x y throttle`
+    command does)
+
+    :return: the final distance to the target and the final speed
+    """
+    x, y = 0.0, 0.0
+    vx = v0 * math.cos(relative_heading)
+    vy = v0 * math.sin(relative_heading)
+
+    for throttle in throttles:
+        dx = d_target - x
+        dy = -y
+        distance = math.sqrt(dx * dx + dy * dy)
+        if distance > 0:
+            acceleration = throttle / m
+            vx += dx / distance * acceleration
+            vy += dy / distance * acceleration
+        vx *= 1 - f
+        vy *= 1 - f
+        x += vx
+        y += vy
+
+    final_distance = math.sqrt((d_target - x) ** 2 + y**2)
+    final_speed = math.sqrt(vx * vx + vy * vy)
+    return final_distance, final_speed
+
+
+def heading_fitness(
+    v0,
+    throttles,
+    m,
+    f,
+    d_target,
+    v_threshold,
+    distance_weight=1.0,
+    speed_weight=2.5,
+    length_weight=0.1,
+    nonzero_weight=0.1,
+    relative_heading=0.0,
+) -> FitnessScore:
+    """
+    Same as `fitness`, but the movement is simulated in 2D, see
+    `calculate_heading_final_state`
+
+    :return: FitnessScore, the distance_diff is the final distance from the target
+    """
+    distance_diff, final_speed = calculate_heading_final_state(v0, relative_heading, throttles, m, f, d_target)
+
+    if 0 <= final_speed <= v_threshold:
+        speed_penalty = 0
+    else:
+        speed_penalty = abs(final_speed - v_threshold)
+
+    length_penalty = len(throttles)
+    nonzero_count = len(throttles) - throttles.count(0)
+    score = (
+        (distance_weight * distance_diff)
+        + (speed_weight * speed_penalty)
+        + (length_weight * length_penalty)
+        + (nonzero_count * nonzero_weight)
+    )
+
+    return FitnessScore(score, distance_diff, speed_penalty, length_penalty)
+
+
 def generate_initial_population(pop_size, max_t, throttle_range):
     """
     Generate an initial population of variable-length throttle sequences.
@@ -3,3 +3,31 @@ class UnitFriction:
     doof = 0.5
     destroyer = 0.3
     tanker = 0.2
+
+
+class UnitMass:
+    reaper = 0.5
+    destroyer = 1.5
+    doof = 1.0
+    tanker_empty = 2.5
+    tanker_per_water = 0.5
+
+
+class UnitRadius:
+    looter = 400
+    tanker_base = 400
+    tanker_per_capacity = 50
+
+
+class UnitThrust:
+    max_looter = 300
+    tanker = 500
+
+
+class UnitSkill:
+    range = 2000
+    radius = 1000
+    duration = 3
+    tar_cost = 30
+    oil_cost = 30
+    grenade_cost = 60
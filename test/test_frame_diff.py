@@ -0,0 +1,39 @@
+from python_prototypes.field_types import Entity, Unit, UnitTable
+from python_prototypes.frame_diff import FrameDiffer
+
+
+def get_reaper(unit_id, x, y) -> Unit:
+    return Unit(x, y, 0, 0, 400, Entity.REAPER.value, 0, unit_id, 0.5, -1, -1)
+
+
+def get_wreck(unit_id, x, y, water) -> Unit:
+    return Unit(x, y, 0, 0, 800, Entity.WRECK.value, -1, unit_id, -1, water, -1)
+
+
+class TestFrameDiffer:
+    def test_first_round_appears(self):
+        frame_diff = FrameDiffer().update(UnitTable.from_units([get_reaper(0, 0, 0)]), {"my_score": 0})
+        assert frame_diff.appeared_ids == [0]
+        assert frame_diff.disappeared_ids == frame_diff.moved_cell_ids == frame_diff.changed_extra_ids == []
+        assert frame_diff.changed_scalars == {"my_score": (None, 0)}
+
+    def test_changes_of_the_round(self):
+        frame_differ = FrameDiffer()
+        frame_differ.update(
+            UnitTable.from_units([get_reaper(0, 0, 0), get_reaper(1, 3000, 0), get_wreck(5, 100, 100, 4)]),
+            {"my_score": 0, "my_rage": 10},
+        )
+        frame_diff = frame_differ.update(
+            UnitTable.from_units([get_reaper(0, 10, 10), get_reaper(1, 4500, 0), get_wreck(6, 0, 0, 2)]),
+            {"my_score": 0, "my_rage": 12},
+        )
+        assert frame_diff.appeared_ids == [6]
+        assert frame_diff.disappeared_ids == [5]
+        # the first reaper stays in its cell
+        assert frame_diff.moved_cell_ids == [1]
+        assert frame_diff.changed_scalars == {"my_rage": (10, 12)}
+
+        frame_diff = frame_differ.update(UnitTable.from_units([get_wreck(6, 0, 0, 1)]), {"my_score": 1, "my_rage": 12})
+        assert frame_diff.changed_extra_ids == [6]
+        assert sorted(frame_diff.disappeared_ids) == [0, 1]
+        assert frame_diff.changed_scalars == {"my_score": (0, 1)}
@@ -0,0 +1,64 @@
+import pytest
+
+from python_prototypes.frame_recorder import (
+    FrameRecorder,
+    get_index_path,
+    iter_recorded_frames,
+    read_frame_index,
+    read_recorded_frame,
+)
+from python_prototypes.round_input import read_recorded_rounds
+from python_prototypes.simulation.referee import GreedyHarvesterBot, LocalReferee, RecordingBot
+
+
+def record_match(round_count=20):
+    recording_bot = RecordingBot(GreedyHarvesterBot())
+    referee = LocalReferee(
+        [recording_bot, GreedyHarvesterBot(), GreedyHarvesterBot()], seed=7, max_round_count=round_count
+    )
+    referee.play_match()
+    return recording_bot.recorded_rounds
+
+
+def get_text_lines(recorded_rounds):
+    return [f"{line}\n" for recorded_round in recorded_rounds for line in recorded_round.to_lines()]
+
+
+def write_log(path, recorded_rounds):
+    with FrameRecorder(path) as frame_recorder:
+        for round_index, recorded_round in enumerate(recorded_rounds):
+            frame_recorder.record(recorded_round.round_input, recorded_round.commands, {"engine": round_index * 1e-3})
+
+
+class TestFrameRecorder:
+    def test_round_trip(self, tmp_path):
+        recorded_rounds = record_match()
+        log_path = tmp_path / "match.bin"
+        write_log(log_path, recorded_rounds)
+
+        read_rounds = list(iter_recorded_frames(log_path))
+        # through the text protocol, the masses are floats there
+        expected_lines = [
+            text_round.to_lines() for text_round in read_recorded_rounds(get_text_lines(recorded_rounds))
+        ]
+        assert [read_round.to_lines() for read_round in read_rounds] == expected_lines
+        assert read_rounds[3].timings["engine"] == pytest.approx(3e-3)
+        assert len(read_frame_index(log_path)) == len(recorded_rounds)
+        assert read_recorded_frame(log_path, 5).to_lines() == expected_lines[5]
+
+    def test_truncated_round_is_dropped(self, tmp_path):
+        recorded_rounds = record_match(round_count=5)
+        log_path = tmp_path / "match.bin"
+        write_log(log_path, recorded_rounds)
+        log_path.write_bytes(log_path.read_bytes()[:-10])
+
+        assert len(list(iter_recorded_frames(log_path))) == len(recorded_rounds) - 1
+        assert get_index_path(log_path).exists()
+        with pytest.raises(IndexError):
+            read_recorded_frame(log_path, -1)
+
+    def test_not_a_log(self, tmp_path):
+        log_path = tmp_path / "match.txt"
+        log_path.write_text("0\n")
+        with pytest.raises(ValueError):
+            list(iter_recorded_frames(log_path))
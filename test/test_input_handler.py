@@ -1,3 +1,17 @@
+import io
+
+import pytest
+
+from python_prototypes.field_types import Entity, GridUnitState, PlayerState, Unit
+from python_prototypes.frame_recorder import FrameRecorder, iter_recorded_frames
+from python_prototypes.input_handler import (
+    BufferCommandSink,
+    GameLoop,
+    StreamCommandSink,
+    iter_recorded_round_inputs,
+    iter_stream_round_inputs,
+)
+from python_prototypes.simulation.referee import EngineBot, GreedyHarvesterBot, LocalReferee, RecordingBot
 from test.real_game_mocks.full_grid_state import (
     ExampleBasicScenarioIncomplete,
 )
@@ -22,3 +36,56 @@ class TestGameInputHandler:
         tanker_grid_state = game_grid_information.tanker_grid_state
         assert len(tanker_grid_state[(2, 0)]) == 1
         assert len(tanker_grid_state[(2, 2)]) == 1
+
+
+class TestPlayerState:
+    def test_gains(self):
+        grid_unit = GridUnitState((0, 0), Unit(0, 0, 0, 0, 400, Entity.REAPER.value, 0, 0, 0.5))
+        assert PlayerState(grid_unit, grid_unit, grid_unit, 10, 20, 4, 15).rage_gained == 6
+        player_state = PlayerState(grid_unit, grid_unit, grid_unit, 10, 20, None, None)
+        assert (player_state.rage_gained, player_state.score_gained) == (0, 0)
+        with pytest.raises(AttributeError):
+            player_state.unknown_field = 1
+
+
+def record_match(round_count=8):
+    recording_bot = RecordingBot(GreedyHarvesterBot())
+    referee = LocalReferee(
+        [recording_bot, GreedyHarvesterBot(), GreedyHarvesterBot()], seed=2, max_round_count=round_count
+    )
+    referee.play_match()
+    return recording_bot.recorded_rounds
+
+
+class TestGameLoop:
+    def test_stream_rounds_until_the_end(self):
+        recorded_rounds = record_match()
+        protocol_bytes = "".join(
+            f"{line}\n" for recorded_round in recorded_rounds for line in recorded_round.round_input.to_lines()
+        ).encode()
+        output = io.StringIO()
+        game_loop = GameLoop(command_sink=StreamCommandSink(output))
+        game_loop.run(iter_stream_round_inputs(io.BytesIO(protocol_bytes)))
+        assert game_loop.round_count == len(recorded_rounds)
+        assert len(output.getvalue().splitlines()) == 3 * len(recorded_rounds)
+
+    def test_recorded_rounds_are_recorded_again(self, tmp_path):
+        recorded_rounds = record_match()
+        text_path = tmp_path / "match.txt"
+        text_path.write_text(
+            "".join(f"{line}\n" for recorded_round in recorded_rounds for line in recorded_round.to_lines())
+        )
+        command_sink = BufferCommandSink()
+        with FrameRecorder(tmp_path / "match.mmf") as frame_recorder:
+            GameLoop(command_sink=command_sink, frame_recorder=frame_recorder).run(
+                iter_recorded_round_inputs(text_path)
+            )
+        log_rounds = list(iter_recorded_frames(tmp_path / "match.mmf"))
+        assert [log_round.commands for log_round in log_rounds] == command_sink.commands
+        assert all(set(log_round.timings) == {"read", "engine"} for log_round in log_rounds)
+        assert len(log_rounds) == len(recorded_rounds)
+
+    def test_referee_plays_through_the_loop(self):
+        engine_bot = EngineBot()
+        LocalReferee([engine_bot, GreedyHarvesterBot(), GreedyHarvesterBot()], seed=2, max_round_count=5).play_match()
+        assert engine_bot.game_loop.round_count == 5
@@ -0,0 +1,45 @@
+import importlib.util
+import subprocess
+import sys
+from pathlib import Path
+
+from merge_to_single_file import merge_files
+from python_prototypes.simulation.referee import GreedyHarvesterBot, LocalReferee, RecordingBot
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1] / "src" / "python_prototypes"
+
+
+def get_protocol_text(round_count=3) -> str:
+    recording_bot = RecordingBot(GreedyHarvesterBot())
+    referee = LocalReferee(
+        [recording_bot, GreedyHarvesterBot(), GreedyHarvesterBot()], seed=4, max_round_count=round_count
+    )
+    referee.play_match()
+    return "".join(
+        f"{line}\n"
+        for recorded_round in recording_bot.recorded_rounds
+        for line in recorded_round.round_input.to_lines()
+    )
+
+
+class TestMergeToSingleFile:
+    def test_merged_solution_plays(self, tmp_path):
+        merged_path = tmp_path / "merged_codingame_solution.py"
+        merge_files(PROJECT_ROOT / "input_handler.py", merged_path, project_root=PROJECT_ROOT)
+        # only the game loop of the entry module may run
+        assert merged_path.read_text(encoding="utf-8").count('if __name__ == "__main__":') == 1
+
+        module_spec = importlib.util.spec_from_file_location("merged_codingame_solution", merged_path)
+        merged_module = importlib.util.module_from_spec(module_spec)
+        module_spec.loader.exec_module(merged_module)
+        assert hasattr(merged_module, "GameLoop")
+
+        completed_process = subprocess.run(
+            [sys.executable, str(merged_path)],
+            input=get_protocol_text(),
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        assert completed_process.returncode == 0, completed_process.stderr[-2000:]
+        assert len(completed_process.stdout.splitlines()) == 3 * 3
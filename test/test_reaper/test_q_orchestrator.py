@@ -1,5 +1,6 @@
 import pytest
 
+from python_prototypes.field_types import Entity, GameGridInformation, GridUnitState, Unit
 from python_prototypes.reaper.exception_types import ImpossibleTarget
 from python_prototypes.reaper.q_orchestrator import ReaperGameState
 from python_prototypes.reaper.q_state_types import (
@@ -8,6 +9,8 @@ from python_prototypes.reaper.q_state_types import (
     get_default_enemies_relation,
     ReaperActionTypes,
 )
+from python_prototypes.simulation.intercept_solver import get_intercepts
+from python_prototypes.simulation.rollout_evaluator import RolloutEvaluator
 
 
 class TestReaperGameStateInitializeNewTarget:
@@ -45,3 +48,91 @@ class TestReaperGameStateInitializeNewTarget:
         assert isinstance(reaper_game_state.current_goal_type, ReaperActionTypes)
         assert reaper_game_state.target_tracker is not None
         assert reaper_game_state.target_tracker.steps_taken == 0
+
+
+class TestReaperGameStateRamTargets:
+    def test_ram_targets_are_ranked_by_interception(self):
+        player_reaper_relation = get_default_enemies_relation()
+        player_reaper_relation[("close", "close")] = [7, 8]
+        player_reaper_relation[("close", "medium")] = [9]
+        reaper_q_state = ReaperQState(
+            water_reaper_relation=get_default_water_relations(),
+            water_other_relation=get_default_water_relations(),
+            tanker_enemy_relation=get_default_enemies_relation(),
+            player_reaper_relation=player_reaper_relation,
+            player_other_relation=get_default_enemies_relation(),
+            super_power_available=False,
+            reaper_water_relation={},
+            other_water_relation={},
+            tanker_id_enemy_category_relation={},
+            reaper_id_category_relation={},
+            other_id_category_mapping={},
+        )
+        reaper_game_state = ReaperGameState()
+        goal_type = ReaperActionTypes.ram_reaper_close
+        # without intercept estimates the order of the selectors is kept
+        reachable_targets = reaper_game_state.get_reachable_ram_targets(reaper_q_state, goal_type)
+        assert [target.id for target in reachable_targets] == [7, 8, 9]
+
+        chaser = Unit(0, 0, 0, 0, 400, Entity.REAPER.value, 0, 1, 0.5)
+        enemies = [
+            Unit(3000, 0, 0, 0, 400, Entity.REAPER.value, 1, 7, 0.5),
+            Unit(1500, 0, 0, 0, 400, Entity.REAPER.value, 2, 8, 0.5),
+        ]
+        # the enemy 9 is not known by the intercept estimates
+        reaper_game_state.enemy_motion_predictor.intercepts = get_intercepts(chaser, enemies)
+        reachable_targets = reaper_game_state.get_reachable_ram_targets(reaper_q_state, goal_type)
+        assert [target.id for target in reachable_targets] == [8, 7]
+        assert reaper_game_state.is_goal_possible(reaper_q_state, goal_type)
+        reaper_game_state.initialize_new_target(goal_type, reaper_q_state)
+        assert reaper_game_state.current_target_info.id == 8
+
+
+class TestReaperGameStateRollouts:
+    def test_rollout_picks_among_the_best_candidates(self):
+        water_reaper_relation = get_default_water_relations()
+        water_reaper_relation[("far", "safe")] = [11]
+        water_reaper_relation[("close", "safe")] = [10]
+        reaper_q_state = ReaperQState(
+            water_reaper_relation=water_reaper_relation,
+            water_other_relation=get_default_water_relations(),
+            tanker_enemy_relation=get_default_enemies_relation(),
+            player_reaper_relation=get_default_enemies_relation(),
+            player_other_relation=get_default_enemies_relation(),
+            super_power_available=False,
+            reaper_water_relation={},
+            other_water_relation={},
+            tanker_id_enemy_category_relation={},
+            reaper_id_category_relation={},
+            other_id_category_mapping={},
+        )
+        reaper_game_state = ReaperGameState()
+        reaper_game_state.exploration_rate = 0
+        candidates = reaper_game_state.get_rollout_candidates(reaper_q_state)
+        assert [(goal_type, target.id) for goal_type, target in candidates] == [
+            (ReaperActionTypes.harvest_safe, 10),
+            (ReaperActionTypes.harvest_safe, 11),
+        ]
+        # no evaluator, the usual initialization applies
+        assert reaper_game_state.initialize_new_goal_and_target_by_rollout(reaper_q_state) is None
+
+        # the rollouts can't evaluate waiting, the best goal is not replaced by a harvest
+        reaper_q_action_weights = reaper_game_state._q_table[reaper_q_state]
+        reaper_q_action_weights.inner_weigths_dict[ReaperActionTypes.wait] = 1000
+        assert reaper_game_state.get_rollout_candidates(reaper_q_state) == []
+        reaper_q_action_weights.inner_weigths_dict[ReaperActionTypes.wait] = -1000
+
+        units = [
+            Unit(0, 0, 0, 0, 400, Entity.REAPER.value, 0, 0, 0.5),
+            Unit(0, -5000, 0, 0, 600, Entity.WRECK.value, -1, 10, -1, 5, -1),
+            Unit(1500, 0, 0, 0, 600, Entity.WRECK.value, -1, 11, -1, 5, -1),
+        ]
+        game_grid_information = GameGridInformation(*[{} for _ in range(11)])
+        game_grid_information.full_grid_state = {(0, 0): [GridUnitState((0, 0), unit) for unit in units]}
+        reaper_game_state.state_arena.load_grid(game_grid_information)
+        reaper_game_state.rollout_evaluator = RolloutEvaluator(rollout_count=2, seed=0)
+        goal_type, target = reaper_game_state.initialize_new_goal_and_target_by_rollout(reaper_q_state)
+        # the far relation is the closer wreck in this made up state
+        assert (goal_type, target.id) == (ReaperActionTypes.harvest_safe, 11)
+        assert reaper_game_state.current_goal_type == ReaperActionTypes.harvest_safe
+        assert reaper_game_state.current_target_info.id == 11
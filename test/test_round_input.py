@@ -0,0 +1,152 @@
+import io
+import subprocess
+import sys
+
+import pytest
+
+from python_prototypes.field_types import UNIT_CATEGORIES, Entity, GameGridInformation, UnitCategory, UnitTable
+from python_prototypes.round_input import parse_unit_block, parse_unit_line, read_round_input_from_buffer
+from python_prototypes.simulation.referee import GreedyHarvesterBot, LocalReferee, RecordingBot
+from python_prototypes.simulation.state import SimulationState
+from test.real_game_mocks.full_grid_state import ExampleBasicScenarioIncomplete
+
+
+def get_recorded_round_inputs(round_count=20):
+    recording_bot = RecordingBot(GreedyHarvesterBot())
+    referee = LocalReferee(
+        [recording_bot, GreedyHarvesterBot(), GreedyHarvesterBot()], seed=5, max_round_count=round_count
+    )
+    referee.play_match()
+    return [recorded_round.round_input for recorded_round in recording_bot.recorded_rounds]
+
+
+def get_unit_values(unit):
+    return tuple(getattr(unit, column_name) for column_name in UnitTable.COLUMNS)
+
+
+class TestFrameReader:
+    def test_rounds_are_read_like_line_by_line(self):
+        round_inputs = get_recorded_round_inputs()
+        stream = io.BytesIO(
+            "".join(f"{line}\n" for round_input in round_inputs for line in round_input.to_lines()).encode()
+        )
+        for round_input in round_inputs:
+            read_round_input = read_round_input_from_buffer(stream)
+            assert read_round_input.my_score == round_input.my_score
+            assert read_round_input.enemy_2_rage == round_input.enemy_2_rage
+            unit_lines = round_input.to_lines()[7:]
+            assert [get_unit_values(unit) for unit in read_round_input.units] == [
+                get_unit_values(parse_unit_line(line)) for line in unit_lines
+            ]
+        with pytest.raises(EOFError):
+            read_round_input_from_buffer(stream)
+
+    def test_unit_values_keep_their_types(self):
+        unit = parse_unit_block(b"7 4 -1 -1.0 600 -100 200 0 0 3 -1\n", 1).get_units()[0]
+        assert (unit.unit_id, unit.unit_type, unit.player, unit.x, unit.y, unit.extra) == (7, 4, -1, -100, 200, 3)
+        assert isinstance(unit.mass, float) and isinstance(unit.radius, int)
+
+    def test_missing_values_are_rejected(self):
+        with pytest.raises(ValueError):
+            parse_unit_block(b"7 4 -1 -1.0 600 -100 200 0 0 3\n", 1)
+
+    def test_readers_need_only_the_standard_library(self):
+        # a fresh interpreter, the test session has the engine imported already
+        completed_process = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys; import python_prototypes.frame_recorder; "
+                "print(sorted({'numpy', 'python_prototypes.main_game_engine'} & set(sys.modules)))",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert completed_process.stdout.strip() == "[]"
+
+
+class TestUnitTable:
+    def test_columns_and_indices(self):
+        unit_table = parse_unit_block(
+            b"0 0 0 0.5 400 100 200 3 4 -1 -1\n"
+            b"1 0 1 0.5 400 -100 200 0 0 -1 -1\n"
+            b"2 4 -1 -1.0 600 0 0 0 0 5 -1\n",
+            3,
+        )
+        assert len(unit_table) == 3
+        assert list(unit_table.x) == [100, -100, 0] and list(unit_table.mass) == [0.5, 0.5, -1.0]
+        assert list(unit_table.get_indices(Entity.REAPER.value)) == [0, 1]
+        assert list(unit_table.get_indices(Entity.REAPER.value, is_player=False)) == [1]
+        assert list(unit_table.get_indices(Entity.TANKER.value)) == []
+        # the units are created once
+        assert unit_table.get_units([2])[0] is unit_table.get_units()[2]
+        assert unit_table.get_units([2])[0].extra == 5
+
+    def test_grid_information_view(self):
+        game_grid_information = ExampleBasicScenarioIncomplete.get_example_full_grid_state()
+        unit_table = game_grid_information.get_unit_table()
+        unit_ids = [
+            grid_unit.unit.unit_id
+            for grid_units in game_grid_information.full_grid_state.values()
+            for grid_unit in grid_units
+        ]
+        assert sorted(unit_table.unit_id) == sorted(unit_ids)
+        state = SimulationState.from_grid_information(game_grid_information)
+        assert state.x.tolist() == list(unit_table.x)
+
+
+class TestUnitCategories:
+    def test_categories(self):
+        assert UNIT_CATEGORIES[(Entity.REAPER.value, True)] == UnitCategory.PLAYER_LOOTER
+        assert UNIT_CATEGORIES[(Entity.DOOF.value, False)] == UnitCategory.ENEMY_OTHER
+        assert UNIT_CATEGORIES[(Entity.OIL_POOL.value, True)] == UNIT_CATEGORIES[(Entity.OIL_POOL.value, False)]
+        assert (Entity.TAR_POOL.value, False) not in UNIT_CATEGORIES
+
+    def test_player_tankers_are_tankers(self):
+        unit_table = parse_unit_block(
+            b"0 0 0 0.5 400 100 200 3 4 -1 -1\n"
+            b"1 3 0 2.5 600 -100 200 0 0 2 4\n"
+            b"2 3 -1 2.5 600 1000 200 0 0 2 4\n"
+            b"3 4 0 -1.0 600 0 0 0 0 5 -1\n",
+            4,
+        )
+        assert list(unit_table.get_category_indices(UnitCategory.TANKER)) == [1, 2]
+        assert list(unit_table.get_category_indices(UnitCategory.WRECK)) == [3]
+        assert list(unit_table.get_category_indices(UnitCategory.OTHER)) == []
+
+
+class TestLazyGridViews:
+    def test_views_are_computed_on_access(self):
+        unit_table = parse_unit_block(
+            b"0 0 0 0.5 400 100 200 3 4 -1 -1\n"
+            b"1 0 1 0.5 400 -100 200 0 0 -1 -1\n"
+            b"2 4 -1 -1.0 600 0 0 0 0 5 -1\n"
+            b"3 2 2 1.0 400 5000 0 0 0 -1 -1\n",
+            4,
+        )
+        game_grid_information = GameGridInformation(unit_table=unit_table)
+        assert "full_grid_state" not in vars(game_grid_information)
+
+        wreck_grid_units = [
+            grid_unit for grid_units in game_grid_information.wreck_grid_state.values() for grid_unit in grid_units
+        ]
+        assert [grid_unit.unit.unit_id for grid_unit in wreck_grid_units] == [2]
+        assert game_grid_information.wreck_id_to_grid_coord == {2: wreck_grid_units[0].grid_coordinate}
+        assert game_grid_information.tanker_grid_state[(0, 0)] == []
+        assert list(game_grid_information.enemy_reaper_id_to_grid_coord) == [1]
+        assert list(game_grid_information.player_looters) == [Entity.REAPER]
+        assert game_grid_information.enemy_id_to_entities[2][Entity.DOOF].unit.unit_id == 3
+        # the views share the grid units
+        full_grid_units = [
+            grid_unit for grid_units in game_grid_information.full_grid_state.values() for grid_unit in grid_units
+        ]
+        assert wreck_grid_units[0] in full_grid_units and len(full_grid_units) == 4
+        assert "oil_pool_grid_state" not in vars(game_grid_information)
+
+    def test_given_views_are_kept(self):
+        wreck_grid_state = {(1, 1): []}
+        game_grid_information = GameGridInformation({}, wreck_grid_state)
+        assert game_grid_information.wreck_grid_state is wreck_grid_state
+        assert game_grid_information.tanker_id_to_grid_coord == {}
+        assert len(game_grid_information.get_unit_table()) == 0
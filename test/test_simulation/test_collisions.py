@@ -0,0 +1,119 @@
+import itertools
+
+import numpy as np
+
+from python_prototypes.field_tools import PLAYFIELD_RADIUS
+from python_prototypes.field_types import Unit, Entity
+from python_prototypes.simulation.collisions import (
+    get_collision_time,
+    get_collision_times,
+    get_candidate_pairs,
+    move_with_collisions,
+)
+from python_prototypes.simulation.state import SimulationState
+
+
+def get_head_on_state() -> SimulationState:
+    return SimulationState.from_units(
+        [
+            Unit(-700, 0, 450, 0, 400, Entity.REAPER.value, player=0, unit_id=0, mass=0.5),
+            Unit(700, 0, -450, 0, 400, Entity.REAPER.value, player=1, unit_id=1, mass=0.5),
+            Unit(0, 3000, 0, 0, 400, Entity.DESTROYER.value, player=2, unit_id=2, mass=1.5),
+        ]
+    )
+
+
+class TestCollisionTime:
+    def test_head_on(self):
+        # the gap of 600 closes with 900 per round
+        assert np.isclose(get_collision_time(-700, 0, 450, 0, 400, 700, 0, -450, 0, 400), 2 / 3)
+
+    def test_missing_and_separating(self):
+        assert get_collision_time(-1000, 0, 300, 0, 400, 1000, 1000, -300, 0, 400) is None
+        assert get_collision_time(-1000, 0, -300, 0, 400, 1000, 0, 300, 0, 400) is None
+        assert get_collision_time(0, 0, 0, 0, 400, 500, 0, -10, 0, 400) == 0.0
+
+    def test_vectorized_matches_scalar(self):
+        rng = np.random.default_rng(7)
+        values = rng.uniform(-2000, 2000, size=(200, 4))
+        velocities = rng.uniform(-500, 500, size=(200, 4))
+        times = get_collision_times(
+            values[:, 2] - values[:, 0],
+            values[:, 3] - values[:, 1],
+            velocities[:, 2] - velocities[:, 0],
+            velocities[:, 3] - velocities[:, 1],
+            np.full(200, 800.0),
+        )
+        for index in range(200):
+            x1, y1, x2, y2 = values[index]
+            vx1, vy1, vx2, vy2 = velocities[index]
+            scalar_time = get_collision_time(x1, y1, vx1, vy1, 400, x2, y2, vx2, vy2, 400)
+            if scalar_time is None:
+                assert np.isinf(times[index])
+            else:
+                assert np.isclose(times[index], scalar_time)
+
+
+class TestBroadPhase:
+    def test_candidate_pairs_contain_every_colliding_pair(self):
+        rng = np.random.default_rng(3)
+        batch_count, unit_count = 8, 12
+        x = rng.uniform(-5000, 5000, size=(batch_count, unit_count))
+        y = rng.uniform(-5000, 5000, size=(batch_count, unit_count))
+        vx = rng.uniform(-600, 600, size=(batch_count, unit_count))
+        vy = rng.uniform(-600, 600, size=(batch_count, unit_count))
+        radius = np.full((batch_count, unit_count), 400.0)
+        is_collidable = np.ones((batch_count, unit_count), dtype=bool)
+
+        candidates = set(zip(*(array.tolist() for array in get_candidate_pairs(
+            x, y, vx, vy, radius, is_collidable, np.ones(batch_count)
+        ))))
+        for batch, (first, second) in itertools.product(range(batch_count), itertools.combinations(range(unit_count), 2)):
+            collision_time = get_collision_time(
+                x[batch, first], y[batch, first], vx[batch, first], vy[batch, first], 400,
+                x[batch, second], y[batch, second], vx[batch, second], vy[batch, second], 400,
+            )
+            if collision_time is not None and collision_time <= 1:
+                assert (batch, first, second) in candidates
+
+
+class TestMoveWithCollisions:
+    def test_head_on_bounce(self):
+        state = get_head_on_state()
+        resolved_collision_count = move_with_collisions(state)
+
+        assert resolved_collision_count == 1
+        # equal masses: they bounce back with the same speed
+        assert state.vx[0] < 0 < state.vx[1]
+        assert np.isclose(state.vx[0], -state.vx[1])
+        assert np.hypot(state.x[1] - state.x[0], state.y[1] - state.y[0]) >= 800 - 1e-6
+        assert state.x[2] == 0 and state.y[2] == 3000
+
+    def test_the_round_is_finished_without_collisions_left(self):
+        state = get_head_on_state()
+        move_with_collisions(state)
+        limited_state = get_head_on_state()
+        assert move_with_collisions(limited_state, max_collisions=1) == 1
+        assert np.allclose(limited_state.x, state.x) and np.allclose(limited_state.y, state.y)
+
+        # the bounce is skipped, but the units still move for the whole round
+        uncollided_state = get_head_on_state()
+        assert move_with_collisions(uncollided_state, max_collisions=0) == 0
+        assert np.allclose(uncollided_state.x[:2], [-250, 250])
+
+    def test_border_bounce(self):
+        state = SimulationState.from_units(
+            [Unit(PLAYFIELD_RADIUS - 500, 0, 400, 0, 400, Entity.REAPER.value, player=0, unit_id=0, mass=0.5)]
+        )
+        move_with_collisions(state)
+        assert state.vx[0] < 0
+        assert state.x[0] <= PLAYFIELD_RADIUS - 400
+
+    def test_batched_rollouts_resolve_independently(self):
+        batched_state = get_head_on_state().repeat(4)
+        # the second rollout has no collision at all
+        batched_state.vx[1] = 0.0
+        move_with_collisions(batched_state)
+        assert batched_state.vx[0, 0] < 0
+        assert batched_state.vx[1, 0] == 0.0
+        assert np.array_equal(batched_state.vx[0], batched_state.vx[3])
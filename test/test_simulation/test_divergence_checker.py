@@ -0,0 +1,61 @@
+from python_prototypes.field_types import Entity
+from python_prototypes.frame_recorder import FrameRecorder
+from python_prototypes.round_input import RecordedRound, read_recorded_rounds
+from python_prototypes.simulation.divergence_checker import (
+    DivergenceReport,
+    check_recordings,
+    iter_recording_divergences,
+)
+from python_prototypes.simulation.referee import GreedyHarvesterBot, LocalReferee, RecordingBot, WaitBot
+
+
+def record_match(enemy_bot_type, round_count=30) -> list[RecordedRound]:
+    recording_bot = RecordingBot(GreedyHarvesterBot())
+    referee = LocalReferee([recording_bot, enemy_bot_type(), enemy_bot_type()], seed=3, max_round_count=round_count)
+    referee.play_match()
+    return recording_bot.recorded_rounds
+
+
+class TestDivergenceChecker:
+    def test_recording_round_trip(self):
+        recorded_rounds = record_match(WaitBot, round_count=3)
+        lines = [line for recorded_round in recorded_rounds for line in recorded_round.to_lines()]
+        read_rounds = list(read_recorded_rounds(f"{line}\n" for line in lines))
+        assert [read_round.to_lines() for read_round in read_rounds] == [
+            recorded_round.to_lines() for recorded_round in recorded_rounds
+        ]
+
+    def test_referee_games_are_reproduced(self):
+        report = DivergenceReport()
+        for divergences in iter_recording_divergences(record_match(WaitBot)):
+            report.add_round(divergences)
+        assert report.round_count == 29
+        # the waiting enemies drift, like in the simulation
+        assert all(stats.exact_count == stats.count for stats in report.stats.values())
+        assert (Entity.REAPER.value, True) in report.stats and (Entity.REAPER.value, False) in report.stats
+
+    def test_moving_enemies_diverge(self, tmp_path):
+        recording_path = tmp_path / "recording.txt"
+        recording_path.write_text(
+            "\n".join(line for recorded_round in record_match(GreedyHarvesterBot) for line in recorded_round.to_lines())
+        )
+        report = check_recordings([recording_path, recording_path])
+        assert report.round_count == 2 * 29
+        enemy_reaper_stats = report.stats[(Entity.REAPER.value, False)]
+        assert enemy_reaper_stats.position_error_max > 0
+        assert len(report.format_lines()) == 1 + len(report.stats)
+
+    def test_frame_logs_are_checked(self, tmp_path):
+        recorded_rounds = record_match(GreedyHarvesterBot)
+        recording_path = tmp_path / "recording.txt"
+        recording_path.write_text(
+            "\n".join(line for recorded_round in recorded_rounds for line in recorded_round.to_lines())
+        )
+        log_path = tmp_path / "recording.mmf"
+        with FrameRecorder(log_path) as frame_recorder:
+            for recorded_round in recorded_rounds:
+                frame_recorder.record(recorded_round.round_input, recorded_round.commands)
+
+        log_report = check_recordings([log_path])
+        assert log_report.round_count == 29
+        assert log_report.format_lines() == check_recordings([recording_path]).format_lines()
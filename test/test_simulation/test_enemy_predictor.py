@@ -0,0 +1,114 @@
+import numpy as np
+
+from python_prototypes.field_tools import get_grid_position
+from python_prototypes.field_types import Entity, GridUnitState, Unit
+from python_prototypes.reaper.input_to_q_state import get_predicted_grid_coordinates
+from python_prototypes.reaper.target_tracker_determiner import DynamicTargetTracker
+from python_prototypes.simulation.enemy_predictor import (
+    EnemyMotionPrediction,
+    EnemyMotionPredictor,
+    predict_unit_motion,
+)
+from python_prototypes.unit_parameters import UnitFriction
+from test.real_game_mocks.full_grid_state import ExampleBasicScenarioIncomplete
+
+
+def get_drifting_units() -> list[Unit]:
+    return [
+        Unit(0, 0, 300, -100, 400, Entity.REAPER.value, player=1, unit_id=7, mass=0.5),
+        Unit(1000, 2000, -200, 50, 400, Entity.DESTROYER.value, player=2, unit_id=8, mass=1.5),
+    ]
+
+
+def get_enemy_units(game_grid_information) -> list[Unit]:
+    return [
+        grid_unit.unit
+        for grid_state in (game_grid_information.enemy_reaper_grid_state, game_grid_information.enemy_others_grid_state)
+        for grid_units in grid_state.values()
+        for grid_unit in grid_units
+    ]
+
+
+class TestPredictUnitMotion:
+    def test_closed_form_matches_stepping(self):
+        units = get_drifting_units()
+        prediction = predict_unit_motion(units, round_count=6)
+
+        for unit, friction in zip(units, (UnitFriction.reaper, UnitFriction.destroyer)):
+            x, y, vx, vy = unit.x, unit.y, unit.vx, unit.vy
+            for rounds_ahead in range(1, 7):
+                x, y = x + vx, y + vy
+                vx, vy = vx * (1 - friction), vy * (1 - friction)
+                assert np.allclose(prediction.get_position(unit.unit_id, rounds_ahead), (x, y))
+
+    def test_rounds_are_clipped(self):
+        prediction = predict_unit_motion(get_drifting_units(), round_count=3)
+        assert prediction.get_position(7, 0) == (0.0, 0.0)
+        assert prediction.get_position(7, 50) == prediction.get_position(7, 3)
+
+
+
+class TestEnemyMotionPredictor:
+    def test_intercept_leads_the_target(self):
+        predictor = EnemyMotionPredictor(round_count=10)
+        chaser = Unit(-3000, 0, 0, 0, 400, Entity.REAPER.value, player=0, unit_id=1, mass=0.5)
+        target = Unit(0, 0, 0, 400, 400, Entity.REAPER.value, player=1, unit_id=7, mass=0.5)
+        predictor.prediction = predict_unit_motion([target], predictor.round_count)
+
+        intercept_x, intercept_y = predictor.get_intercept_coordinate(chaser, target)
+        assert intercept_x == 0 and intercept_y > 400
+        # same answer within the round, even if the units are changed
+        target.vy = 0
+        assert predictor.get_intercept_coordinate(chaser, target) == (intercept_x, intercept_y)
+
+    def test_update_predicts_the_enemies(self):
+        game_grid_information = ExampleBasicScenarioIncomplete.get_example_full_grid_state()
+        predictor = EnemyMotionPredictor()
+        prediction = predictor.update(game_grid_information)
+
+        enemy_ids = set(game_grid_information.enemy_reaper_id_to_grid_coord) | set(
+            game_grid_information.enemy_others_id_to_grid_coord
+        )
+        assert set(prediction.unit_ids.tolist()) == enemy_ids
+        tanker = next(iter(game_grid_information.tanker_grid_state.values()))[0].unit
+        assert predictor.get_intercept_coordinate(tanker, tanker) == (tanker.x, tanker.y)
+
+    def test_aims_at_the_ranked_intercept(self):
+        game_grid_information = ExampleBasicScenarioIncomplete.get_example_full_grid_state()
+        reaper = game_grid_information.player_looters[Entity.REAPER].unit
+        predictor = EnemyMotionPredictor()
+        predictor.update(game_grid_information, chaser_unit=reaper)
+
+        enemy_units = get_enemy_units(game_grid_information)
+        assert predictor.intercepts.unit_ids.tolist() == [unit.unit_id for unit in enemy_units]
+        for target in enemy_units:
+            x, y = predictor.intercepts.get_coordinate(target.unit_id)
+            assert predictor.get_intercept_coordinate(reaper, target) == (round(x), round(y))
+
+
+class TestPredictionConsumers:
+    def test_q_state_categorizes_the_predicted_positions(self):
+        units = get_drifting_units()
+        prediction = predict_unit_motion(units)
+        enemy_id_to_grid_coord = {7: get_grid_position((0, 0)), 99: (1, 1)}
+
+        predicted_id_to_grid_coord = get_predicted_grid_coordinates(enemy_id_to_grid_coord, prediction)
+        assert predicted_id_to_grid_coord[7] == get_grid_position((300, -100))
+        # no prediction for the unit
+        assert predicted_id_to_grid_coord[99] == (1, 1)
+        assert get_predicted_grid_coordinates(enemy_id_to_grid_coord, None) is enemy_id_to_grid_coord
+
+    def test_tracker_moves_the_target_as_predicted(self):
+        player = Unit(0, 0, 0, 0, 400, Entity.REAPER.value, player=0, unit_id=1, mass=0.5)
+        target = Unit(2000, 0, 0, 0, 400, Entity.REAPER.value, player=1, unit_id=7, mass=0.5)
+        player_grid_unit = GridUnitState(get_grid_position((player.x, player.y)), player)
+        target_grid_unit = GridUnitState(get_grid_position((target.x, target.y)), target)
+        # the target stands still, but it is predicted to come at the player
+        prediction = EnemyMotionPrediction(np.array([7]), x=np.array([[2000.0], [700.0]]), y=np.zeros((2, 1)))
+
+        tracker = DynamicTargetTracker()
+        tracker.track(player_grid_unit, target_grid_unit)
+        assert not tracker.is_within_collision_radius()
+        tracker.track(player_grid_unit, target_grid_unit, prediction)
+        assert tracker.is_within_collision_radius()
+        assert tracker.is_moving_towards_target()
@@ -0,0 +1,82 @@
+import random
+
+from python_prototypes.field_types import Entity, Unit
+from python_prototypes.simulation.harvest_tour import HarvestTourPlanner, get_reach_table, plan_harvest_tour
+from python_prototypes.simulation.water_extraction import WaterExtractionMap
+
+
+def get_wreck(unit_id, x, y, radius=600, water=3) -> Unit:
+    return Unit(x, y, 0, 0, radius, Entity.WRECK.value, -1, unit_id, -1, water, -1)
+
+
+def get_reaper(x=0, y=0, vx=0, vy=0) -> Unit:
+    return Unit(x, y, vx, vy, 400, Entity.REAPER.value, 0, 0, 0.5)
+
+
+def get_water_extraction_map(wrecks: list[Unit]) -> WaterExtractionMap:
+    water_extraction_map = WaterExtractionMap()
+    water_extraction_map.set_units(wrecks)
+    return water_extraction_map
+
+
+class TestHarvestTour:
+    def test_reach_table_is_increasing(self):
+        reach_table = get_reach_table(10)
+        assert reach_table[0] == 0 and reach_table[1] == 600
+        assert (reach_table[1:] > reach_table[:-1]).all()
+
+    def test_close_wrecks_are_chained(self):
+        water_extraction_map = get_water_extraction_map(
+            [
+                get_wreck(1, 4000, 0, water=2),
+                get_wreck(2, 1500, 0, water=2),
+                get_wreck(3, -4000, 0, water=2),
+            ]
+        )
+        tour = plan_harvest_tour(get_reaper(), water_extraction_map, max_stop_count=3)
+        assert [stop.wreck_ids for stop in tour.stops] == [[2], [1], [3]]
+        assert tour.water == 6
+        assert tour.stops[0].arrival_round == 2
+        assert tour.stops[1].arrival_round > tour.stops[0].arrival_round + tour.stops[0].stay_round_count - 1
+
+    def test_overlap_is_harvested_once(self):
+        water_extraction_map = get_water_extraction_map(
+            [get_wreck(1, 2000, 0, water=3), get_wreck(2, 2800, 0, water=3)]
+        )
+        tour = plan_harvest_tour(get_reaper(), water_extraction_map)
+        # both wrecks at once, nothing is left for the other stops
+        assert [sorted(stop.wreck_ids) for stop in tour.stops] == [[1, 2]]
+        assert tour.water == 6 and tour.stops[0].stay_round_count == 3
+
+    def test_first_stop_is_restricted(self):
+        water_extraction_map = get_water_extraction_map([get_wreck(1, 1500, 0), get_wreck(2, 4000, 0)])
+        tour = plan_harvest_tour(get_reaper(), water_extraction_map, first_wreck_ids=[2])
+        assert tour.stops[0].wreck_ids == [2]
+        assert plan_harvest_tour(get_reaper(), get_water_extraction_map([])).stops == []
+
+    def test_tour_is_followed(self):
+        wrecks = [get_wreck(1, 1500, 0), get_wreck(2, 4000, 0), get_wreck(3, -4000, 0)]
+        water_extraction_map = get_water_extraction_map(wrecks)
+        planner = HarvestTourPlanner()
+        assert planner.select_wreck(get_reaper(), water_extraction_map, [1, 2, 3]) == 1
+        assert len(planner.tour.stops) == 3
+        assert planner.get_stop_coordinate(1) == (1500, 0)
+        assert planner.get_stop_coordinate(2) is None
+        # a failed harvest goes back to the same stop
+        assert planner.select_wreck(get_reaper(500, 0), water_extraction_map, [1, 2, 3]) == 1
+        # the next stop is taken from the cached tour
+        planner.complete_stop()
+        assert planner.select_wreck(get_reaper(1500, 0), water_extraction_map, [1, 2, 3]) == 2
+        # unless the goal doesn't allow it
+        assert planner.select_wreck(get_reaper(4000, 0), water_extraction_map, [1]) == 1
+
+    def test_dozens_of_wrecks_are_planned(self):
+        generator = random.Random(0)
+        wrecks = [
+            get_wreck(unit_id, *(generator.randint(-5000, 5000) for _ in range(2)), water=generator.randint(1, 9))
+            for unit_id in range(40)
+        ]
+        water_extraction_map = get_water_extraction_map(wrecks)
+        tour = plan_harvest_tour(get_reaper(), water_extraction_map)
+        assert 2 <= len(tour.stops) <= 4
+        assert tour.round_count <= 40
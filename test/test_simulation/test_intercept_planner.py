@@ -0,0 +1,61 @@
+import numpy as np
+
+from python_prototypes.field_types import Entity, Unit
+from python_prototypes.reaper.path_planner import CommandPath, InterceptPathPlanner
+from python_prototypes.simulation.enemy_predictor import predict_unit_motion
+from python_prototypes.simulation.intercept_planner import get_aim_points, plan_intercept
+from python_prototypes.simulation.physics import UnitCommands, step
+from python_prototypes.simulation.state import SimulationState
+
+
+def get_chaser() -> Unit:
+    return Unit(-3000, 0, 0, 0, 400, Entity.REAPER.value, player=0, unit_id=1, mass=0.5)
+
+
+def get_target_trajectory(round_count=10) -> tuple[np.ndarray, np.ndarray]:
+    target = Unit(0, -1000, 0, 700, 400, Entity.REAPER.value, player=1, unit_id=7, mass=0.5)
+    return predict_unit_motion([target], round_count).get_trajectory(7)
+
+
+class TestPlanIntercept:
+    def test_aim_points(self):
+        target_x, target_y = np.arange(4.0), np.zeros(4)
+        aim_x, _ = get_aim_points(target_x, target_y)
+        # 3 fixed aim rounds and 3 pursuit leads
+        assert aim_x.shape == (6, 3)
+        assert aim_x[0].tolist() == [1, 1, 1]
+        assert aim_x[3].tolist() == [1, 2, 3]
+
+    def test_plan_reaches_the_moving_target(self):
+        target_x, target_y = get_target_trajectory()
+        intercept_plan = plan_intercept(get_chaser(), target_x, target_y, contact_distance=800)
+        assert intercept_plan.intercept_round is not None
+        assert len(intercept_plan.commands) == intercept_plan.intercept_round
+        assert intercept_plan.expected_target_positions[0] == (0, -1000)
+
+        # replaying the commands ends in contact with the predicted target
+        state = SimulationState.from_units([get_chaser()])
+        for x, y, throttle in intercept_plan.commands:
+            step(state, UnitCommands(np.array([x], float), np.array([y], float), np.array([throttle], float)))
+        intercept_round = intercept_plan.intercept_round
+        distance = np.hypot(state.x[0] - target_x[intercept_round], state.y[0] - target_y[intercept_round])
+        assert distance <= 800
+
+    def test_unreachable_target_gets_closest(self):
+        target_x, target_y = get_target_trajectory(round_count=2)
+        intercept_plan = plan_intercept(get_chaser(), target_x, target_y, contact_distance=800)
+        assert intercept_plan.intercept_round is None
+        assert 1 <= len(intercept_plan.commands) <= 2
+
+
+class TestCommandPath:
+    def test_commands_and_prediction(self):
+        target_x, target_y = get_target_trajectory()
+        command_path = InterceptPathPlanner().get_command_path(get_chaser(), target_x, target_y, 800)
+        assert isinstance(command_path, CommandPath)
+        first_command = (*command_path.coordinates[0], command_path.sequence[0])
+
+        assert command_path.get_next_step() == first_command[2]
+        assert command_path.current_coordinate == first_command[:2]
+        assert command_path.is_prediction_holding(target_x[1], target_y[1], tolerance=50)
+        assert not command_path.is_prediction_holding(target_x[1] + 500, target_y[1], tolerance=50)
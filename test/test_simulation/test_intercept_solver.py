@@ -0,0 +1,95 @@
+import math
+
+import numpy as np
+import pytest
+
+from python_prototypes.field_tools import get_drift_factor, get_intercept, get_thrust_reach
+from python_prototypes.field_types import Entity, Unit
+from python_prototypes.simulation.intercept_solver import (
+    get_intercepts,
+    get_scalar_intercepts,
+    get_vectorized_intercepts,
+)
+from python_prototypes.unit_parameters import UnitFriction, UnitMass, UnitThrust
+
+
+def get_chaser() -> Unit:
+    return Unit(-2000, 0, 100, 0, 400, Entity.REAPER.value, 0, 1, UnitMass.reaper)
+
+
+def get_targets() -> list[Unit]:
+    return [
+        Unit(1000, 0, 0, 0, 400, Entity.REAPER.value, 1, 7, UnitMass.reaper),
+        Unit(0, 2000, 300, 0, 400, Entity.DESTROYER.value, 2, 8, UnitMass.destroyer),
+        Unit(-1500, 0, 0, 0, 400, Entity.DOOF.value, 1, 9, UnitMass.doof),
+    ]
+
+
+def solve_with_field_tools(chaser: Unit, target: Unit) -> tuple[float, tuple[float, float]] | None:
+    target_friction = {
+        Entity.REAPER.value: UnitFriction.reaper,
+        Entity.DESTROYER.value: UnitFriction.destroyer,
+        Entity.DOOF.value: UnitFriction.doof,
+    }[target.unit_type]
+    return get_intercept(
+        chaser_coordinate=(chaser.x, chaser.y),
+        chaser_velocity=(chaser.vx, chaser.vy),
+        chaser_friction=UnitFriction.reaper,
+        chaser_acceleration=UnitThrust.max_looter / chaser.mass,
+        target_coordinate=(target.x, target.y),
+        target_velocity=(target.vx, target.vy),
+        target_friction=target_friction,
+        contact_distance=chaser.radius + target.radius,
+    )
+
+
+class TestIntercept:
+    def test_thrust_reach_matches_stepping(self):
+        acceleration = UnitThrust.max_looter / UnitMass.reaper
+        speed, distance = 0.0, 0.0
+        for rounds in range(1, 8):
+            speed += acceleration
+            distance += speed
+            speed *= 1 - UnitFriction.reaper
+            assert get_thrust_reach(acceleration, UnitFriction.reaper, rounds) == pytest.approx(distance)
+
+    def test_arrays_match_the_scalar_kinematics(self):
+        frictions = np.array([UnitFriction.reaper, UnitFriction.tanker, 0.0])
+        rounds = np.array([0.0, 0.5, 3.0, 7.25])[:, np.newaxis]
+        drift_factors = get_drift_factor(frictions, rounds)
+        thrust_reaches = get_thrust_reach(600.0, frictions, rounds)
+        for round_index, round_value in enumerate(rounds[:, 0].tolist()):
+            for friction_index, friction in enumerate(frictions.tolist()):
+                assert drift_factors[round_index, friction_index] == pytest.approx(
+                    get_drift_factor(friction, round_value)
+                )
+                assert thrust_reaches[round_index, friction_index] == pytest.approx(
+                    get_thrust_reach(600.0, friction, round_value)
+                )
+
+    def test_overlapping_target_is_intercepted_immediately(self):
+        eta, coordinate = solve_with_field_tools(get_chaser(), get_targets()[2])
+        assert eta == 0.0 and coordinate == (-1500, 0)
+
+    def test_static_target(self):
+        eta, coordinate = solve_with_field_tools(get_chaser(), get_targets()[0])
+        assert 2 < eta < 4
+        assert coordinate == (1000, 0)
+
+    def test_unreachable_target(self):
+        target = Unit(4000, 0, 2000, 0, 400, Entity.REAPER.value, 1, 7, UnitMass.reaper)
+        assert get_intercept((0, 0), (0, 0), 0.4, 600, (4000, 0), (2000, 0), 0.0, 800, max_round_count=5) is None
+        for solver in (get_scalar_intercepts, get_vectorized_intercepts):
+            intercepts = solver(get_chaser(), [target], round_limit=5)
+            assert math.isinf(intercepts.eta[0]) and (intercepts.x[0], intercepts.y[0]) == (4000, 0)
+
+    def test_solvers_match_field_tools(self):
+        chaser = get_chaser()
+        for solver in (get_intercepts, get_scalar_intercepts, get_vectorized_intercepts):
+            intercepts = solver(chaser, get_targets())
+            for index, target in enumerate(get_targets()):
+                eta, (x, y) = solve_with_field_tools(chaser, target)
+                assert intercepts.eta[index] == pytest.approx(eta, abs=1 / 256)
+                assert (intercepts.x[index], intercepts.y[index]) == pytest.approx((x, y), abs=1)
+            assert intercepts.get_eta(8) == pytest.approx(intercepts.eta[1])
+            assert intercepts.get_eta(404) is None
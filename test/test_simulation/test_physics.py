@@ -0,0 +1,71 @@
+import numpy as np
+
+from python_prototypes.field_tools import PLAYFIELD_RADIUS
+from python_prototypes.field_types import Unit, Entity
+from python_prototypes.simulation.physics import (
+    UnitCommands,
+    create_idle_commands,
+    roll_out,
+    step,
+)
+from python_prototypes.simulation.state import SimulationState
+from python_prototypes.unit_parameters import UnitFriction
+
+
+def get_example_state() -> SimulationState:
+    return SimulationState.from_units(
+        [
+            Unit(0, 0, 0, 0, 400, Entity.REAPER.value, player=0, unit_id=0, mass=0.5),
+            Unit(1000, 0, 100, 0, 400, Entity.DESTROYER.value, player=1, unit_id=1, mass=1.5),
+            Unit(3000, 3000, -50, 0, 600, Entity.TANKER.value, player=-1, unit_id=2, mass=4.5, extra=4, extra_2=4),
+            Unit(-2000, 0, 0, 0, 600, Entity.WRECK.value, player=-1, unit_id=3, mass=-1, extra=4, extra_2=-1),
+        ]
+    )
+
+
+class TestPhysicsStep:
+    def test_thrust_move_friction(self):
+        state = get_example_state()
+        commands = UnitCommands(
+            target_x=np.array([5000.0, 0.0, 0.0, 0.0]),
+            target_y=np.zeros(4),
+            power=np.array([300.0, 0.0, 0.0, 0.0]),
+        )
+        step(state, commands)
+
+        # 300 / 0.5 acceleration, then friction is applied after moving
+        assert state.x[0] == 600
+        assert state.vx[0] == round(600 * (1 - UnitFriction.reaper))
+        # no thrust, just drift
+        assert state.x[1] == 1100
+        assert state.vx[1] == round(100 * (1 - UnitFriction.destroyer))
+        # wrecks never move
+        assert state.x[3] == -2000
+
+    def test_looters_stay_on_the_map(self):
+        state = SimulationState.from_units(
+            [Unit(PLAYFIELD_RADIUS - 450, 0, 300, 0, 400, Entity.REAPER.value, player=0, unit_id=0, mass=0.5)]
+        )
+        step(state, create_idle_commands(state))
+        assert np.hypot(state.x[0], state.y[0]) <= PLAYFIELD_RADIUS - 400
+        assert state.vx[0] <= 0
+
+    def test_batched_rollout_matches_single_rollout(self):
+        state = get_example_state()
+        batched_state = state.repeat(16)
+        assert batched_state.batch_shape == (16,)
+
+        single_result = roll_out(state, 10)
+        batched_result = roll_out(batched_state, 10)
+        for batch_index in range(16):
+            assert np.array_equal(batched_result.x[batch_index], single_result.x)
+            assert np.array_equal(batched_result.vy[batch_index], single_result.vy)
+        # the original state is untouched
+        assert state.x[0] == 0
+
+    def test_to_units_round_trip(self):
+        state = get_example_state()
+        units = state.to_units()
+        assert [unit.unit_id for unit in units] == [0, 1, 2, 3]
+        assert units[2].extra == 4
+        assert state.get_unit_index(2) == 2
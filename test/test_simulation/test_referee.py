@@ -0,0 +1,75 @@
+from python_prototypes.field_types import Entity, Unit
+from python_prototypes.simulation.referee import (
+    LocalReferee,
+    EngineBot,
+    GreedyHarvesterBot,
+    WaitBot,
+    MAX_ROUND_COUNT,
+    WINNING_SCORE,
+    parse_looter_command,
+)
+
+
+def get_units_of_type(referee: LocalReferee, entity: Entity) -> list[Unit]:
+    return [unit for unit in referee.units if unit.unit_type == entity.value]
+
+
+class TestCommandParsing:
+    def test_commands(self):
+        move_command = parse_looter_command("100 -200 500 hello")
+        assert (move_command.target_x, move_command.target_y, move_command.throttle) == (100, -200, 300)
+        assert not move_command.is_skill
+
+        skill_command = parse_looter_command("SKILL 10 20")
+        assert skill_command.is_skill and (skill_command.target_x, skill_command.target_y) == (10, 20)
+
+        assert parse_looter_command("WAIT") is None
+        assert parse_looter_command("1 2") is None
+
+
+class TestLocalReferee:
+    def test_round_input_perspective(self):
+        referee = LocalReferee([WaitBot(), WaitBot(), WaitBot()], seed=0)
+        referee.scores = [1, 2, 3]
+
+        round_input = referee.get_round_input(1)
+        assert (round_input.my_score, round_input.enemy_1_score, round_input.enemy_2_score) == (2, 3, 1)
+        own_reapers = [
+            unit for unit in round_input.units if unit.unit_type == Entity.REAPER.value and unit.player == 0
+        ]
+        assert [reaper.unit_id for reaper in own_reapers] == [referee._get_looter(1, Entity.REAPER).unit_id]
+        tanker = next(unit for unit in round_input.units if unit.unit_type == Entity.TANKER.value)
+        assert tanker.player == -1
+
+    def test_destroyer_hit_creates_wreck_and_reaper_harvests_it(self):
+        referee = LocalReferee([WaitBot(), WaitBot(), WaitBot()], seed=0)
+        referee.units = [unit for unit in referee.units if unit.unit_type != Entity.TANKER.value]
+        referee._spawn_tanker(0)
+        tanker = get_units_of_type(referee, Entity.TANKER)[0]
+        destroyer = referee._get_looter(0, Entity.DESTROYER)
+        tanker.x, tanker.y, tanker.extra = destroyer.x + 1500, destroyer.y, 3
+        destroyer.vx = 800
+
+        referee.play_round()
+        wrecks = get_units_of_type(referee, Entity.WRECK)
+        assert not get_units_of_type(referee, Entity.TANKER)
+        assert len(wrecks) == 1 and wrecks[0].extra == 3
+
+        reaper = referee._get_looter(0, Entity.REAPER)
+        reaper.x, reaper.y, reaper.vx, reaper.vy = wrecks[0].x, wrecks[0].y, 0, 0
+        referee.play_round()
+        assert referee.scores[0] == 1
+        assert wrecks[0].extra == 2
+
+    def test_full_match(self):
+        result = LocalReferee([GreedyHarvesterBot(), GreedyHarvesterBot(), WaitBot()], seed=1).play_match()
+
+        assert result.round_count == MAX_ROUND_COUNT or max(result.scores) >= WINNING_SCORE
+        assert len(result.scores) == len(result.rages) == len(result.bot_round_seconds) == 3
+        assert result.scores[2] <= max(result.scores[:2])
+        assert all(len(round_seconds) == result.round_count for round_seconds in result.bot_round_seconds)
+
+    def test_engine_bot_plays(self):
+        referee = LocalReferee([EngineBot(), GreedyHarvesterBot(), GreedyHarvesterBot()], seed=2, max_round_count=15)
+        result = referee.play_match()
+        assert result.round_count == 15
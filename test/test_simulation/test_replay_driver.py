@@ -0,0 +1,110 @@
+import pytest
+
+from python_prototypes.field_types import Entity, PlayerFieldTypes
+from python_prototypes.frame_recorder import FrameRecorder, iter_recording
+from python_prototypes.simulation.referee import LOOTER_MASSES, GreedyHarvesterBot, LocalReferee, RecordingBot
+from python_prototypes.simulation.replay_driver import (
+    LATENCY_BUCKET_MS,
+    ReplayedRound,
+    ReplayReport,
+    get_parked_looters,
+    get_scenario_round_input,
+    replay_recordings,
+    replay_rounds,
+)
+from python_prototypes.simulation.tournament import get_seat_latency
+from test.real_game_mocks.full_grid_state import ExampleBasicScenarioIncomplete
+from test.real_game_mocks.player_and_wrecks_only import ReaperAndWreckOnlyScenario
+
+
+def record_match(round_count=12):
+    recording_bot = RecordingBot(GreedyHarvesterBot())
+    referee = LocalReferee(
+        [recording_bot, GreedyHarvesterBot(), GreedyHarvesterBot()], seed=5, max_round_count=round_count
+    )
+    referee.play_match()
+    return recording_bot.recorded_rounds
+
+
+def write_recordings(tmp_path, recorded_rounds):
+    log_path = tmp_path / "match.mmf"
+    with FrameRecorder(log_path) as frame_recorder:
+        for recorded_round in recorded_rounds:
+            frame_recorder.record(recorded_round.round_input, recorded_round.commands)
+    text_path = tmp_path / "match.txt"
+    text_path.write_text(
+        "".join(f"{line}\n" for recorded_round in recorded_rounds for line in recorded_round.to_lines())
+    )
+    return log_path, text_path
+
+
+class TestReplayDriver:
+    def test_both_recording_formats_are_read(self, tmp_path):
+        recorded_rounds = record_match()
+        log_path, text_path = write_recordings(tmp_path, recorded_rounds)
+        log_rounds = list(iter_recording(log_path))
+        text_rounds = list(iter_recording(text_path))
+        assert len(log_rounds) == len(text_rounds) == len(recorded_rounds)
+        assert [log_round.commands for log_round in log_rounds] == [
+            recorded_round.commands for recorded_round in recorded_rounds
+        ]
+        assert [log_round.round_input.units[0].unit_id for log_round in log_rounds] == [
+            text_round.round_input.units[0].unit_id for text_round in text_rounds
+        ]
+
+    def test_recordings_are_replayed(self, tmp_path):
+        recorded_rounds = record_match()
+        log_path, text_path = write_recordings(tmp_path, recorded_rounds)
+        replayed = []
+        report = replay_recordings(
+            [log_path, text_path], on_round=lambda path, replayed_round: replayed.append((path, replayed_round))
+        )
+        assert report.round_count == report.recorded_round_count == 2 * len(recorded_rounds)
+        assert [path for path, _ in replayed] == [log_path] * len(recorded_rounds) + [text_path] * len(recorded_rounds)
+        # every recording starts a new match
+        assert [replayed_round.round_index for _, replayed_round in replayed][len(recorded_rounds)] == 0
+        assert report.latency.max_ms > 0
+        assert len(report.format_lines()) == 2
+
+    def test_scenarios_are_replayed(self):
+        scenario_grids = [
+            ExampleBasicScenarioIncomplete.get_example_full_grid_state(),
+            ReaperAndWreckOnlyScenario(None, None).get_full_grid_state(),
+        ]
+        for game_grid_information in scenario_grids:
+            round_input = get_scenario_round_input(game_grid_information)
+            looters = {
+                (unit.player, unit.unit_type)
+                for unit in round_input.units
+                if unit.unit_type in (Entity.REAPER.value, Entity.DESTROYER.value, Entity.DOOF.value)
+            }
+            assert len(looters) == 3 * len(PlayerFieldTypes)
+            scenario_units = [
+                grid_unit.unit
+                for grid_units in game_grid_information.full_grid_state.values()
+                for grid_unit in grid_units
+            ]
+            parked_looters = get_parked_looters(scenario_units)
+            assert parked_looters
+            assert all(unit.mass == LOOTER_MASSES[Entity(unit.unit_type)] for unit in parked_looters)
+            assert len({unit.unit_id for unit in round_input.units}) == len(round_input.units)
+
+            report = ReplayReport()
+            for replayed_round in replay_rounds([round_input, round_input]):
+                assert replayed_round.recorded_commands is None
+                assert all(isinstance(command, str) for command in replayed_round.commands)
+                report.add_round(replayed_round)
+            assert report.round_count == 2 and report.recorded_round_count == 0
+
+    def test_report_keeps_a_histogram(self):
+        report = ReplayReport()
+        round_seconds = [0.001 * (round_index % 40) + 0.00005 for round_index in range(10_000)] + [0.5]
+        for round_index, seconds in enumerate(round_seconds):
+            report.add_round(ReplayedRound(round_index, ("WAIT", "WAIT", "WAIT"), None, seconds))
+        assert len(report.bucket_counts) == len(ReplayReport().bucket_counts)
+
+        latency = report.latency
+        expected_latency = get_seat_latency(round_seconds)
+        assert latency.mean_ms == pytest.approx(expected_latency.mean_ms)
+        assert latency.max_ms == pytest.approx(500)
+        assert expected_latency.p95_ms <= latency.p95_ms <= expected_latency.p95_ms + LATENCY_BUCKET_MS
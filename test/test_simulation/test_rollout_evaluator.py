@@ -0,0 +1,71 @@
+from python_prototypes.field_types import Entity, Unit
+from python_prototypes.simulation.rollout_evaluator import RolloutCandidate, RolloutEvaluator
+
+
+def get_wreck(unit_id, x, y, radius=600, water=3) -> Unit:
+    return Unit(x, y, 0, 0, radius, Entity.WRECK.value, -1, unit_id, -1, water, -1)
+
+
+def get_units() -> list[Unit]:
+    return [
+        Unit(0, 0, 0, 0, 400, Entity.REAPER.value, 0, 0, 0.5),
+        Unit(0, 1000, 0, 0, 400, Entity.DOOF.value, 0, 2, 1.0),
+        Unit(-4000, 0, 0, 0, 400, Entity.REAPER.value, 1, 3, 0.5),
+        get_wreck(10, 1500, 0, water=5),
+        get_wreck(11, 0, -5000, water=5),
+        # the enemy reaper is heading to this one
+        get_wreck(12, -3000, 0, water=5),
+    ]
+
+
+class TestRolloutEvaluator:
+    def test_close_wreck_is_worth_more(self):
+        evaluator = RolloutEvaluator(rollout_count=4, round_count=5, time_budget_ms=1000, seed=0)
+        candidates = [RolloutCandidate("harvest", 11), RolloutCandidate("harvest", 10)]
+        evaluations = evaluator.evaluate(get_units(), candidates)
+        assert [evaluation.candidate for evaluation in evaluations] == candidates
+        assert all(evaluation.round_count == 5 for evaluation in evaluations)
+        assert evaluations[1].score_gain > evaluations[0].score_gain
+        # the enemy harvests its wreck in both cases
+        assert evaluations[0].enemy_score_gain > 0
+        assert evaluator.get_best_candidate(evaluations) == candidates[1]
+
+    def test_contested_wreck_is_shared(self):
+        units = get_units()
+        units[0] = Unit(-2500, 0, 0, 0, 400, Entity.REAPER.value, 0, 0, 0.5)
+        evaluator = RolloutEvaluator(rollout_count=4, round_count=6, time_budget_ms=1000, seed=0)
+        contested, free = evaluator.evaluate(units, [RolloutCandidate("harvest", 12), RolloutCandidate("harvest", 10)])
+        # both reapers take from the same 5 water
+        assert contested.score_gain + contested.enemy_score_gain <= 5
+        assert contested.enemy_score_gain < free.enemy_score_gain
+
+    def test_moving_target_and_rage(self):
+        evaluator = RolloutEvaluator(rollout_count=2, round_count=3, time_budget_ms=1000, seed=0)
+        (evaluation,) = evaluator.evaluate(get_units(), [RolloutCandidate("ram", 3)])
+        assert evaluation.score_gain == 0
+        # the idle doof doesn't gain rage
+        assert evaluation.rage_gain == 0
+
+    def test_time_budget_stops_after_the_first_round(self):
+        evaluator = RolloutEvaluator(rollout_count=4, round_count=5, time_budget_ms=0, seed=0)
+        (evaluation,) = evaluator.evaluate(get_units(), [RolloutCandidate("harvest", 10)])
+        assert evaluation.round_count == 1
+
+    def test_rounds_stay_within_the_budget(self):
+        evaluator = RolloutEvaluator(rollout_count=4, round_count=1000, time_budget_ms=10, seed=0)
+        # a round of 2 rollout rows costs 4 ms with the 3 moving units
+        evaluator.round_seconds_per_pair = 0.002 / 3**2
+        round_seconds = evaluator.get_round_seconds(batch_size=2, unit_count=3)
+        assert evaluator.is_round_affordable(0.003, round_seconds, budget_seconds=0.01)
+        # it fits by the estimate, but not with the margin for a slower round
+        assert not evaluator.is_round_affordable(0.005, round_seconds, budget_seconds=0.01)
+
+    def test_rollouts_are_cut_to_the_budget(self):
+        evaluator = RolloutEvaluator(rollout_count=4, round_count=5, time_budget_ms=5, seed=0)
+        # a round of a rollout row costs 2 ms with the 3 moving units
+        evaluator.round_seconds_per_pair = 0.002 / 3**2
+        assert evaluator.get_rollout_count(candidate_count=1, unit_count=3, budget_seconds=0.005) == 2
+        assert evaluator.get_rollout_count(candidate_count=3, unit_count=3, budget_seconds=0.005) == 0
+        # not even a single rollout fits
+        evaluator.round_seconds_per_pair = 0.006 / 3**2
+        assert evaluator.evaluate(get_units(), [RolloutCandidate("harvest", 10)]) == []
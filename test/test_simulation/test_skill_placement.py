@@ -0,0 +1,78 @@
+import math
+from collections import defaultdict
+
+from python_prototypes.field_tools import get_grid_position
+from python_prototypes.field_types import Entity, GameGridInformation, GridUnitState, Unit
+from python_prototypes.simulation.skill_placement import (
+    COARSE_GRID_SPACINGS,
+    SkillType,
+    find_best_skill_placement,
+    find_skill_placement,
+    get_coarse_grid_spacing,
+)
+from python_prototypes.unit_parameters import UnitSkill
+
+
+def get_looter(unit_id, entity, player, x, y) -> Unit:
+    return Unit(x, y, 0, 0, 400, entity.value, player, unit_id, 0.5, -1, -1)
+
+
+def get_game_grid_information(units: list[Unit]) -> GameGridInformation:
+    full_grid_state = defaultdict(list)
+    for unit in units:
+        grid_coordinate = get_grid_position((unit.x, unit.y))
+        full_grid_state[grid_coordinate].append(GridUnitState(grid_coordinate=grid_coordinate, unit=unit))
+    return GameGridInformation(full_grid_state, *[{} for _ in range(10)])
+
+
+class TestFindSkillPlacement:
+    def test_tar_covers_the_enemy_reaper_within_range(self):
+        caster = get_looter(0, Entity.REAPER, 0, 0, 0)
+        enemy_reaper = get_looter(3, Entity.REAPER, 1, 2600, 0)
+        skill_placement = find_skill_placement(SkillType.tar, caster, [caster, enemy_reaper])
+
+        assert math.hypot(skill_placement.x, skill_placement.y) <= UnitSkill.range
+        assert math.hypot(skill_placement.x - 2600, skill_placement.y) < UnitSkill.radius
+        assert skill_placement.command == f"SKILL {skill_placement.x} {skill_placement.y}"
+
+    def test_own_units_are_spared(self):
+        caster = get_looter(0, Entity.DESTROYER, 0, 0, 0)
+        own_reaper = get_looter(1, Entity.REAPER, 0, 1000, 0)
+        enemy_reaper = get_looter(3, Entity.REAPER, 1, 1500, 0)
+        skill_placement = find_skill_placement(SkillType.grenade, caster, [caster, own_reaper, enemy_reaper])
+        assert math.hypot(skill_placement.x - 1000, skill_placement.y) >= UnitSkill.radius
+        assert math.hypot(skill_placement.x - 1500, skill_placement.y) < UnitSkill.radius
+
+    def test_nothing_worth_casting(self):
+        caster = get_looter(0, Entity.DOOF, 0, 0, 0)
+        enemy_destroyer = get_looter(4, Entity.DESTROYER, 1, 500, 0)
+        # oil doesn't affect destroyers
+        assert find_skill_placement(SkillType.oil, caster, [caster, enemy_destroyer]) is None
+        enemy_reaper = get_looter(3, Entity.REAPER, 1, 6000, 0)
+        assert find_skill_placement(SkillType.oil, caster, [caster, enemy_reaper]) is None
+
+    def test_coarse_grid_is_sized_by_the_budget(self):
+        assert get_coarse_grid_spacing(unit_count=9, time_budget_us=300) == COARSE_GRID_SPACINGS[0]
+        assert get_coarse_grid_spacing(unit_count=9, time_budget_us=40) > COARSE_GRID_SPACINGS[0]
+        assert get_coarse_grid_spacing(unit_count=9, time_budget_us=0) == COARSE_GRID_SPACINGS[-1]
+
+        caster = get_looter(0, Entity.REAPER, 0, 0, 0)
+        enemy_reaper = get_looter(3, Entity.REAPER, 1, 2600, 0)
+        skill_placement = find_skill_placement(SkillType.tar, caster, [caster, enemy_reaper], time_budget_us=0)
+        assert math.hypot(skill_placement.x - 2600, skill_placement.y) < UnitSkill.radius
+
+
+class TestFindBestSkillPlacement:
+    def test_only_affordable_skills_are_cast(self):
+        reaper = get_looter(0, Entity.REAPER, 0, 0, 0)
+        destroyer = get_looter(1, Entity.DESTROYER, 0, 0, 1000)
+        doof = get_looter(2, Entity.DOOF, 0, 0, -1000)
+        enemy_reaper = get_looter(3, Entity.REAPER, 1, 2000, 0)
+        wreck = Unit(2000, 0, 0, 0, 700, Entity.WRECK.value, -1, 9, -1, 4, -1)
+        game_grid_information = get_game_grid_information([reaper, destroyer, doof, enemy_reaper, wreck])
+        casters = {Entity.REAPER: reaper, Entity.DESTROYER: destroyer, Entity.DOOF: doof}
+
+        assert find_best_skill_placement(game_grid_information, casters, rage=20) is None
+        # the enemy reaper is harvesting, oil is the most harmful
+        skill_placement = find_best_skill_placement(game_grid_information, casters, rage=30)
+        assert skill_placement.skill_type == SkillType.oil
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from python_prototypes.field_types import Entity, GameGridInformation, GridUnitState, Unit
+from python_prototypes.simulation.physics import UnitCommands, step
+from python_prototypes.simulation.state import SimulationState
+from python_prototypes.simulation.state_arena import StateArena
+
+
+def get_units() -> list[Unit]:
+    return [
+        Unit(0, 0, 100, 0, 400, Entity.REAPER.value, 0, 1, 0.5),
+        Unit(1000, 0, 0, 0, 400, Entity.DESTROYER.value, 1, 2, 1.5),
+    ]
+
+
+def get_commands(batch_shape=()) -> UnitCommands:
+    shape = (*batch_shape, 2)
+    return UnitCommands(np.full(shape, 3000.0), np.zeros(shape), np.full(shape, 300.0))
+
+
+class TestStateArena:
+    def test_grid_is_converted(self):
+        game_grid_information = GameGridInformation(*[{} for _ in range(11)])
+        game_grid_information.full_grid_state = {
+            (0, 0): [GridUnitState((0, 0), get_units()[0])],
+            (1, 0): [GridUnitState((1, 0), get_units()[1])],
+        }
+        state_arena = StateArena()
+        state_arena.load_grid(game_grid_information)
+        assert state_arena.turn_state.unit_id.tolist() == [1, 2]
+        assert state_arena.state is not state_arena.turn_state
+
+    def test_snapshot_and_restore(self):
+        state_arena = StateArena()
+        state_arena.load(SimulationState.from_units(get_units()))
+        state_arena.snapshot(1)
+        step(state_arena.state, get_commands())
+        assert state_arena.state.x[0] != 0
+        state_arena.restore(1)
+        assert state_arena.state.x.tolist() == [0, 1000]
+        # the turn state is never stepped
+        step(state_arena.state, get_commands())
+        state_arena.reset()
+        assert state_arena.state.vx.tolist() == [100, 0]
+
+    def test_back_buffer_is_committed_or_dropped(self):
+        state_arena = StateArena()
+        state_arena.load(SimulationState.from_units(get_units()))
+        front = state_arena.state
+        step(state_arena.get_back_buffer(), get_commands())
+        assert state_arena.state.x[0] == 0
+        state_arena.commit()
+        assert state_arena.state is not front and state_arena.state.x[0] != 0
+
+    def test_buffers_are_reused(self):
+        state_arena = StateArena()
+        state_arena.load(SimulationState.from_units(get_units()), batch_size=4)
+        batched_state = state_arena.state
+        buffers = [getattr(batched_state, column) for column in SimulationState.COLUMNS]
+        step(batched_state, get_commands((4,)))
+        state_arena.load(SimulationState.from_units(get_units()[::-1]), batch_size=4)
+        assert state_arena.state is batched_state
+        # stepped in place
+        assert all(getattr(batched_state, column) is buffer for column, buffer in zip(SimulationState.COLUMNS, buffers))
+        assert state_arena.state.unit_id[:, 0].tolist() == [2, 2, 2, 2]
+        state_arena.load(SimulationState.from_units(get_units()[:1]), batch_size=4)
+        assert state_arena.state.batch_shape == (4,)
+        assert state_arena.state is not batched_state
+
+    def test_unloaded_arena(self):
+        with pytest.raises(ValueError):
+            _ = StateArena().state
@@ -0,0 +1,91 @@
+from collections import defaultdict
+
+from python_prototypes.field_tools import get_grid_position
+from python_prototypes.field_types import Entity, GameGridInformation, GridUnitState, Unit
+from python_prototypes.frame_diff import FrameDiffer
+from python_prototypes.reaper.target_availability_determiner import TargetAvailabilityState, tanker_target_available
+from python_prototypes.reaper.target_tracker_determiner import StaticTargetTracker
+from python_prototypes.simulation.tanker_forecast import TankerLifecycleTracker, forecast_tanker_wrecks
+
+
+def get_tanker(unit_id=20, x=3000, y=0, water=2, capacity=8) -> Unit:
+    return Unit(x, y, 0, 0, 400 + 50 * capacity, Entity.TANKER.value, -1, unit_id, 2.5 + 0.5 * water, water, capacity)
+
+
+def get_destroyer(x, y) -> Unit:
+    return Unit(x, y, 0, 0, 400, Entity.DESTROYER.value, 1, 30, 1.5, -1, -1)
+
+
+def get_game_grid_information(units: list[Unit]) -> GameGridInformation:
+    full_grid_state = defaultdict(list)
+    for unit in units:
+        grid_coordinate = get_grid_position((unit.x, unit.y))
+        full_grid_state[grid_coordinate].append(GridUnitState(grid_coordinate=grid_coordinate, unit=unit))
+    return GameGridInformation(full_grid_state, *[{} for _ in range(10)])
+
+
+class TestForecastTankerWrecks:
+    def test_close_destroyer_forecasts_a_wreck(self):
+        forecast = forecast_tanker_wrecks([get_tanker()], [get_destroyer(3000, 2000)])
+        wreck_forecast = forecast.get_wreck_forecast(20)
+        assert wreck_forecast is not None
+        assert 1 <= wreck_forecast.rounds <= 5
+        # the tanker heads to the centre and fills up in the meantime
+        assert wreck_forecast.x < 3000
+        assert wreck_forecast.water == 2 + wreck_forecast.rounds
+
+    def test_without_destroyers_there_is_no_wreck(self):
+        forecast = forecast_tanker_wrecks([get_tanker()], [])
+        assert forecast.get_wreck_forecast(20) is None
+        assert forecast.get_wreck_forecast(404) is None
+
+    def test_far_destroyer_is_too_slow(self):
+        forecast = forecast_tanker_wrecks([get_tanker(x=5000)], [get_destroyer(-5500, 0)], round_count=3)
+        assert forecast.get_wreck_forecast(20) is None
+
+
+class TestTankerLifecycleTracker:
+    def test_vanished_tanker_becomes_the_new_wreck(self):
+        tracker = TankerLifecycleTracker()
+        tracker.update(get_game_grid_information([get_tanker(), get_destroyer(3000, 1000)]))
+        assert tracker.forecast.get_wreck_forecast(20) is not None
+
+        wreck = Unit(3100, 50, 0, 0, 800, Entity.WRECK.value, -1, 40, -1, 3, -1)
+        tracker.update(get_game_grid_information([wreck, get_destroyer(3000, 600)]))
+        assert tracker.get_wreck_id(20) == 40
+
+    def test_frame_diff_is_used(self):
+        tracker = TankerLifecycleTracker()
+        frame_differ = FrameDiffer()
+        for units in (
+            [get_tanker(), get_destroyer(3000, 1000)],
+            [Unit(3100, 50, 0, 0, 800, Entity.WRECK.value, -1, 40, -1, 3, -1), get_destroyer(3000, 600)],
+        ):
+            game_grid_information = get_game_grid_information(units)
+            game_grid_information.frame_diff = frame_differ.update(game_grid_information.get_unit_table(), {})
+            tracker.update(game_grid_information)
+        assert tracker.get_wreck_id(20) == 40
+
+    def test_tanker_leaving_the_map_has_no_wreck(self):
+        tracker = TankerLifecycleTracker()
+        tracker.update(get_game_grid_information([get_tanker(x=6500, water=8)]))
+        tracker.update(get_game_grid_information([]))
+        assert tracker.get_wreck_id(20) is None
+
+    def test_reaper_next_to_the_new_wreck_succeeds(self):
+        tanker = get_tanker()
+        reaper = Unit(3500, 500, 0, 0, 400, Entity.REAPER.value, 0, 0, 0.5, -1, -1)
+        tracker = TankerLifecycleTracker()
+        tracker.update(get_game_grid_information([tanker, reaper, get_destroyer(3000, 1000)]))
+        target_tracker = StaticTargetTracker()
+        target_tracker.track(
+            GridUnitState(get_grid_position((reaper.x, reaper.y)), reaper),
+            GridUnitState(get_grid_position((tanker.x, tanker.y)), tanker),
+        )
+
+        wreck = Unit(3000, 0, 0, 0, 800, Entity.WRECK.value, -1, 40, -1, 3, -1)
+        game_grid_information = get_game_grid_information([wreck, reaper])
+        tracker.update(game_grid_information)
+        availability = tanker_target_available(None, game_grid_information, target_tracker, tracker, tanker_id=20)
+        assert availability == TargetAvailabilityState.goal_reached_success
+        assert tanker_target_available(None, game_grid_information, target_tracker) == TargetAvailabilityState.invalid
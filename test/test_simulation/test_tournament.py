@@ -0,0 +1,107 @@
+import random
+from dataclasses import replace
+
+from python_prototypes.reaper.path_planner import REAPER_FAST_PATH_CONFIGURATION
+from python_prototypes.throttle_lookup.refinement import read_refinement_records
+from python_prototypes.simulation.tournament import (
+    BASELINE_VARIANT_NAME,
+    EngineVariant,
+    MatchRecord,
+    MatchTask,
+    SeatLatency,
+    create_match_tasks,
+    get_seat_latency,
+    get_wilson_interval,
+    get_win_rate_intervals,
+    play_tournament_match,
+    read_match_records,
+    run_tournament,
+)
+
+
+def get_match_record(variant_names: list[str], scores: list[int]) -> MatchRecord:
+    return MatchRecord(
+        match_index=0,
+        seed=0,
+        variant_names=variant_names,
+        scores=scores,
+        round_count=200,
+        latencies=[SeatLatency(1.0, 2.0, 3.0)] * 3,
+    )
+
+
+class TestTournamentStatistics:
+    def test_wilson_interval(self):
+        low, high = get_wilson_interval(50, 100)
+        assert low < 0.5 < high
+        assert abs((0.5 - low) - (high - 0.5)) < 1e-9
+        assert get_wilson_interval(0, 10)[0] == 0.0
+        assert get_wilson_interval(10, 10)[1] == 1.0
+        assert get_wilson_interval(500, 1000)[1] - get_wilson_interval(500, 1000)[0] < high - low
+
+    def test_win_rates_count_matches_once_per_variant(self):
+        match_records = [
+            get_match_record(["a", "b", "a"], [10, 5, 3]),
+            get_match_record(["b", "a", "b"], [10, 5, 3]),
+            get_match_record(["a", "b", "a"], [7, 7, 1]),
+        ]
+        win_rate_intervals = get_win_rate_intervals(match_records)
+        assert (win_rate_intervals["a"].wins, win_rate_intervals["a"].matches) == (2, 3)
+        assert (win_rate_intervals["b"].wins, win_rate_intervals["b"].matches) == (2, 3)
+
+    def test_seat_rotation_and_latency(self):
+        variants = [EngineVariant("a"), EngineVariant("b")]
+        match_tasks = create_match_tasks(variants, match_count=6, seed=5)
+        seat_names = [[variant.name for variant in match_task.seat_variants] for match_task in match_tasks]
+        # one seat per variant, against the baseline, every variant in every seat twice
+        assert all(sorted(names) == ["a", "b", BASELINE_VARIANT_NAME] for names in seat_names)
+        assert all(sorted(names[seat] for names in seat_names) == ["a", "a", "b", "b", "baseline", "baseline"]
+                   for seat in range(3))
+        assert [match_task.seed for match_task in match_tasks[:2]] == [5, 6]
+
+        variants.append(EngineVariant("c"))
+        variants.append(EngineVariant("d"))
+        match_tasks = create_match_tasks(variants, match_count=4)
+        assert all(len({variant.name for variant in match_task.seat_variants}) == 3 for match_task in match_tasks)
+        assert [match_task.seat_variants[0].name for match_task in match_tasks] == ["a", "b", "c", "d"]
+
+        latency = get_seat_latency([0.001] * 19 + [0.1])
+        assert latency.p95_ms == 1.0 and latency.max_ms == 100.0
+
+
+class TestRunTournament:
+    def test_short_tournament(self, tmp_path):
+        quick_configuration = replace(REAPER_FAST_PATH_CONFIGURATION, timeout_ms=2)
+        variants = [
+            EngineVariant("quick", harvest_configuration=quick_configuration, fast_configuration=quick_configuration),
+            EngineVariant(
+                "penalized",
+                step_penalty=1.0,
+                harvest_configuration=quick_configuration,
+                fast_configuration=quick_configuration,
+            ),
+        ]
+        results_path = tmp_path / "results.jsonl"
+        match_records = run_tournament(variants, match_count=2, max_round_count=5, max_workers=2, results_path=results_path)
+
+        assert [match_record.round_count for match_record in match_records] == [5, 5]
+        assert [record.scores for record in read_match_records(results_path)] == [
+            match_record.scores for match_record in match_records
+        ]
+
+    def test_refinements_are_recorded(self, tmp_path):
+        quick_configuration = replace(REAPER_FAST_PATH_CONFIGURATION, timeout_ms=2)
+        refinement_path = tmp_path / "refinements.jsonl"
+        variant = EngineVariant(
+            "recording",
+            harvest_configuration=quick_configuration,
+            fast_configuration=quick_configuration,
+            refinement_path=refinement_path,
+        )
+        # a table miss of a moving reaper takes a few dozen rounds to come up
+        random.seed(0)
+        play_tournament_match(MatchTask(0, seed=1, seat_variants=[variant] * 3, max_round_count=60))
+        records = list(read_refinement_records(refinement_path))
+        assert records
+        # the moving reaper is recorded into the heading cells
+        assert all(len(record.cell_key) == 3 for record in records)
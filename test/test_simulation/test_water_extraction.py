@@ -0,0 +1,99 @@
+import numpy as np
+
+from python_prototypes.field_types import Entity, GameGridInformation, Unit, UnitTable
+from python_prototypes.frame_diff import FrameDiffer
+from python_prototypes.simulation.water_extraction import WaterExtractionMap
+
+
+def get_wreck(unit_id, x, y, radius=600, water=3) -> Unit:
+    return Unit(x, y, 0, 0, radius, Entity.WRECK.value, -1, unit_id, -1, water, -1)
+
+
+def get_water_extraction_map() -> WaterExtractionMap:
+    water_extraction_map = WaterExtractionMap()
+    water_extraction_map.set_units(
+        [
+            get_wreck(1, 0, 0, water=2),
+            get_wreck(2, 800, 0, water=5),
+            get_wreck(3, 400, 600, water=1),
+            get_wreck(4, 5000, 0, water=9),
+        ]
+    )
+    return water_extraction_map
+
+
+class TestWaterExtraction:
+    def test_overlaps_are_counted(self):
+        water_extraction_map = get_water_extraction_map()
+        counts = water_extraction_map.get_wreck_counts(np.array([0, 400, 400, 3000]), np.array([0, 0, 250, 0]))
+        assert counts.tolist() == [1, 2, 3, 0]
+
+    def test_water_is_limited_by_the_wrecks(self):
+        water_extraction_map = get_water_extraction_map()
+        water = water_extraction_map.get_extracted_water(np.array([400, 400]), np.array([0, 250]), round_count=3)
+        assert water.tolist() == [2 + 3, 2 + 3 + 1]
+
+    def test_oil_blocks_harvesting(self):
+        water_extraction_map = WaterExtractionMap()
+        oil_pool = Unit(0, 0, 0, 0, 1000, Entity.OIL_POOL.value, -1, 9, -1, 3, -1)
+        water_extraction_map.set_units([get_wreck(1, 0, 0), get_wreck(2, 2500, 0)], [oil_pool])
+        reapers = [
+            Unit(0, 0, 0, 0, 400, Entity.REAPER.value, 0, 0, 0.5),
+            Unit(2500, 100, 0, 0, 400, Entity.REAPER.value, 1, 1, 0.5),
+        ]
+        assert water_extraction_map.predict_scores(reapers) == [0, 1]
+
+
+class TestBestHarvestPoint:
+    def test_best_point_is_in_the_triple_overlap(self):
+        harvest_point = get_water_extraction_map().get_best_harvest_point(round_count=1)
+        assert harvest_point.wreck_count == 3
+        assert harvest_point.water == 3
+
+    def test_longer_stays_prefer_the_big_wreck(self):
+        harvest_point = get_water_extraction_map().get_best_harvest_point(round_count=9)
+        assert harvest_point.water == 9
+        assert (harvest_point.x, harvest_point.y) == (5000, 0)
+
+    def test_restricted_to_the_target_wreck(self):
+        water_extraction_map = get_water_extraction_map()
+        harvest_point = water_extraction_map.get_best_harvest_point(wreck_id=2, round_count=9)
+        assert harvest_point.wreck_count == 3
+        # the second query of the round is answered from the cache
+        assert water_extraction_map.get_best_harvest_point(wreck_id=2, round_count=9) is harvest_point
+        assert water_extraction_map.get_best_harvest_point(wreck_id=404) is None
+
+    def test_no_wrecks(self):
+        water_extraction_map = WaterExtractionMap()
+        water_extraction_map.set_units([])
+        assert water_extraction_map.get_best_harvest_point() is None
+        assert water_extraction_map.predict_scores([]) == []
+
+    def test_frame_diff_keeps_the_map(self):
+        frame_differ = FrameDiffer()
+        water_extraction_map = WaterExtractionMap()
+
+        def update(units):
+            unit_table = UnitTable.from_units(units)
+            game_grid_information = GameGridInformation(unit_table=unit_table)
+            game_grid_information.frame_diff = frame_differ.update(unit_table, {})
+            water_extraction_map.update(game_grid_information)
+
+        reaper = Unit(3000, 0, 0, 0, 400, Entity.REAPER.value, 0, 0, 0.5, -1, -1)
+        update([get_wreck(1, 0, 0, water=2), get_wreck(2, 800, 0, water=5), reaper])
+        best_harvest_point = water_extraction_map.get_best_harvest_point(round_count=3)
+        candidate_x, _ = water_extraction_map.get_candidate_points()
+
+        # only the reaper moved, the cached point is kept
+        reaper.x = 2000
+        update([get_wreck(1, 0, 0, water=2), get_wreck(2, 800, 0, water=5), reaper])
+        assert water_extraction_map.get_best_harvest_point(round_count=3) is best_harvest_point
+
+        # harvested, the candidates are kept but the water is updated
+        update([get_wreck(1, 0, 0, water=1), get_wreck(2, 800, 0, water=4), reaper])
+        assert water_extraction_map.get_candidate_points()[0] is candidate_x
+        assert water_extraction_map.get_best_harvest_point(round_count=3).water == 1 + 3
+
+        update([get_wreck(2, 800, 0, water=4), reaper])
+        assert water_extraction_map.wreck_ids.tolist() == [2]
+        assert water_extraction_map.get_best_harvest_point(round_count=3).water == 3
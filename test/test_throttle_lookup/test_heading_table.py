@@ -0,0 +1,124 @@
+import math
+
+from python_prototypes.field_tools import calculate_relative_heading
+from python_prototypes.field_types import Entity, GridUnitState, PlayerState, Unit
+from python_prototypes.reaper.decision_maker import ReaperDecisionOutput, ReaperDecisionType
+from python_prototypes.reaper.path_planner import LookupTablePathPlanner, NoOpPlanner, get_reaper_planner
+from python_prototypes.reaper.q_state_types import ReaperActionTypes
+from python_prototypes.reaper.strategy_path_decider import get_planned_relative_heading
+from python_prototypes.simulation.tournament import EngineVariant
+from python_prototypes.throttle_lookup.builder import build_throttle_lookup_table, create_empty_reaper_table
+from python_prototypes.throttle_lookup.table import LookupAxis, save_throttle_lookup_table
+from python_prototypes.throttle_optimization import (
+    GeneticConfiguration,
+    ThrottleCalculationInput,
+    get_fitness_function,
+    heading_fitness,
+    fitness,
+)
+
+SMALL_CONFIGURATION = GeneticConfiguration(
+    max_sequence_length=6,
+    population_size=20,
+    num_generations=5,
+    num_best_parents=4,
+    num_worst_parents=2,
+    timeout_ms=100,
+)
+
+
+class TestRelativeHeading:
+    def test_relative_heading(self):
+        assert calculate_relative_heading((0, 0), (10, 0), (100, 0)) == 0.0
+        assert math.isclose(calculate_relative_heading((0, 0), (-10, 0), (100, 0)), math.pi)
+        assert math.isclose(calculate_relative_heading((0, 0), (0, 10), (100, 0)), math.pi / 2)
+        assert math.isclose(calculate_relative_heading((0, 0), (0, -10), (100, 0)), math.pi / 2)
+        assert calculate_relative_heading((0, 0), (0, 0), (100, 0)) == 0.0
+
+
+class TestHeadingFitness:
+    def test_zero_heading_matches_the_1d_fitness(self):
+        throttles = [100, 200, 0, 50]
+        heading_score = heading_fitness(50, throttles, 0.5, 0.4, 2000, 5, relative_heading=0.0)
+        straight_score = fitness(50, throttles, 0.5, 0.4, 2000, 5)
+        assert math.isclose(heading_score.score, straight_score.score)
+
+    def test_almost_straight_headings_use_the_1d_fitness(self):
+        assert get_fitness_function(ThrottleCalculationInput(100, 0.5, 0.2, 2000, relative_heading=0.0)) is fitness
+        almost_straight_input = ThrottleCalculationInput(100, 0.5, 0.2, 2000, relative_heading=math.radians(3))
+        assert get_fitness_function(almost_straight_input) is fitness
+        sideways_input = ThrottleCalculationInput(100, 0.5, 0.2, 2000, relative_heading=math.radians(30))
+        assert get_fitness_function(sideways_input).func is heading_fitness
+
+    def test_only_ram_goals_plan_against_the_heading(self):
+        # the reaper moves sideways to the target
+        player_state = PlayerState(
+            reaper_state=GridUnitState((0, 0), Unit(0, 0, 0, 200, 400, Entity.REAPER.value)),
+            destroyer_state=GridUnitState((0, 0), Unit(0, 0, 0, 0, 400, Entity.DESTROYER.value)),
+            doof_state=GridUnitState((0, 0), Unit(0, 0, 0, 0, 400, Entity.DOOF.value)),
+            rage=0,
+            score=0,
+            prev_rage=0,
+            prev_score=0,
+        )
+        planned_headings = {
+            goal_action_type: get_planned_relative_heading(
+                ReaperDecisionOutput(ReaperDecisionType.replan_existing_target, goal_action_type, None),
+                player_state,
+                (3000, 0),
+            )
+            for goal_action_type in (
+                ReaperActionTypes.harvest_safe,
+                ReaperActionTypes.move_tanker_risky,
+                ReaperActionTypes.ram_reaper_far,
+            )
+        }
+        assert planned_headings[ReaperActionTypes.harvest_safe] == 0.0
+        assert planned_headings[ReaperActionTypes.move_tanker_risky] == 0.0
+        assert math.isclose(planned_headings[ReaperActionTypes.ram_reaper_far], math.pi / 2)
+
+    def test_moving_away_is_worse(self):
+        throttles = [300, 300, 300]
+        towards_score = heading_fitness(200, throttles, 0.5, 0.4, 3000, 5, relative_heading=0.0)
+        away_score = heading_fitness(200, throttles, 0.5, 0.4, 3000, 5, relative_heading=math.pi)
+        assert away_score.distance_diff > towards_score.distance_diff
+
+
+class TestHeadingLookupTable:
+    def test_build_and_lookup(self):
+        table = build_throttle_lookup_table(
+            mass=0.5,
+            friction=0.4,
+            genetic_configuration=SMALL_CONFIGURATION,
+            distance_axis=LookupAxis(min_value=500, max_value=1000, step=500),
+            speed_axis=LookupAxis(min_value=0, max_value=100, step=100),
+            heading_axis=LookupAxis(min_value=0, max_value=180, step=90),
+            max_workers=2,
+        )
+        assert len(table.entries) == 2 * 2 * 3
+        assert all(len(key) == 3 for key in table.entries)
+
+        throttle_input = ThrottleCalculationInput(
+            v0=90, mass=0.5, friction=0.4, d_target=1100, relative_heading=math.radians(100)
+        )
+        assert table.get_cell_key(throttle_input) == (1000, 100, 90)
+
+        planner = LookupTablePathPlanner(table, NoOpPlanner())
+        assert planner.get_path(throttle_input).sequence == table.entries[(1000, 100, 90)].sequence
+
+        outside_input = ThrottleCalculationInput(v0=90, mass=10.5, friction=0.4, d_target=1100)
+        assert planner.get_path(outside_input).sequence == [0]
+
+    def test_loaded_table_owns_the_ram_replans(self, tmp_path):
+        table_path = tmp_path / "heading_table.json"
+        save_throttle_lookup_table(create_empty_reaper_table(), table_path)
+
+        default_bot = EngineVariant("default").create_bot()
+        assert default_bot.main_game_engine.reaper_game_state.path_planner_settings.plans_rams_with_intercepts
+
+        variant = EngineVariant("heading_table", heading_table_path=table_path)
+        planner_settings = variant.create_bot().main_game_engine.reaper_game_state.path_planner_settings
+        assert planner_settings.heading_lookup_table.heading_axis is not None
+        assert not planner_settings.plans_rams_with_intercepts
+        ram_planner = get_reaper_planner(ReaperActionTypes.ram_reaper_far, planner_settings)
+        assert isinstance(ram_planner, LookupTablePathPlanner)
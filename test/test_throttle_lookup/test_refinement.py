@@ -0,0 +1,104 @@
+from python_prototypes.throttle_lookup.refinement import (
+    ThrottleRefinementStore,
+    RefinementRecord,
+    merge_refinements,
+    read_refinement_records,
+)
+from python_prototypes.throttle_lookup.table import (
+    LookupAxis,
+    create_throttle_lookup_table,
+    save_throttle_lookup_table,
+    load_throttle_lookup_table,
+)
+from python_prototypes.throttle_optimization import (
+    GeneticConfiguration,
+    ThrottleCalculationInput,
+    ThrottleSequenceGeneticResult,
+    FitnessScore,
+)
+
+
+def get_small_table():
+    raw_lookup = {
+        (300, 0): [300, 300, 300, 300, 300],
+        (600, 0): [300, 300, 300, 300, 300],
+    }
+    return create_throttle_lookup_table(
+        raw_lookup=raw_lookup,
+        mass=0.5,
+        friction=0.4,
+        genetic_configuration=GeneticConfiguration(speed_threshold=3),
+        distance_axis=LookupAxis(min_value=300, max_value=600, step=300),
+        speed_axis=LookupAxis(min_value=0, max_value=50, step=50),
+    )
+
+
+def get_genetic_result(sequence: list[int]) -> ThrottleSequenceGeneticResult:
+    return ThrottleSequenceGeneticResult(sequence, FitnessScore(0.0, 0.0, 0.0, len(sequence)))
+
+
+class TestThrottleRefinementStore:
+    def test_only_improvements_are_recorded(self, tmp_path):
+        table = get_small_table()
+        store = ThrottleRefinementStore(table, tmp_path / "refinements.jsonl")
+        throttle_input = ThrottleCalculationInput(v0=10, mass=0.5, friction=0.4, d_target=320)
+
+        worse_record = store.offer(throttle_input, get_genetic_result([300] * 40))
+        assert worse_record is None
+
+        better_sequence = [300, 0]
+        better_record = store.offer(throttle_input, get_genetic_result(better_sequence))
+        assert better_record is not None
+        assert better_record.cell_key == (300, 0)
+        assert better_record.fitness < table.entries[(300, 0)].fitness
+
+        # the planner pops the throttles of the result, the record has to keep its own copy
+        better_sequence.pop(0)
+        assert better_record.sequence == [300, 0]
+
+        same_again = store.offer(throttle_input, get_genetic_result([300, 0]))
+        assert same_again is None
+
+        assert store.flush() == 1
+        assert store.flush() == 0
+        records = list(read_refinement_records(tmp_path / "refinements.jsonl"))
+        assert len(records) == 1
+        assert records[0].cell_key == (300, 0)
+
+    def test_almost_straight_movements_are_covered(self):
+        table = get_small_table()
+        assert table.is_covered(
+            ThrottleCalculationInput(v0=10, mass=0.5, friction=0.4, d_target=320, relative_heading=0.05)
+        )
+        assert not table.is_covered(
+            ThrottleCalculationInput(v0=10, mass=0.5, friction=0.4, d_target=320, relative_heading=0.5)
+        )
+
+
+class TestMergeRefinements:
+    def test_best_fitness_wins(self, tmp_path):
+        table = get_small_table()
+        records = [
+            RefinementRecord((300, 0), [300, 0], 0.0, table_version=1, recorded_at=1.0),
+            RefinementRecord((300, 0), [300, 0, 0, 0, 0, 0, 0, 0], 0.0, table_version=1, recorded_at=2.0),
+            RefinementRecord((300, 50), [0, 0], 0.0, table_version=1, recorded_at=3.0),
+            RefinementRecord((301, 0), [0], 0.0, table_version=1, recorded_at=4.0),
+        ]
+        merged_table, changed_cell_count = merge_refinements(table, records)
+
+        assert changed_cell_count == 2
+        assert merged_table.version == table.version + 1
+        assert merged_table.entries[(300, 0)].sequence == [300, 0]
+        assert merged_table.entries[(300, 50)].sequence == [0, 0]
+        assert (301, 0) not in merged_table.entries
+        assert table.entries[(300, 0)].sequence == [300, 300, 300, 300, 300]
+
+        save_throttle_lookup_table(merged_table, tmp_path / "table.json")
+        loaded_table = load_throttle_lookup_table(tmp_path / "table.json")
+        assert loaded_table == merged_table
+
+    def test_version_not_bumped_without_changes(self):
+        table = get_small_table()
+        merged_table, changed_cell_count = merge_refinements(table, [])
+        assert changed_cell_count == 0
+        assert merged_table.version == table.version